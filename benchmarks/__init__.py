@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Benchmark suite for the FamilyMedT persistence and query hot paths.
+# Run with: python -m benchmarks --help
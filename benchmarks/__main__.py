@@ -0,0 +1,6 @@
+# benchmarks/__main__.py
+# Allows running the benchmark suite with: python -m benchmarks
+import sys
+from benchmarks.runner import main
+
+sys.exit(main())
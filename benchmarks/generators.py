@@ -0,0 +1,215 @@
+# generators.py
+# Seeded synthetic family data for benchmarks and scale tests, in the FamilyMedT CSV layout or in memory.
+import csv
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from medication_management.inventory import INVENTORY_COLUMNS
+from medication_management.lots import LotQueue
+from user_management.family import FamilyManagement
+from user_management.reminder import (
+    REMINDER_COLUMNS, KIND_LOW_STOCK, KIND_REFILL, SEVERITY_CRITICAL, SEVERITY_INFO, SEVERITY_WARNING,
+    ReminderSystem
+)
+
+# Building blocks for synthetic medications
+DRUG_NAMES = [
+    "Amoxicillin", "Atorvastatin", "Cetirizine", "Ibuprofen", "Levothyroxine",
+    "Lisinopril", "Metformin", "Omeprazole", "Paracetamol", "Sertraline",
+    "Simvastatin", "Vitamin D", "Amlodipine", "Losartan", "Salbutamol",
+]
+DOSAGES = ["5mg", "10mg", "20mg", "50mg", "100mg", "200mg", "500mg", "1000IU"]
+# (frequency, doses per day, relative weight): most medications are taken daily
+FREQUENCIES = [
+    ("daily", 1, 8), ("twice daily", 2, 5), ("2 times/day", 2, 2), ("3 times/day", 3, 3),
+    ("4 times/day", 4, 1), ("every other day", 1, 1), ("weekly", 1, 1),
+]
+DOCTORS = ["Dr. Smith", "Dr. Lee", "Dr. Patel", "Dr. Garcia", "Dr. Chen"]
+INDICATIONS = ["Hypertension", "Diabetes", "Infection", "Pain", "Allergy", "Asthma"]
+
+# Share of prescription medications, of medications about to run out and of dated stock
+PRESCRIPTION_SHARE = 0.4
+LOW_STOCK_SHARE = 0.15
+LOT_SHARE = 0.3
+
+
+def _medication_row(rng, med_id, today):
+    """Return one synthetic inventory row; numbers are ints and is_prescription a bool."""
+    frequency, doses = rng.choices([(name, doses) for name, doses, _ in FREQUENCIES],
+                                   weights=[weight for _, _, weight in FREQUENCIES])[0]
+    daily_dosage = doses * rng.choice((1, 1, 2))
+    # A few days of supply for medications about to run out, one to three months for the rest
+    days = rng.randint(0, 5) if rng.random() < LOW_STOCK_SHARE else rng.randint(10, 90)
+    row = dict.fromkeys(INVENTORY_COLUMNS, "")
+    row.update(
+        med_id=med_id,
+        name=rng.choice(DRUG_NAMES),
+        dosage=rng.choice(DOSAGES),
+        frequency=frequency,
+        daily_dosage=daily_dosage,
+        stock=days * daily_dosage,
+        is_prescription=rng.random() < PRESCRIPTION_SHARE
+    )
+    if row['is_prescription']:
+        prescribed = today - timedelta(days=rng.randint(0, 365))
+        row.update(
+            doctor_name=rng.choice(DOCTORS),
+            prescription_date=prescribed.isoformat(),
+            indication=rng.choice(INDICATIONS),
+            warnings="Take with food",
+            # Some prescriptions have already expired
+            expiration_date=(prescribed + timedelta(days=rng.randint(30, 730))).isoformat()
+        )
+    if row['stock'] and rng.random() < LOT_SHARE:
+        # Part of the stock in one to three dated lots, some of them already expired
+        lots = LotQueue()
+        remaining = row['stock']
+        for _ in range(rng.randint(1, 3)):
+            quantity = rng.randint(1, remaining)
+            lots.add(quantity, today + timedelta(days=rng.randint(-30, 540)))
+            remaining -= quantity
+            if not remaining:
+                break
+        if remaining:
+            lots.add(remaining)
+        row['lots'] = lots.serialize()
+    return row
+
+
+def _reminder_row(name, row, today):
+    """Return the reminder a medication would have: low stock if it is about to run out, else a refill."""
+    days_left = row['stock'] // row['daily_dosage']
+    if days_left <= 3:
+        kind, severity = KIND_LOW_STOCK, SEVERITY_CRITICAL if days_left <= 1 else SEVERITY_WARNING
+        due_date = today + timedelta(days=days_left)
+    else:
+        kind, severity = KIND_REFILL, SEVERITY_INFO
+        due_date = today + timedelta(days=max(days_left - 7, 0))
+    return {
+        'member': name,
+        'med_id': row['med_id'],
+        'kind': kind,
+        'severity': severity,
+        'med_name': row['name'],
+        'days_left': days_left,
+        'due_date': due_date.isoformat(),
+        'created_at': f"{today.isoformat()}T00:00:00",
+        'message': ''
+    }
+
+
+def iter_dataset(members, meds_per_member, reminders_per_member, seed=0, today=None):
+    """
+    Generate a synthetic family one member at a time.
+
+    Medications follow a realistic mix: most are taken daily, 40% are
+    prescriptions (some of them expired), 15% are about to run out and 30%
+    have part of their stock in dated lots, some of them expired.
+    Medications about to run out get a low stock reminder, and the other
+    reminders are planned refills. Only one member's rows are held at a
+    time, so any number of members can be generated.
+
+    Args:
+        members (int): Number of family members.
+        meds_per_member (int): Number of medications per member.
+        reminders_per_member (int): Number of reminders per member, at most one per medication.
+        seed (int, optional): Random seed, so the same arguments give the same data.
+        today (date, optional): The date the data is relative to. Defaults to today.
+
+    Yields:
+        tuple: (member name, inventory rows, reminder rows), rows as dicts
+        keyed by INVENTORY_COLUMNS and REMINDER_COLUMNS.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    for index in range(members):
+        name = f"Member{index:06d}"
+        rows = [_medication_row(rng, med_id, today) for med_id in range(1, meds_per_member + 1)]
+        # Reminders go to the medications running out first, then to random others
+        chosen = sorted(rows, key=lambda row: (row['stock'] // row['daily_dosage'] > 3, rng.random()))
+        reminders = [_reminder_row(name, row, today) for row in chosen[:reminders_per_member]]
+        yield name, rows, reminders
+
+
+def generate_dataset(base_dir, members, meds_per_member, reminders_per_member, seed=0, today=None):
+    """
+    Write a synthetic family dataset under base_dir/data.
+
+    Files are written directly with the csv module, in the same layout the
+    application reads (members.csv, <member>_inventory.csv, reminders.csv).
+    See iter_dataset() for the data generated.
+
+    Args:
+        base_dir (str or Path): Base directory; the data/ folder is created inside it.
+        members (int): Number of family members.
+        meds_per_member (int): Number of medications per member.
+        reminders_per_member (int): Number of reminders per member.
+        seed (int, optional): Random seed, so the same arguments give the same data.
+        today (date, optional): The date the data is relative to. Defaults to today.
+
+    Returns:
+        list: The generated member names.
+    """
+    data_dir = Path(base_dir) / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+
+    with open(data_dir / "reminders.csv", "w", newline="") as reminder_stream:
+        reminder_writer = csv.DictWriter(reminder_stream, fieldnames=REMINDER_COLUMNS, lineterminator="\n")
+        reminder_writer.writeheader()
+        for name, rows, reminders in iter_dataset(members, meds_per_member, reminders_per_member, seed, today):
+            names.append(name)
+            with open(data_dir / f"{name}_inventory.csv", "w", newline="") as stream:
+                writer = csv.DictWriter(stream, fieldnames=INVENTORY_COLUMNS, lineterminator="\n")
+                writer.writeheader()
+                writer.writerows(rows)
+            reminder_writer.writerows(reminders)
+
+    with open(data_dir / "members.csv", "w", newline="") as stream:
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(["name"])
+        writer.writerows([name] for name in names)
+    return names
+
+
+def generate_memory_family(members, meds_per_member, reminders_per_member, seed=0, today=None, base_dir="."):
+    """
+    Build the synthetic family of generate_dataset() in in-memory mode.
+
+    The generated records are installed as the "saved" state of in-memory
+    objects, without going through add_member() and add_medication(), so a
+    large family is built quickly and its operation log starts empty. Call
+    save_to_disk() on the result to get the same files as generate_dataset().
+
+    Args:
+        members (int): Number of family members.
+        meds_per_member (int): Number of medications per member.
+        reminders_per_member (int): Number of reminders per member.
+        seed (int, optional): Random seed, so the same arguments give the same data.
+        today (date, optional): The date the data is relative to. Defaults to today.
+        base_dir (str or Path, optional): Where save_to_disk() would write.
+
+    Returns:
+        FamilyManagement: The in-memory family, with an in-memory ReminderSystem.
+    """
+    base_dir = Path(base_dir)
+    reminder_system = ReminderSystem(base_dir, in_memory=True)
+    family = FamilyManagement(base_dir, reminder_system, in_memory=True)
+    names = []
+    reminder_records = []
+    for name, rows, reminders in iter_dataset(members, meds_per_member, reminders_per_member, seed, today):
+        names.append(name)
+        inventory = family._new_inventory(name)
+        inventory._saved_records = rows
+        reminder_records.extend(
+            ReminderSystem._record_from_row({column: str(value) for column, value in row.items()})
+            for row in reminders
+        )
+    # Load the installed state the way the objects load their files
+    reminder_system._saved_records = reminder_records
+    reminder_system._load_reminders()
+    family._saved_members = names
+    family._load_members()
+    for name in names:
+        family.members[name]._reload()
+    return family
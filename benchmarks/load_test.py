@@ -0,0 +1,182 @@
+# load_test.py
+# HTTP load test of the FamilyMedT service: requests per second and latency percentiles.
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+from benchmarks.generators import generate_dataset
+from medication_management import events
+
+
+def _percentile(sorted_values, fraction):
+    """Return the value at a fraction (0-1) of a sorted list, by nearest rank."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _request(connection, method, path, body=None):
+    """Send one request on a keep-alive connection and return (status, payload)."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"} if data is not None else {}
+    connection.request(method, path, body=data, headers=headers)
+    response = connection.getresponse()
+    payload = response.read()
+    return response.status, payload
+
+
+def run_load_test(url, clients=8, requests_per_client=200, write_ratio=0.2, seed=0):
+    """
+    Send a read/write request mix to a running service from several clients.
+
+    Each client keeps one HTTP/1.1 connection open for all its requests.
+    Reads list medications and low stock; writes restock a medication by
+    one unit, so the data stays valid however long the test runs.
+
+    Args:
+        url (str): Base URL of the service, e.g. "http://127.0.0.1:8000".
+        clients (int, optional): Number of concurrent client threads.
+        requests_per_client (int, optional): Requests sent by each client.
+        write_ratio (float, optional): Fraction of requests that are writes.
+        seed (int, optional): Seed of the request mix.
+
+    Returns:
+        dict: "requests", "errors", "seconds", "requests_per_second" and the
+        "p50_ms", "p99_ms" and "max_ms" latencies.
+
+    Raises:
+        RuntimeError: If the service has no medications to work with.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    connection = http.client.HTTPConnection(host, port)
+    _, payload = _request(connection, "GET", "/members")
+    targets = []
+    for member in json.loads(payload)["members"]:
+        _, payload = _request(connection, "GET", f"/members/{quote(member)}/medications")
+        targets.extend((quote(member), record["med_id"]) for record in json.loads(payload)["medications"])
+    connection.close()
+    if not targets:
+        raise RuntimeError("The service has no medications to load test")
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index):
+        rng = random.Random(seed + index)
+        connection = http.client.HTTPConnection(host, port)
+        own_latencies, own_errors = [], 0
+        barrier.wait()
+        for _ in range(requests_per_client):
+            member, med_id = rng.choice(targets)
+            if rng.random() < write_ratio:
+                request = ("POST", f"/members/{member}/medications/{med_id}/stock", {"quantity": 1})
+            elif rng.random() < 0.5:
+                request = ("GET", f"/members/{member}/medications", None)
+            else:
+                request = ("GET", f"/members/{member}/low-stock", None)
+            start = time.perf_counter()
+            try:
+                status, _ = _request(connection, *request)
+            except (OSError, http.client.HTTPException):
+                status = None
+                connection.close()  # Reconnects on the next request
+            own_latencies.append(time.perf_counter() - start)
+            if status is None or status >= 400:
+                own_errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(own_latencies)
+            errors[0] += own_errors
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds if seconds else float("inf"),
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point: python -m benchmarks.load_test
+
+    Without --url, a service is started in this process on a generated dataset.
+
+    Args:
+        argv (list, optional): Command line arguments, without the program name.
+
+    Returns:
+        int: 1 if any request failed, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test",
+                                     description="HTTP load test of the FamilyMedT service.")
+    parser.add_argument("--url", help="Base URL of a running service (default: start one on generated data)")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16],
+                        help="Concurrent client counts to run (default: 1 4 16)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client (default: 500)")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of writes (default: 0.2)")
+    parser.add_argument("--members", type=int, default=10, help="Members of the generated dataset (default: 10)")
+    parser.add_argument("--meds", type=int, default=20, help="Medications per generated member (default: 20)")
+    args = parser.parse_args(argv)
+
+    server = None
+    temp_dir = None
+    url = args.url
+    if url is None:
+        # Imported here so a remote load test does not need the service code
+        from server import make_server
+        temp_dir = tempfile.TemporaryDirectory()
+        generate_dataset(temp_dir.name, args.members, args.meds, 2)
+        events.set_sink(events.NullSink())
+        server = make_server(Path(temp_dir.name), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'Clients':>7} {'Requests':>9} {'Req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'Errors':>7}")
+    print("-" * 55)
+    failed = False
+    try:
+        for clients in args.clients:
+            result = run_load_test(url, clients, args.requests, args.write_ratio)
+            failed = failed or result["errors"] != 0
+            print(f"{clients:>7} {result['requests']:>9} {result['requests_per_second']:>9.0f} "
+                  f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}")
+        if server is not None:
+            stats = server.service.stats()
+            print(f"\n{stats['writes']} writes saved in {stats['flushes']} flushes")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+            temp_dir.cleanup()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# runner.py
+# Runs the benchmark scenarios and compares the results with a baseline.
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from benchmarks.generators import generate_dataset
+from benchmarks.scenarios import SCENARIOS
+from medication_management import events
+
+# Dataset sizes as (members, medications per member, reminders per member)
+SIZES = {
+    "tiny": (3, 5, 2),
+    "small": (10, 20, 5),
+    "medium": (100, 50, 10),
+    "large": (1000, 50, 10),
+}
+
+
+def run_scenario(scenario, dataset_dir, repeat):
+    """
+    Time a scenario on fresh copies of a dataset.
+
+    Every repetition runs on its own copy, so mutating scenarios always see
+    the same starting data. Only scenario.run is timed.
+
+    Args:
+        scenario (Scenario): The scenario to run.
+        dataset_dir (Path): Base directory of the generated dataset.
+        repeat (int): Number of timed repetitions.
+
+    Returns:
+        list: The wall times of the repetitions, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            base_dir = Path(work_dir) / "base"
+            shutil.copytree(dataset_dir, base_dir)
+            with events.silenced():
+                state = scenario.setup(base_dir)
+                start = time.perf_counter()
+                scenario.run(state)
+                timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(size="small", repeat=5, seed=0, names=None):
+    """
+    Generate a dataset and run the benchmark scenarios on it.
+
+    Args:
+        size (str, optional): One of the SIZES keys.
+        repeat (int, optional): Number of timed repetitions per scenario.
+        seed (int, optional): Seed of the synthetic dataset.
+        names (list, optional): Only run the scenarios with these names.
+
+    Returns:
+        dict: Machine-readable results with a "meta" and a "results" section.
+    """
+    members, meds, reminders = SIZES[size]
+    results = {}
+    with tempfile.TemporaryDirectory() as dataset_dir:
+        generate_dataset(dataset_dir, members, meds, reminders, seed=seed)
+        for scenario in SCENARIOS:
+            if names and scenario.name not in names:
+                continue
+            timings = run_scenario(scenario, Path(dataset_dir), repeat)
+            results[scenario.name] = {
+                "description": scenario.description,
+                "min": min(timings),
+                "median": statistics.median(timings),
+                "max": max(timings),
+                "repeat": repeat,
+            }
+
+    return {
+        "meta": {
+            "size": size,
+            "members": members,
+            "meds_per_member": meds,
+            "reminders_per_member": reminders,
+            "seed": seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.25):
+    """
+    Compare benchmark results with a baseline.
+
+    A scenario regresses when its median time exceeds the baseline median
+    by more than the tolerance. Scenarios missing from either side are skipped.
+
+    Args:
+        current (dict): Results from run_benchmarks.
+        baseline (dict): Previously stored results.
+        tolerance (float, optional): Allowed slowdown as a fraction (0.25 = 25%).
+
+    Returns:
+        list: Tuples of (scenario, baseline median, current median, ratio, regressed).
+    """
+    comparison = []
+    for name, result in current["results"].items():
+        if name not in baseline.get("results", {}):
+            continue
+        before = baseline["results"][name]["median"]
+        after = result["median"]
+        ratio = after / before if before > 0 else float("inf")
+        comparison.append((name, before, after, ratio, ratio > 1 + tolerance))
+    return comparison
+
+
+def print_results(results, comparison=None):
+    """
+    Print benchmark results, and the baseline comparison if given, as a table.
+
+    Args:
+        results (dict): Results from run_benchmarks.
+        comparison (list, optional): Output of compare_results.
+    """
+    meta = results["meta"]
+    print(f"\nBenchmarks ({meta['size']}: {meta['members']} members x {meta['meds_per_member']} meds "
+          f"x {meta['reminders_per_member']} reminders, {meta['python']})")
+    print(f"{'Scenario':<18} {'Median (ms)':>12} {'Min (ms)':>10} {'Baseline':>10} {'Ratio':>7}")
+    print("-" * 62)
+    compared = {row[0]: row for row in comparison or []}
+    for name, result in results["results"].items():
+        line = f"{name:<18} {result['median'] * 1000:>12.2f} {result['min'] * 1000:>10.2f}"
+        if name in compared:
+            _, before, _, ratio, regressed = compared[name]
+            line += f" {before * 1000:>10.2f} {ratio:>6.2f}x" + ("  REGRESSION" if regressed else "")
+        print(line)
+
+
+def main(argv=None):
+    """
+    Command line entry point of the benchmark suite.
+
+    Args:
+        argv (list, optional): Command line arguments, without the program name.
+
+    Returns:
+        int: 1 if a regression against the baseline was found, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the FamilyMedT benchmarks.")
+    parser.add_argument("--size", choices=list(SIZES), default="small", help="Dataset size (default: small)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per scenario (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset seed (default: 0)")
+    parser.add_argument("--scenario", action="append", help="Only run this scenario (repeatable)")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare with results stored in this JSON file")
+    parser.add_argument("--save-baseline", type=Path, help="Store the results as a new baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.size, args.repeat, args.seed, args.scenario)
+    comparison = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("meta", {}).get("size") != args.size:
+            print(f"Warning: baseline was recorded with size '{baseline.get('meta', {}).get('size')}'",
+                  file=sys.stderr)
+        comparison = compare_results(results, baseline, args.tolerance)
+
+    print_results(results, comparison)
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(results, indent=2) + "\n")
+
+    if comparison and any(row[4] for row in comparison):
+        print("\nPerformance regression detected.", file=sys.stderr)
+        return 1
+    return 0
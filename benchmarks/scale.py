@@ -0,0 +1,178 @@
+# scale.py
+# Scale tests: load time, low stock sweep time and peak memory of large generated families.
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from benchmarks.generators import generate_dataset, generate_memory_family
+from medication_management import events
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+
+try:
+    import resource  # Peak resident memory; not available on Windows
+except ImportError:
+    resource = None
+
+# Upper bounds of one scale test: seconds to load, seconds to sweep, peak memory in MB
+ScaleLimits = namedtuple("ScaleLimits", ["load", "sweep", "peak_mb"])
+
+# Bounds per number of members, with 10 medications and 2 reminders each.
+# They leave room for slower machines and catch growth that is worse than
+# linear; the peak includes the interpreter with pandas and numpy (~70 MB).
+SCALE_LIMITS = {
+    1000: ScaleLimits(load=10, sweep=1, peak_mb=300),
+    10000: ScaleLimits(load=90, sweep=5, peak_mb=1024),
+    100000: ScaleLimits(load=900, sweep=40, peak_mb=6144),
+}
+
+# Storage backends a scale test can run against
+BACKENDS = ("csv", "memory")
+
+
+def _peak_mb():
+    """Return the peak resident memory of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KB elsewhere
+
+
+def measure_scale(members, meds_per_member=10, reminders_per_member=2, seed=0, backend="csv"):
+    """
+    Generate a family and time loading it and sweeping it for low stock.
+
+    With the csv backend the dataset is written to a temporary directory
+    first (not timed) and the load is a cold start from the CSV files. With
+    the memory backend the load is building the in-memory family. The sweep
+    is FamilyManagement.get_all_low_stock(). The peak memory is the whole
+    process's, so run_scale() runs this in a fresh process.
+
+    Args:
+        members (int): Number of family members.
+        meds_per_member (int, optional): Number of medications per member.
+        reminders_per_member (int, optional): Number of reminders per member.
+        seed (int, optional): Seed of the generated data.
+        backend (str, optional): One of BACKENDS.
+
+    Returns:
+        dict: members, backend, load and sweep (seconds), peak_mb (None if
+        unknown) and low_stock (number of warnings found).
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'; expected one of {', '.join(BACKENDS)}.")
+    with tempfile.TemporaryDirectory() as base_dir, events.silenced():
+        base_dir = Path(base_dir)
+        start = time.perf_counter()
+        if backend == "csv":
+            generate_dataset(base_dir, members, meds_per_member, reminders_per_member, seed=seed)
+            start = time.perf_counter()
+            family = FamilyManagement(base_dir, ReminderSystem(base_dir))
+        else:
+            family = generate_memory_family(members, meds_per_member, reminders_per_member, seed=seed,
+                                            base_dir=base_dir)
+        loaded = time.perf_counter()
+        low_stock = family.get_all_low_stock()
+        swept = time.perf_counter()
+    return {
+        "members": members,
+        "backend": backend,
+        "load": loaded - start,
+        "sweep": swept - loaded,
+        "peak_mb": _peak_mb(),
+        "low_stock": len(low_stock),
+    }
+
+
+def run_scale(members, meds_per_member=10, reminders_per_member=2, seed=0, backend="csv"):
+    """
+    Run measure_scale() in a fresh process, so its peak memory is its own.
+
+    Args:
+        members (int): Number of family members.
+        meds_per_member (int, optional): Number of medications per member.
+        reminders_per_member (int, optional): Number of reminders per member.
+        seed (int, optional): Seed of the generated data.
+        backend (str, optional): One of BACKENDS.
+
+    Returns:
+        dict: The result of measure_scale().
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(measure_scale, members, meds_per_member, reminders_per_member, seed, backend).result()
+
+
+def check_limits(result, limits=None):
+    """
+    Compare a scale test result with its upper bounds.
+
+    Args:
+        result (dict): A result of measure_scale() or run_scale().
+        limits (ScaleLimits, optional): The bounds. Defaults to
+            SCALE_LIMITS for the result's number of members.
+
+    Returns:
+        list: One message per bound exceeded, empty if all are met. An
+        unknown peak memory is not checked.
+
+    Raises:
+        KeyError: If no limits are given and SCALE_LIMITS has none for the size.
+    """
+    limits = limits or SCALE_LIMITS[result["members"]]
+    exceeded = []
+    for name, unit in (("load", "s"), ("sweep", "s"), ("peak_mb", " MB")):
+        value, bound = result[name], getattr(limits, name)
+        if value is not None and value > bound:
+            exceeded.append(f"{result['members']} members ({result['backend']}): "
+                            f"{name} {value:.2f}{unit} exceeds {bound}{unit}")
+    return exceeded
+
+
+def main(argv=None):
+    """
+    Command line entry point of the scale tests.
+
+    Args:
+        argv (list, optional): Command line arguments, without the program name.
+
+    Returns:
+        int: 1 if a bound was exceeded, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scale",
+                                     description="Check load time, sweep time and peak memory of large families.")
+    parser.add_argument("--members", type=int, nargs="+", default=[1000],
+                        help="Family sizes to test (default: 1000)")
+    parser.add_argument("--backend", choices=BACKENDS, default="csv", help="Storage backend (default: csv)")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset seed (default: 0)")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    exceeded = []
+    print(f"{'Members':>8} {'Backend':>8} {'Load (s)':>9} {'Sweep (s)':>10} {'Peak (MB)':>10} {'Low stock':>10}")
+    print("-" * 60)
+    for members in args.members:
+        result = run_scale(members, seed=args.seed, backend=args.backend)
+        results.append(result)
+        peak = "n/a" if result["peak_mb"] is None else f"{result['peak_mb']:.0f}"
+        print(f"{members:>8} {args.backend:>8} {result['load']:>9.2f} {result['sweep']:>10.3f} "
+              f"{peak:>10} {result['low_stock']:>10}")
+        if members in SCALE_LIMITS:
+            exceeded.extend(check_limits(result))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    for message in exceeded:
+        print(message, file=sys.stderr)
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# scenarios.py
+# Timed benchmark scenarios for the persistence and query hot paths.
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from user_management.refill import RefillPlanner
+from user_management.schedule import DoseScheduler
+
+
+class Scenario:
+    """
+    A named benchmark scenario.
+
+    Attributes:
+        name (str): The scenario name used in results and baselines.
+        description (str): What the scenario measures.
+        setup (callable): Called with the dataset base_dir; returns the state
+            passed to run. Not timed.
+        run (callable): Called with the state returned by setup. Timed.
+    """
+    def __init__(self, name, description, setup, run):
+        """
+        Initialize a Scenario.
+
+        Args:
+            name (str): The scenario name.
+            description (str): What the scenario measures.
+            setup (callable): Untimed preparation, called with base_dir.
+            run (callable): The timed operation, called with the setup result.
+        """
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.run = run
+
+
+def _load_family(base_dir):
+    """Load the reminder system and family manager from base_dir."""
+    reminder_system = ReminderSystem(base_dir)
+    return FamilyManagement(base_dir, reminder_system)
+
+
+def _first_inventory(base_dir):
+    """Load the family and return the first member's inventory."""
+    family = _load_family(base_dir)
+    return family.members[next(iter(family.members))]
+
+
+def _bulk_restock(family):
+    """Restock every medication of every member in one transaction."""
+    with family.batch():
+        for inventory in family.members.values():
+            inventory.update_stocks({med_id: 10 for med_id in inventory.medications})
+
+
+def _full_save(family):
+    """Save the member list, every inventory and the reminders."""
+    family.save_all_data()
+    family.reminder_system._save_reminders()
+
+
+SCENARIOS = [
+    Scenario("startup", "Load reminders, members and every inventory from CSV",
+             lambda base_dir: base_dir, _load_family),
+    Scenario("warm_startup", "Startup again with unchanged files, served by the snapshots and parse cache",
+             lambda base_dir: _load_family(base_dir).base_dir, _load_family),
+    Scenario("load_reminders", "ReminderSystem._load_reminders",
+             lambda base_dir: base_dir, ReminderSystem),
+    Scenario("load_members", "FamilyManagement._load_members with all inventories",
+             ReminderSystem, lambda reminders: FamilyManagement(reminders.base_dir, reminders)),
+    Scenario("load_inventory", "InventoryManagement._load_inventory for one member",
+             _first_inventory, lambda inventory: inventory._reload()),
+    Scenario("save_inventory", "InventoryManagement._save_inventory for one member",
+             _first_inventory, lambda inventory: inventory._save_inventory()),
+    Scenario("save_reminders", "ReminderSystem._save_reminders",
+             ReminderSystem, lambda reminders: reminders._save_reminders()),
+    Scenario("single_mutation", "One update_stock call, including its saves",
+             _first_inventory, lambda inventory: inventory.update_stock(next(iter(inventory.medications)), 1)),
+    Scenario("bulk_restock", "update_stocks on every medication of every member in one batch",
+             _load_family, _bulk_restock),
+    Scenario("low_stock_sweep", "FamilyManagement.get_all_low_stock",
+             _load_family, lambda family: family.get_all_low_stock()),
+    Scenario("full_save", "FamilyManagement.save_all_data plus the reminders",
+             _load_family, _full_save),
+    Scenario("refill_plan", "RefillPlanner.plan over 60 days for the whole family",
+             lambda base_dir: RefillPlanner(_load_family(base_dir)), lambda planner: planner.plan()),
+    Scenario("dose_schedule", "DoseScheduler stream of the next 7 days for the whole family",
+             lambda base_dir: DoseScheduler(_load_family(base_dir)),
+             lambda scheduler: sum(1 for _ in scheduler.stream(days=7))),
+]
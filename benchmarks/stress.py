@@ -0,0 +1,110 @@
+# stress.py
+# Concurrent restock stress test: checks for lost updates and measures throughput per thread count.
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from medication_management import events
+from medication_management.inventory import InventoryManagement
+from medication_management.medication import Medication
+from user_management.reminder import ReminderSystem
+
+
+def run_stress(base_dir, threads, updates_per_thread, medications=4, group_commit=None):
+    """
+    Restock one inventory from several threads at once.
+
+    Every thread restocks the medications round-robin, one unit per
+    update_stock call, so each medication is contended by all threads.
+
+    Args:
+        base_dir (Path): Base directory of a fresh data directory.
+        threads (int): Number of worker threads.
+        updates_per_thread (int): update_stock calls per thread.
+        medications (int, optional): Number of medications in the inventory.
+        group_commit (float, optional): Enable group commit with this flush
+            interval in seconds. The final flush() is included in the time.
+
+    Returns:
+        dict: "threads", "updates", "seconds", "updates_per_second" and
+        "lost_updates" (expected minus actual total stock, in memory and on disk).
+    """
+    with events.silenced():
+        reminder_system = ReminderSystem(base_dir)
+        inventory = InventoryManagement("Stress", base_dir, reminder_system)
+        med_ids = list(inventory.add_medications(
+            Medication(f"Med {index}", "1mg", "daily", 1, 10) for index in range(medications)
+        ))
+        start_stock = sum(med.stock for med in inventory.medications.values())
+        if group_commit is not None:
+            inventory.enable_group_commit(interval=group_commit)
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(offset):
+            barrier.wait()
+            for update in range(updates_per_thread):
+                inventory.update_stock(med_ids[(offset + update) % len(med_ids)], 1)
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        inventory.flush()
+        seconds = time.perf_counter() - start
+        inventory.disable_group_commit()
+
+        expected = start_stock + threads * updates_per_thread
+        saved = InventoryManagement("Stress", base_dir)
+    updates = threads * updates_per_thread
+    return {
+        "threads": threads,
+        "updates": updates,
+        "seconds": seconds,
+        "updates_per_second": updates / seconds if seconds else float("inf"),
+        "lost_updates": {
+            "memory": expected - sum(med.stock for med in inventory.medications.values()),
+            "disk": expected - sum(med.stock for med in saved.medications.values()),
+        },
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point: python -m benchmarks.stress
+
+    Args:
+        argv (list, optional): Command line arguments, without the program name.
+
+    Returns:
+        int: 1 if any update was lost, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stress",
+                                     description="Concurrent restock stress test.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Thread counts to run (default: 1 2 4 8)")
+    parser.add_argument("--updates", type=int, default=200, help="update_stock calls per thread (default: 200)")
+    parser.add_argument("--group-commit", type=float, metavar="MS",
+                        help="Save in the background every MS milliseconds instead of on every update")
+    args = parser.parse_args(argv)
+
+    print(f"{'Threads':>7} {'Updates':>8} {'Seconds':>9} {'Updates/s':>10} {'Lost':>5}")
+    print("-" * 43)
+    failed = False
+    for threads in args.threads:
+        with tempfile.TemporaryDirectory() as base_dir:
+            interval = args.group_commit / 1000 if args.group_commit is not None else None
+            result = run_stress(Path(base_dir), threads, args.updates, group_commit=interval)
+        lost = max(result["lost_updates"].values())
+        failed = failed or lost != 0
+        print(f"{threads:>7} {result['updates']:>8} {result['seconds']:>9.3f} "
+              f"{result['updates_per_second']:>10.0f} {lost:>5}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
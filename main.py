@@ -1,10 +1,23 @@
 # main.py
+import argparse
+import csv
+import json
 import sys
+from datetime import date
 from pathlib import Path
 from user_management.family import FamilyManagement
 from user_management.reminder import ReminderSystem
+from user_management.refill import RefillPlanner
+from user_management.schedule import DoseScheduler
+from user_management.sweep import (
+    DEFAULT_CHUNK_SIZE, SWEEP_LOW_STOCK, SWEEP_PRESCRIPTION_EXPIRY, sweep_inventories
+)
 from medication_management.medication import Medication
 from medication_management.prescription import PrescriptionMedication
+from medication_management.inventory import medication_from_record
+from medication_management.metrics import registry as metrics
+from medication_management.names import DEFAULT_THRESHOLD
+from medication_management import events
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -14,6 +27,12 @@ class InvalidMenuChoiceError(Exception):
         super().__init__(f"Invalid menu choice: {choice}. Please enter a valid number from 1 to 12.")
 
 
+class BatchInputError(Exception):
+    """Custom exception for invalid records in a batch input file."""
+    def __init__(self, line_number, message):
+        super().__init__(f"Record {line_number}: {message}")
+
+
 def initialize_system():
     """
     Initialize the FamilyMedT system.
@@ -46,12 +65,21 @@ def clean_exit(family_manager):
         # Check if the family manager has a save method and call it
         if hasattr(family_manager, 'save_all_data'):
             family_manager.save_all_data()
+        print_profile()
         print("Goodbye!")
         sys.exit(0)
     except Exception as e:
         print(f"Error during exit: {str(e)}")
         sys.exit(1)
 
+def print_profile():
+    """
+    Print the profiling summary to stderr if profiling (--profile) is enabled.
+    """
+    if metrics.enabled:
+        print("\n=== Profile ===", file=sys.stderr)
+        print(metrics.summary(), file=sys.stderr)
+
 def main():
     """
     Save all data and exit the program.
@@ -162,12 +190,15 @@ def main():
                     try:
                         med_id = int(input("Enter medication ID: "))
                         quantity = int(input("Enter quantity (negative to remove): "))
-                        if inventory_manager.update_stock(med_id, quantity):
+                        expiry = None
+                        if quantity > 0:
+                            expiry = input("Enter expiration date of the new stock (YYYY-MM-DD, blank if unknown): ").strip() or None
+                        if inventory_manager.update_stock(med_id, quantity, expiry):
                             print("Stock updated successfully.")
                         else:
                             print("Failed to update stock.")
                     except ValueError:
-                        print("Please enter valid numbers.")
+                        print("Please enter valid numbers and dates.")
                 else:
                     print("No member selected.")
 
@@ -246,7 +277,395 @@ def main():
         except Exception as e:
             print(f"An error occurred: {str(e)}")
 
+def build_parser():
+    """
+    Build the argument parser for the non-interactive batch commands.
+
+    Returns:
+        argparse.ArgumentParser: The configured parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="FamilyMedT batch commands. Run without arguments for the interactive menu."
+    )
+    parser.add_argument("--base-dir", type=Path, default=BASE_DIR,
+                        help="Directory containing the data/ folder (default: the program directory)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print call counts, timings and file I/O per operation at exit")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only report warnings and errors, not status messages")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_input_arguments(command):
+        command.add_argument("input", nargs="?", default="-",
+                             help="CSV or JSONL batch file, or - for stdin (default)")
+        command.add_argument("--format", choices=["csv", "jsonl"],
+                             help="Input format (default: from the file extension or content)")
+
+    add_input_arguments(commands.add_parser(
+        "add-member", help="Add family members from records with a 'name' field"))
+    add_med = commands.add_parser(
+        "add-med", help="Add medications from records in the inventory CSV schema plus 'member'")
+    add_input_arguments(add_med)
+    add_med.add_argument("--member", help="Member for records without a 'member' field")
+    restock = commands.add_parser(
+        "restock", help="Apply stock changes from records with 'member', 'med_id', 'quantity' and optional 'expiry'")
+    add_input_arguments(restock)
+    restock.add_argument("--member", help="Member for records without a 'member' field")
+    report = commands.add_parser("report", help="Print a stock or prescription report")
+    report.add_argument("--member", help="Member to report on (default: all members)")
+    report.add_argument("--type", choices=["stock", "prescription"], default="stock",
+                        help="Report type (default: stock)")
+    report.add_argument("--format", choices=["text", "csv", "json"], default="text",
+                        help="Output format (default: text)")
+    commands.add_parser("low-stock", help="List low stock medications for all members")
+    commands.add_parser("expire", help="Write off stock of lots past their expiration date")
+    sweep = commands.add_parser(
+        "sweep", help="Stream every inventory file for low stock and expiry, without loading the family")
+    sweep.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                       help=f"Rows checked together; bounds memory use (default: {DEFAULT_CHUNK_SIZE})")
+    sweep.add_argument("--threshold", type=int, default=3,
+                       help="Report medications with at most this many days of stock left (default: 3)")
+    sweep.add_argument("--expiry-days", type=int, default=0,
+                       help="Also report what expires within this many days (default: 0, expired only)")
+    refill_plan = commands.add_parser("refill-plan", help="Plan pharmacy trips that keep every medication in stock")
+    refill_plan.add_argument("--horizon", type=int, default=60, help="Days to plan ahead (default: 60)")
+    refill_plan.add_argument("--safety-days", type=int, default=3,
+                             help="Days of supply every medication keeps at least (default: 3)")
+    refill_plan.add_argument("--refill-days", type=int, default=30, help="Days of supply per refill (default: 30)")
+    refill_plan.add_argument("--window", type=int, default=7,
+                             help="Days before its deadline a refill may be picked up (default: 7)")
+    refill_plan.add_argument("--reminders", action="store_true",
+                             help="Replace the refill reminders with the first planned refill of each medication")
+    schedule = commands.add_parser("schedule", help="Print the dose timetable in time order")
+    schedule.add_argument("--start", type=date.fromisoformat, default=None,
+                          help="First day, YYYY-MM-DD (default: today)")
+    schedule.add_argument("--days", type=int, default=1, help="Number of days (default: 1)")
+    schedule.add_argument("--member", action="append", default=None,
+                          help="Only this member; may be given several times (default: whole family)")
+    commands.add_parser("interactions", help="Check every member's medications for drug interactions")
+    dedup = commands.add_parser("dedup", help="Find medications entered more than once under similar names")
+    dedup.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help=f"Minimum name similarity from 0 to 1 (default: {DEFAULT_THRESHOLD})")
+    dedup.add_argument("--apply", action="store_true",
+                       help="Merge each group into the medication with the lowest ID")
+    commands.add_parser("undo", help="Undo the last recorded change")
+    commands.add_parser("redo", help="Apply the last undone change again")
+    restore = commands.add_parser("restore", help="Restore all inventories to their state at a point in time")
+    restore.add_argument("--at", required=True, help="The point in time, e.g. 2024-05-01T09:30")
+    return parser
+
+
+def read_records(stream, fmt=None):
+    """
+    Read batch records one at a time from a CSV or JSONL stream.
+
+    Args:
+        stream (file): A text stream.
+        fmt (str, optional): "csv" or "jsonl". Detected from the first line if omitted.
+
+    Yields:
+        tuple: The 1-based record number and the record as a dictionary.
+
+    Raises:
+        BatchInputError: If a JSONL line is not a valid JSON object.
+    """
+    first_line = stream.readline()
+    if fmt is None:
+        fmt = "jsonl" if first_line.lstrip().startswith("{") else "csv"
+
+    def lines():
+        yield first_line
+        yield from stream
+
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(lines()), start=1)
+        return
+
+    line_number = 0
+    for line in lines():
+        if not line.strip():
+            continue
+        line_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise BatchInputError(line_number, f"invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise BatchInputError(line_number, "expected a JSON object")
+        yield line_number, record
+
+
+def _open_input(path, fmt):
+    """Open a batch input path (or stdin for '-') and guess its format from the extension."""
+    if path == "-":
+        return sys.stdin, fmt
+    if fmt is None and Path(path).suffix.lower() in (".jsonl", ".ndjson"):
+        fmt = "jsonl"
+    elif fmt is None and Path(path).suffix.lower() == ".csv":
+        fmt = "csv"
+    return open(path, newline=""), fmt
+
+
+def _record_inventory(family_manager, record, line_number, default_member):
+    """Return the inventory of the member named by a batch record."""
+    member = record.get("member") or default_member
+    if not member:
+        raise BatchInputError(line_number, "missing 'member'")
+    if member not in family_manager.members:
+        raise BatchInputError(line_number, f"unknown member '{member}'")
+    return family_manager.members[member]
+
+
+def apply_records(family_manager, command, records, default_member=None):
+    """
+    Apply batch records for a mutating command to the family data.
+
+    Args:
+        family_manager (FamilyManagement): The FamilyManagement instance.
+        command (str): One of "add-member", "add-med" or "restock".
+        records (iterable): Pairs of record number and record dictionary.
+        default_member (str, optional): Member for records without a 'member' field.
+
+    Returns:
+        int: The number of records applied.
+
+    Raises:
+        BatchInputError: If a record is invalid or cannot be applied.
+    """
+    count = 0
+    for line_number, record in records:
+        try:
+            if command == "add-member":
+                name = (record.get("name") or "").strip()
+                if not name:
+                    raise BatchInputError(line_number, "missing 'name'")
+                if not family_manager.add_member(name):
+                    raise BatchInputError(line_number, f"member '{name}' already exists")
+            elif command == "add-med":
+                inventory = _record_inventory(family_manager, record, line_number, default_member)
+                inventory.add_medication(medication_from_record(record))
+            elif command == "restock":
+                inventory = _record_inventory(family_manager, record, line_number, default_member)
+                med_id = int(record["med_id"])
+                if not inventory.update_stock(med_id, int(record["quantity"]), record.get("expiry") or None):
+                    raise BatchInputError(line_number, f"cannot update stock of medication ID {med_id}")
+        except (KeyError, ValueError) as e:
+            raise BatchInputError(line_number, f"invalid record ({e})")
+        count += 1
+    return count
+
+
+def print_low_stock(family_manager):
+    """
+    Print the low stock medications of all family members as a table.
+
+    Args:
+        family_manager (FamilyManagement): The FamilyManagement instance.
+    """
+    low_stock = family_manager.get_all_low_stock()
+    if not low_stock:
+        print("No low stock medications.")
+        return
+    print(f"{'Member':<15} {'ID':<5} {'Name':<20} {'Days Left':<10}")
+    print("-" * 50)
+    for member, med_id, med_name, days_left in low_stock:
+        print(f"{member:<15} {med_id:<5} {med_name:<20} {days_left:<10}")
+
+
+def print_sweep(results):
+    """
+    Print the findings of a streaming sweep one line at a time, as they arrive.
+
+    Args:
+        results (iterable): SweepResult tuples.
+
+    Returns:
+        int: The number of findings printed.
+    """
+    count = 0
+    for result in results:
+        if result.kind == SWEEP_LOW_STOCK:
+            detail = f"low stock, {result.days_left} day(s) left"
+        elif result.kind == SWEEP_PRESCRIPTION_EXPIRY:
+            detail = f"prescription expires {result.expiry}"
+        else:
+            detail = f"{result.quantity} unit(s) in lots expiring from {result.expiry}"
+        print(f"{result.member}: {result.name} (ID {result.med_id}), {detail}")
+        count += 1
+    if not count:
+        print("No low stock or expiring medications.")
+    return count
+
+
+def run_command(argv):
+    """
+    Run a non-interactive batch command.
+
+    All changes of a mutating command are applied in one transaction and
+    the data files are written once at the end; if any record fails,
+    nothing is saved.
+
+    Args:
+        argv (list): Command line arguments, without the program name.
+
+    Returns:
+        int: The process exit status.
+    """
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        metrics.enable()
+
+    # Status events are buffered and go to stderr, so command output on stdout can be piped
+    sink = events.BufferedEventSink(
+        events.StdoutSink(level=events.WARNING if args.quiet else events.INFO, stream=sys.stderr)
+    )
+    with events.use_sink(sink):
+        return _execute_command(args)
+
+
+def _execute_command(args):
+    """
+    Execute a parsed batch command.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        int: The process exit status.
+    """
+    if args.command == "sweep":
+        # The sweep streams the files itself, so the family is never loaded
+        try:
+            print_sweep(sweep_inventories(args.base_dir, threshold=args.threshold,
+                                          expiry_days=args.expiry_days, chunk_size=args.chunk_size))
+        except (ValueError, OSError) as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            return 1
+        finally:
+            print_profile()
+        return 0
+
+    reminder_system = ReminderSystem(args.base_dir)
+    family_manager = FamilyManagement(args.base_dir, reminder_system)
+
+    try:
+        if args.command in ("add-member", "add-med", "restock"):
+            stream, fmt = _open_input(args.input, args.format)
+            try:
+                with family_manager.batch():
+                    count = apply_records(
+                        family_manager, args.command, read_records(stream, fmt),
+                        getattr(args, "member", None)
+                    )
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+            print(f"Applied {count} record(s).")
+
+        elif args.command == "report":
+            if args.member and args.member not in family_manager.members:
+                print(f"Family member '{args.member}' not found.")
+                return 1
+            members = [args.member] if args.member else list(family_manager.members)
+            for member in members:
+                inventory = family_manager.members[member]
+                if args.type == "stock":
+                    inventory.generate_stock_report(fmt=args.format)
+                else:
+                    inventory.generate_prescription_report(fmt=args.format)
+
+        elif args.command == "low-stock":
+            with family_manager.batch():
+                print_low_stock(family_manager)
+
+        elif args.command == "expire":
+            results = family_manager.write_off_expired()
+            for member, written_off in results.items():
+                for med_id, quantity in written_off.items():
+                    print(f"{member}: wrote off {quantity} expired units of medication ID {med_id}.")
+            if not results:
+                print("No expired stock.")
+
+        elif args.command == "dedup":
+            duplicates = family_manager.find_duplicates(args.threshold)
+            for member, groups in duplicates.items():
+                medications = family_manager.members[member].medications
+                for group in groups:
+                    print(f"{member}: " + " + ".join(f"{medications[med_id].name} (ID {med_id})" for med_id in group))
+            if not duplicates:
+                print("No duplicate medications found.")
+            elif args.apply:
+                results = family_manager.merge_duplicates(args.threshold)
+                count = sum(len(others) for merged in results.values() for others in merged.values())
+                print(f"Merged {count} duplicate medication(s).")
+
+        elif args.command == "schedule":
+            doses = 0
+            for dose in DoseScheduler(family_manager).stream(args.start, args.days, args.member):
+                print(f"{dose.time:%Y-%m-%d %H:%M}  {dose.member}: {dose.name} (ID {dose.med_id}), {dose.units:g} unit(s)")
+                doses += 1
+            if not doses:
+                print("No doses scheduled.")
+
+        elif args.command == "refill-plan":
+            planner = RefillPlanner(family_manager)
+            try:
+                trips = planner.plan(horizon=args.horizon, safety_days=args.safety_days,
+                                     refill_days=args.refill_days, window=args.window)
+            except ValueError as e:
+                print(f"Error: {str(e)}", file=sys.stderr)
+                return 1
+            for trip in trips:
+                print(f"{trip.date.isoformat()}: {len(trip.refills)} refill(s)")
+                for refill in trip.refills:
+                    print(f"  {refill.member}: {refill.name} (ID {refill.med_id}), {refill.quantity} units, "
+                          f"{refill.days_left} days left")
+            if not trips:
+                print("No refills needed.")
+            if args.reminders:
+                family_manager.reminder_system.sync_refill_reminders(planner.next_refills(trips))
+
+        elif args.command == "interactions":
+            results = family_manager.check_interactions()
+            for member, pairs in results.items():
+                medications = family_manager.members[member].medications
+                for med_id_a, med_id_b, interaction in pairs:
+                    print(f"{member}: {medications[med_id_a].name} (ID {med_id_a}) + "
+                          f"{medications[med_id_b].name} (ID {med_id_b}) "
+                          f"[{interaction.severity}] {interaction.description}")
+            if not results:
+                print("No drug interactions found.")
+
+        elif args.command in ("undo", "redo"):
+            done = family_manager.undo() if args.command == "undo" else family_manager.redo()
+            if not done:
+                print(f"Nothing to {args.command}.")
+                return 1
+            print(f"{args.command.capitalize()} applied.")
+
+        elif args.command == "restore":
+            try:
+                count = family_manager.restore(args.at)
+            except ValueError as e:
+                print(f"Error: {str(e)}", file=sys.stderr)
+                return 1
+            print(f"Restored the state as of {args.at} ({count} change(s)).")
+
+    except (BatchInputError, OSError) as e:
+        print(f"Error: {str(e)}. No changes were saved.", file=sys.stderr)
+        return 1
+    finally:
+        print_profile()
+    return 0
+
 if __name__ == "__main__":
+    if "--profile" in sys.argv[1:]:
+        # Profiling is enabled before any data is loaded so startup is measured too
+        sys.argv.remove("--profile")
+        metrics.enable()
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
     try:
         main()
     except KeyboardInterrupt:
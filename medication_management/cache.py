@@ -0,0 +1,196 @@
+# cache.py
+# On-disk cache of parsed data files, so unchanged CSVs are not parsed again.
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from medication_management.metrics import registry as metrics
+
+# Bump when the layout of cached values changes, to discard old cache files
+CACHE_VERSION = 1
+
+# A file modified this close to the time its entry was stored may have been
+# modified again within the file system's timestamp resolution, so its
+# entry is only trusted after comparing content hashes.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def _digest(path):
+    """Return the BLAKE2 hash of a file's content."""
+    return hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest()
+
+
+def file_stamp(path):
+    """
+    Take the stamp of a file, to tell later whether its content changed.
+
+    Args:
+        path (Path): The file.
+
+    Returns:
+        tuple: (size, mtime_ns, digest, stored_ns): the file's size,
+        modification time and content hash, and the time the stamp was taken.
+    """
+    stat = Path(path).stat()
+    return stat.st_size, stat.st_mtime_ns, _digest(path), time.time_ns()
+
+
+def stat_is_trusted(stat, mtime_ns, stored_ns):
+    """
+    Whether a file's stat alone shows it unchanged since its stamp was taken:
+    the modification time is the same and was outside the racy window then.
+    """
+    return stat.st_mtime_ns == mtime_ns and stored_ns - stat.st_mtime_ns >= RACY_WINDOW_NS
+
+
+def is_unchanged(path, stat, size, mtime_ns, digest, stored_ns):
+    """
+    Check whether a file still has the content it had when its stamp was taken.
+
+    The cheap stat fields decide when they can be trusted; otherwise the
+    content is hashed and compared.
+
+    Args:
+        path (Path): The file.
+        stat (os.stat_result): The file's current stat.
+        size, mtime_ns, digest, stored_ns: The stamp, see file_stamp().
+
+    Returns:
+        bool: True if the content is unchanged.
+    """
+    if stat.st_size != size:
+        return False
+    return stat_is_trusted(stat, mtime_ns, stored_ns) or digest == _digest(path)
+
+
+def should_restamp(stat, mtime_ns, stored_ns):
+    """
+    Whether a stamp that needed hashing can be taken again so that the
+    next check can trust the stat: the file is now outside the racy window.
+    """
+    return not stat_is_trusted(stat, mtime_ns, stored_ns) and time.time_ns() - stat.st_mtime_ns >= RACY_WINDOW_NS
+
+
+class ParseCache:
+    """
+    A pickle sidecar cache of parsed data files.
+
+    Each entry is keyed by the source file's resolved path, size,
+    modification time and content hash. A lookup first compares the cheap
+    stat fields; the content is only hashed when the stat fields differ
+    or are too recent to be trusted, and the file is only parsed again
+    when its content really changed.
+
+    The cache files are pickles, so the cache directory must only be
+    writable by the data's owner, like the data files themselves.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cache files.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that parsed the source file.
+    """
+    def __init__(self, cache_dir):
+        """
+        Initialize a ParseCache.
+
+        Args:
+            cache_dir (Path): Directory holding the cache files. Created on first store.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, path):
+        """Return the cache file of a source file."""
+        return self.cache_dir / f"{Path(path).name}.pickle"
+
+    def load(self, path, parse, tag=None):
+        """
+        Return the parsed content of a file, from the cache when it is unchanged.
+
+        Args:
+            path (Path): The source file.
+            parse (callable): Called with path to parse the file on a cache miss.
+                Its result must be picklable.
+            tag (str, optional): Identifies the parser and the shape of its
+                result; entries stored with another tag are ignored.
+
+        Returns:
+            The parsed content.
+        """
+        path = Path(path)
+        stat = path.stat()
+        entry = self._read_entry(path)
+        if entry is not None and entry['tag'] == tag and is_unchanged(
+                path, stat, entry['size'], entry['mtime_ns'], entry['digest'], entry['stored_ns']):
+            self.hits += 1
+            if should_restamp(stat, entry['mtime_ns'], entry['stored_ns']):
+                # Refresh the stamp so the next lookup can skip hashing
+                self._write_entry(path, stat, entry['digest'], entry['value'], tag)
+            return entry['value']
+
+        self.misses += 1
+        value = parse(path)
+        self.store(path, value, tag)
+        return value
+
+    def store(self, path, value, tag=None):
+        """
+        Store the parsed content of a file.
+
+        Args:
+            path (Path): The source file, as it is on disk now.
+            value: The parsed content.
+            tag (str, optional): See load().
+        """
+        path = Path(path)
+        try:
+            self._write_entry(path, path.stat(), _digest(path), value, tag)
+        except OSError:
+            pass  # The cache is an optimization; a read-only data directory still works
+
+    def invalidate(self, path):
+        """
+        Drop the cache entry of a file.
+
+        Args:
+            path (Path): The source file.
+        """
+        try:
+            self._entry_path(path).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _read_entry(self, path):
+        """Read the cache entry of a source file, or None if it is missing or unusable."""
+        entry_path = self._entry_path(path)
+        try:
+            with open(entry_path, "rb") as stream:
+                entry = pickle.load(stream)
+        except Exception:
+            return None  # A missing, corrupt or incompatible entry is rebuilt
+        if (not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION
+                or entry.get('path') != str(path.resolve())):
+            return None
+        metrics.record_file_read("ParseCache.load", entry_path)
+        return entry
+
+    def _write_entry(self, path, stat, digest, value, tag):
+        """Write a cache entry atomically."""
+        entry = {
+            'version': CACHE_VERSION,
+            'path': str(path.resolve()),
+            'tag': tag,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'digest': digest,
+            'stored_ns': time.time_ns(),
+            'value': value,
+        }
+        self.cache_dir.mkdir(exist_ok=True)
+        entry_path = self._entry_path(path)
+        temp_path = entry_path.with_name(entry_path.name + f".{os.getpid()}.tmp")
+        with open(temp_path, "wb") as stream:
+            pickle.dump(entry, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
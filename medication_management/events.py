@@ -0,0 +1,314 @@
+# events.py
+# Levelled status events with pluggable sinks, replacing print() side effects.
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Event levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+class Event:
+    """
+    A status event emitted by the domain classes.
+
+    Attributes:
+        level (int): One of DEBUG, INFO, WARNING or ERROR.
+        message (str): The human-readable message.
+        source (str): The emitting component, e.g. "inventory" or "reminders".
+        timestamp (float): When the event was emitted (time.time()).
+    """
+    __slots__ = ('level', 'message', 'source', 'timestamp')
+
+    def __init__(self, level, message, source=None):
+        """
+        Initialize an Event.
+
+        Args:
+            level (int): The event level.
+            message (str): The message.
+            source (str, optional): The emitting component.
+        """
+        self.level = level
+        self.message = message
+        self.source = source
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        """
+        Return a string representation of the Event object.
+
+        Returns: A string representing the event.
+        """
+        return f"Event(level={LEVEL_NAMES.get(self.level, self.level)}, source={self.source}, message={self.message!r})"
+
+
+class StdoutSink:
+    """
+    Print events at or above a level, one line per event (the default sink).
+
+    Attributes:
+        level (int): The minimum level printed.
+        stream (file): Where to print; standard output when None.
+    """
+    def __init__(self, level=INFO, stream=None):
+        """
+        Initialize a StdoutSink.
+
+        Args:
+            level (int, optional): The minimum level printed.
+            stream (file, optional): Where to print. Defaults to standard output.
+        """
+        self.level = level
+        self.stream = stream
+
+    def handle(self, event):
+        """Print an event."""
+        print(event.message, file=self.stream or sys.stdout)
+
+    def flush(self):
+        """Flush the underlying stream."""
+        (self.stream or sys.stdout).flush()
+
+
+class NullSink:
+    """Discard all events."""
+    level = ERROR + 1
+
+    def handle(self, event):
+        """Ignore an event."""
+
+    def flush(self):
+        """Nothing to flush."""
+
+
+class MemorySink:
+    """
+    Keep events in a list, e.g. to inspect them in tests or show them later.
+
+    Attributes:
+        level (int): The minimum level kept.
+        events (list): The kept events, oldest first.
+    """
+    def __init__(self, level=DEBUG):
+        """
+        Initialize a MemorySink.
+
+        Args:
+            level (int, optional): The minimum level kept.
+        """
+        self.level = level
+        self.events = []
+
+    def handle(self, event):
+        """Keep an event."""
+        self.events.append(event)
+
+    def flush(self):
+        """Nothing to flush."""
+
+    def messages(self, level=DEBUG):
+        """
+        Return the messages of the kept events at or above a level.
+
+        Args:
+            level (int, optional): The minimum level.
+
+        Returns:
+            list: The messages, oldest first.
+        """
+        return [event.message for event in self.events if event.level >= level]
+
+
+class BufferedEventSink:
+    """
+    Buffer events and pass them on to another sink in groups.
+
+    The buffer is flushed when it holds `capacity` events, when an event at
+    or above `flush_level` arrives, or when flush() is called.
+
+    Attributes:
+        target: The sink receiving the buffered events.
+        capacity (int): Number of events buffered before flushing.
+        flush_level (int): Events at or above this level flush immediately.
+    """
+    def __init__(self, target, capacity=1000, flush_level=ERROR):
+        """
+        Initialize a BufferedEventSink.
+
+        Args:
+            target: The sink receiving the buffered events.
+            capacity (int, optional): Number of events buffered before flushing.
+            flush_level (int, optional): Events at or above this level flush immediately.
+        """
+        self.target = target
+        self.level = target.level
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def handle(self, event):
+        """Buffer an event, flushing if needed."""
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.capacity or event.level >= self.flush_level
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Pass the buffered events on to the target sink."""
+        with self._lock:
+            events, self._buffer = self._buffer, []
+        for event in events:
+            self.target.handle(event)
+        self.target.flush()
+
+
+class ThreadedSink:
+    """
+    Hand events to another sink on a background thread.
+
+    Emitting only enqueues the event, so slow sinks (terminals, files,
+    network) do not block the caller.
+
+    Attributes:
+        target: The sink receiving the events on the worker thread.
+    """
+    def __init__(self, target):
+        """
+        Initialize a ThreadedSink and start its worker thread.
+
+        Args:
+            target: The sink receiving the events.
+        """
+        self.target = target
+        self.level = target.level
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        """Deliver queued events until the sink is closed."""
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self.target.handle(event)
+            finally:
+                self._queue.task_done()
+
+    def handle(self, event):
+        """Queue an event for delivery."""
+        self._queue.put(event)
+
+    def flush(self):
+        """Wait until every queued event has been delivered."""
+        self._queue.join()
+        self.target.flush()
+
+    def close(self):
+        """Deliver the remaining events and stop the worker thread."""
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self.target.flush()
+
+
+_sink = StdoutSink()
+
+
+def get_sink():
+    """
+    Return the current event sink.
+
+    Returns:
+        The sink receiving events.
+    """
+    return _sink
+
+
+def set_sink(sink):
+    """
+    Replace the event sink.
+
+    Args:
+        sink: An object with a `level` attribute and handle(event) and flush() methods.
+
+    Returns:
+        The previous sink.
+    """
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+@contextmanager
+def use_sink(sink):
+    """
+    Send events to a sink for the duration of a with block.
+
+    Args:
+        sink: The sink to use inside the block.
+
+    Yields:
+        The sink.
+    """
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        sink.flush()
+        set_sink(previous)
+
+
+def silenced():
+    """
+    Discard all events for the duration of a with block.
+
+    Returns:
+        A context manager.
+    """
+    return use_sink(NullSink())
+
+
+def emit(level, message, source=None):
+    """
+    Emit an event to the current sink if its level is high enough.
+
+    Args:
+        level (int): The event level.
+        message (str): The message.
+        source (str, optional): The emitting component.
+    """
+    sink = _sink
+    if level >= sink.level:
+        sink.handle(Event(level, message, source))
+
+
+def debug(message, source=None):
+    """Emit a DEBUG event."""
+    emit(DEBUG, message, source)
+
+
+def info(message, source=None):
+    """Emit an INFO event."""
+    emit(INFO, message, source)
+
+
+def warning(message, source=None):
+    """Emit a WARNING event."""
+    emit(WARNING, message, source)
+
+
+def error(message, source=None):
+    """Emit an ERROR event."""
+    emit(ERROR, message, source)
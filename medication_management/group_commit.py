@@ -0,0 +1,141 @@
+# group_commit.py
+# Background group commit: many in-memory changes, one save.
+import threading
+import time
+
+
+class GroupCommitter:
+    """
+    Save accumulated changes from a background thread.
+
+    Callers change their data in memory and call mark(); the flusher thread
+    saves once `interval` seconds after the first unsaved change, or as soon
+    as `max_ops` changes are waiting, whichever comes first. Every change
+    marked before a save starts is covered by that save, so the number of
+    saves no longer grows with the number of changes.
+
+    flush() is the durability barrier: it returns once every change marked
+    before the call has been saved.
+
+    Attributes:
+        interval (float): Seconds an unsaved change may wait.
+        max_ops (int): Number of waiting changes that triggers a save at once.
+        saves (int): Number of saves performed.
+    """
+    def __init__(self, save, interval=0.05, max_ops=100, name="group-commit"):
+        """
+        Initialize a GroupCommitter and start its flusher thread.
+
+        Args:
+            save (callable): Saves the current state; returns False if the
+                save failed, in which case the changes stay pending and are
+                retried after the next interval.
+            interval (float, optional): Seconds an unsaved change may wait.
+            max_ops (int, optional): Number of waiting changes that triggers a save at once.
+            name (str, optional): Name of the flusher thread.
+        """
+        self.interval = interval
+        self.max_ops = max_ops
+        self.saves = 0
+        self._save = save
+        self._condition = threading.Condition()
+        self._marked = 0  # Sequence number of the last marked change
+        self._saved = 0  # Sequence number covered by the last successful save
+        self._first_pending = None  # Monotonic time of the oldest unsaved change
+        self._urgent = False  # Whether flush() is waiting
+        self._failed = False  # Whether the last save failed
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        """Number of marked changes not saved yet."""
+        return self._marked - self._saved
+
+    def mark(self):
+        """Record that the data changed and must be saved."""
+        with self._condition:
+            self._marked += 1
+            if self._first_pending is None:
+                self._first_pending = time.monotonic()
+                self._condition.notify_all()
+            elif self._marked - self._saved >= self.max_ops:
+                self._condition.notify_all()
+
+    def flush(self):
+        """
+        Wait until every change marked before this call is saved.
+
+        Raises:
+            RuntimeError: If the save failed.
+        """
+        with self._condition:
+            target = self._marked
+            if self._saved >= target:
+                return
+            if self._closed:
+                raise RuntimeError("Cannot flush a closed group committer")
+            self._urgent = True
+            self._failed = False
+            self._condition.notify_all()
+            while self._saved < target and not self._failed:
+                self._condition.wait()
+            if self._saved < target:
+                raise RuntimeError("Saving the pending changes failed")
+
+    def close(self):
+        """
+        Save the pending changes and stop the flusher thread.
+
+        Raises:
+            RuntimeError: If the final save failed.
+        """
+        with self._condition:
+            if self._closed:
+                return
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._thread.join()
+
+    def _due(self):
+        """Whether the pending changes should be saved now."""
+        if self._saved >= self._marked:
+            return False
+        return (self._urgent or self._marked - self._saved >= self.max_ops
+                or time.monotonic() - self._first_pending >= self.interval)
+
+    def _run(self):
+        """Wait for due changes and save them, until closed."""
+        while True:
+            with self._condition:
+                while not self._due():
+                    if self._closed:  # close() has flushed already
+                        return
+                    if self._first_pending is None or self._saved >= self._marked:
+                        self._condition.wait()
+                    else:
+                        self._condition.wait(max(0.0, self._first_pending + self.interval - time.monotonic()))
+                target = self._marked
+                # Changes marked from now on wait for the next save
+                self._first_pending = time.monotonic()
+                self._urgent = False
+
+            try:
+                saved = self._save() is not False
+            except Exception:
+                saved = False
+
+            with self._condition:
+                self.saves += 1
+                if saved:
+                    self._saved = max(self._saved, target)
+                else:
+                    self._failed = True
+                if self._saved >= self._marked:
+                    self._first_pending = None
+                self._condition.notify_all()
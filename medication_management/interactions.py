@@ -0,0 +1,239 @@
+# interactions.py
+# Drug-interaction checks against a local interaction table.
+import csv
+from functools import lru_cache
+from pathlib import Path
+
+# The interaction table shipped with the application
+DEFAULT_TABLE = Path(__file__).resolve().parent / "interactions.csv"
+
+# Interaction severities, mildest first
+SEVERITIES = ("minor", "moderate", "major")
+
+# Reminder severity of an alert for each interaction severity
+ALERT_SEVERITIES = {"minor": "info", "moderate": "warning", "major": "critical"}
+
+
+def normalize_drug_name(name):
+    """
+    Normalize a medication name for grouping (case and whitespace insensitive).
+
+    Args:
+        name (str): The medication name.
+
+    Returns:
+        str: The normalized name.
+    """
+    return " ".join(str(name).split()).casefold()
+
+
+class Interaction:
+    """
+    A known interaction between two drugs.
+
+    Attributes:
+        drug_a (str): One drug, normalized.
+        drug_b (str): The other drug, normalized.
+        severity (str): One of SEVERITIES.
+        description (str): What happens and what to do about it.
+    """
+    __slots__ = ('drug_a', 'drug_b', 'severity', 'description')
+
+    def __init__(self, drug_a, drug_b, severity, description):
+        """
+        Initialize an Interaction.
+
+        Args:
+            drug_a (str): One drug, normalized.
+            drug_b (str): The other drug, normalized.
+            severity (str): One of SEVERITIES.
+            description (str): What happens and what to do about it.
+        """
+        self.drug_a = drug_a
+        self.drug_b = drug_b
+        self.severity = severity
+        self.description = description
+
+    def __repr__(self):
+        return f"Interaction({self.drug_a!r}, {self.drug_b!r}, severity={self.severity!r})"
+
+
+class InteractionIndex:
+    """
+    A hashed pair index of drug interactions.
+
+    Each normalized drug name maps to a dictionary of the drugs it
+    interacts with, so checking one medication against k others takes k
+    dictionary lookups and checking a whole inventory is a set intersection
+    per medication.
+    """
+    def __init__(self, interactions=()):
+        """
+        Initialize an InteractionIndex.
+
+        Args:
+            interactions (iterable, optional): Interaction objects to index.
+        """
+        self._pairs = {}  # drug -> {other drug: Interaction}
+        for interaction in interactions:
+            self.add(interaction)
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Load an interaction table with drug_a, drug_b, severity and description columns.
+
+        Args:
+            path (str or Path): The CSV file.
+
+        Returns:
+            InteractionIndex: The index.
+
+        Raises:
+            ValueError: If a row has an unknown severity.
+        """
+        index = cls()
+        with open(path, newline="", encoding="utf-8") as stream:
+            for line_number, row in enumerate(csv.DictReader(stream), start=2):
+                severity = (row.get('severity') or "").strip().casefold()
+                if severity not in SEVERITIES:
+                    raise ValueError(f"{path}, line {line_number}: unknown severity '{row.get('severity')}'")
+                index.add(Interaction(normalize_drug_name(row['drug_a']), normalize_drug_name(row['drug_b']),
+                                      severity, (row.get('description') or "").strip()))
+        return index
+
+    def add(self, interaction):
+        """
+        Index an interaction under both of its drugs.
+
+        Args:
+            interaction (Interaction): The interaction.
+        """
+        self._pairs.setdefault(interaction.drug_a, {})[interaction.drug_b] = interaction
+        self._pairs.setdefault(interaction.drug_b, {})[interaction.drug_a] = interaction
+
+    def __len__(self):
+        """Return the number of indexed interactions."""
+        return sum(len(others) for others in self._pairs.values()) // 2
+
+    def lookup(self, drug_a, drug_b):
+        """
+        Return the interaction between two drugs.
+
+        Args:
+            drug_a (str): A medication name.
+            drug_b (str): Another medication name.
+
+        Returns:
+            Interaction: The interaction, or None if none is known.
+        """
+        return self._pairs.get(normalize_drug_name(drug_a), {}).get(normalize_drug_name(drug_b))
+
+    def check(self, name, others):
+        """
+        Check one medication against others.
+
+        Args:
+            name (str): The name of the medication to check.
+            others (iterable): (med_id, name) pairs of the other medications.
+
+        Returns:
+            list: (med_id, Interaction) pairs, one per interacting medication.
+        """
+        interacting = self._pairs.get(normalize_drug_name(name))
+        if not interacting:
+            return []
+        found = []
+        for med_id, other in others:
+            interaction = interacting.get(normalize_drug_name(other))
+            if interaction is not None:
+                found.append((med_id, interaction))
+        return found
+
+    def check_medications(self, medications):
+        """
+        Find every interacting pair within one set of medications.
+
+        Args:
+            medications (dict): Medication objects keyed by medication ID.
+
+        Returns:
+            list: (med_id_a, med_id_b, Interaction) tuples with med_id_a < med_id_b.
+        """
+        by_drug = {}  # normalized name -> medication IDs
+        for med_id, medication in medications.items():
+            by_drug.setdefault(normalize_drug_name(medication.name), []).append(med_id)
+
+        found = []
+        for drug, med_ids in by_drug.items():
+            interacting = self._pairs.get(drug)
+            if not interacting:
+                continue
+            for other in interacting.keys() & by_drug.keys():
+                if other <= drug:
+                    continue  # Each pair once
+                for med_id in med_ids:
+                    for other_id in by_drug[other]:
+                        pair = (med_id, other_id) if med_id < other_id else (other_id, med_id)
+                        found.append(pair + (interacting[other],))
+        found.sort(key=lambda item: item[:2])
+        return found
+
+    def check_family(self, members):
+        """
+        Find every interacting pair within each member's inventory, in one pass.
+
+        Args:
+            members (dict): InventoryManagement objects keyed by member name.
+
+        Returns:
+            dict: {member: [(med_id_a, med_id_b, Interaction), ...]} for members with interactions.
+        """
+        results = {}
+        for member, inventory in list(members.items()):
+            found = self.check_medications(inventory.medications)
+            if found:
+                results[member] = found
+        return results
+
+
+def alert_message(med_name, interacting):
+    """
+    Build the alert text for a medication and the medications it interacts with.
+
+    Args:
+        med_name (str): The name of the medication.
+        interacting (list): (other medication name, Interaction) pairs.
+
+    Returns:
+        str: The alert text.
+    """
+    parts = [f"{other} ({interaction.severity}): {interaction.description}" for other, interaction in interacting]
+    return f"Possible interaction of {med_name} with " + "; ".join(parts)
+
+
+def alert_severity(interactions):
+    """
+    Return the reminder severity of an alert: that of its most severe interaction.
+
+    Args:
+        interactions (iterable): Interaction objects.
+
+    Returns:
+        str: "info", "warning" or "critical".
+    """
+    worst = max(SEVERITIES.index(interaction.severity) for interaction in interactions)
+    return ALERT_SEVERITIES[SEVERITIES[worst]]
+
+
+@lru_cache(maxsize=None)
+def default_index():
+    """
+    Return the index of the interaction table shipped with the application.
+
+    The table is loaded once per process.
+
+    Returns:
+        InteractionIndex: The index.
+    """
+    return InteractionIndex.from_csv(DEFAULT_TABLE)
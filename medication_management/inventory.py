@@ -1,9 +1,119 @@
 # inventory.py
+import csv
+import io
+import json
 import os
+import threading
 import pandas as pd
+from datetime import date
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from medication_management.medication import Medication
 from medication_management.prescription import PrescriptionMedication
+from medication_management.metrics import registry as metrics
+from medication_management import events
+from medication_management.snapshot import InventorySnapshot, write_snapshot
+from medication_management.locking import DataFileLock, MemoryLock, ReadWriteLock
+from medication_management.group_commit import GroupCommitter
+from medication_management.oplog import change
+from medication_management.interactions import alert_message, alert_severity, default_index
+from medication_management.lots import LotQueue
+from medication_management.names import DEFAULT_THRESHOLD, NameIndex, clean_name, normalize_name
+from medication_management.report import (
+    PRESCRIPTION_COLUMNS, STOCK_COLUMNS, prescription_report_rows, stock_report_rows, write_report
+)
+
+# Columns of the inventory CSV file
+INVENTORY_COLUMNS = [
+    'med_id', 'name', 'dosage', 'frequency', 'daily_dosage',
+    'stock', 'is_prescription', 'doctor_name', 'prescription_date',
+    'indication', 'warnings', 'expiration_date', 'lots'
+]
+
+# Formats supported by InventoryManagement.export
+EXPORT_FORMATS = ("csv", "json", "jsonl")
+
+def _to_bool(value):
+    """Interpret CSV/JSON truthy values such as "yes", "True" or 1."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def medication_from_record(record):
+    """
+    Build a medication object from a record in the inventory CSV schema.
+
+    Numeric fields may be given as strings (CSV/JSON input) or numbers, and
+    `is_prescription` decides between Medication and PrescriptionMedication.
+
+    Args:
+        record (dict): A mapping with the inventory CSV columns.
+
+    Returns:
+        Medication: The medication or prescription medication object.
+
+    Raises:
+        KeyError: If a required field is missing.
+        ValueError: If a numeric or date field is invalid.
+    """
+    fields = dict(
+        name=record['name'],
+        dosage=record['dosage'],
+        frequency=record['frequency'],
+        daily_dosage=int(float(record['daily_dosage'])),
+        stock=int(float(record['stock']))
+    )
+    if _to_bool(record.get('is_prescription', False)):  # Differentiate between prescription and non-prescription medications
+        medication = PrescriptionMedication(
+            doctor_name=record['doctor_name'],
+            prescription_date=record['prescription_date'],
+            indication=record['indication'],
+            warnings=record['warnings'],
+            expiration_date=record['expiration_date'],
+            **fields
+        )
+    else:
+        medication = Medication(**fields)
+    lots = record.get('lots')
+    if isinstance(lots, str) and lots:  # Missing in files written before lots were tracked
+        medication.lots = LotQueue.parse(lots)
+        medication.lots = medication.stock_lots()  # The stock column wins if they disagree
+    return medication
+
+
+def _lots_of(record):
+    """Return the lots of a saved record, with undated stock made explicit."""
+    lots = LotQueue.parse(record.get('lots') or "")
+    if record['stock'] > lots.total:
+        lots.add(record['stock'] - lots.total)
+    return lots
+
+
+def _record_of(medication):
+    """Return the saved fields of a medication, used to detect local changes."""
+    record = medication.to_dict()
+    record['is_prescription'] = isinstance(medication, PrescriptionMedication)
+    return record
+
+
+def medication_record(med_id, medication):
+    """
+    Return a medication as a record in the inventory CSV schema.
+
+    Args:
+        med_id (int): The ID of the medication.
+        medication (Medication): The medication.
+
+    Returns:
+        dict: The record, with every inventory column.
+    """
+    record = dict.fromkeys(INVENTORY_COLUMNS)
+    record.update(medication.to_dict())
+    record['med_id'] = med_id
+    record['is_prescription'] = isinstance(medication, PrescriptionMedication)
+    return record
+
 
 class InventoryManagement:
     """
@@ -13,8 +123,16 @@ class InventoryManagement:
         member_name (str): Name of the member.
         base_dir (Path): Base directory to store data files.
         reminder_system (object): Optional reminder system for low stock alerts.
+        oplog (OperationLog): Optional operation log the changes are recorded in.
+        interactions (InteractionIndex): Drug interactions checked when medications are added,
+            or None to skip the checks.
+        in_memory (bool): Whether the inventory lives in memory only; see save_to_disk().
+
+    Listeners added with add_listener() are called after every change to a
+    medication other than its stock, so derived data such as dose schedules
+    can be updated for that medication alone.
     """    
-    def __init__(self, member_name, base_dir, reminder_system=None):
+    def __init__(self, member_name, base_dir, reminder_system=None, in_memory=False):
         """
         Initialize the InventoryManagement class.
 
@@ -22,103 +140,497 @@ class InventoryManagement:
             member_name (str): Name of the member.
             base_dir (str): Base directory to store data files.
             reminder_system (object, optional): Reminder system for alerts.
+            in_memory (bool, optional): Keep the inventory in memory only. It
+                starts empty, saves keep a copy of the records instead of
+                writing files, and no file is touched until save_to_disk().
         """
         self.member_name = member_name
         self.base_dir = Path(base_dir)
         self.reminder_system = reminder_system
-        
+        self.in_memory = in_memory
+
         # Ensure the data directory exists
         self.data_dir = self.base_dir / "data"
-        self.data_dir.mkdir(exist_ok=True)
+        if not in_memory:
+            self.data_dir.mkdir(exist_ok=True)
         
         self.inventory_file = self.data_dir / f"{member_name}_inventory.csv"   # Define paths for inventory and history files
         self.history_file = self.data_dir / f"{member_name}_history.csv"
+        self.snapshot_file = self.data_dir / f"{member_name}_inventory.snap"  # Binary mirror of the CSV for fast loading
 
         self.medications = {} # Initialize medication dictionary and ID tracker
         self.next_med_id = 1
+        self.revision = 0  # Incremented on every change, so caches can detect stale data
+        self._batch_depth = 0  # Nesting depth of open batch() blocks
+        self._dirty = False  # Whether a save was deferred by an open batch
+        # Guards the file against other processes
+        self._lock = MemoryLock(self.inventory_file) if in_memory else DataFileLock(self.inventory_file)
+        self._saved_records = []  # In-memory mode: the records as last saved, standing in for the file
+        self._rwlock = ReadWriteLock()  # Shared by stock updates; held exclusively by structural changes, saves and batches
+        self._med_locks = {}  # Per-medication locks serializing stock updates of the same medication
+        self._version = 0  # Version of the inventory file the in-memory state is based on
+        self._base = {}  # Saved fields per medication at that version, for merging
+        self._committer = None  # Background saver while group commit is enabled
+        self.oplog = None  # Set by FamilyManagement to record changes for undo and restore
+        self.interactions = default_index()  # Checked when medications are added
+        self._listeners = []  # Called with (inventory, med_ids) after medications change
+        self._name_index = None  # Trigram index of the medication names, built on first lookup
+        self._names_lock = threading.Lock()  # Guards the name index, updated after changes outside the write lock
+        self._indexed_names = {}  # med_id -> name it is indexed under
         self._load_inventory() # Load inventory if it exists
 
     def _load_inventory(self):
         """
         Load inventory data from a CSV file. If the file doesn't exist,
         create an empty inventory file.
+
+        The file is read under its shared lock, and the version read is
+        remembered so that a later save can detect concurrent writers.
+        """
+        with self._lock.shared():
+            self._read_inventory()
+            self._version = self._lock.version()
+        self._base = {med_id: _record_of(med) for med_id, med in self.medications.items()}
+
+    def _read_inventory(self):
         """
+        Read the inventory file (or its snapshot), replacing self.medications
+        with a new dictionary so that concurrent readers never see it half-filled.
+        """
+        self.next_med_id = 1
+        if self.in_memory:
+            self.medications = {record['med_id']: medication_from_record(record) for record in self._saved_records}
+            self.next_med_id = max(self.medications, default=0) + 1
+            return
         if not self.inventory_file.exists():
+            self.medications = {}
             self._create_empty_inventory()
             return
+        if self._load_snapshot():
+            return
 
+        medications = {}
         try:
             df = pd.read_csv(self.inventory_file)
+            metrics.record_file_read("InventoryManagement._load_inventory", self.inventory_file)
             if df.empty:
+                self.medications = {}
                 self._create_empty_inventory()
                 return
             # Load medications from the CSV file
             for _, row in df.iterrows():
                 try:
-                    if row['is_prescription']:  # Differentiate between prescription and non-prescription medications
-                        med = PrescriptionMedication(
-                            name=row['name'],
-                            dosage=row['dosage'],
-                            frequency=row['frequency'],
-                            daily_dosage=row['daily_dosage'],
-                            stock=row['stock'],
-                            doctor_name=row['doctor_name'],
-                            prescription_date=row['prescription_date'],
-                            indication=row['indication'],
-                            warnings=row['warnings'],
-                            expiration_date=row['expiration_date']
-                        )
-                    else:
-                        med = Medication(
-                            name=row['name'],
-                            dosage=row['dosage'],
-                            frequency=row['frequency'],
-                            daily_dosage=row['daily_dosage'],
-                            stock=row['stock']
-                        )
-                    self.medications[int(row['med_id'])] = med
+                    medications[int(row['med_id'])] = medication_from_record(row)
                 except Exception as e:
-                    print(f"Error loading medication: {str(e)}")
+                    events.error(f"Error loading medication: {str(e)}", "inventory")
                     continue
 
             if not df.empty:     # Update the next medication ID
-                self.next_med_id = df['med_id'].max() + 1
+                self.next_med_id = int(df['med_id'].max()) + 1
 
         except Exception as e:
-            print(f"Error loading inventory: {str(e)}")
+            events.error(f"Error loading inventory: {str(e)}", "inventory")
+            self.medications = {}
             self._create_empty_inventory()
+            return
+        self.medications = medications
+
+        # Rebuild the snapshot so the next start can skip parsing the CSV
+        try:
+            write_snapshot(self.snapshot_file, self.medications, source=self.inventory_file)
+        except OSError:
+            pass
+
+    def _load_snapshot(self):
+        """
+        Load the inventory from its binary snapshot if the snapshot still
+        mirrors the CSV file, which avoids parsing the CSV.
+
+        Returns:
+            bool: True if the inventory was loaded from the snapshot.
+        """
+        if not self.snapshot_file.exists():
+            return False
+        try:
+            with InventorySnapshot(self.snapshot_file) as snapshot:
+                if not snapshot.is_fresh(self.inventory_file):
+                    return False
+                medications = snapshot.medications()
+                restamp = snapshot.should_restamp(self.inventory_file)
+        except Exception as e:
+            events.debug(f"Ignoring inventory snapshot: {str(e)}", "inventory")
+            return False
+        metrics.record_file_read("InventoryManagement._load_inventory", self.snapshot_file)
+        if restamp:
+            # Stamp the source again so the next start can skip hashing it
+            try:
+                write_snapshot(self.snapshot_file, medications, source=self.inventory_file)
+            except OSError:
+                pass
+        self.medications = medications
+        if medications:
+            self.next_med_id = max(medications) + 1
+        return True
+
+    def open_snapshot(self):
+        """
+        Open the binary snapshot of the saved inventory for read-only queries.
+
+        The snapshot is memory-mapped, so queries such as
+        InventorySnapshot.check_low_stock read only the columns they need.
+        Unsaved changes are not included.
+
+        Returns:
+            InventorySnapshot: The open snapshot, or None if there is no
+            up-to-date snapshot (always in in-memory mode). Close it when done.
+        """
+        if self.in_memory or not self.snapshot_file.exists():
+            return None
+        snapshot = InventorySnapshot(self.snapshot_file)
+        if not snapshot.is_fresh(self.inventory_file):
+            snapshot.close()
+            return None
+        return snapshot
 
     def _create_empty_inventory(self):
         """Create an empty inventory file with predefined columns."""
-        columns = [
-            'med_id', 'name', 'dosage', 'frequency', 'daily_dosage',
-            'stock', 'is_prescription', 'doctor_name', 'prescription_date',
-            'indication', 'warnings', 'expiration_date'
-        ]
-        df = pd.DataFrame(columns=columns)
+        df = pd.DataFrame(columns=INVENTORY_COLUMNS)
         df.to_csv(self.inventory_file, index=False)
+        write_snapshot(self.snapshot_file, {}, source=self.inventory_file)
 
     def _save_inventory(self):
         """
         Save the current inventory to a CSV file.
+
+        The file is written under its exclusive lock. If another process
+        saved it since it was loaded, the local changes are merged into the
+        saved inventory first instead of overwriting it.
+
+        Returns:
+            bool: False if saving failed, otherwise True.
         """
         try:
-            data = []
-            for med_id, med in self.medications.items():
-                med_data = med.to_dict()
-                med_data['med_id'] = med_id
-                med_data['is_prescription'] = isinstance(med, PrescriptionMedication)
-                data.append(med_data)
-
-            if not data:
-                return
+            with self._rwlock.write(), self._lock.exclusive():
+                if self._lock.version() != self._version:
+                    self._merge_with_saved()
+                self._write_inventory()
+                self._version = self._lock.bump()
+                self._base = {med_id: _record_of(med) for med_id, med in self.medications.items()}
+            events.info(f"Inventory for {self.member_name} saved successfully.", "inventory")
+            return True
+
+        except Exception as e:
+            events.error(f"Error saving inventory: {str(e)}", "inventory")
+            return False
+
+    def _write_inventory(self):
+        """
+        Write the inventory CSV file and its snapshot, or in in-memory mode
+        keep a copy of the records in their place.
+        """
+        if self.in_memory:
+            self._saved_records = list(self.iter_records())
+            return True
+        return self._write_files()
+
+    def _write_files(self):
+        """
+        Write the inventory CSV file and its snapshot.
+        """
+        data = []
+        for med_id, med in self.medications.items():
+            med_data = med.to_dict()
+            med_data['med_id'] = med_id
+            med_data['is_prescription'] = isinstance(med, PrescriptionMedication)
+            data.append(med_data)
+
+        # An empty inventory still gets its header, so deleting the last medication is saved
+        df = pd.DataFrame(data) if data else pd.DataFrame(columns=INVENTORY_COLUMNS)
+        df.to_csv(self.inventory_file, index=False)
+        metrics.record_file_write("InventoryManagement._save_inventory", self.inventory_file)
+        write_snapshot(self.snapshot_file, self.medications, source=self.inventory_file)
+        metrics.record_file_write("InventoryManagement._save_inventory", self.snapshot_file)
+        return True
 
-            df = pd.DataFrame(data)
-            df.to_csv(self.inventory_file, index=False)
-            print(f"Inventory for {self.member_name} saved successfully.")
+    def save_to_disk(self):
+        """
+        Write the inventory files, also in in-memory mode.
+
+        In in-memory mode this is the only method that touches the disk: it
+        writes the CSV file and its snapshot under base_dir/data, creating
+        the directory if needed, and bumps the file's version so other
+        processes reload it. The inventory stays in memory. Otherwise it is
+        a normal save.
 
+        Returns:
+            bool: False if saving failed, otherwise True.
+        """
+        if not self.in_memory:
+            return self._save_inventory()
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            with self._rwlock.write(), DataFileLock(self.inventory_file).exclusive() as lock:
+                self._write_files()
+                lock.bump()
+            events.info(f"Inventory for {self.member_name} written to {self.inventory_file}.", "inventory")
+            return True
         except Exception as e:
-            print(f"Error saving inventory: {str(e)}")
+            events.error(f"Error writing inventory to disk: {str(e)}", "inventory")
+            return False
+
+    def _merge_with_saved(self):
+        """
+        Merge the local changes into the inventory saved by another process.
+
+        A three-way merge against the state loaded at the last load or save:
+        stock changes are applied as deltas on top of the saved stock, so
+        concurrent restocks add up; medications deleted here are deleted
+        there; medications added here are kept, with a new ID if another
+        process used theirs; and changes to medications another process
+        deleted are dropped.
+        """
+        base, ours = self._base, self.medications
+        self._read_inventory()
+        theirs = self.medications
+        merged = dict(theirs)
+        free_id = max(list(merged) + list(ours) + list(base), default=0) + 1
+
+        for med_id, medication in ours.items():
+            before = base.get(med_id)
+            if before is None:  # Added here
+                if med_id in theirs:
+                    events.warning(f"Medication ID {med_id} was also added by another process; "
+                                   f"{medication.name} now has ID {free_id}.", "inventory")
+                    med_id, free_id = free_id, free_id + 1
+                merged[med_id] = medication
+                continue
+            record = _record_of(medication)
+            if record == before:  # Unchanged here, keep the saved version
+                continue
+            saved = theirs.get(med_id)
+            if saved is None:
+                events.warning(f"Medication '{medication.name}' (ID {med_id}) was deleted by another process; "
+                               f"discarding its changes.", "inventory")
+                continue
+            stock = saved.stock + medication.stock - before['stock']
+            record['stock'], record['lots'] = before['stock'], before['lots']
+            if record == before:  # Only the stock changed here: apply the lot changes to the saved lots
+                lots = saved.stock_lots().copy()
+                shortfall = lots.apply_changes(_lots_of(before), medication.stock_lots())
+                saved.lots = lots
+                medication, stock = saved, lots.total
+                if shortfall:
+                    stock = -shortfall
+            if stock < 0:
+                events.warning(f"Stock of '{medication.name}' (ID {med_id}) would drop below zero after merging; "
+                               f"setting it to 0.", "inventory")
+                stock = 0
+            medication.stock = stock
+            merged[med_id] = medication
+
+        for med_id in base:
+            if med_id not in ours:  # Deleted here
+                merged.pop(med_id, None)
+
+        self.medications = merged
+        self.next_med_id = max(merged, default=0) + 1
+        self.revision += 1
+        self._notify(None)
+        events.info(f"Merged changes to {self.member_name}'s inventory saved by another process.", "inventory")
+
+    def _persist(self):
+        """
+        Save the inventory, or defer the save while a batch is open or
+        group commit is enabled.
+        """
+        with self._rwlock.write():
+            self.revision += 1
+            if self._batch_depth:
+                self._dirty = True
+                return
+            if self._committer is not None:
+                self._committer.mark()
+                return
+            self._save_inventory()
+
+    def enable_group_commit(self, interval=0.05, max_ops=100):
+        """
+        Save changes from a background thread instead of on every change.
+
+        Changes are applied in memory at once and saved together `interval`
+        seconds after the first unsaved change, or as soon as `max_ops`
+        changes are waiting. Use flush() where a change must be on disk.
+
+        Args:
+            interval (float, optional): Seconds an unsaved change may wait.
+            max_ops (int, optional): Number of waiting changes that triggers a save at once.
+        """
+        with self._rwlock.write():
+            if self._committer is None:
+                self._committer = GroupCommitter(self._save_inventory, interval, max_ops,
+                                                 name=f"group-commit-{self.member_name}")
+
+    def disable_group_commit(self):
+        """
+        Save the pending changes and return to saving on every change.
+
+        Raises:
+            RuntimeError: If saving the pending changes failed.
+        """
+        with self._rwlock.write():
+            committer, self._committer = self._committer, None
+        if committer is not None:
+            committer.close()
+
+    def flush(self):
+        """
+        Wait until every change made so far is saved.
+
+        Without group commit every change is saved before its method
+        returns, so there is nothing to wait for. Must not be called inside
+        a batch() block of the same thread.
+
+        Raises:
+            RuntimeError: If saving the pending changes failed.
+        """
+        committer = self._committer
+        if committer is not None:
+            committer.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several mutations into one transaction that is saved once.
+
+        Saves are deferred until the outermost batch exits. If the block
+        raises, the in-memory changes are discarded by reloading the
+        inventory file and the exception is re-raised. Other threads cannot
+        change the inventory while a batch is open. With group commit,
+        changes made before the batch are saved when it starts, so a
+        rollback does not discard them.
+
+        Yields:
+            InventoryManagement: This inventory.
+        """
+        with self._log_transaction(), self._rwlock.write():
+            committer = self._committer
+            if not self._batch_depth and committer is not None and committer.pending:
+                self._save_inventory()
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._dirty = False
+                    self._reload()
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._dirty = False
+                self._save_inventory()
+
+    def _item_level(self):
+        """
+        Level for per-item events: DEBUG inside a batch, where one summary
+        is emitted instead, otherwise INFO.
+        """
+        return events.DEBUG if self._batch_depth else events.INFO
+
+    def _reload(self):
+        """Discard the in-memory state and load the inventory file again."""
+        with self._rwlock.write():
+            self.revision += 1
+            self._load_inventory()
+        self._notify(None)
+
+    def _log_transaction(self):
+        """Collect the changes of a batch into one operation log entry."""
+        return self.oplog.transaction() if self.oplog is not None else nullcontext()
+
+    def _log(self, op, changes):
+        """Record changes in the operation log, if there is one."""
+        if self.oplog is not None:
+            self.oplog.record(op, changes)
+
+    def _put_medication(self, med_id, record):
+        """
+        Set or remove one medication from a record, for undo and restore.
+
+        Args:
+            med_id (int): The ID of the medication.
+            record (dict): The medication record, or None to remove it.
+        """
+        with self._rwlock.write():
+            medications = dict(self.medications)
+            if record is None:
+                if medications.pop(med_id, None) is None:
+                    return
+                self._med_locks.pop(med_id, None)
+            else:
+                medications[med_id] = medication_from_record(record)
+                self.next_med_id = max(self.next_med_id, med_id + 1)
+            self.medications = medications
+            self._persist()
+        self._notify([med_id])
+
+    def _replace_medications(self, records):
+        """
+        Replace all medications with the given records, for undo and restore.
+
+        Args:
+            records (list): Medication records in the inventory CSV schema.
+        """
+        with self._rwlock.write():
+            self.medications = {record['med_id']: medication_from_record(record) for record in records}
+            self.next_med_id = max(self.medications, default=0) + 1
+            self._med_locks = {}
+            self._persist()
+        self._notify(None)
+
+    def add_listener(self, listener):
+        """
+        Register a function called after medications are added, changed or deleted.
+
+        The listener is called as listener(inventory, med_ids), where med_ids
+        lists the IDs of the changed medications, or is None if any medication
+        may have changed (e.g. after a reload). Stock changes are not reported.
+
+        Args:
+            listener (callable): The function to call.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregister a function added with add_listener().
+
+        Args:
+            listener (callable): The function to remove.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, med_ids):
+        """Call the listeners; a failing listener is reported and does not undo the change."""
+        with self._names_lock:
+            if self._name_index is not None:
+                if med_ids is None:
+                    self._name_index = None  # Rebuilt on the next lookup
+                else:
+                    self._reindex_names(med_ids)
+        for listener in list(self._listeners):
+            try:
+                listener(self, med_ids)
+            except Exception as e:
+                events.error(f"Error in inventory listener: {str(e)}", "inventory")
+
+    def _med_lock(self, med_id):
+        """Return the lock serializing stock updates of one medication."""
+        lock = self._med_locks.get(med_id)
+        if lock is None:
+            lock = self._med_locks.setdefault(med_id, threading.Lock())
+        return lock
 
     def add_medication(self, medication):
         """
@@ -130,66 +642,600 @@ class InventoryManagement:
         Returns:
             int: The ID of the added medication.
         """
-        med_id = self.next_med_id
-        self.medications[med_id] = medication
-        self.next_med_id += 1
-
-        self._save_inventory()
-        print(f"Added medication {medication.name} with ID {med_id}")
+        medication.name = clean_name(medication.name)
+        with self._rwlock.write():
+            med_id = self.next_med_id
+            self.medications = {**self.medications, med_id: medication}  # Copy on write for lock-free readers
+            self.next_med_id += 1
+            self._persist()
+            self._log("add_medication", [change(self.member_name, med_id, None, medication_record(med_id, medication))])
+        self._notify([med_id])
+        events.emit(self._item_level(), f"Added medication {medication.name} with ID {med_id}", "inventory")
         
         # Check stock and set reminders if applicable
         try:
             days_left = medication.calculate_days_left()
             if days_left <= 3 and self.reminder_system:
-                self.reminder_system.set_reminder(
-                    self.member_name,
-                    med_id,
-                    f"Low stock alert for {medication.name} (ID {med_id})! Only {days_left} days left."
+                self.reminder_system.set_low_stock_reminder(
+                    self.member_name, med_id, medication.name, days_left
                 )
         except Exception as e:
-            print(f"Error checking stock for new medication: {str(e)}")
-        
+            events.error(f"Error checking stock for new medication: {str(e)}", "inventory")
+
+        self._report_new_medications([med_id])
+
+        if self.interactions is not None:
+            others = ((other_id, other.name) for other_id, other in self.medications.items() if other_id != med_id)
+            pairs = [(other_id, med_id, interaction)
+                     for other_id, interaction in self.interactions.check(medication.name, others)]
+            self._report_interactions(pairs)
+
         return med_id
 
-    def update_stock(self, med_id, quantity):
+    def _report_new_medications(self, med_ids):
+        """
+        Warn about dosage conflicts and likely duplicates of new medications.
+
+        A medication is reported as a duplicate of the older medications
+        only, so two similar medications added together are reported once.
+        """
+        medications = self.medications
+        for med_id in med_ids:
+            medication = medications.get(med_id)
+            if medication is None:
+                continue
+            conflict = medication.dosage_conflict()
+            if conflict:
+                events.warning(f"Medication '{medication.name}' (ID {med_id}): {conflict}", "inventory")
+
+            dose_key = self._dose_key(medication)
+            duplicates = [f"'{other_name}' (ID {other_id})"
+                          for other_id, other_name, _ in self.find_similar(medication.name, limit=5)
+                          if other_id < med_id and other_id in medications
+                          and self._dose_key(medications[other_id]) == dose_key]
+            if duplicates:
+                events.warning(f"Medication '{medication.name}' (ID {med_id}) may duplicate {', '.join(duplicates)}; "
+                               f"see find_duplicates() or the dedup command.", "inventory")
+
+    def _names(self):
+        """Return the trigram index of the medication names, building it if needed; hold _names_lock."""
+        index = self._name_index
+        if index is None:
+            medications = self.medications
+            index = NameIndex((medication.name, med_id) for med_id, medication in medications.items())
+            self._indexed_names = {med_id: medication.name for med_id, medication in medications.items()}
+            self._name_index = index
+        return index
+
+    def _reindex_names(self, med_ids):
+        """Bring the names of some medications up to date in the name index."""
+        for med_id in med_ids:
+            name = self._indexed_names.pop(med_id, None)
+            if name is not None:
+                self._name_index.remove(name, med_id)
+            medication = self.medications.get(med_id)
+            if medication is not None:
+                self._name_index.add(medication.name, med_id)
+                self._indexed_names[med_id] = medication.name
+
+    @staticmethod
+    def _dose_key(medication):
+        """Return what must be equal for two similarly named medications to be duplicates."""
+        dose = medication.dose
+        return (isinstance(medication, PrescriptionMedication),
+                dose if dose is not None else normalize_name(medication.dosage))
+
+    def find_similar(self, name, threshold=DEFAULT_THRESHOLD, limit=None):
+        """
+        Find the medications whose names are similar to a name.
+
+        Names are compared after normalization (case, spacing and
+        punctuation ignored) by trigram similarity, so misspellings such as
+        "Ibuprofin" find "Ibuprofen".
+
+        Args:
+            name (str): The name to look up.
+            threshold (float, optional): The minimum similarity, from 0 to 1.
+            limit (int, optional): The maximum number of names matched.
+
+        Returns:
+            list: (med_id, name, score) tuples, most similar first.
+        """
+        with self._names_lock:
+            matches = self._names().similar(name, threshold, limit)
+        medications = self.medications
+        return [(med_id, medications[med_id].name, match.score)
+                for match in matches for med_id in sorted(match.keys) if med_id in medications]
+
+    def find_duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """
+        Find groups of medications that are probably entered more than once.
+
+        Medications are duplicates when their names are similar, directly
+        or through another medication of the group, and they have the same
+        dose and are both prescription or both non-prescription.
+
+        Args:
+            threshold (float, optional): The minimum similarity of two names, from 0 to 1.
+
+        Returns:
+            list: Lists of medication IDs, in ascending order, of two or more medications each.
+        """
+        with self._names_lock:
+            groups = self._names().groups(threshold)
+        medications = self.medications
+        duplicates = []
+        for group in groups:
+            by_dose = {}
+            for med_id in sorted(group):
+                if med_id in medications:
+                    by_dose.setdefault(self._dose_key(medications[med_id]), []).append(med_id)
+            duplicates.extend(med_ids for med_ids in by_dose.values() if len(med_ids) > 1)
+        duplicates.sort()
+        return duplicates
+
+    def merge_duplicates(self, groups=None, threshold=DEFAULT_THRESHOLD):
+        """
+        Merge each group of duplicates into the medication with the lowest ID.
+
+        The kept medication keeps its fields and receives the stock and lots
+        of the others, which are deleted along with their reminders. All
+        groups are merged in one transaction and can be undone.
+
+        Args:
+            groups (list, optional): Lists of medication IDs to merge. Defaults
+                to the groups found by find_duplicates(threshold).
+            threshold (float, optional): The name similarity used to find the groups.
+
+        Returns:
+            dict: {kept med_id: [merged med_ids]}.
+        """
+        if groups is None:
+            groups = self.find_duplicates(threshold)
+        merged = {}
+        with self.batch():
+            for group in groups:
+                group = sorted(set(group) & self.medications.keys())
+                if len(group) < 2:
+                    continue
+                keep, others = group[0], group[1:]
+                kept = self.medications[keep]
+                before = medication_record(keep, kept)
+                combined = medication_from_record(before)
+                lots = LotQueue(kept.stock_lots().lots())
+                for med_id in others:
+                    for quantity, expiry in self.medications[med_id].stock_lots().lots():
+                        lots.add(quantity, expiry)
+                combined.lots = lots
+                combined.stock = lots.total
+                changes = [change(self.member_name, keep, before, medication_record(keep, combined))]
+                changes += [change(self.member_name, med_id, medication_record(med_id, self.medications[med_id]), None)
+                            for med_id in others]
+                medications = {key: value for key, value in self.medications.items() if key not in others}
+                medications[keep] = combined
+                self.medications = medications  # Copy on write for lock-free readers
+                for med_id in others:
+                    self._med_locks.pop(med_id, None)
+                self._persist()
+                self._log("merge_medications", changes)
+                self._notify(group)
+                merged[keep] = others
+
+            if self.reminder_system:
+                for keep, others in merged.items():
+                    for med_id in others:
+                        self.reminder_system.clear_reminder(self.member_name, med_id)
+                    combined = self.medications[keep]
+                    days_left = combined.calculate_days_left()
+                    if days_left <= 3:
+                        self.reminder_system.set_low_stock_reminder(self.member_name, keep, combined.name, days_left)
+                    else:
+                        self.reminder_system.clear_low_stock_reminder(self.member_name, keep)
+
+        for keep, others in merged.items():
+            events.emit(self._item_level(), f"Merged medication ID(s) {', '.join(map(str, others))} "
+                                            f"into {self.medications[keep].name} (ID {keep})", "inventory")
+        return merged
+
+    def update_medication(self, med_id, **fields):
+        """
+        Change fields of a medication other than its stock.
+
+        Args:
+            med_id (int): The ID of the medication to change.
+            **fields: New values, e.g. frequency="twice daily" or daily_dosage=2.
+
+        Returns:
+            bool: True if successful, False if the medication was not found.
+
+        Raises:
+            ValueError: If a field is unknown or is the stock, or a value is invalid.
+        """
+        with self._rwlock.write():
+            medication = self.medications.get(med_id)
+            if medication is None:
+                events.warning(f"Medication ID {med_id} not found.", "inventory")
+                return False
+            before = medication_record(med_id, medication)
+            if 'name' in fields:
+                fields['name'] = clean_name(fields['name'])
+            unknown = set(fields) - (set(medication.to_dict()) - {'stock', 'lots'})
+            if unknown:
+                raise ValueError(f"Cannot change field(s): {', '.join(sorted(unknown))}")
+            updated = medication_from_record({**before, **fields})
+            if not isinstance(updated.daily_dosage, int) or updated.daily_dosage <= 0:
+                raise ValueError("Daily dosage must be a positive integer.")
+            updated.lots = medication.stock_lots()
+            self.medications = {**self.medications, med_id: updated}  # Copy on write for lock-free readers
+            self._persist()
+            self._log("update_medication", [change(self.member_name, med_id, before, medication_record(med_id, updated))])
+        self._notify([med_id])
+        events.emit(self._item_level(), f"Updated medication {updated.name} (ID {med_id})", "inventory")
+
+        conflict = updated.dosage_conflict()
+        if conflict:
+            events.warning(f"Medication '{updated.name}' (ID {med_id}): {conflict}", "inventory")
+        if self.interactions is not None and updated.name != medication.name:
+            self.check_interactions()
+        return True
+
+    def update_stock(self, med_id, quantity, expiry=None):
         """
         Update the stock of a medication.
 
         Args:
             med_id (int): The ID of the medication to update.
             quantity (int): The amount to add to the stock.
+            expiry (date or str, optional): Expiration date of added stock (YYYY-MM-DD).
 
         Returns:
             bool: True if successful, False otherwise.
         """
-        if med_id not in self.medications:
-            print(f"Medication ID {med_id} not found.")
-            return False
+        # Updates of different medications run concurrently; the medication
+        # lock serializes the read-modify-write of one medication's stock
+        with self._rwlock.read():
+            if med_id not in self.medications:
+                events.warning(f"Medication ID {med_id} not found.", "inventory")
+                return False
+            with self._med_lock(med_id):
+                current = self.medications[med_id]  # Not deleted while the read side is held
+                medication = current.copy()
+                updated = medication.update_stock(quantity, expiry)
+                if updated:
+                    # Copy on write: lock-free readers see the old or the new
+                    # medication, never a half-applied update. Replacing the
+                    # value of an existing key does not resize the dictionary.
+                    self.medications[med_id] = medication
+                before = medication_record(med_id, current) if updated and self.oplog is not None else None
+                after = medication_record(med_id, medication) if before is not None else None
 
-        medication = self.medications[med_id]
-        if medication.update_stock(quantity):
-            self._save_inventory()
-            print(f"Updated stock for {medication.name} (ID {med_id}) by {quantity}")
+        if updated:
+            self._persist()
+            if after is not None:
+                self._log("update_stock", [change(self.member_name, med_id, before, after)])
+            events.emit(self._item_level(), f"Updated stock for {medication.name} (ID {med_id}) by {quantity}", "inventory")
 
              # Check updated stock status and set or clear reminders
             try:
                 days_left = medication.calculate_days_left()
                 if days_left <= 3 and self.reminder_system: # Set reminders during low stock check
-                    self.reminder_system.set_reminder(
-                        self.member_name,
-                        med_id,
-                        f"Low stock alert for {medication.name} (ID {med_id})! Only {days_left} days left."
+                    self.reminder_system.set_low_stock_reminder(
+                        self.member_name, med_id, medication.name, days_left
                     )
                 elif days_left > 3 and self.reminder_system:
-                    self.reminder_system.clear_reminder(self.member_name, med_id)
+                    self.reminder_system.clear_low_stock_reminder(self.member_name, med_id)
             except Exception as e:
-                print(f"Error checking stock after update: {str(e)}")
+                events.error(f"Error checking stock after update: {str(e)}", "inventory")
 
             return True
 
-        print(f"Failed to update stock for {medication.name} (ID {med_id})")
+        events.warning(f"Failed to update stock for {medication.name} (ID {med_id})", "inventory")
         return False
 
+    def add_medications(self, medications):
+        """
+        Add many medications to the inventory in one transaction.
+
+        IDs are assigned consecutively, the inventory is saved once and low
+        stock reminders are set in a single pass at the end. The input is
+        consumed lazily, so it can be a generator over a large feed. If any
+        item is invalid, nothing is added. Dosage conflicts, likely
+        duplicates and interactions are reported per added medication, as
+        add_medication() does.
+
+        Args:
+            medications (iterable): Medication objects, or dictionaries in the
+                inventory CSV schema.
+
+        Returns:
+            range: The IDs assigned to the added medications.
+
+        Raises:
+            ValueError: If an item is not a valid medication.
+        """
+        low_stock = []
+        with self.batch():
+            first_id = self.next_med_id
+            added_medications = dict(self.medications)  # Published at once, for lock-free readers
+            med_id = first_id
+            for index, item in enumerate(medications):
+                try:
+                    medication = item if isinstance(item, Medication) else medication_from_record(item)
+                    medication.name = clean_name(medication.name)
+                    days_left = medication.calculate_days_left()  # Validates daily_dosage
+                    if not isinstance(medication.stock, int) or medication.stock < 0:
+                        raise ValueError("Stock must be a non-negative integer.")
+                except (KeyError, ValueError) as e:
+                    raise ValueError(f"Invalid medication at position {index}: {str(e)}")
+                added_medications[med_id] = medication
+                if days_left <= 3:
+                    low_stock.append((med_id, medication.name, days_left))
+                med_id += 1
+
+            self.medications = added_medications
+            self.next_med_id = med_id
+            if med_id > first_id:
+                self._persist()
+                if self.interactions is not None:
+                    self._report_interactions([pair for pair in self.interactions.check_medications(added_medications)
+                                               if pair[1] >= first_id])
+                self._log("add_medications", [
+                    change(self.member_name, added_id, None, medication_record(added_id, added_medications[added_id]))
+                    for added_id in range(first_id, med_id)
+                ])
+                self._apply_low_stock_reminders(low_stock)
+
+        added = range(first_id, self.next_med_id)
+        if added:
+            self._notify(added)
+            events.info(f"Added {len(added)} medications for {self.member_name} (IDs {added[0]}-{added[-1]})", "inventory")
+            self._report_new_medications(added)
+        return added
+
+    def update_stocks(self, deltas):
+        """
+        Apply many stock changes in one transaction.
+
+        The inventory is saved once and the low stock reminders of the
+        touched medications are re-evaluated once at the end. Changes to the
+        same ID accumulate. If any change fails, none are applied.
+
+        Args:
+            deltas (dict or iterable): A {med_id: quantity} mapping, or an
+                iterable of (med_id, quantity) pairs such as a generator.
+
+        Returns:
+            int: The number of stock changes applied.
+
+        Raises:
+            ValueError: If a medication ID is unknown or the stock would go negative.
+        """
+        pairs = deltas.items() if hasattr(deltas, 'items') else deltas
+        touched = {}  # med_id -> record before the first change
+        updated = {}  # med_id -> changed copy, published when all changes are applied
+        count = 0
+        with self.batch():
+            for med_id, quantity in pairs:
+                medication = updated.get(med_id)
+                if medication is None:
+                    current = self.medications.get(med_id)
+                    if current is None:
+                        raise ValueError(f"Medication ID {med_id} not found.")
+                    touched[med_id] = medication_record(med_id, current)
+                    medication = updated[med_id] = current.copy()
+                if not medication.update_stock(quantity):
+                    raise ValueError(f"Failed to update stock for {medication.name} (ID {med_id}) by {quantity}")
+                count += 1
+
+            if count:
+                self.medications = {**self.medications, **updated}  # Copy on write for lock-free readers
+                self._persist()
+                if self.oplog is not None:
+                    changes = []
+                    for med_id, before in touched.items():
+                        after = medication_record(med_id, self.medications[med_id])
+                        changes.append(change(self.member_name, med_id, before, after))
+                    self._log("update_stocks", changes)
+                low_stock = []
+                recovered = []
+                for med_id in touched:
+                    medication = self.medications[med_id]
+                    days_left = medication.calculate_days_left()
+                    if days_left <= 3:
+                        low_stock.append((med_id, medication.name, days_left))
+                    else:
+                        recovered.append(med_id)
+                self._apply_low_stock_reminders(low_stock, recovered)
+
+        if count:
+            events.info(f"Applied {count} stock updates to {len(touched)} medications for {self.member_name}", "inventory")
+        return count
+
+    def write_off_expired(self, today=None, med_ids=None):
+        """
+        Remove the stock of lots that expired before today.
+
+        The inventory is saved once and the low stock reminders of the
+        medications written off are re-evaluated.
+
+        Args:
+            today (date, optional): The current date. Defaults to today.
+            med_ids (iterable, optional): Only check these medications.
+
+        Returns:
+            dict: {med_id: quantity written off} for the medications that had expired lots.
+        """
+        today = today or date.today()
+        written_off = {}
+        updated = {}  # med_id -> copy with the expired lots removed
+        changes = []
+        with self.batch():
+            for med_id in (self.medications if med_ids is None else med_ids):
+                medication = self.medications.get(med_id)
+                if medication is None:
+                    continue
+                next_expiry = medication.stock_lots().next_expiry
+                if next_expiry is None or next_expiry >= today:
+                    continue
+                updated[med_id] = medication.copy()
+                quantity = updated[med_id].expire_lots(today)
+                if quantity:
+                    written_off[med_id] = quantity
+                    changes.append(change(self.member_name, med_id, medication_record(med_id, medication),
+                                          medication_record(med_id, updated[med_id])))
+            if written_off:
+                self.medications = {**self.medications, **updated}  # Copy on write for lock-free readers
+                self._persist()
+                self._log("write_off_expired", changes)
+                low_stock = []
+                for med_id in written_off:
+                    medication = self.medications[med_id]
+                    days_left = medication.calculate_days_left(today)
+                    if days_left <= 3:
+                        low_stock.append((med_id, medication.name, days_left))
+                self._apply_low_stock_reminders(low_stock)
+
+        for med_id, quantity in written_off.items():
+            events.warning(f"Wrote off {quantity} expired units of {self.medications[med_id].name} "
+                           f"(ID {med_id}) for {self.member_name}.", "inventory")
+        return written_off
+
+    def _apply_low_stock_reminders(self, low_stock, recovered=()):
+        """
+        Set low stock reminders for a list of (med_id, name, days_left) tuples
+        and clear them for the recovered medication IDs, saving the reminders
+        once when the reminder system supports batches.
+        """
+        if not self.reminder_system or not (low_stock or recovered):
+            return
+        if hasattr(self.reminder_system, 'batch'):
+            with self.reminder_system.batch():
+                self._apply_low_stock_reminders_now(low_stock, recovered)
+        else:
+            self._apply_low_stock_reminders_now(low_stock, recovered)
+
+    def _apply_low_stock_reminders_now(self, low_stock, recovered):
+        """Set and clear low stock reminders one by one."""
+        for med_id, med_name, days_left in low_stock:
+            self.reminder_system.set_low_stock_reminder(self.member_name, med_id, med_name, days_left)
+        for med_id in recovered:
+            self.reminder_system.clear_low_stock_reminder(self.member_name, med_id)
+
+    def _interaction_alerts(self, pairs):
+        """
+        Group (med_id_a, med_id_b, Interaction) pairs into one alert per medication.
+
+        Each pair is reported on its newer medication (the higher ID), so it
+        is reported once, on the medication that was added last.
+
+        Returns:
+            dict: {med_id: (med_name, message, severity)}.
+        """
+        medications = self.medications
+        grouped = {}
+        for med_id_a, med_id_b, interaction in pairs:
+            older, newer = min(med_id_a, med_id_b), max(med_id_a, med_id_b)
+            if older in medications and newer in medications:
+                grouped.setdefault(newer, []).append((medications[older].name, interaction))
+        return {
+            med_id: (medications[med_id].name, alert_message(medications[med_id].name, found),
+                     alert_severity(interaction for _, interaction in found))
+            for med_id, found in grouped.items()
+        }
+
+    def _report_interactions(self, pairs):
+        """Report interactions of new medications and set their reminders."""
+        alerts = self._interaction_alerts(pairs)
+        if not alerts:
+            return
+        for med_id, (med_name, message, severity) in alerts.items():
+            events.warning(message, "inventory")
+        if self.reminder_system and hasattr(self.reminder_system, 'set_interaction_reminder'):
+            batch = self.reminder_system.batch() if hasattr(self.reminder_system, 'batch') else nullcontext()
+            with batch:
+                for med_id, (med_name, message, severity) in alerts.items():
+                    self.reminder_system.set_interaction_reminder(self.member_name, med_id, med_name, message, severity)
+
+    def check_interactions(self):
+        """
+        Check all medications of the inventory against each other.
+
+        The member's interaction reminders are brought up to date: set for
+        every interacting medication and cleared for the others.
+
+        Returns:
+            list: (med_id_a, med_id_b, Interaction) tuples with med_id_a < med_id_b.
+        """
+        if self.interactions is None:
+            return []
+        pairs = self.interactions.check_medications(self.medications)
+        self._sync_interaction_reminders(pairs)
+        return pairs
+
+    def _sync_interaction_reminders(self, pairs):
+        """Replace the member's interaction reminders with those of a complete check."""
+        if self.reminder_system and hasattr(self.reminder_system, 'sync_interaction_reminders'):
+            self.reminder_system.sync_interaction_reminders(self.member_name, self._interaction_alerts(pairs))
+
+    def iter_records(self):
+        """
+        Iterate over the inventory as records in the inventory CSV schema.
+
+        Yields:
+            dict: One record per medication, ordered by medication ID.
+        """
+        medications = self.medications
+        for med_id in sorted(medications):
+            yield medication_record(med_id, medications[med_id])
+
+    def export(self, fmt="csv", path_or_buf=None):
+        """
+        Export the inventory in the inventory CSV schema.
+
+        Records are written one at a time, so exporting does not build an
+        intermediate table.
+
+        Args:
+            fmt (str): One of "csv", "json" (an array) or "jsonl" (one object per line).
+            path_or_buf (str, Path or file, optional): Where to write. If omitted,
+                the export is returned as a string.
+
+        Returns:
+            str: The exported data if path_or_buf is omitted, otherwise None.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}. Use one of {', '.join(EXPORT_FORMATS)}.")
+
+        if path_or_buf is None:
+            buffer = io.StringIO()
+            self._write_export(fmt, buffer)
+            return buffer.getvalue()
+        if hasattr(path_or_buf, 'write'):
+            self._write_export(fmt, path_or_buf)
+            return None
+        with open(path_or_buf, 'w', newline='') as stream:
+            self._write_export(fmt, stream)
+        return None
+
+    def _write_export(self, fmt, stream):
+        """Write the inventory records to a text stream in the given format."""
+        records = self.iter_records()
+        if fmt == "csv":
+            writer = csv.DictWriter(stream, fieldnames=INVENTORY_COLUMNS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(records)
+        elif fmt == "jsonl":
+            for record in records:
+                stream.write(json.dumps(record) + "\n")
+        else:
+            stream.write("[")
+            for index, record in enumerate(records):
+                stream.write(("," if index else "") + "\n" + json.dumps(record))
+            stream.write("\n]\n")
+
     def delete_medication(self, med_id):
         """
         Delete a medication from the inventory.
@@ -200,23 +1246,36 @@ class InventoryManagement:
         Returns:
             bool: True if successful, False otherwise.
         """
-        if med_id not in self.medications:
-            print(f"Medication ID {med_id} not found.")
-            return False
-
-        deleted_med = self.medications.pop(med_id)
-        self._save_inventory()
+        with self._rwlock.write():
+            if med_id not in self.medications:
+                events.warning(f"Medication ID {med_id} not found.", "inventory")
+                return False
+            deleted_med = self.medications[med_id]
+            self.medications = {key: value for key, value in self.medications.items() if key != med_id}
+            self._med_locks.pop(med_id, None)
+            self._persist()
+            self._log("delete_medication", [change(self.member_name, med_id, medication_record(med_id, deleted_med), None)])
+        self._notify([med_id])
 
         if self.reminder_system:
             self.reminder_system.clear_reminder(self.member_name, med_id)
+            # Alerts of the medications it interacted with may no longer apply
+            if self.interactions is not None and self.interactions.check(
+                    deleted_med.name, ((other_id, other.name) for other_id, other in self.medications.items())):
+                self.check_interactions()
 
-        print(f"Medication '{deleted_med.name}' (ID {med_id}) deleted successfully.")
+        events.emit(self._item_level(), f"Medication '{deleted_med.name}' (ID {med_id}) deleted successfully.", "inventory")
         return True
 
-    def check_low_stock(self):
+    def check_low_stock(self, remind=True):
         """
         Check for medications with low stock.
 
+        Args:
+            remind (bool, optional): Set a low stock reminder for every
+                medication found. Callers sweeping many inventories pass False
+                and set the reminders in bulk.
+
         Returns:
             list: A list of tuples containing medication ID, name, and days left.
         """
@@ -227,49 +1286,72 @@ class InventoryManagement:
                 if days_left <= 3:
                     low_stock.append((med_id, medication.name, days_left))
                      # Set reminders during low stock check
-                    if self.reminder_system:
-                        self.reminder_system.set_reminder(
-                            self.member_name,
-                            med_id,
-                            f"Low stock alert for {medication.name} (ID {med_id})! Only {days_left} days left."
+                    if self.reminder_system and remind:
+                        self.reminder_system.set_low_stock_reminder(
+                            self.member_name, med_id, medication.name, days_left
                         )
             except Exception as e:
-                print(f"Error checking stock for medication {med_id}: {str(e)}")
+                events.error(f"Error checking stock for medication {med_id}: {str(e)}", "inventory")
                 continue
 
         return low_stock
 
-    def generate_stock_report(self):
+    def generate_stock_report(self, sink=None, fmt="text"):
         """
         Generate a stock report for all medications.
+
+        Rows are formatted and written one at a time.
+
+        Args:
+            sink (file, optional): Where to write the report. Defaults to standard output.
+            fmt (str, optional): One of "text", "csv" or "json".
         """
-        if not self.medications:
-            print(f"No medications found for {self.member_name}.")
+        if not self.medications and fmt == "text":
+            print(f"No medications found for {self.member_name}.", file=sink)
             return
 
-        print(f"\nStock Report for {self.member_name}:")
-        print(f"{'ID':<5} {'Name':<20} {'Stock':<10} {'Days Left':<10}")
-        print("-" * 50)
-
-        for med_id, medication in self.medications.items():
-            days_left = medication.calculate_days_left() or "N/A"
-            print(f"{med_id:<5} {medication.name:<20} {medication.stock:<10} {days_left:<10}")
+        write_report(
+            stock_report_rows(self), STOCK_COLUMNS, sink=sink, fmt=fmt,
+            title=f"\nStock Report for {self.member_name}:", rule_width=50
+        )
 
-    def generate_prescription_report(self):
+    def generate_prescription_report(self, sink=None, fmt="text"):
         """
         Generate a report for prescription medications.
+
+        Rows are formatted and written one at a time.
+
+        Args:
+            sink (file, optional): Where to write the report. Defaults to standard output.
+            fmt (str, optional): One of "text", "csv" or "json".
         """
-        prescriptions = self.list_prescription_medications()
-        if not prescriptions:
-            print(f"No prescription medications found for {self.member_name}.")
+        if fmt == "text" and next(self.iter_prescription_medications(), None) is None:
+            print(f"No prescription medications found for {self.member_name}.", file=sink)
             return
 
-        print(f"\nPrescription Report for {self.member_name}:")
-        print(f"{'ID':<5} {'Name':<20} {'Doctor':<15} {'Date':<12} {'Expiration':<12}")
-        print("-" * 80)
+        write_report(
+            prescription_report_rows(self), PRESCRIPTION_COLUMNS, sink=sink, fmt=fmt,
+            title=f"\nPrescription Report for {self.member_name}:", rule_width=80
+        )
 
-        for med in prescriptions:
-            print(f"{med['id']:<5} {med['name']:<20} {med['doctor']:<15} {med['date']:<12} {med['expiration_date']:<12}")
+    def iter_prescription_medications(self):
+        """
+        Iterate over the prescription medications.
+
+        Yields:
+            dict: The prescription details of one medication.
+        """
+        for med_id, med in self.medications.items():
+            if isinstance(med, PrescriptionMedication):
+                yield {
+                    "id": med_id,
+                    "name": med.name,
+                    "doctor": getattr(med, 'doctor_name', 'N/A'),
+                    "date": getattr(med, 'prescription_date', 'N/A'),
+                    "indication": getattr(med, 'indication', 'N/A'),
+                    "warnings": getattr(med, 'warnings', 'N/A'),
+                    "expiration_date": getattr(med, 'expiration_date', 'N/A')
+                }
 
     def list_prescription_medications(self):
         """        
@@ -277,17 +1359,8 @@ class InventoryManagement:
         Returns:
             list: A list of dictionaries with prescription details.
         """
-        prescriptions = [
-            {
-                "id": med_id,
-                "name": med.name,
-                "doctor": getattr(med, 'doctor_name', 'N/A'),
-                "date": getattr(med, 'prescription_date', 'N/A'),
-                "indication": getattr(med, 'indication', 'N/A'),
-                "warnings": getattr(med, 'warnings', 'N/A'),
-                "expiration_date": getattr(med, 'expiration_date', 'N/A')
-            }
-            for med_id, med in self.medications.items()
-            if isinstance(med, PrescriptionMedication)
-        ]
-        return prescriptions
+        return list(self.iter_prescription_medications())
+
+
+# Instrument the public methods and the load/save helpers (active only when enabled)
+metrics.register(InventoryManagement)
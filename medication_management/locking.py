@@ -0,0 +1,273 @@
+# locking.py
+# Locks for sharing the data between processes (per-file advisory locks with
+# version counters) and between threads (a readers-writer lock).
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, versions are still tracked
+    fcntl = None
+
+
+class DataFileLock:
+    """
+    An advisory lock and a version counter for one data file.
+
+    Every process working on a data directory takes the shared lock while
+    reading a data file and the exclusive lock while writing it, and bumps
+    the file's version after each write. A writer whose loaded version is
+    older than the current one knows another process saved in between and
+    merges instead of overwriting.
+
+    The lock and the version live in data/.locks/<file name>.lock, so each
+    data file is locked independently: processes working on different
+    members' inventories never wait for each other.
+
+    Locks are re-entrant within one DataFileLock object, so a load inside a
+    save does not deadlock. They are not thread-safe; each thread should
+    use its own objects.
+
+    Attributes:
+        path (Path): The data file.
+        lock_path (Path): The lock file holding the version counter.
+    """
+    def __init__(self, path):
+        """
+        Initialize a DataFileLock.
+
+        Args:
+            path (Path): The data file to guard.
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.parent / ".locks" / f"{self.path.name}.lock"
+        self._stream = None
+        self._depth = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self):
+        """
+        Hold the shared (read) lock for the duration of a with block.
+
+        Yields:
+            DataFileLock: This lock.
+        """
+        with self._locked(exclusive=False):
+            yield self
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Hold the exclusive (write) lock for the duration of a with block.
+
+        Yields:
+            DataFileLock: This lock.
+        """
+        with self._locked(exclusive=True):
+            yield self
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """Acquire the lock, or reuse it if this object already holds it."""
+        if self._depth:
+            if exclusive and not self._exclusive:
+                self._lock(exclusive=True)  # Upgrade a shared lock
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        self.lock_path.parent.mkdir(exist_ok=True)
+        self._stream = open(self.lock_path, "a+")
+        try:
+            self._lock(exclusive)
+            self._depth = 1
+            try:
+                yield
+            finally:
+                self._depth = 0
+                self._exclusive = False
+                if fcntl is not None:
+                    fcntl.flock(self._stream, fcntl.LOCK_UN)
+        finally:
+            self._stream.close()
+            self._stream = None
+
+    def _lock(self, exclusive):
+        """Block until the lock is granted in the requested mode."""
+        if fcntl is not None:
+            fcntl.flock(self._stream, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._exclusive = exclusive
+
+    def version(self):
+        """
+        Return the current version of the data file.
+
+        Returns:
+            int: The number of versioned writes so far (0 for a new file).
+        """
+        if self._stream is not None:
+            self._stream.seek(0)
+            text = self._stream.read()
+        else:
+            try:
+                text = self.lock_path.read_text()
+            except FileNotFoundError:
+                return 0
+        try:
+            return int(text.strip() or 0)
+        except ValueError:
+            return 0
+
+    def bump(self, count=1):
+        """
+        Increment the version after a write. Requires the exclusive lock.
+
+        Args:
+            count (int, optional): Number of versioned writes to count.
+
+        Returns:
+            int: The new version.
+
+        Raises:
+            RuntimeError: If the exclusive lock is not held.
+        """
+        if self._stream is None or not self._exclusive:
+            raise RuntimeError(f"Bumping the version of {self.path} requires the exclusive lock")
+        version = self.version() + count
+        self._stream.seek(0)
+        self._stream.truncate()
+        self._stream.write(str(version))
+        self._stream.flush()
+        return version
+
+
+class MemoryLock:
+    """
+    The DataFileLock interface for data that only lives in memory.
+
+    Nothing is shared with other processes, so locking does nothing and the
+    version is a plain counter; callers written against DataFileLock work
+    unchanged in in-memory mode.
+
+    Attributes:
+        path (Path): The data file the lock would guard on disk.
+    """
+    def __init__(self, path=None):
+        """
+        Initialize a MemoryLock.
+
+        Args:
+            path (Path, optional): The data file the lock would guard on disk.
+        """
+        self.path = Path(path) if path is not None else None
+        self._version = 0
+
+    @contextmanager
+    def shared(self):
+        """Do nothing for the duration of a with block."""
+        yield self
+
+    @contextmanager
+    def exclusive(self):
+        """Do nothing for the duration of a with block."""
+        yield self
+
+    def version(self):
+        """Return the number of versioned writes so far."""
+        return self._version
+
+    def bump(self, count=1):
+        """
+        Increment the version after a write.
+
+        Args:
+            count (int, optional): Number of versioned writes to count.
+
+        Returns:
+            int: The new version.
+        """
+        self._version += count
+        return self._version
+
+
+class ReadWriteLock:
+    """
+    A readers-writer lock for the threads of one process.
+
+    Any number of threads can hold the read side at once; the write side
+    is exclusive. The writing thread may re-enter the write side and also
+    take the read side. A thread holding only the read side cannot take the
+    write side. Waiting writers hold back new readers, so a steady stream
+    of readers cannot starve them.
+    """
+    def __init__(self):
+        """Initialize an unlocked ReadWriteLock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = {}  # thread ident -> read depth
+        self._writer = None  # thread ident of the writer
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """
+        Hold the read side for the duration of a with block.
+
+        Yields:
+            ReadWriteLock: This lock.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+        try:
+            yield self
+        finally:
+            with self._condition:
+                depth = self._readers.pop(me) - 1
+                if depth:
+                    self._readers[me] = depth
+                else:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """
+        Hold the write side for the duration of a with block.
+
+        Yields:
+            ReadWriteLock: This lock.
+
+        Raises:
+            RuntimeError: If the calling thread holds only the read side.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                if me in self._readers:
+                    raise RuntimeError("Cannot upgrade a read lock to a write lock")
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+                self._write_depth = 1
+        try:
+            yield self
+        finally:
+            with self._condition:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._condition.notify_all()
@@ -0,0 +1,260 @@
+# lots.py
+# Stock lots ordered by expiration date, consumed first-expiring-first-out.
+import heapq
+from datetime import date
+
+# Heap key of stock without a known expiration date; it is used last
+UNDATED = date.max.toordinal() + 1
+
+
+def _ordinal(expiry):
+    """Return the heap key of an expiration date (a date, an ISO string or None)."""
+    if expiry is None or expiry == "":
+        return UNDATED
+    if isinstance(expiry, str):
+        expiry = date.fromisoformat(expiry.strip())
+    return expiry.toordinal()
+
+
+def _as_date(ordinal):
+    """Return the expiration date of a heap key, or None for undated stock."""
+    return None if ordinal == UNDATED else date.fromordinal(ordinal)
+
+
+class LotQueue:
+    """
+    The lots of one medication, as a heap ordered by expiration date.
+
+    Each lot is a quantity with an expiration date. Stock is consumed from
+    the lot expiring first, so a restock with a later date is only used
+    once the older stock is gone. Lots with the same date are kept as one
+    lot, and stock without a known date sorts after every dated lot.
+
+    Adding a lot and using up a lot are O(log n); writing off expired lots
+    pops them from the front of the heap.
+
+    Attributes:
+        total (int): The quantity over all lots.
+    """
+    __slots__ = ('_heap', '_by_ordinal', '_sequence', 'total')
+
+    def __init__(self, lots=()):
+        """
+        Initialize a LotQueue.
+
+        Args:
+            lots (iterable, optional): (quantity, expiry) pairs; expiry is a
+                date, an ISO 8601 string or None.
+        """
+        self._heap = []  # [ordinal, sequence, quantity] entries, mutated in place
+        self._by_ordinal = {}  # ordinal -> heap entry, for merging lots with the same date
+        self._sequence = 0  # Tie breaker keeping the heap order stable
+        self.total = 0
+        for quantity, expiry in lots:
+            self.add(quantity, expiry)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse lots saved by serialize(), e.g. "10@2025-06-30;5".
+
+        Args:
+            text (str): The saved lots.
+
+        Returns:
+            LotQueue: The lots.
+
+        Raises:
+            ValueError: If a lot is malformed.
+        """
+        lots = cls()
+        for part in str(text).split(";"):
+            part = part.strip()
+            if not part:
+                continue
+            quantity, _, expiry = part.partition("@")
+            lots.add(int(quantity), expiry or None)
+        return lots
+
+    def serialize(self):
+        """
+        Return the lots as text, earliest expiry first.
+
+        Returns:
+            str: Lots as "quantity@YYYY-MM-DD" separated by ";", undated stock
+            as a bare quantity, or "" if all stock is undated.
+        """
+        if not self.is_dated():
+            return ""
+        return ";".join(
+            str(quantity) if expiry is None else f"{quantity}@{expiry.isoformat()}"
+            for quantity, expiry in self.lots()
+        )
+
+    def copy(self):
+        """
+        Return an independent copy of the lots.
+
+        Returns:
+            LotQueue: The copy; changing it leaves these lots unchanged.
+        """
+        lots = LotQueue()
+        lots._heap = [list(entry) for entry in self._heap]  # Still a valid heap
+        lots._by_ordinal = {entry[0]: entry for entry in lots._heap}
+        lots._sequence = self._sequence
+        lots.total = self.total
+        return lots
+
+    def __len__(self):
+        """Return the number of lots."""
+        return len(self._heap)
+
+    def is_dated(self):
+        """Whether any lot has an expiration date."""
+        return any(ordinal != UNDATED for ordinal in self._by_ordinal)
+
+    def lots(self):
+        """
+        Return the lots, earliest expiry first.
+
+        Returns:
+            list: (quantity, expiry) pairs; expiry is a date or None.
+        """
+        return [(quantity, _as_date(ordinal)) for ordinal, _, quantity in sorted(self._heap)]
+
+    @property
+    def next_expiry(self):
+        """The earliest expiration date, or None if there is no dated lot."""
+        return _as_date(self._heap[0][0]) if self._heap else None
+
+    def add(self, quantity, expiry=None):
+        """
+        Add a lot, merging it into a lot with the same expiration date.
+
+        Args:
+            quantity (int): The quantity, greater than zero.
+            expiry (date or str, optional): The expiration date.
+
+        Raises:
+            ValueError: If the quantity is not a positive integer or the date is invalid.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise ValueError("Lot quantity must be a positive integer.")
+        ordinal = _ordinal(expiry)
+        entry = self._by_ordinal.get(ordinal)
+        if entry is not None:
+            entry[2] += quantity  # The heap order does not depend on the quantity
+        else:
+            entry = [ordinal, self._sequence, quantity]
+            self._sequence += 1
+            self._by_ordinal[ordinal] = entry
+            heapq.heappush(self._heap, entry)
+        self.total += quantity
+
+    def _pop(self):
+        """Remove and return the lot expiring first."""
+        entry = heapq.heappop(self._heap)
+        del self._by_ordinal[entry[0]]
+        self.total -= entry[2]
+        return entry
+
+    def consume(self, quantity):
+        """
+        Take stock from the lots expiring first.
+
+        Args:
+            quantity (int): The quantity to take.
+
+        Returns:
+            list: The (quantity, expiry) pairs taken from each lot.
+
+        Raises:
+            ValueError: If the lots hold less than the quantity.
+        """
+        if quantity > self.total:
+            raise ValueError(f"Cannot take {quantity} from lots holding {self.total}.")
+        taken = []
+        while quantity > 0:
+            head = self._heap[0]
+            if head[2] <= quantity:
+                self._pop()
+                taken.append((head[2], _as_date(head[0])))
+                quantity -= head[2]
+            else:
+                head[2] -= quantity
+                self.total -= quantity
+                taken.append((quantity, _as_date(head[0])))
+                quantity = 0
+        return taken
+
+    def apply_changes(self, before, after):
+        """
+        Apply the difference between two versions of some lots to these lots.
+
+        Quantities added to a lot are added with the same expiration date;
+        quantities removed are taken from the lots expiring first, as
+        consume() would have.
+
+        Args:
+            before (LotQueue): The lots before the changes.
+            after (LotQueue): The lots after the changes.
+
+        Returns:
+            int: The quantity that could not be taken because these lots hold too little.
+        """
+        old = {ordinal: entry[2] for ordinal, entry in before._by_ordinal.items()}
+        new = {ordinal: entry[2] for ordinal, entry in after._by_ordinal.items()}
+        taken = 0
+        for ordinal in old.keys() | new.keys():
+            difference = new.get(ordinal, 0) - old.get(ordinal, 0)
+            if difference > 0:
+                self.add(difference, _as_date(ordinal))
+            else:
+                taken -= difference
+        shortfall = max(0, taken - self.total)
+        self.consume(taken - shortfall)
+        return shortfall
+
+    def expire(self, today=None):
+        """
+        Remove the lots that expired before a date.
+
+        A lot can still be used on its expiration date.
+
+        Args:
+            today (date, optional): The current date. Defaults to today.
+
+        Returns:
+            int: The quantity removed.
+        """
+        limit = (today or date.today()).toordinal()
+        removed = 0
+        while self._heap and self._heap[0][0] < limit:
+            removed += self._pop()[2]
+        return removed
+
+    def usable(self, daily, today=None):
+        """
+        Return the quantity that can be used before it expires.
+
+        Stock is used at `daily` units a day from the lot expiring first; a
+        lot, or the part of it, that would still be left after its
+        expiration date is not counted.
+
+        Args:
+            daily (int): Units used per day, greater than zero.
+            today (date, optional): The current date. Defaults to today.
+
+        Returns:
+            int: The usable quantity.
+        """
+        start = (today or date.today()).toordinal()
+        used = 0
+        for ordinal, _, quantity in sorted(self._heap):
+            if ordinal == UNDATED:
+                used += quantity
+                continue
+            # Units that can be used from today to the end of the expiration date
+            capacity = (ordinal - start + 1) * daily
+            used += max(0, min(quantity, capacity - used))
+        return used
@@ -1,4 +1,9 @@
 # medication.py
+import copy
+from medication_management import events
+from medication_management.units import parse_dosage, parse_frequency
+from medication_management.lots import LotQueue
+
 class Medication:
     """
     A class representing a medication.
@@ -9,6 +14,13 @@ class Medication:
         frequency (str): The frequency of intake (e.g., "2 times/day")
         daily_dosage (int): The daily dosage (number of units per day).
         stock (int): The current stock level.
+        lots (LotQueue): The stock split into lots by expiration date.
+
+    The dosage and frequency strings are also available parsed, as dose and
+    doses_per_day; parsing is cached per distinct string.
+
+    `stock` stays the total. Stock added without an expiration date, or by
+    assigning `stock` directly, is kept as an undated lot that is used last.
     """
     def __init__(self, name, dosage, frequency, daily_dosage, stock):
         """
@@ -26,11 +38,89 @@ class Medication:
         self.frequency = frequency
         self.daily_dosage = daily_dosage
         self.stock = stock
+        self.lots = LotQueue()  # Read in line with the stock, see stock_lots
+
+    @property
+    def dose(self):
+        """The parsed dosage of one unit (amount and normalized unit), or None if not understood."""
+        return parse_dosage(self.dosage)
+
+    @property
+    def doses_per_day(self):
+        """The number of doses per day parsed from the frequency, or None if not understood."""
+        return parse_frequency(self.frequency)
 
-    def calculate_days_left(self):
+    @property
+    def daily_amount(self):
+        """The amount taken per day in the dose unit (dose amount times daily dosage), or None."""
+        dose = self.dose
+        if dose is None or not isinstance(self.daily_dosage, int):
+            return None
+        return dose.amount * self.daily_dosage
+
+    def dosage_conflict(self):
+        """
+        Check that the daily dosage agrees with the frequency.
+
+        A daily dosage that cannot be split evenly over the doses of a day,
+        e.g. 1 unit a day taken "twice daily", is reported.
+
+        Returns:
+            str: A description of the contradiction, or None if there is none
+            or the frequency is not understood.
+        """
+        doses = self.doses_per_day
+        if doses is None or doses < 1 or not isinstance(self.daily_dosage, int) or self.daily_dosage <= 0:
+            return None
+        if self.daily_dosage % doses:
+            return (f"Daily dosage {self.daily_dosage} cannot be split over "
+                    f"{doses:g} doses per day ('{self.frequency}').")
+        return None
+
+    def stock_lots(self):
+        """
+        Return the lots, in line with the stock.
+
+        Stock assigned directly (e.g. when merging saved changes) counts as
+        an undated lot, or is taken from the lots expiring first. Reading
+        never changes the medication: if the lots disagree with the stock, a
+        reconciled copy is returned. Do not modify the result; changes go
+        through update_stock() and expire_lots().
+        """
+        lots, stock = self.lots, self.stock
+        if isinstance(stock, int) and stock >= 0 and stock != lots.total:
+            lots = lots.copy()
+            if stock > lots.total:
+                lots.add(stock - lots.total)
+            else:
+                lots.consume(lots.total - stock)
+        return lots
+
+    def copy(self):
+        """
+        Return an independent copy of the medication, with its own lots.
+
+        Returns:
+            Medication: The copy, of the same class.
+        """
+        duplicate = copy.copy(self)
+        duplicate.lots = self.lots.copy()
+        return duplicate
+
+    def _lots_to_change(self):
+        """Return a private copy of the lots, in line with the stock, for a change."""
+        lots = self.stock_lots()
+        return lots.copy() if lots is self.lots else lots
+
+    def calculate_days_left(self, today=None):
         """
         Calculate the remaining days of stock based on daily dosage.
 
+        Lots that expire before they would be used up are not counted.
+
+        Args:
+            today (date, optional): The current date, for the expiry of lots. Defaults to today.
+
         Returns:
             int: The number of days of stock left.
 
@@ -40,8 +130,27 @@ class Medication:
         # Ensure that daily_dosage is a valid positive integer.
         if not isinstance(self.daily_dosage, int) or self.daily_dosage <= 0:
             raise ValueError("Daily dosage must be a positive integer.")
+        lots = self.stock_lots()
+        if lots.is_dated():
+            return lots.usable(self.daily_dosage, today) // self.daily_dosage
         return self.stock // self.daily_dosage  #  Calculate the remaining days of stock.
 
+    def expire_lots(self, today=None):
+        """
+        Write off the lots that expired before today.
+
+        Args:
+            today (date, optional): The current date. Defaults to today.
+
+        Returns:
+            int: The quantity written off.
+        """
+        lots = self._lots_to_change()
+        removed = lots.expire(today)
+        # The lots and the stock are replaced together, never changed in place
+        self.lots, self.stock = lots, self.stock - removed
+        return removed
+
     def display_info(self):
         """
         Display medication information as a formatted string.
@@ -52,26 +161,36 @@ class Medication:
          # Format and return a string with all medication details.
         return f"Medication: {self.name}, Dosage: {self.dosage}, Frequency: {self.frequency}, Daily Dosage: {self.daily_dosage}, Stock: {self.stock}"
 
-    def update_stock(self, quantity):
+    def update_stock(self, quantity, expiry=None):
         """
         Update the stock of the medication.
 
+        Added stock becomes a lot with the given expiration date; removed
+        stock is taken from the lots expiring first.
+
         Args:
             quantity (int): The quantity to add (positive) or remove (negative).
+            expiry (date or str, optional): Expiration date of added stock (YYYY-MM-DD).
 
         Returns:
             bool: True if the stock update was successful, False otherwise.
 
         Raises:
-            ValueError: If quantity is not an integer.
+            ValueError: If quantity is not an integer or the expiration date is invalid.
         """
         # Check if the quantity is a valid integer.
         if not isinstance(quantity, int):
             raise ValueError("Quantity must be an integer.")
         if self.stock + quantity < 0:   # Verify that there is enough stock to remove the requested amount
-            print(f"Not enough stock to remove. Current stock: {self.stock}, Requested: {abs(quantity)}")
+            events.warning(f"Not enough stock to remove. Current stock: {self.stock}, Requested: {abs(quantity)}", "medication")
             return False
-        self.stock += quantity  # Update the stock level.
+        lots = self._lots_to_change()
+        if quantity > 0:
+            lots.add(quantity, expiry)
+        elif quantity < 0:
+            lots.consume(-quantity)
+        # Update the stock level, replacing the lots and the stock together
+        self.lots, self.stock = lots, self.stock + quantity
         return True
 
     def to_dict(self):
@@ -87,7 +206,8 @@ class Medication:
             "dosage": self.dosage,
             "frequency": self.frequency,
             "daily_dosage": self.daily_dosage,
-            "stock": self.stock
+            "stock": self.stock,
+            "lots": self.stock_lots().serialize()
         }
 
     def __repr__(self):
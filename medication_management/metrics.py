@@ -0,0 +1,170 @@
+# metrics.py
+# Opt-in call count, timing and file I/O instrumentation for the domain classes.
+import functools
+import inspect
+import threading
+import time
+
+
+class MetricsRegistry:
+    """
+    An in-process registry of call counts, wall time and bytes read/written.
+
+    Classes register the methods to instrument. Nothing is wrapped until
+    enable() is called, and disable() restores the original methods, so
+    instrumentation costs nothing while it is off.
+
+    Attributes:
+        enabled (bool): Whether instrumentation is currently active.
+    """
+    def __init__(self):
+        """Initialize an empty, disabled MetricsRegistry."""
+        self.enabled = False
+        self._targets = []  # (class, method name) pairs to instrument
+        self._originals = {}  # (class, method name) -> original function while enabled
+        self._stats = {}  # metric name -> [calls, seconds, bytes read, bytes written]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_methods(cls):
+        """
+        Pick the methods of a class to instrument: public methods plus the
+        _load_* and _save_* helpers. Generator functions and context managers
+        are skipped, since timing them would only time their creation.
+        """
+        names = []
+        for name, member in vars(cls).items():
+            if not inspect.isfunction(member) or inspect.isgeneratorfunction(inspect.unwrap(member)):
+                continue
+            if name.startswith(("_load_", "_save_")) or not name.startswith("_"):
+                names.append(name)
+        return names
+
+    def register(self, cls, methods=None):
+        """
+        Register methods of a class for instrumentation.
+
+        Args:
+            cls (type): The class whose methods are instrumented.
+            methods (list, optional): Method names. Defaults to the public
+                methods plus the _load_* and _save_* helpers.
+        """
+        for name in methods or self._default_methods(cls):
+            if (cls, name) not in self._targets:
+                self._targets.append((cls, name))
+                if self.enabled:
+                    self._wrap(cls, name)
+
+    def _wrap(self, cls, name):
+        """Replace a method with a timing wrapper."""
+        original = vars(cls)[name]
+        metric = f"{cls.__name__}.{name}"
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._add(metric, calls=1, seconds=time.perf_counter() - start)
+
+        self._originals[(cls, name)] = original
+        setattr(cls, name, timed)
+
+    def enable(self):
+        """Start recording metrics by wrapping every registered method."""
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls, name in self._targets:
+            self._wrap(cls, name)
+
+    def disable(self):
+        """Stop recording metrics and restore the original methods."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals = {}
+
+    def _add(self, metric, calls=0, seconds=0.0, bytes_read=0, bytes_written=0):
+        """Add to the counters of a metric."""
+        with self._lock:
+            stats = self._stats.setdefault(metric, [0, 0.0, 0, 0])
+            stats[0] += calls
+            stats[1] += seconds
+            stats[2] += bytes_read
+            stats[3] += bytes_written
+
+    def record_file_read(self, metric, path):
+        """
+        Record the size of a file that was read, if instrumentation is enabled.
+
+        Args:
+            metric (str): The metric name, e.g. "InventoryManagement._load_inventory".
+            path (Path): The file that was read.
+        """
+        if self.enabled:
+            self._add(metric, bytes_read=_file_size(path))
+
+    def record_file_write(self, metric, path):
+        """
+        Record the size of a file that was written, if instrumentation is enabled.
+
+        Args:
+            metric (str): The metric name, e.g. "InventoryManagement._save_inventory".
+            path (Path): The file that was written.
+        """
+        if self.enabled:
+            self._add(metric, bytes_written=_file_size(path))
+
+    def snapshot(self):
+        """
+        Return the recorded metrics.
+
+        Returns:
+            dict: {metric: {"calls", "seconds", "bytes_read", "bytes_written"}}.
+        """
+        with self._lock:
+            return {
+                metric: {"calls": calls, "seconds": seconds, "bytes_read": read, "bytes_written": written}
+                for metric, (calls, seconds, read, written) in self._stats.items()
+            }
+
+    def reset(self):
+        """Clear all recorded metrics."""
+        with self._lock:
+            self._stats = {}
+
+    def summary(self):
+        """
+        Format the recorded metrics as a table, slowest first.
+
+        Returns:
+            str: The formatted summary.
+        """
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1]["seconds"], reverse=True)
+        lines = [
+            f"{'Operation':<45} {'Calls':>7} {'Total ms':>10} {'Avg ms':>8} {'Read KB':>9} {'Written KB':>10}",
+            "-" * 94,
+        ]
+        for metric, stats in rows:
+            average = stats["seconds"] / stats["calls"] * 1000 if stats["calls"] else 0.0
+            lines.append(
+                f"{metric:<45} {stats['calls']:>7} {stats['seconds'] * 1000:>10.2f} {average:>8.2f} "
+                f"{stats['bytes_read'] / 1024:>9.1f} {stats['bytes_written'] / 1024:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def _file_size(path):
+    """Return the size of a file in bytes, or 0 if it does not exist."""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+# The process-wide registry used by the domain classes
+registry = MetricsRegistry()
@@ -0,0 +1,643 @@
+# oplog.py
+# Operation log of inventory and family changes, for undo/redo and point-in-time restore.
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from medication_management.group_commit import GroupCommitter
+from medication_management.locking import DataFileLock, MemoryLock
+from medication_management.metrics import registry as metrics
+
+# Operations between two checkpoints, by default
+CHECKPOINT_EVERY = 1000
+
+# Number of operations that can be undone, by default
+MAX_UNDO = 1000
+
+# Checkpoints kept by compaction, by default
+KEEP_CHECKPOINTS = 5
+
+
+def change(member, med_id, before, after):
+    """
+    Build one change of a log entry.
+
+    A change holds complete before and after images, so applying the after
+    images in log order reproduces a state and applying the before images
+    in reverse order undoes an entry. Applying an image twice is harmless.
+
+    Args:
+        member (str): The family member.
+        med_id (int): The medication, or None for a change of the whole member.
+        before: The medication record before the change, or for a member-level
+            change {"records": [...]}; None if it did not exist.
+        after: The same after the change; None if it was deleted.
+
+    Returns:
+        dict: The change.
+    """
+    return {"member": member, "med_id": med_id, "before": before, "after": after}
+
+
+def invert(changes):
+    """Return the changes that undo the given changes."""
+    return [change(c["member"], c["med_id"], c["after"], c["before"]) for c in reversed(changes)]
+
+
+def apply_to_state(state, changes):
+    """
+    Apply the after images of changes to a state.
+
+    Args:
+        state (dict): {member: {med_id: record}}, changed in place.
+        changes (list): Changes as built by change().
+    """
+    for item in changes:
+        member, med_id, after = item["member"], item["med_id"], item["after"]
+        if med_id is None:
+            if after is None:
+                state.pop(member, None)
+            else:
+                state[member] = {record["med_id"]: record for record in after["records"]}
+        elif after is None:
+            state.get(member, {}).pop(med_id, None)
+        else:
+            state.setdefault(member, {})[med_id] = after
+
+
+def _json_default(value):
+    """Encode numpy scalars, which can appear in records read with pandas."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _as_datetime(when):
+    """Accept a datetime or an ISO 8601 string."""
+    return datetime.fromisoformat(when) if isinstance(when, str) else when
+
+
+class OperationLog:
+    """
+    An append-only log of changes, with periodic checkpoints.
+
+    Every mutation appends one JSON line to data/oplog.jsonl with a
+    sequence number, a timestamp and the before and after images of what
+    it changed. Every `checkpoint_every` entries the complete state is
+    written to data/.checkpoints/, together with the log offset it covers,
+    so the state as of any time is rebuilt from the last checkpoint before
+    it plus the entries after that checkpoint, without reading older
+    history. Each checkpoint also saves the undo and redo stacks as of its
+    entry, so building them reads only the entries after the last one.
+
+    Changes recorded inside transaction() are written as one entry when
+    the outermost transaction of the thread commits, and dropped if it
+    fails, so a rolled back batch leaves no trace in the log. Inside a
+    transaction, separate() makes the changes of a block an entry of
+    their own, undone on their own.
+
+    The log and the checkpoints are compacted once twice `keep_checkpoints`
+    checkpoints exist: only the newest `keep_checkpoints` are kept, with
+    the log entries after the oldest of them. The state can then be
+    restored as of any time since that checkpoint; the undo stacks are
+    saved with the checkpoints, so undo reaches further back.
+
+    With group commit enabled, entries are buffered in memory and written
+    together from a background thread, in one write under one lock; they
+    are numbered again at that point if another process appended meanwhile.
+
+    In in-memory mode the entries and checkpoints are kept in lists and no
+    file is written; offsets are then positions in the entry list.
+
+    Attributes:
+        path (Path): The log file.
+        checkpoint_dir (Path): Directory holding the checkpoints and their index.
+        checkpoint_every (int): Entries between two checkpoints.
+        keep_checkpoints (int): Checkpoints kept by compaction.
+    """
+    def __init__(self, data_dir, state=None, checkpoint_every=CHECKPOINT_EVERY, max_undo=MAX_UNDO,
+                 in_memory=False, keep_checkpoints=KEEP_CHECKPOINTS):
+        """
+        Initialize an OperationLog.
+
+        Args:
+            data_dir (Path): The data directory.
+            state (callable, optional): Returns the current state as
+                {member: {med_id: record}} for checkpoints. Without it no
+                checkpoints are written.
+            checkpoint_every (int, optional): Entries between two checkpoints.
+            max_undo (int, optional): Number of entries that can be undone.
+            in_memory (bool, optional): Keep the log in memory instead of writing files.
+            keep_checkpoints (int, optional): Checkpoints kept by compaction.
+        """
+        self.path = Path(data_dir) / "oplog.jsonl"
+        self.checkpoint_dir = Path(data_dir) / ".checkpoints"
+        self.index_path = self.checkpoint_dir / "index.jsonl"
+        self.checkpoint_every = checkpoint_every
+        self.max_undo = max_undo
+        self.keep_checkpoints = keep_checkpoints
+        self._state = state
+        self.in_memory = in_memory
+        self._lock = MemoryLock(self.path) if in_memory else DataFileLock(self.path)  # Its version is the last sequence number
+        self._memory_entries = []  # In-memory mode: the entries, standing in for the log file
+        self._memory_checkpoints = []  # In-memory mode: (index entry, state, stacks) triples
+        self._mutex = threading.RLock()
+        self._local = threading.local()  # Per-thread transaction buffer (groups of changes) and suspension
+        self._undo = None  # Entries that can be undone, built from the log on first use
+        self._redo = None  # Entries that can be redone
+        self._checkpoint_seq = None  # Sequence number of the newest checkpoint, read on first use
+        self._pending = []  # Entries not written to the log yet, while group commit is enabled
+        self._committer = None  # GroupCommitter writing the pending entries, while enabled
+
+    # Recording
+
+    def record(self, op, changes, **extra):
+        """
+        Append an entry, or buffer its changes inside a transaction.
+
+        Args:
+            op (str): The operation name, e.g. "update_stock".
+            changes (list): Changes as built by change().
+            **extra: Additional fields stored in the entry.
+
+        Returns:
+            dict: The appended entry, or None if it was buffered or suspended.
+        """
+        if getattr(self._local, "suspended", 0) or not changes:
+            return None
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer[-1].append((op, changes))
+            return None
+        return self._append(op, changes, extra)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Collect the changes recorded by this thread into one entry.
+
+        Transactions nest; the outermost one writes the entry when the block
+        exits normally and discards the changes if it raises. An entry made
+        of a single operation keeps that operation's name, otherwise it is
+        recorded as "batch".
+        """
+        if getattr(self._local, "buffer", None) is not None:
+            yield self
+            return
+        self._local.buffer = [[]]
+        try:
+            yield self
+        except BaseException:
+            self._local.buffer = None
+            raise
+        groups, self._local.buffer = self._local.buffer, None
+        for group in groups:
+            if len(group) == 1:
+                self.record(*group[0])
+            elif group:
+                self.record("batch", [item for _, changes in group for item in changes])
+
+    @contextmanager
+    def separate(self):
+        """
+        Record the changes this thread makes inside the block as an entry of their own.
+
+        Inside a transaction the entry is still written, or dropped, with
+        the outermost transaction, but it is not merged with the other
+        changes of the transaction, so it is undone on its own. Outside a
+        transaction the block is a transaction; nested blocks join the
+        outer one.
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or getattr(self._local, "separate", False):
+            with self.transaction():
+                yield self
+            return
+        buffer.append([])
+        self._local.separate = True
+        try:
+            yield self
+        finally:
+            self._local.separate = False
+            buffer.append([])  # Later changes are not part of this entry
+
+    @contextmanager
+    def suspended(self):
+        """Do not record the changes this thread makes inside the block."""
+        self._local.suspended = getattr(self._local, "suspended", 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.suspended -= 1
+
+    @staticmethod
+    def _new_entry(seq, op, changes, extra):
+        """Build a log entry."""
+        entry = {"seq": seq, "time": datetime.now().isoformat(timespec="microseconds"), "op": op}
+        entry.update(extra)
+        entry["changes"] = changes
+        return entry
+
+    def _append(self, op, changes, extra):
+        """Append or buffer an entry, update the undo stacks and checkpoint if due."""
+        with self._mutex:
+            if self._committer is not None:
+                seq = (self._pending[-1]["seq"] if self._pending else self._lock.version()) + 1
+                entry = self._new_entry(seq, op, changes, extra)
+                if self._undo is not None:
+                    self._track(entry)
+                self._pending.append(entry)
+                self._committer.mark()
+                return entry
+
+            with self._lock.exclusive():
+                entry = self._new_entry(self._lock.version() + 1, op, changes, extra)
+                self._pending.append(entry)
+                try:
+                    offset = self._write_pending()
+                except BaseException:
+                    self._pending.remove(entry)
+                    raise
+                if self._undo is not None:
+                    self._track(entry)
+                self._checkpoint_if_due(entry, offset)
+        return entry
+
+    def _write_pending(self):
+        """
+        Write the pending entries to the log in one write.
+
+        Requires the mutex and the exclusive lock. Entries are numbered
+        again first if another process appended since they were buffered.
+
+        Returns:
+            int: The offset just past the last entry, or None if none was pending.
+        """
+        if not self._pending:
+            return None
+        shift = self._lock.version() + 1 - self._pending[0]["seq"]
+        if shift:
+            first = self._pending[0]["seq"]
+            for entry in self._pending:  # The same objects as on the undo and redo stacks
+                entry["seq"] += shift
+                for key in ("undo_of", "redo_of"):
+                    if entry.get(key, 0) >= first:
+                        entry[key] += shift
+        if self.in_memory:
+            self._memory_entries.extend(self._pending)
+            offset = len(self._memory_entries)
+        else:
+            text = "".join(json.dumps(entry, default=_json_default) + "\n" for entry in self._pending)
+            with open(self.path, "a", encoding="utf-8") as stream:
+                stream.write(text)
+                offset = stream.tell()
+            metrics.record_file_write("OperationLog.record", self.path)
+        self._lock.bump(len(self._pending))
+        self._pending = []
+        return offset
+
+    def _save_pending(self):
+        """Write the pending entries and checkpoint if due; the group committer's save."""
+        with self._mutex, self._lock.exclusive():
+            last = self._pending[-1] if self._pending else None
+            offset = self._write_pending()
+            if last is not None:
+                self._checkpoint_if_due(last, offset)
+
+    def _checkpoint_if_due(self, entry, offset):
+        """Write a checkpoint after entry if checkpoint_every entries followed the last one."""
+        if self._checkpoint_seq is None:
+            last = self._last_checkpoint()
+            self._checkpoint_seq = last["seq"] if last else 0
+        if self._state is not None and entry["seq"] - self._checkpoint_seq >= self.checkpoint_every:
+            self._write_checkpoint(entry["seq"], entry["time"], offset)
+
+    # Group commit
+
+    def enable_group_commit(self, interval=0.05, max_ops=100):
+        """
+        Buffer entries and write them from a background thread.
+
+        Nothing is written in in-memory mode, so there is nothing to buffer.
+        See InventoryManagement.enable_group_commit.
+
+        Args:
+            interval (float, optional): Seconds an unwritten entry may wait.
+            max_ops (int, optional): Number of waiting entries that triggers a write at once.
+        """
+        if self.in_memory:
+            return
+        with self._mutex:
+            if self._committer is None:
+                self._committer = GroupCommitter(self._save_pending, interval, max_ops,
+                                                 name="group-commit-oplog")
+
+    def disable_group_commit(self):
+        """
+        Write the pending entries and return to writing every entry at once.
+
+        Raises:
+            RuntimeError: If writing the pending entries failed.
+        """
+        with self._mutex:
+            committer, self._committer = self._committer, None
+        if committer is not None:
+            committer.close()
+
+    def flush(self):
+        """
+        Wait until every entry recorded so far is written.
+
+        Raises:
+            RuntimeError: If writing the pending entries failed.
+        """
+        committer = self._committer
+        if committer is not None:
+            committer.flush()
+
+    # Reading
+
+    def entries(self, offset=0):
+        """
+        Iterate over the log entries, writing the pending ones first.
+
+        Args:
+            offset (int, optional): Byte offset to start reading at, as stored in a checkpoint.
+
+        Yields:
+            dict: The entries, oldest first.
+        """
+        self.flush()
+        yield from self._read_entries(offset)
+
+    def _read_entries(self, offset=0):
+        """Iterate over the entries written to the log, without the pending ones."""
+        if self.in_memory:
+            yield from self._memory_entries[offset:]
+            return
+        try:
+            stream = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with stream:
+            stream.seek(offset)
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+    def last_seq(self):
+        """Return the sequence number of the last entry (0 for an empty log)."""
+        with self._mutex:
+            return self._pending[-1]["seq"] if self._pending else self._lock.version()
+
+    # Checkpoints
+
+    def checkpoints(self):
+        """
+        Return the index of the checkpoints.
+
+        Returns:
+            list: Dictionaries with "seq", "time", "offset", "file" and "stacks", oldest first.
+        """
+        if self.in_memory:
+            return [checkpoint for checkpoint, _, _ in self._memory_checkpoints]
+        try:
+            lines = self.index_path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def _last_checkpoint(self):
+        """Return the index entry of the newest checkpoint, or None."""
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def ensure_checkpoint(self):
+        """Write a checkpoint of the current state if there is none yet."""
+        if self._state is None:
+            return
+        with self._mutex, self._lock.exclusive():
+            self._write_pending()
+            if self._last_checkpoint() is None:
+                self._write_checkpoint(self._lock.version(), datetime.now().isoformat(timespec="microseconds"),
+                                       self._end_offset())
+
+    def checkpoint(self):
+        """Write a checkpoint of the current state now."""
+        if self._state is None:
+            return
+        with self._mutex, self._lock.exclusive():
+            self._write_pending()
+            self._write_checkpoint(self._lock.version(), datetime.now().isoformat(timespec="microseconds"),
+                                   self._end_offset())
+
+    def _end_offset(self):
+        """Return the offset just past the last entry."""
+        if self.in_memory:
+            return len(self._memory_entries)
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def compact(self, keep=None):
+        """
+        Drop all but the newest checkpoints and the log entries before the oldest kept one.
+
+        Args:
+            keep (int, optional): Checkpoints to keep. Defaults to keep_checkpoints.
+
+        Returns:
+            int: The number of log entries dropped.
+
+        Raises:
+            ValueError: If keep is less than 1.
+        """
+        keep = self.keep_checkpoints if keep is None else keep
+        if keep < 1:
+            raise ValueError("At least one checkpoint must be kept.")
+        with self._mutex, self._lock.exclusive():
+            self._write_pending()
+            return self._compact(keep)
+
+    def _compact(self, keep):
+        """Compact the log down to `keep` checkpoints. Requires the mutex and the exclusive lock."""
+        checkpoints = self.checkpoints()
+        if len(checkpoints) <= keep:
+            return 0
+        dropped, kept = checkpoints[:-keep], checkpoints[-keep:]
+        start = kept[0]["offset"]
+        if self.in_memory:
+            del self._memory_entries[:start]
+            self._memory_checkpoints = self._memory_checkpoints[-keep:]
+            for checkpoint in kept:
+                checkpoint["offset"] -= start
+            return start
+
+        # The new log and index replace the old ones whole; open readers keep the old files
+        with open(self.path, "rb") as stream:
+            count = stream.read(start).count(b"\n")
+            tail = stream.read()
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_bytes(tail)
+        os.replace(temporary, self.path)
+        lines = "".join(json.dumps(dict(checkpoint, offset=checkpoint["offset"] - start)) + "\n"
+                        for checkpoint in kept)
+        temporary = self.index_path.with_name(self.index_path.name + ".tmp")
+        temporary.write_text(lines, encoding="utf-8")
+        os.replace(temporary, self.index_path)
+        for checkpoint in dropped:
+            for name in (checkpoint["file"], checkpoint.get("stacks")):
+                if name:
+                    (self.checkpoint_dir / name).unlink(missing_ok=True)
+        metrics.record_file_write("OperationLog.compact", self.path)
+        return count
+
+    def _write_checkpoint(self, seq, time, offset):
+        """
+        Write the current state and the undo and redo stacks as the checkpoint after entry seq.
+
+        Requires the mutex and the exclusive lock, with no entry pending.
+        The stacks are rebuilt from the previous checkpoint first, so they
+        also hold the entries other processes appended.
+        """
+        state = {member: list(records.values()) for member, records in self._state().items()}
+        self._load_stacks()
+        stacks = {"undo": self._undo, "redo": self._redo}
+        if self.in_memory:
+            index_entry = {"seq": seq, "time": time, "offset": offset, "file": None, "stacks": None}
+            self._memory_checkpoints.append((index_entry, state, {key: list(value) for key, value in stacks.items()}))
+            self._checkpoint_seq = seq
+            if len(self._memory_checkpoints) >= 2 * self.keep_checkpoints:
+                self._compact(self.keep_checkpoints)
+            return
+        self.checkpoint_dir.mkdir(exist_ok=True)
+        name = f"{seq:012d}.json"
+        stacks_name = f"{seq:012d}.stacks.json"
+        (self.checkpoint_dir / name).write_text(json.dumps(state, default=_json_default), encoding="utf-8")
+        (self.checkpoint_dir / stacks_name).write_text(json.dumps(stacks, default=_json_default), encoding="utf-8")
+        with open(self.index_path, "a", encoding="utf-8") as stream:
+            stream.write(json.dumps({"seq": seq, "time": time, "offset": offset, "file": name,
+                                     "stacks": stacks_name}) + "\n")
+        metrics.record_file_write("OperationLog.checkpoint", self.checkpoint_dir / name)
+        self._checkpoint_seq = seq
+        if len(self.checkpoints()) >= 2 * self.keep_checkpoints:
+            self._compact(self.keep_checkpoints)
+
+    def state_at(self, when):
+        """
+        Rebuild the state as of a point in time.
+
+        Starts from the newest checkpoint taken at or before `when` and
+        replays only the entries recorded after it, up to `when`.
+
+        Args:
+            when (datetime or str): The point in time.
+
+        Returns:
+            dict: The state as {member: {med_id: record}}.
+
+        Raises:
+            ValueError: If no checkpoint is older than `when`.
+        """
+        when = _as_datetime(when)
+        self.flush()
+        with self._mutex, self._lock.shared():  # Not compacted meanwhile, so the offsets hold
+            base = None
+            for checkpoint in self.checkpoints():
+                if _as_datetime(checkpoint["time"]) <= when:
+                    base = checkpoint
+            if base is None:
+                raise ValueError(f"No checkpoint at or before {when.isoformat()}; the log starts later")
+
+            saved = self._checkpoint_state(base)
+            state = {member: {record["med_id"]: record for record in records} for member, records in saved.items()}
+            for entry in self._read_entries(base["offset"]):
+                if entry["seq"] <= base["seq"]:
+                    continue
+                if _as_datetime(entry["time"]) > when:
+                    break
+                apply_to_state(state, entry["changes"])
+        return state
+
+    def _checkpoint_state(self, checkpoint):
+        """Return the state saved by a checkpoint as {member: [record, ...]}."""
+        if self.in_memory:
+            for index_entry, state, _ in self._memory_checkpoints:
+                if index_entry is checkpoint:
+                    return state
+        return json.loads((self.checkpoint_dir / checkpoint["file"]).read_text(encoding="utf-8"))
+
+    def _checkpoint_stacks(self, checkpoint):
+        """Return the undo and redo stacks saved by a checkpoint, or None if it saved none."""
+        if self.in_memory:
+            for index_entry, _, stacks in self._memory_checkpoints:
+                if index_entry is checkpoint:
+                    return list(stacks["undo"]), list(stacks["redo"])
+        if not checkpoint.get("stacks"):
+            return None  # Written before checkpoints saved the stacks
+        stacks = json.loads((self.checkpoint_dir / checkpoint["stacks"]).read_text(encoding="utf-8"))
+        return stacks["undo"], stacks["redo"]
+
+    # Undo and redo
+
+    def _track(self, entry):
+        """Update the undo and redo stacks with a new entry."""
+        if "undo_of" in entry:
+            if self._undo and self._undo[-1]["seq"] == entry["undo_of"]:
+                self._redo.append(self._undo.pop())
+        elif "redo_of" in entry:
+            if self._redo and self._redo[-1]["seq"] == entry["redo_of"]:
+                self._undo.append(self._redo.pop())
+        else:
+            self._undo.append(entry)
+            self._redo.clear()
+            del self._undo[:-self.max_undo]
+
+    def _stacks(self):
+        """Build the undo and redo stacks from the log on first use."""
+        if self._undo is None:
+            with self._lock.shared():
+                self._load_stacks()
+
+    def _load_stacks(self):
+        """
+        Build the undo and redo stacks from the newest checkpoint and the entries after it.
+
+        Requires the mutex and a lock on the log. Only a log whose newest checkpoint saved no
+        stacks is read from the start.
+        """
+        last = self._last_checkpoint()
+        stacks = self._checkpoint_stacks(last) if last else None
+        if stacks is None:
+            self._undo, self._redo = [], []
+            offset, seq = 0, 0
+        else:
+            self._undo, self._redo = stacks
+            offset, seq = last["offset"], last["seq"]
+        for entry in self._read_entries(offset):
+            if entry["seq"] > seq:
+                self._track(entry)
+        for entry in list(self._pending):
+            self._track(entry)
+
+    def undo_target(self):
+        """
+        Return the entry the next undo reverts.
+
+        Returns:
+            dict: The entry, or None if there is nothing to undo.
+        """
+        with self._mutex:
+            self._stacks()
+            return self._undo[-1] if self._undo else None
+
+    def redo_target(self):
+        """
+        Return the entry the next redo applies again.
+
+        Returns:
+            dict: The entry, or None if there is nothing to redo.
+        """
+        with self._mutex:
+            self._stacks()
+            return self._redo[-1] if self._redo else None
@@ -1,6 +1,7 @@
 # prescription.py
 from datetime import datetime
 from medication_management.medication import Medication
+from medication_management import events
 
 class PrescriptionMedication(Medication):
     """
@@ -82,7 +83,7 @@ class PrescriptionMedication(Medication):
             return current_date > expiry_date
         except ValueError:
             # Handle invalid date formats
-            print("Error: Invalid date format")
+            events.error("Error: Invalid date format", "medication")
             return True
 
     def to_dict(self):
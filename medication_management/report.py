@@ -0,0 +1,178 @@
+# report.py
+# Streaming report generation for medication inventories.
+import csv
+import io
+import json
+import sys
+
+# Formats supported by the report writers
+REPORT_FORMATS = ("text", "csv", "json")
+
+# Report columns as (key, heading, text width)
+STOCK_COLUMNS = (
+    ("id", "ID", 5),
+    ("name", "Name", 20),
+    ("stock", "Stock", 10),
+    ("days_left", "Days Left", 10),
+)
+PRESCRIPTION_COLUMNS = (
+    ("id", "ID", 5),
+    ("name", "Name", 20),
+    ("doctor", "Doctor", 15),
+    ("date", "Date", 12),
+    ("expiration_date", "Expiration", 12),
+)
+
+
+class BufferedSink:
+    """
+    A write buffer in front of a file-like sink.
+
+    Small writes are collected and passed on to the sink in large chunks,
+    so writing a report row by row does not cost one sink write per row.
+
+    Attributes:
+        sink (file): The file-like object receiving the output.
+        buffer_size (int): Number of characters collected before flushing.
+    """
+    def __init__(self, sink, buffer_size=64 * 1024):
+        """
+        Initialize a BufferedSink.
+
+        Args:
+            sink (file): Any object with a write(str) method.
+            buffer_size (int, optional): Number of characters collected before flushing.
+        """
+        self.sink = sink
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        """
+        Buffer a piece of text, flushing when the buffer is full.
+
+        Args:
+            text (str): The text to write.
+        """
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered text to the sink."""
+        if self._parts:
+            self.sink.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        if hasattr(self.sink, 'flush'):
+            self.sink.flush()
+
+
+def stock_report_rows(inventory):
+    """
+    Yield the rows of a stock report, one medication at a time.
+
+    Args:
+        inventory (InventoryManagement): The inventory to report on.
+
+    Yields:
+        dict: A row with id, name, stock and days_left (None if it cannot be computed).
+    """
+    for med_id, medication in inventory.medications.items():
+        try:
+            days_left = medication.calculate_days_left()
+        except ValueError:
+            days_left = None
+        yield {"id": med_id, "name": medication.name, "stock": medication.stock, "days_left": days_left}
+
+
+def prescription_report_rows(inventory):
+    """
+    Yield the rows of a prescription report, one prescription at a time.
+
+    Args:
+        inventory (InventoryManagement): The inventory to report on.
+
+    Yields:
+        dict: A row with the prescription details.
+    """
+    yield from inventory.iter_prescription_medications()
+
+
+def _text_cell(value, width):
+    """Format a value as a left-aligned text report cell."""
+    return format("N/A" if value is None else value, f"<{width}")
+
+
+def iter_report_lines(rows, columns, fmt="text", title=None, rule_width=50):
+    """
+    Format report rows lazily.
+
+    Args:
+        rows (iterable): Report rows as dictionaries.
+        columns (tuple): The report columns as (key, heading, text width).
+        fmt (str, optional): One of "text", "csv" or "json".
+        title (str, optional): A title line for the text format.
+        rule_width (int, optional): Width of the rule under the text header.
+
+    Yields:
+        str: Pieces of the formatted report, each ending with a newline.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {fmt}. Use one of {', '.join(REPORT_FORMATS)}.")
+    keys = [key for key, _, _ in columns]
+
+    if fmt == "text":
+        if title:
+            yield title + "\n"
+        yield " ".join(_text_cell(heading, width) for _, heading, width in columns) + "\n"
+        yield "-" * rule_width + "\n"
+        for row in rows:
+            yield " ".join(_text_cell(row.get(key), width) for key, _, width in columns) + "\n"
+
+    elif fmt == "csv":
+        line = io.StringIO()  # Reused for every row
+        writer = csv.writer(line, lineterminator="\n")
+
+        def csv_line(values):
+            line.seek(0)
+            line.truncate()
+            writer.writerow(values)
+            return line.getvalue()
+
+        yield csv_line(keys)
+        for row in rows:
+            yield csv_line([row.get(key) for key in keys])
+
+    else:
+        yield "["
+        for index, row in enumerate(rows):
+            yield ("," if index else "") + "\n" + json.dumps({key: row.get(key) for key in keys})
+        yield "\n]\n"
+
+
+def write_report(rows, columns, sink=None, fmt="text", title=None, rule_width=50, buffer_size=64 * 1024):
+    """
+    Stream a report to a file-like sink with buffered output.
+
+    Rows are formatted and written as they are produced, so memory use does
+    not grow with the number of rows.
+
+    Args:
+        rows (iterable): Report rows as dictionaries.
+        columns (tuple): The report columns as (key, heading, text width).
+        sink (file, optional): Where to write. Defaults to standard output.
+        fmt (str, optional): One of "text", "csv" or "json".
+        title (str, optional): A title line for the text format.
+        rule_width (int, optional): Width of the rule under the text header.
+        buffer_size (int, optional): Number of characters buffered between sink writes.
+    """
+    buffered = BufferedSink(sink if sink is not None else sys.stdout, buffer_size)
+    for piece in iter_report_lines(rows, columns, fmt, title, rule_width):
+        buffered.write(piece)
+    buffered.flush()
@@ -0,0 +1,340 @@
+# snapshot.py
+# Compact, versioned binary snapshots of an inventory that are read through mmap.
+import csv
+import mmap
+import os
+import struct
+import numpy as np
+from pathlib import Path
+from medication_management.cache import file_stamp, is_unchanged, should_restamp
+from medication_management.prescription import PrescriptionMedication
+
+# File layout, version 3 (all integers little-endian):
+#
+#   header          64 bytes, see HEADER; ends with the stamp of the source
+#                   CSV file (size, mtime, BLAKE2 hash, time taken), see cache.py
+#   med_id          int64[count]
+#   daily_dosage    int64[count]
+#   stock           int64[count]
+#   is_prescription uint8[count], padded to 8 bytes
+#   string refs     uint32[count, len(STRING_FIELDS)], indexes into the string table, padded to 8 bytes
+#   string offsets  uint32[string_count + 1], padded to 8 bytes
+#   string data     UTF-8 bytes of the deduplicated strings
+#
+# Every column is a contiguous fixed-width array, so a query that only needs
+# stock and daily dosage touches only those pages of the file.
+MAGIC = b"FMTSNAP\x00"
+VERSION = 3  # 2: lots added to STRING_FIELDS; 3: hash and stamp time of the source
+HEADER = struct.Struct("<8sHHIIIqq16sq")
+HEADER_SIZE = 64
+NULL_REF = 0xFFFFFFFF  # String reference of a missing value
+
+# String columns of the inventory CSV schema, in storage order
+STRING_FIELDS = (
+    'name', 'dosage', 'frequency', 'doctor_name', 'prescription_date',
+    'indication', 'warnings', 'expiration_date', 'lots'
+)
+
+
+def _padding(size):
+    """Return the number of bytes needed to align size to 8 bytes."""
+    return -size % 8
+
+
+def _is_missing(value):
+    """Whether a string field holds no value (None or a NaN read from CSV)."""
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def write_snapshot(path, medications, source=None):
+    """
+    Write an inventory snapshot.
+
+    The file is written to a temporary path and moved into place, so readers
+    never see a partial snapshot.
+
+    Args:
+        path (Path): The snapshot file to write.
+        medications (dict): Medication objects keyed by medication ID.
+        source (Path, optional): The CSV file the snapshot mirrors. Its stamp
+            (size, modification time and content hash) is stored so readers
+            can detect a stale snapshot.
+    """
+    path = Path(path)
+    med_ids = sorted(medications)
+    count = len(med_ids)
+
+    strings = {}  # string -> index in the string table
+    refs = np.full((count, len(STRING_FIELDS)), NULL_REF, dtype="<u4")
+    daily_dosage = np.zeros(count, dtype="<i8")
+    stock = np.zeros(count, dtype="<i8")
+    is_prescription = np.zeros(count, dtype="u1")
+    for row, med_id in enumerate(med_ids):
+        medication = medications[med_id]
+        record = medication.to_dict()
+        daily_dosage[row] = int(record['daily_dosage'])
+        stock[row] = int(record['stock'])
+        is_prescription[row] = isinstance(medication, PrescriptionMedication)
+        for column, field in enumerate(STRING_FIELDS):
+            value = record.get(field)
+            if not _is_missing(value):
+                refs[row, column] = strings.setdefault(str(value), len(strings))
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+    source_size, source_mtime, source_digest, stamped_ns = -1, -1, bytes(16), 0
+    if source is not None and Path(source).exists():
+        source_size, source_mtime, digest, stamped_ns = file_stamp(source)
+        source_digest = bytes.fromhex(digest)
+
+    header = HEADER.pack(MAGIC, VERSION, HEADER_SIZE, count, len(encoded), int(offsets[-1]),
+                         source_size, source_mtime, source_digest, stamped_ns)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as stream:
+        stream.write(header.ljust(HEADER_SIZE, b"\x00"))
+        stream.write(np.asarray(med_ids, dtype="<i8").tobytes())
+        stream.write(daily_dosage.tobytes())
+        stream.write(stock.tobytes())
+        stream.write(is_prescription.tobytes() + b"\x00" * _padding(count))
+        stream.write(refs.tobytes() + b"\x00" * _padding(refs.nbytes))
+        stream.write(offsets.tobytes() + b"\x00" * _padding(offsets.nbytes))
+        stream.write(b"".join(encoded))
+    os.replace(temp_path, path)
+
+
+class InventorySnapshot:
+    """
+    A read-only view of an inventory snapshot file.
+
+    The file is memory-mapped and the numeric columns are numpy arrays over
+    the mapping, so opening a snapshot parses nothing and queries only read
+    the pages of the columns they use. Strings are decoded on access.
+
+    Attributes:
+        path (Path): The snapshot file.
+        med_ids (numpy.ndarray): Medication IDs, ascending.
+        daily_dosage (numpy.ndarray): Daily dosage per medication.
+        stock (numpy.ndarray): Stock per medication.
+        is_prescription (numpy.ndarray): 1 for prescription medications, else 0.
+    """
+    def __init__(self, path):
+        """
+        Open a snapshot file.
+
+        Args:
+            path (Path): The snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot or has an unsupported version.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as stream:
+            self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < HEADER_SIZE:
+                raise ValueError(f"{self.path} is not an inventory snapshot")
+            (magic, version, header_size, count, string_count, data_size,
+             self._source_size, self._source_mtime, source_digest, self._stamped_ns) = HEADER.unpack_from(self._map)
+            self._source_digest = source_digest.hex()
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not an inventory snapshot")
+            if version != VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} in {self.path}")
+            self._count = count
+
+            offset = header_size
+            self.med_ids, offset = self._column("<i8", count, offset)
+            self.daily_dosage, offset = self._column("<i8", count, offset)
+            self.stock, offset = self._column("<i8", count, offset)
+            self.is_prescription, offset = self._column("u1", count, offset)
+            refs, offset = self._column("<u4", count * len(STRING_FIELDS), offset)
+            self._refs = refs.reshape(count, len(STRING_FIELDS))
+            self._offsets, offset = self._column("<u4", string_count + 1, offset)
+            self._data_start = offset
+            if offset + data_size > len(self._map):
+                raise ValueError(f"Truncated inventory snapshot {self.path}")
+        except Exception:
+            self.close()
+            raise
+
+    def _column(self, dtype, count, offset):
+        """Map a column at offset; return it and the aligned offset after it."""
+        column = np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+        end = offset + column.nbytes
+        return column, end + _padding(end)
+
+    def close(self):
+        """Release the columns and unmap the file."""
+        self.med_ids = self.daily_dosage = self.stock = self.is_prescription = None
+        self._refs = self._offsets = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Return the number of medications in the snapshot."""
+        return self._count
+
+    def is_fresh(self, source):
+        """
+        Check whether the snapshot still mirrors its source CSV file.
+
+        As in ParseCache, the file's size and modification time decide when
+        they can be trusted; a file modified within the timestamp resolution
+        of when the snapshot was written is compared by content hash, so a
+        same-size rewrite is not missed.
+
+        Args:
+            source (Path): The CSV file the snapshot was written from.
+
+        Returns:
+            bool: True if the file's content is the one the snapshot mirrors.
+        """
+        try:
+            stat = Path(source).stat()
+            return is_unchanged(source, stat, self._source_size, self._source_mtime,
+                                self._source_digest, self._stamped_ns)
+        except OSError:
+            return False
+
+    def should_restamp(self, source):
+        """
+        Whether the snapshot should be written again, with a new stamp of its
+        source, so that the next is_fresh() can skip hashing the source.
+
+        Args:
+            source (Path): The CSV file the snapshot was written from, checked fresh.
+
+        Returns:
+            bool: True if the source had to be hashed and is now old enough to trust its stat.
+        """
+        try:
+            stat = Path(source).stat()
+        except OSError:
+            return False
+        return should_restamp(stat, self._source_mtime, self._stamped_ns)
+
+    def _string(self, ref):
+        """Decode a string from the string table, or None for NULL_REF."""
+        if ref == NULL_REF:
+            return None
+        start = self._data_start + int(self._offsets[ref])
+        end = self._data_start + int(self._offsets[ref + 1])
+        return self._map[start:end].decode("utf-8")
+
+    def field(self, row, name):
+        """
+        Return one string field of a medication.
+
+        Args:
+            row (int): The position of the medication in the snapshot.
+            name (str): One of STRING_FIELDS.
+
+        Returns:
+            str: The value, or None if it is missing.
+        """
+        return self._string(int(self._refs[row, STRING_FIELDS.index(name)]))
+
+    def record(self, row):
+        """
+        Return a medication as a record in the inventory CSV schema.
+
+        Args:
+            row (int): The position of the medication in the snapshot.
+
+        Returns:
+            dict: The record.
+        """
+        prescription = bool(self.is_prescription[row])
+        record = {
+            'med_id': int(self.med_ids[row]),
+            'daily_dosage': int(self.daily_dosage[row]),
+            'stock': int(self.stock[row]),
+            'is_prescription': prescription,
+        }
+        for column, name in enumerate(STRING_FIELDS):
+            record[name] = self._string(int(self._refs[row, column]))
+        return record
+
+    def iter_records(self):
+        """
+        Iterate over the medications as records in the inventory CSV schema.
+
+        Yields:
+            dict: One record per medication, ordered by medication ID.
+        """
+        for row in range(self._count):
+            yield self.record(row)
+
+    def medications(self):
+        """
+        Build the medication objects stored in the snapshot.
+
+        Returns:
+            dict: Medication objects keyed by medication ID.
+        """
+        # Imported here because inventory.py imports this module
+        from medication_management.inventory import medication_from_record
+        return {record['med_id']: medication_from_record(record) for record in self.iter_records()}
+
+    def check_low_stock(self, threshold=3, today=None):
+        """
+        Find medications with low stock without building medication objects.
+
+        Only the stock and daily dosage columns are read, plus the names of
+        the matching medications. Medications with lots are the exception:
+        their days left are recomputed from the lots, counting only stock
+        used before it expires, as Medication.calculate_days_left() does.
+        Medications without a positive daily dosage are skipped, as
+        InventoryManagement.check_low_stock does.
+
+        Args:
+            threshold (int, optional): Maximum days of stock left to report.
+            today (date, optional): The current date, for the expiry of lots. Defaults to today.
+
+        Returns:
+            list: Tuples of (medication ID, name, days left), ordered by ID.
+        """
+        # Imported here because inventory.py imports this module
+        from medication_management.inventory import medication_from_record
+        valid = self.daily_dosage > 0
+        days_left = np.zeros(self._count, dtype="<i8")
+        np.floor_divide(self.stock, self.daily_dosage, out=days_left, where=valid)
+        with_lots = valid & (self._refs[:, STRING_FIELDS.index('lots')] != NULL_REF)
+        for row in np.flatnonzero(with_lots).tolist():
+            days_left[row] = medication_from_record(self.record(row)).calculate_days_left(today)
+        rows = np.flatnonzero(valid & (days_left <= threshold))
+        name_column = STRING_FIELDS.index('name')
+        return [
+            (int(self.med_ids[row]), self._string(int(self._refs[row, name_column])), int(days_left[row]))
+            for row in rows
+        ]
+
+    def to_csv(self, path_or_buf):
+        """
+        Export the snapshot to the inventory CSV schema.
+
+        Args:
+            path_or_buf (str, Path or file): Where to write the CSV.
+        """
+        # Imported here because inventory.py imports this module
+        from medication_management.inventory import INVENTORY_COLUMNS
+        if hasattr(path_or_buf, 'write'):
+            self._write_csv(path_or_buf, INVENTORY_COLUMNS)
+            return
+        with open(path_or_buf, "w", newline="") as stream:
+            self._write_csv(stream, INVENTORY_COLUMNS)
+
+    def _write_csv(self, stream, columns):
+        """Write the records as CSV to a text stream."""
+        writer = csv.DictWriter(stream, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(self.iter_records())
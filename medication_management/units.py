@@ -0,0 +1,140 @@
+# units.py
+# Parsing of dosage and frequency strings into normalized numeric values.
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Dosage units and their factor to the normalized unit of their dimension
+UNIT_ALIASES = {
+    # Mass, normalized to mg
+    "mg": ("mg", 1.0), "milligram": ("mg", 1.0), "milligrams": ("mg", 1.0),
+    "g": ("mg", 1000.0), "gram": ("mg", 1000.0), "grams": ("mg", 1000.0),
+    "mcg": ("mg", 0.001), "ug": ("mg", 0.001), "µg": ("mg", 0.001),
+    "microgram": ("mg", 0.001), "micrograms": ("mg", 0.001),
+    # Volume, normalized to ml
+    "ml": ("ml", 1.0), "milliliter": ("ml", 1.0), "milliliters": ("ml", 1.0),
+    "l": ("ml", 1000.0), "liter": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    # International units
+    "iu": ("iu", 1.0), "unit": ("iu", 1.0), "units": ("iu", 1.0),
+    # Counted forms
+    "tablet": ("tablet", 1.0), "tablets": ("tablet", 1.0), "tab": ("tablet", 1.0), "tabs": ("tablet", 1.0),
+    "capsule": ("capsule", 1.0), "capsules": ("capsule", 1.0), "cap": ("capsule", 1.0), "caps": ("capsule", 1.0),
+    "drop": ("drop", 1.0), "drops": ("drop", 1.0),
+    "puff": ("puff", 1.0), "puffs": ("puff", 1.0),
+    "%": ("%", 1.0),
+}
+
+# Number words used in frequencies
+NUMBER_WORDS = {
+    "once": 1, "one": 1, "a": 1, "an": 1, "twice": 2, "two": 2,
+    "thrice": 3, "three": 3, "four": 4, "five": 5, "six": 6,
+}
+
+# Frequencies given as one word or abbreviation, in doses per day
+FREQUENCY_WORDS = {
+    "daily": 1.0, "qd": 1.0, "od": 1.0, "nightly": 1.0, "qhs": 1.0, "qam": 1.0, "qpm": 1.0,
+    "bid": 2.0, "tid": 3.0, "qid": 4.0,
+    "weekly": 1 / 7, "monthly": 1 / 30,
+}
+
+# Times of day; a frequency naming several of them means one dose at each
+TIMES_OF_DAY = ("morning", "noon", "evening", "bedtime", "night")
+
+# Days per period named in a frequency
+PERIOD_DAYS = {
+    "day": 1.0, "daily": 1.0, "d": 1.0, "night": 1.0,
+    "week": 7.0, "weekly": 7.0, "wk": 7.0, "w": 7.0,
+    "month": 30.0, "monthly": 30.0,
+}
+
+_DOSAGE_PATTERN = re.compile(r"^\s*(\d+(?:,\d{3})*(?:\.\d+)?|\.\d+)\s*([a-zµ%]+)?", re.IGNORECASE)
+_COUNT = r"\b(\d+(?:\.\d+)?|(?:" + "|".join(NUMBER_WORDS) + r")\b)"
+_TIMES_PER_PERIOD = re.compile(
+    _COUNT + r"\s*(?:x|times?)?\s*(?:/|a|an|per|each|every)?\s*(" + "|".join(PERIOD_DAYS) + r")\b"
+)
+_EVERY_HOURS = re.compile(r"(?:every|q)\s*(\d+(?:\.\d+)?)\s*(?:-\s*\d+\s*)?(?:hours?|hrs?|h)\b")
+_EVERY_DAYS = re.compile(r"(?:every|each)\s*(\d+|other)?\s*(days?|weeks?)\b")
+_AS_NEEDED = re.compile(r"\b(?:as needed|prn|when needed|if needed)\b")
+
+# A parsed dosage: the amount of one unit of the medication in its normalized unit
+Dosage = namedtuple("Dosage", ["amount", "unit"])
+
+
+@lru_cache(maxsize=4096)
+def parse_dosage(text):
+    """
+    Parse a dosage string such as "500mg", "0.5 g" or "1,000 IU".
+
+    The amount is converted to the normalized unit of its dimension: mg for
+    mass, ml for volume, iu for international units; counted forms such as
+    tablets keep their own unit. Only the leading amount is read, so
+    "250mg/5ml" gives 250 mg. Results are cached per distinct string, since
+    the same few values repeat across many medications.
+
+    Args:
+        text (str): The dosage string.
+
+    Returns:
+        Dosage: The amount and normalized unit, or None if the string is not understood.
+    """
+    match = _DOSAGE_PATTERN.match(str(text))
+    if match is None:
+        return None
+    amount = float(match.group(1).replace(",", ""))
+    unit = (match.group(2) or "").casefold()
+    if unit not in UNIT_ALIASES:
+        return None
+    normalized, factor = UNIT_ALIASES[unit]
+    return Dosage(amount * factor, normalized)
+
+
+@lru_cache(maxsize=4096)
+def parse_frequency(text):
+    """
+    Parse a frequency string into the number of doses per day.
+
+    Understands forms such as "daily", "twice daily", "2 times/day",
+    "3x a day", "every 8 hours", "q12h", "every other day", "every day",
+    "each week", "weekly", "morning and evening" and the abbreviations bid,
+    tid and qid. Results are cached per distinct string.
+
+    Args:
+        text (str): The frequency string.
+
+    Returns:
+        float: The doses per day, or None if the string is not understood
+        or the medication is taken as needed.
+    """
+    text = " ".join(str(text).casefold().replace(".", "").split())
+    if not text or _AS_NEEDED.search(text):
+        return None
+    if text in FREQUENCY_WORDS:
+        return FREQUENCY_WORDS[text]
+
+    match = _EVERY_HOURS.search(text)
+    if match:
+        hours = float(match.group(1))
+        return 24.0 / hours if hours > 0 else None
+
+    match = _EVERY_DAYS.search(text)
+    # Without a count, "every day" is once a day unless a count precedes it,
+    # as in "twice every day"
+    if match and (match.group(1) or not _TIMES_PER_PERIOD.search(text)):
+        count = match.group(1)
+        days = 1.0 if count is None else 2.0 if count == "other" else float(count)
+        if match.group(2).startswith("week"):
+            days *= 7
+        return 1.0 / days if days > 0 else None
+
+    match = _TIMES_PER_PERIOD.search(text)
+    if match:
+        count = match.group(1)
+        count = float(NUMBER_WORDS[count]) if count in NUMBER_WORDS else float(count)
+        return count / PERIOD_DAYS[match.group(2)]
+
+    words = text.split()
+    for word in words:
+        if word in FREQUENCY_WORDS:
+            return FREQUENCY_WORDS[word]
+    times = {word for word in words if word in TIMES_OF_DAY}
+    return float(len(times)) if times else None
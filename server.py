@@ -0,0 +1,534 @@
+# server.py
+# Local HTTP/JSON service keeping one FamilyManagement resident.
+import argparse
+import io
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from medication_management.inventory import medication_from_record, medication_record
+from medication_management.report import REPORT_FORMATS
+from medication_management import events
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Content types of the report formats
+REPORT_CONTENT_TYPES = {"text": "text/plain", "csv": "text/csv", "json": "application/json"}
+
+
+class ApiError(Exception):
+    """Custom exception for requests that cannot be served, with an HTTP status."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _PendingWrite:
+    """A write operation waiting for the writer thread."""
+    __slots__ = ('operation', 'result', 'error', 'done')
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class WriteCoalescer:
+    """
+    Apply write operations on a single writer thread, in groups.
+
+    Writes submitted while the writer is busy queue up and are applied
+    together inside one FamilyManagement.batch(), so a burst of concurrent
+    writes costs one save per touched file instead of one per write. Each
+    submitter waits until the group containing its write has been saved.
+    Each write is still its own operation log entry, so an undo reverts
+    one client's write, not the whole group.
+
+    Attributes:
+        family (FamilyManagement): The family the operations are applied to.
+        max_group (int): Maximum number of writes in one group.
+        linger (float): Seconds to wait for more writes before saving a group.
+        writes (int): Number of writes applied.
+        flushes (int): Number of groups saved.
+    """
+    def __init__(self, family, max_group=256, linger=0.0):
+        """
+        Initialize a WriteCoalescer and start its writer thread.
+
+        Args:
+            family (FamilyManagement): The family the operations are applied to.
+            max_group (int, optional): Maximum number of writes in one group.
+            linger (float, optional): Seconds to wait for more writes before
+                saving a group. 0 groups only the writes already waiting.
+        """
+        self.family = family
+        self.max_group = max_group
+        self.linger = linger
+        self.writes = 0
+        self.flushes = 0
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="write-coalescer", daemon=True)
+        self._writer.start()
+
+    def submit(self, operation):
+        """
+        Apply an operation on the writer thread and wait until it is saved.
+
+        Args:
+            operation (callable): Called with the FamilyManagement object.
+
+        Returns:
+            The operation's return value.
+
+        Raises:
+            Exception: Whatever the operation raised.
+        """
+        pending = _PendingWrite(operation)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _next_group(self):
+        """Block for the next write, then collect the writes waiting behind it."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        group = [first]
+        deadline = time.monotonic() + self.linger
+        while len(group) < self.max_group:
+            try:
+                remaining = deadline - time.monotonic()
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                self._queue.put(None)  # Stop after this group
+                break
+            group.append(pending)
+        return group
+
+    def _run(self):
+        """Apply and save groups of writes until closed."""
+        while True:
+            group = self._next_group()
+            if group is None:
+                return
+            try:
+                with self.family.batch():
+                    for pending in group:
+                        try:
+                            with self.family.oplog.separate():
+                                pending.result = pending.operation(self.family)
+                        except Exception as e:
+                            # Operations validate before changing anything, so
+                            # a failed one does not affect the rest of the group
+                            pending.error = e
+            except Exception as e:
+                for pending in group:
+                    pending.error = pending.error or e
+            self.writes += len(group)
+            self.flushes += 1
+            for pending in group:
+                pending.done.set()
+
+    def close(self):
+        """Apply the queued writes and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+
+class FamilyService:
+    """
+    The operations behind the HTTP API.
+
+    Reads are served from the in-memory objects without locking; writes go
+    through a WriteCoalescer.
+
+    Attributes:
+        reminder_system (ReminderSystem): The resident reminder system.
+        family (FamilyManagement): The resident family.
+        coalescer (WriteCoalescer): Applies and saves the writes.
+    """
+    def __init__(self, base_dir, linger=0.0):
+        """
+        Load the family data and start the writer thread.
+
+        Args:
+            base_dir (Path): Base directory of the data files.
+            linger (float, optional): See WriteCoalescer.
+        """
+        self.reminder_system = ReminderSystem(base_dir)
+        self.family = FamilyManagement(Path(base_dir), self.reminder_system)
+        self.coalescer = WriteCoalescer(self.family, linger=linger)
+
+    def close(self):
+        """Apply the queued writes and stop the writer thread."""
+        self.coalescer.close()
+
+    def inventory(self, member):
+        """Return a member's inventory, or raise a 404 ApiError."""
+        inventory = self.family.members.get(member)
+        if inventory is None:
+            raise ApiError(404, f"Family member '{member}' not found.")
+        return inventory
+
+    @staticmethod
+    def medication_record(inventory, med_id):
+        """Return one medication as a record, or raise a 404 ApiError."""
+        medication = inventory.medications.get(med_id)
+        if medication is None:
+            raise ApiError(404, f"Medication ID {med_id} not found.")
+        return medication_record(med_id, medication)
+
+    @staticmethod
+    def low_stock(inventory, threshold=3):
+        """Return the low stock medications of an inventory, without setting reminders."""
+        rows = []
+        for med_id, medication in inventory.medications.items():
+            try:
+                days_left = medication.calculate_days_left()
+            except ValueError:
+                continue
+            if days_left <= threshold:
+                rows.append({"med_id": med_id, "name": medication.name, "days_left": days_left})
+        return rows
+
+    @staticmethod
+    def reminder_record(record):
+        """Return a reminder as a JSON-ready dictionary."""
+        return {
+            "member": record.member,
+            "med_id": record.med_id,
+            "kind": record.kind,
+            "severity": record.severity,
+            "message": record.render(),
+            "due_date": record.due_date.isoformat() if record.due_date else None,
+            "created_at": record.created_at.isoformat(),
+        }
+
+    # Reads
+
+    def list_members(self):
+        return {"members": list(self.family.members)}
+
+    def list_medications(self, member):
+        return {"medications": list(self.inventory(member).iter_records())}
+
+    def get_medication(self, member, med_id):
+        return self.medication_record(self.inventory(member), med_id)
+
+    def member_low_stock(self, member):
+        return {"low_stock": self.low_stock(self.inventory(member))}
+
+    def family_low_stock(self):
+        rows = []
+        for member, inventory in list(self.family.members.items()):
+            rows.extend(dict(row, member=member) for row in self.low_stock(inventory))
+        return {"low_stock": rows}
+
+    def report(self, member, kind, fmt):
+        if fmt not in REPORT_FORMATS:
+            raise ApiError(400, f"Unsupported report format: {fmt}. Use one of {', '.join(REPORT_FORMATS)}.")
+        inventory = self.inventory(member)
+        buffer = io.StringIO()
+        if kind == "stock":
+            inventory.generate_stock_report(buffer, fmt)
+        elif kind == "prescription":
+            inventory.generate_prescription_report(buffer, fmt)
+        else:
+            raise ApiError(404, f"Unknown report type: {kind}")
+        return buffer.getvalue()
+
+    def find_reminders(self, query):
+        due_before = query.get("due_before")
+        records = self.reminder_system.find_reminders(
+            member=query.get("member"),
+            kind=query.get("kind"),
+            severity=query.get("severity"),
+            due_before=date.fromisoformat(due_before) if due_before else None,
+        )
+        return {"reminders": [self.reminder_record(record) for record in records]}
+
+    # Writes
+
+    def add_member(self, body):
+        name = str(body.get("name") or "").strip()
+        if not name:
+            raise ApiError(400, "Name cannot be empty")
+        if not self.coalescer.submit(lambda family: family.add_member(name)):
+            raise ApiError(409, f"Member {name} already exists.")
+        return {"name": name}
+
+    def delete_member(self, member):
+        self.inventory(member)
+        if not self.coalescer.submit(lambda family: family.delete_member(member)):
+            raise ApiError(404, f"Family member '{member}' not found.")
+        return {"deleted": member}
+
+    # The checks before a write are repeated on the writer thread, where the
+    # member or the medication may have been deleted by a write queued earlier
+
+    def add_medication(self, member, body):
+        self.inventory(member)
+        try:
+            medication = medication_from_record(body)  # Validate before queueing the write
+            medication.calculate_days_left()
+        except (KeyError, TypeError, ValueError) as e:
+            raise ApiError(400, f"Invalid medication: {str(e)}")
+
+        def apply(family):
+            inventory = self.inventory(member)
+            return inventory, inventory.add_medication(medication)
+
+        inventory, med_id = self.coalescer.submit(apply)
+        return self.medication_record(inventory, med_id)
+
+    def delete_medication(self, member, med_id):
+        self.medication_record(self.inventory(member), med_id)
+
+        def apply(family):
+            if not self.inventory(member).delete_medication(med_id):
+                raise ApiError(404, f"Medication ID {med_id} not found.")
+
+        self.coalescer.submit(apply)
+        return {"deleted": med_id}
+
+    def update_stock(self, member, med_id, body):
+        self.medication_record(self.inventory(member), med_id)
+        quantity = body.get("quantity")
+        if not isinstance(quantity, int) or isinstance(quantity, bool):
+            raise ApiError(400, "Quantity must be an integer.")
+        expiry = body.get("expiry") or None
+        try:
+            if expiry is not None:
+                date.fromisoformat(str(expiry))
+        except ValueError:
+            raise ApiError(400, "Expiry must be a date in YYYY-MM-DD format.")
+
+        def apply(family):
+            inventory = self.inventory(member)
+            self.medication_record(inventory, med_id)
+            if not inventory.update_stock(med_id, quantity, expiry):
+                raise ApiError(409, f"Not enough stock to remove {abs(quantity)}.")
+            return inventory
+
+        return self.medication_record(self.coalescer.submit(apply), med_id)
+
+    def set_reminder(self, body):
+        try:
+            member, med_id, message = str(body["member"]), int(body["med_id"]), str(body["message"])
+            severity = body.get("severity") or "info"
+            due_date = date.fromisoformat(body["due_date"]) if body.get("due_date") else None
+        except (KeyError, TypeError, ValueError) as e:
+            raise ApiError(400, f"Invalid reminder: {str(e)}")
+        self.coalescer.submit(
+            lambda family: family.reminder_system.set_reminder(member, med_id, message, severity, due_date)
+        )
+        return {"member": member, "med_id": med_id, "message": message}
+
+    def clear_reminder(self, member, med_id):
+        self.coalescer.submit(lambda family: family.reminder_system.clear_reminder(member, med_id))
+        return {"cleared": {"member": member, "med_id": med_id}}
+
+    def stats(self):
+        return {"writes": self.coalescer.writes, "flushes": self.coalescer.flushes}
+
+
+# (method, path pattern, handler name); path parameters are passed positionally
+ROUTES = [
+    ("GET", r"/members", "list_members"),
+    ("POST", r"/members", "add_member"),
+    ("DELETE", r"/members/([^/]+)", "delete_member"),
+    ("GET", r"/members/([^/]+)/medications", "list_medications"),
+    ("POST", r"/members/([^/]+)/medications", "add_medication"),
+    ("GET", r"/members/([^/]+)/medications/(\d+)", "get_medication"),
+    ("DELETE", r"/members/([^/]+)/medications/(\d+)", "delete_medication"),
+    ("POST", r"/members/([^/]+)/medications/(\d+)/stock", "update_stock"),
+    ("GET", r"/members/([^/]+)/low-stock", "member_low_stock"),
+    ("GET", r"/members/([^/]+)/reports/([^/]+)", "report"),
+    ("GET", r"/low-stock", "family_low_stock"),
+    ("GET", r"/reminders", "find_reminders"),
+    ("POST", r"/reminders", "set_reminder"),
+    ("DELETE", r"/reminders/([^/]+)/(\d+)", "clear_reminder"),
+    ("GET", r"/stats", "stats"),
+]
+_COMPILED_ROUTES = [(method, re.compile(pattern + "$"), name) for method, pattern, name in ROUTES]
+
+
+class FamilyRequestHandler(BaseHTTPRequestHandler):
+    """
+    Route HTTP requests to a FamilyService.
+
+    Connections are kept alive (HTTP/1.1), so a client can send many
+    requests over one connection. Nagle's algorithm is disabled, otherwise
+    the separately written headers and body of a response would wait for
+    the client's delayed acknowledgement on every request.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "FamilyMedT"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        """Log requests only when the server was started verbosely."""
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        """Find the route of a request, call its handler and send the response."""
+        url = urlsplit(self.path)
+        service = self.server.service
+        try:
+            body = self._read_body()
+            path_found = False
+            for route_method, pattern, name in _COMPILED_ROUTES:
+                match = pattern.match(url.path)
+                if not match:
+                    continue
+                path_found = True
+                if route_method != method:
+                    continue
+                args = [int(arg) if arg.isdigit() and index else unquote(arg)
+                        for index, arg in enumerate(match.groups())]
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                self._send(*self._call(service, name, args, query, body))
+                return
+            if path_found:
+                raise ApiError(405, f"Method {method} not allowed for {url.path}")
+            raise ApiError(404, f"No route for {method} {url.path}")
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+    @staticmethod
+    def _call(service, name, args, query, body):
+        """Call a service method and return (status, payload, content type)."""
+        if name == "report":
+            fmt = query.get("format", "json")
+            return 200, service.report(*args, fmt), REPORT_CONTENT_TYPES.get(fmt)
+        if name == "find_reminders":
+            return 200, service.find_reminders(query), None
+        if name in ("add_member", "set_reminder"):
+            return 201, getattr(service, name)(body), None
+        if name in ("add_medication", "update_stock"):
+            status = 201 if name == "add_medication" else 200
+            return status, getattr(service, name)(*args, body), None
+        return 200, getattr(service, name)(*args), None
+
+    def _read_body(self):
+        """
+        Read and decode the JSON request body, if any.
+
+        Returns:
+            dict: The body, empty if there is none.
+
+        Raises:
+            ApiError: 400 if the body is not a JSON object.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        data = self.rfile.read(length)  # Read in full, so the connection can be kept alive
+        try:
+            body = json.loads(data)
+        except ValueError as e:
+            raise ApiError(400, f"Request body is not valid JSON: {str(e)}")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object.")
+        return body
+
+    def _send(self, status, payload, content_type=None):
+        """Send a response with a Content-Length, as keep-alive requires."""
+        if content_type is None or content_type == "application/json" and not isinstance(payload, str):
+            data = json.dumps(payload).encode("utf-8")
+            content_type = "application/json"
+        else:
+            data = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FamilyHTTPServer(ThreadingHTTPServer):
+    """A threading HTTP server with a listen backlog sized for many clients."""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(base_dir, host="127.0.0.1", port=8000, linger=0.0, verbose=False):
+    """
+    Create the HTTP server with a resident FamilyService.
+
+    Args:
+        base_dir (Path): Base directory of the data files.
+        host (str, optional): Interface to listen on.
+        port (int, optional): Port to listen on; 0 picks a free port.
+        linger (float, optional): See WriteCoalescer.
+        verbose (bool, optional): Log every request to stderr.
+
+    Returns:
+        FamilyHTTPServer: The server; its `service` attribute is the FamilyService.
+    """
+    server = FamilyHTTPServer((host, port), FamilyRequestHandler)
+    server.service = FamilyService(base_dir, linger=linger)
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    """
+    Command line entry point: python server.py
+
+    Args:
+        argv (list, optional): Command line arguments, without the program name.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog="server.py", description="Serve the FamilyMedT data over HTTP/JSON.")
+    parser.add_argument("--base-dir", type=Path, default=BASE_DIR, help="Directory containing the data/ folder")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--linger", type=float, default=0.0,
+                        help="Seconds to wait for more writes before saving a group (default: 0)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    events.set_sink(events.StdoutSink(level=events.WARNING, stream=sys.stderr))
+    server = make_server(args.base_dir, args.host, args.port, args.linger, args.verbose)
+    print(f"Serving FamilyMedT on http://{server.server_address[0]}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# isolation.py
+# A base class giving every test its own temporary base directory.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+class IsolatedTestCase(unittest.TestCase):
+    """
+    A test case run in a temporary base directory of its own.
+
+    setUp() creates an empty directory for every test and removes it once the
+    test is over, whatever its outcome. Tests never share data files, with one
+    another or with other processes, so the suite can run in parallel.
+
+    Attributes:
+        base_dir (Path): The test's base directory, empty at the start.
+        data_dir (Path): Its data subdirectory, not created.
+    """
+
+    def setUp(self):
+        """Create the test's base directory and schedule its removal."""
+        self.base_dir = Path(tempfile.mkdtemp(prefix="familymedt-test-"))
+        self.data_dir = self.base_dir / "data"
+        self.addCleanup(shutil.rmtree, self.base_dir, ignore_errors=True)
@@ -0,0 +1,133 @@
+# test_analytics.py
+# Unit tests for the family-wide analytics engine.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import date
+from medication_management.medication import Medication
+from medication_management.prescription import PrescriptionMedication
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from user_management.analytics import FamilyAnalytics
+from tests.isolation import IsolatedTestCase
+
+class TestAnalytics(IsolatedTestCase):
+    """
+    A test suite for the FamilyAnalytics module.
+
+    Verifies the group-bys, supply projections and the incremental
+    invalidation of the cached snapshot.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestAnalytics class...")
+        cls.today = date(2024, 1, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestAnalytics class...")
+
+    def setUp(self):
+        """Create a family of two members with a shared drug."""
+        super().setUp()
+        self.family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+        self.family.add_member("John")
+        self.family.add_member("Jane")
+        self.family.members["John"].add_medication(Medication(
+            name="Ibuprofen", dosage="200mg", frequency="daily", daily_dosage=2, stock=20
+        ))
+        self.family.members["John"].add_medication(PrescriptionMedication(
+            name="Lisinopril", dosage="10mg", frequency="daily", daily_dosage=1, stock=5,
+            doctor_name="Dr. Lee", prescription_date="2023-12-01", indication="Hypertension",
+            warnings="None", expiration_date="2025-01-01"
+        ))
+        self.family.members["Jane"].add_medication(Medication(
+            name=" ibuprofen", dosage="200mg", frequency="daily", daily_dosage=1, stock=10
+        ))
+        self.analytics = FamilyAnalytics(self.family)
+
+    def tearDown(self):
+        """Clean up resources after each test."""
+        self.family = None
+        self.analytics = None
+
+    def test_group_by_drug_and_doctor(self):
+        """Test aggregating medications per drug and per doctor"""
+        by_drug = self.analytics.group_by("drug", today=self.today)
+        self.assertEqual(list(by_drug.index), ["ibuprofen", "lisinopril"])
+        ibuprofen = by_drug.loc["ibuprofen"]
+        self.assertEqual(ibuprofen["medications"], 2)
+        self.assertEqual(ibuprofen["members"], 2)
+        self.assertEqual(ibuprofen["total_stock"], 30)
+        self.assertEqual(ibuprofen["total_daily_dosage"], 3)
+        self.assertEqual(ibuprofen["days_of_supply"], 10)
+        self.assertEqual(ibuprofen["min_days_left"], 10)
+
+        by_doctor = self.analytics.group_by("doctor", today=self.today)
+        self.assertEqual(list(by_doctor.index), ["Dr. Lee"])
+        self.assertEqual(by_doctor.loc["Dr. Lee", "earliest_runout"].date(), date(2024, 1, 6))
+        with self.assertRaises(ValueError):
+            self.analytics.group_by("pharmacy")
+
+    def test_daily_amounts(self):
+        """Test totals of the parsed daily amounts per member and per drug"""
+        self.family.members["Jane"].add_medication(Medication(
+            name="Ibuprofen", dosage="0.4 g", frequency="twice daily", daily_dosage=2, stock=10
+        ))
+        self.family.members["Jane"].add_medication(Medication(
+            name="Herbal tea", dosage="one cup", frequency="as needed", daily_dosage=1, stock=10
+        ))
+        snapshot = self.analytics.snapshot()
+        self.assertEqual(list(snapshot.columns[-4:]), ['dose_amount', 'dose_unit', 'doses_per_day', 'daily_amount'])
+        self.assertTrue(snapshot.loc[snapshot['name'] == "Herbal tea", 'doses_per_day'].isna().all())
+
+        by_member = self.analytics.daily_amounts()
+        self.assertEqual(by_member.loc[("Jane", "mg"), 'total_daily_amount'], 1000)   # 200 + 2 x 400
+        self.assertEqual(by_member.loc[("John", "mg"), 'total_daily_amount'], 410)    # 2 x 200 + 10
+        self.assertEqual(by_member.loc[("Jane", "mg"), 'medications'], 2)
+        by_drug = self.analytics.daily_amounts("drug")
+        self.assertEqual(by_drug.loc[("ibuprofen", "mg"), 'total_daily_amount'], 1400)
+        with self.assertRaises(ValueError):
+            self.analytics.daily_amounts("pharmacy")
+
+    def test_runout_and_burn_down(self):
+        """Test run-out dates and the supply burn-down projection"""
+        runout = self.analytics.runout_dates(within_days=7, today=self.today)
+        self.assertEqual(list(runout['name']), ["Lisinopril"])
+        self.assertEqual(runout.loc[0, 'runout_date'].date(), date(2024, 1, 6))
+
+        burn_down = self.analytics.burn_down(days=12, today=self.today)
+        self.assertEqual(burn_down['units_left'].iloc[0], 35)
+        self.assertEqual(burn_down['units_left'].iloc[1], 31)    # 18 + 4 + 9
+        self.assertEqual(burn_down['units_left'].iloc[5], 15)    # 10 + 0 + 5
+        self.assertEqual(burn_down['medications_in_stock'].iloc[5], 2)
+        self.assertEqual(burn_down['units_left'].iloc[12], 0)
+        self.assertEqual(burn_down.index[0].date(), self.today)
+
+    def test_incremental_invalidation(self):
+        """Test only changed members are rebuilt in the cached snapshot"""
+        first = self.analytics.snapshot()
+        self.assertEqual(len(first), 3)
+        self.assertEqual(self.analytics.rebuilds, 2)
+        self.assertIs(self.analytics.snapshot(), first)
+
+        self.family.members["Jane"].update_stock(1, 5)
+        snapshot = self.analytics.snapshot()
+        self.assertEqual(self.analytics.rebuilds, 3)
+        self.assertEqual(snapshot.loc[snapshot['member'] == "Jane", 'stock'].iloc[0], 15)
+
+        self.family.delete_member("John")
+        self.assertEqual(list(self.analytics.snapshot()['member']), ["Jane"])
+        self.assertEqual(self.analytics.rebuilds, 3)
+
+        self.family.delete_member("Jane")
+        self.assertTrue(self.analytics.snapshot().empty)
+        self.assertEqual(len(self.analytics.burn_down(days=3)), 4)
+
+if __name__ == '__main__':
+    unittest.main()
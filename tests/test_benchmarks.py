@@ -0,0 +1,60 @@
+# test_benchmarks.py
+# Unit tests for the benchmark suite's data generator, runner and baseline comparison.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from benchmarks.generators import generate_dataset
+from benchmarks.runner import compare_results, run_benchmarks
+from benchmarks.scenarios import SCENARIOS
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestBenchmarks(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestBenchmarks class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestBenchmarks class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+
+    def test_generated_dataset_loads(self):
+        """Test the generated dataset is readable by the application"""
+        names = generate_dataset(self.base_dir, members=4, meds_per_member=6, reminders_per_member=3, seed=1)
+        reminder_system = ReminderSystem(self.base_dir)
+        family = FamilyManagement(self.base_dir, reminder_system)
+        self.assertEqual(list(family.members), names)
+        self.assertTrue(all(len(inv.medications) == 6 for inv in family.members.values()))
+        self.assertEqual(sum(1 for _ in reminder_system.iter_records()), 12)
+
+        # The same seed gives the same data
+        first = (self.base_dir / "data" / f"{names[0]}_inventory.csv").read_text()
+        generate_dataset(self.base_dir, members=4, meds_per_member=6, reminders_per_member=3, seed=1)
+        self.assertEqual((self.base_dir / "data" / f"{names[0]}_inventory.csv").read_text(), first)
+
+    def test_run_benchmarks(self):
+        """Test every scenario runs and reports machine-readable timings"""
+        results = run_benchmarks(size="tiny", repeat=1)
+        self.assertEqual(list(results["results"]), [scenario.name for scenario in SCENARIOS])
+        self.assertEqual(results["meta"]["members"], 3)
+        for result in results["results"].values():
+            self.assertGreaterEqual(result["median"], 0)
+
+    def test_compare_results(self):
+        """Test regressions are flagged beyond the tolerance"""
+        baseline = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}}}
+        current = {"results": {"a": {"median": 1.2}, "b": {"median": 1.5}, "c": {"median": 9.0}}}
+        comparison = compare_results(current, baseline, tolerance=0.25)
+        self.assertEqual([(row[0], row[4]) for row in comparison], [("a", False), ("b", True)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# test_cache.py
+# Unit tests for the parsed-file cache used at startup.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import unittest
+from unittest import mock
+from medication_management.cache import ParseCache
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestCache(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestCache class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestCache class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+        self.data_dir = self.base_dir / "data"
+        self.data_dir.mkdir()
+        self.cache = ParseCache(self.data_dir / ".cache")
+
+    def write(self, path, text, age=60):
+        """Write a file and set its modification time `age` seconds in the past."""
+        path.write_text(text)
+        past = time.time() - age
+        os.utime(path, (past, past))
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        """Test a second load of an unchanged file skips the parser and hashing"""
+        path = self.data_dir / "example.csv"
+        self.write(path, "name\nJohn\n")
+        parse = mock.Mock(side_effect=lambda p: p.read_text().split())
+        self.assertEqual(self.cache.load(path, parse), ["name", "John"])
+        with mock.patch("medication_management.cache._digest") as digest:
+            self.assertEqual(self.cache.load(path, parse), ["name", "John"])
+        digest.assert_not_called()
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_changed_file_is_parsed_again(self):
+        """Test content changes within the timestamp resolution are detected"""
+        path = self.data_dir / "example.csv"
+        self.write(path, "name\nJohn\n", age=0)
+        self.cache.load(path, lambda p: p.read_text())
+        mtime = path.stat().st_mtime_ns
+        path.write_text("name\nJane\n")
+        os.utime(path, ns=(mtime, mtime))
+        # The entry was stored right after the file was written, so it is
+        # racy and the content hash decides
+        self.assertEqual(self.cache.load(path, lambda p: p.read_text()), "name\nJane\n")
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_touched_file_uses_content_hash(self):
+        """Test a file rewritten with the same content is not parsed again"""
+        path = self.data_dir / "example.csv"
+        self.write(path, "name\nJohn\n", age=120)
+        self.cache.load(path, lambda p: p.read_text())
+        self.write(path, "name\nJohn\n", age=60)
+        parse = mock.Mock()
+        self.assertEqual(self.cache.load(path, parse), "name\nJohn\n")
+        parse.assert_not_called()
+
+    def test_tag_and_corrupt_entries(self):
+        """Test entries with another tag or unreadable content are rebuilt"""
+        path = self.data_dir / "example.csv"
+        self.write(path, "name\nJohn\n")
+        self.cache.load(path, lambda p: "old", tag="v1")
+        self.assertEqual(self.cache.load(path, lambda p: "new", tag="v2"), "new")
+        (self.data_dir / ".cache" / "example.csv.pickle").write_bytes(b"garbage")
+        self.assertEqual(self.cache.load(path, lambda p: "rebuilt", tag="v2"), "rebuilt")
+
+    def test_startup_skips_parsing_unchanged_files(self):
+        """Test reminders, members and inventories load without pandas after the first start"""
+        reminders = ReminderSystem(self.base_dir)
+        family = FamilyManagement(self.base_dir, reminders)
+        family.add_member("John")
+        reminders.set_reminder("John", 1, "Take with food")
+        ReminderSystem(self.base_dir)  # Fills the cache
+        FamilyManagement(self.base_dir, reminders)
+
+        with mock.patch("pandas.read_csv") as read_csv:
+            reminders = ReminderSystem(self.base_dir)
+            family = FamilyManagement(self.base_dir, reminders)
+        read_csv.assert_not_called()
+        self.assertEqual(list(family.members), ["John"])
+        self.assertEqual(reminders.reminders["John"][1], "Take with food")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# test_cli.py
+# Unit tests for the non-interactive batch commands of main.py.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from unittest import mock
+from main import run_command, read_records
+from medication_management.metrics import registry
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestCli(IsolatedTestCase):
+    """
+    A test suite for the batch command mode of main.py.
+
+    Verifies that batch files are applied through the FamilyManagement API,
+    saved once, and rolled back completely when a record is invalid.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestCli class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestCli class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+
+    def run_with_stdin(self, argv, text):
+        """Run a batch command with the given text on stdin."""
+        with mock.patch("sys.stdin", io.StringIO(text)):
+            return run_command(["--base-dir", str(self.base_dir)] + argv)
+
+    def load_family(self):
+        """Load the family data saved in the test directory."""
+        return FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+
+    def test_read_records_formats(self):
+        """Test CSV and JSONL records are detected and numbered"""
+        csv_records = list(read_records(io.StringIO("name\nJohn\nJane\n")))
+        self.assertEqual(csv_records, [(1, {"name": "John"}), (2, {"name": "Jane"})])
+        jsonl_records = list(read_records(io.StringIO('{"name": "John"}\n\n{"name": "Jane"}\n')))
+        self.assertEqual(jsonl_records, [(1, {"name": "John"}), (2, {"name": "Jane"})])
+
+    def test_batch_add_and_restock(self):
+        """Test adding members and medications, then restocking, from batch input"""
+        self.assertEqual(self.run_with_stdin(["add-member"], "name\nJohn\nJane\n"), 0)
+        meds = (
+            '{"member": "John", "name": "Med A", "dosage": "10mg", "frequency": "daily", "daily_dosage": 1, "stock": 30}\n'
+            '{"member": "Jane", "name": "Med B", "dosage": "5mg", "frequency": "daily", "daily_dosage": 2, "stock": 4, '
+            '"is_prescription": true, "doctor_name": "Dr. Test", "prescription_date": "2024-01-01", '
+            '"indication": "Test", "warnings": "None", "expiration_date": "2030-01-01"}\n'
+        )
+        self.assertEqual(self.run_with_stdin(["add-med"], meds), 0)
+        self.assertEqual(self.run_with_stdin(["restock"], "member,med_id,quantity\nJohn,1,-10\nJane,1,20\n"), 0)
+
+        family = self.load_family()
+        self.assertEqual(sorted(family.members), ["Jane", "John"])
+        self.assertEqual(family.members["John"].medications[1].stock, 20)
+        self.assertEqual(family.members["Jane"].medications[1].stock, 24)
+        self.assertEqual(family.members["Jane"].medications[1].doctor_name, "Dr. Test")
+
+    def test_batch_is_saved_once(self):
+        """Test a batch writes each data file once at the end"""
+        self.run_with_stdin(["add-member"], "name\nJohn\n")
+        meds = "".join(
+            f"John,Med {i},10mg,daily,1,30\n" for i in range(20)
+        )
+        with mock.patch("medication_management.inventory.InventoryManagement._save_inventory",
+                        autospec=True) as save_inventory:
+            self.assertEqual(
+                self.run_with_stdin(["add-med"], "member,name,dosage,frequency,daily_dosage,stock\n" + meds), 0
+            )
+        self.assertEqual(save_inventory.call_count, 1)
+
+    def test_invalid_record_rolls_back(self):
+        """Test that a failing record leaves the saved data untouched"""
+        self.run_with_stdin(["add-member"], "name\nJohn\n")
+        self.run_with_stdin(["add-med"], "member,name,dosage,frequency,daily_dosage,stock\nJohn,Med A,10mg,daily,1,5\n")
+
+        status = self.run_with_stdin(["restock"], "member,med_id,quantity\nJohn,1,10\nJohn,1,-100\n")
+        self.assertEqual(status, 1)
+        status = self.run_with_stdin(["add-member"], "name\nJane\nJohn\n")
+        self.assertEqual(status, 1)
+
+        family = self.load_family()
+        self.assertEqual(list(family.members), ["John"])
+        self.assertEqual(family.members["John"].medications[1].stock, 5)
+        # Nor are the files of the member added before the failing record
+        self.assertEqual(sorted(path.name for path in (self.base_dir / "data").glob("Jane_*")), [])
+
+    def test_profile_summary(self):
+        """Test --profile prints a per-operation summary to stderr"""
+        self.run_with_stdin(["add-member"], "name\nJohn\n")
+        stderr = io.StringIO()
+        try:
+            with mock.patch("sys.stderr", stderr):
+                self.assertEqual(run_command(["--base-dir", str(self.base_dir), "--profile", "low-stock"]), 0)
+        finally:
+            registry.disable()
+            registry.reset()
+        self.assertIn("=== Profile ===", stderr.getvalue())
+        self.assertIn("FamilyManagement._load_members", stderr.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
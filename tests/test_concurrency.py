@@ -0,0 +1,175 @@
+# test_concurrency.py
+# Unit tests for using InventoryManagement and ReminderSystem from several threads.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import unittest
+from benchmarks.stress import run_stress
+from medication_management import events
+from medication_management.locking import ReadWriteLock
+from medication_management.medication import Medication
+from medication_management.inventory import InventoryManagement
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestConcurrency(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestConcurrency class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestConcurrency class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+
+    def run_threads(self, target, count):
+        """Run target(index) on count threads at once and re-raise the first error."""
+        errors = []
+        barrier = threading.Barrier(count)
+
+        def run(index):
+            barrier.wait()
+            try:
+                target(index)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def test_read_write_lock(self):
+        """Test readers share the lock, writers exclude them, and the writer may re-enter"""
+        lock = ReadWriteLock()
+        with lock.read(), lock.read():
+            acquired = []
+
+            def read_in_other_thread():
+                with lock.read():
+                    acquired.append(True)
+
+            other = threading.Thread(target=read_in_other_thread)
+            other.start()
+            other.join(1)
+            self.assertEqual(acquired, [True])
+        with lock.write():
+            with lock.write(), lock.read():
+                pass
+        with lock.read():
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+
+    def test_concurrent_restocks_lose_no_updates(self):
+        """Test concurrent restocks of the same medications all count, in memory and on disk"""
+        result = run_stress(self.base_dir, threads=8, updates_per_thread=25)
+        self.assertEqual(result["updates"], 200)
+        self.assertEqual(result["lost_updates"], {"memory": 0, "disk": 0})
+
+    def test_reads_during_structural_changes(self):
+        """Test lock-free readers never see a dictionary change during iteration"""
+        with events.silenced():
+            inventory = InventoryManagement("ThreadUser", self.base_dir, ReminderSystem(self.base_dir))
+            done = threading.Event()
+
+            def work(index):
+                if index == 0:
+                    for step in range(30):
+                        med_id = inventory.add_medication(Medication(f"Med {step}", "1mg", "daily", 1, 2))
+                        if step % 2:
+                            inventory.delete_medication(med_id)
+                    done.set()
+                else:
+                    while not done.is_set():
+                        inventory.check_low_stock()
+                        list(inventory.iter_records())
+
+            self.run_threads(work, 3)
+        self.assertEqual(len(inventory.medications), 15)
+
+    def test_stock_updates_publish_copies(self):
+        """Test lock-free readers only see medications whose stock and lots agree"""
+        with events.silenced():
+            inventory = InventoryManagement("ThreadUser", self.base_dir)
+            med_id = inventory.add_medication(Medication("Med", "1mg", "daily", 1, 0))
+            original = inventory.medications[med_id]
+            done = threading.Event()
+            torn = []
+
+            def work(index):
+                if index == 0:
+                    for _ in range(50):
+                        inventory.update_stock(med_id, 1, "2099-01-01")
+                    done.set()
+                else:
+                    while not done.is_set():
+                        medication = inventory.medications[med_id]
+                        if medication.lots.total != medication.stock:
+                            torn.append(medication.stock)
+                        time.sleep(0)  # Let the writer run
+
+            self.run_threads(work, 3)
+        self.assertEqual(torn, [])
+        self.assertEqual((original.stock, original.lots.total), (0, 0))  # Replaced, not changed
+        self.assertEqual(inventory.medications[med_id].stock_lots().serialize(), "50@2099-01-01")
+
+    def test_concurrent_reminders(self):
+        """Test reminders set and cleared from several threads are all applied"""
+        with events.silenced():
+            reminders = ReminderSystem(self.base_dir)
+
+            def work(index):
+                for med_id in range(10):
+                    reminders.set_reminder(f"Member {index}", med_id, f"Reminder {med_id}")
+                    list(reminders.iter_records())
+                reminders.clear_reminder(f"Member {index}", 0)
+
+            self.run_threads(work, 4)
+        self.assertEqual(sum(1 for _ in reminders.iter_records()), 36)
+        self.assertEqual(len(reminders.find_reminders(kind="custom")), 36)
+        self.assertEqual(sum(1 for _ in ReminderSystem(self.base_dir).iter_records()), 36)
+
+    def test_family_batch_and_bulk_add_do_not_deadlock(self):
+        """Test a family batch and a bulk add setting reminders take the locks in the same order"""
+        with events.silenced():
+            family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+            family.add_member("ThreadUser")
+            inventory = family.members["ThreadUser"]
+            started = threading.Event()
+
+            def slow_feed():
+                yield Medication("Med A", "1mg", "daily", 1, 1)
+                started.set()
+                time.sleep(0.2)  # The family batch starts meanwhile
+                yield Medication("Med B", "1mg", "daily", 1, 1)
+
+            def family_batch():
+                started.wait()
+                with family.batch():
+                    family.add_member("Other")
+
+            threads = [threading.Thread(target=lambda: inventory.add_medications(slow_feed()), daemon=True),
+                       threading.Thread(target=family_batch, daemon=True)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+            self.assertFalse(any(thread.is_alive() for thread in threads), "threads are deadlocked")
+        self.assertEqual(len(inventory.medications), 2)
+        self.assertEqual(len(family.reminder_system.find_reminders(member="ThreadUser", kind="low_stock")), 2)
+
+if __name__ == '__main__':
+    unittest.main()
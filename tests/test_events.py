@@ -0,0 +1,102 @@
+# test_events.py
+# Unit tests for the levelled event sinks and the events emitted by the domain classes.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from medication_management import events
+from medication_management.medication import Medication
+from medication_management.inventory import InventoryManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestEvents(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestEvents class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestEvents class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+
+    def test_levels_and_default_sink(self):
+        """Test the stdout sink prints events at or above its level"""
+        stream = io.StringIO()
+        with events.use_sink(events.StdoutSink(level=events.WARNING, stream=stream)):
+            events.info("hidden")
+            events.warning("shown")
+            events.error("also shown")
+        self.assertEqual(stream.getvalue(), "shown\nalso shown\n")
+        self.assertIsInstance(events.get_sink(), events.StdoutSink)
+
+    def test_domain_events_can_be_redirected(self):
+        """Test inventory and reminder status messages go to the current sink"""
+        sink = events.MemorySink()
+        with events.use_sink(sink):
+            inventory = InventoryManagement("EventUser", self.base_dir, ReminderSystem(self.base_dir))
+            med_id = inventory.add_medication(Medication("Med", "1mg", "daily", 1, 2))
+            inventory.update_stock(med_id, -5)
+        messages = sink.messages(events.INFO)
+        self.assertIn("Inventory for EventUser saved successfully.", messages)
+        self.assertIn(f"Added medication Med with ID {med_id}", messages)
+        self.assertIn("Not enough stock to remove. Current stock: 2, Requested: 5",
+                      sink.messages(events.WARNING))
+
+    def test_bulk_operations_emit_one_summary(self):
+        """Test bulk operations emit a summary at INFO and per-item events only at DEBUG"""
+        inventory = InventoryManagement("EventUser", self.base_dir, ReminderSystem(self.base_dir))
+        sink = events.MemorySink()
+        with events.use_sink(sink):
+            ids = inventory.add_medications(
+                Medication(f"Med {i}", f"{i + 1}mg", "daily", 1, 1) for i in range(100)  # No duplicates
+            )
+            inventory.update_stocks({med_id: 10 for med_id in ids})
+        info_messages = sink.messages(events.INFO)
+        self.assertIn(f"Added 100 medications for EventUser (IDs {ids[0]}-{ids[-1]})", info_messages)
+        self.assertIn("Applied 100 stock updates to 100 medications for EventUser", info_messages)
+        self.assertEqual(info_messages.count("Inventory for EventUser saved successfully."), 2)
+        self.assertEqual(len(info_messages), 6)
+        self.assertEqual(len(sink.messages(events.DEBUG)) - len(info_messages), 100)
+
+    def test_silenced(self):
+        """Test silenced() discards everything"""
+        stream = io.StringIO()
+        previous = events.set_sink(events.StdoutSink(stream=stream))
+        try:
+            with events.silenced():
+                events.error("dropped")
+            events.info("kept")
+        finally:
+            events.set_sink(previous)
+        self.assertEqual(stream.getvalue(), "kept\n")
+
+    def test_buffered_and_threaded_sinks(self):
+        """Test buffered and background-thread delivery"""
+        target = events.MemorySink()
+        buffered = events.BufferedEventSink(target, capacity=3)
+        buffered.handle(events.Event(events.INFO, "one"))
+        buffered.handle(events.Event(events.INFO, "two"))
+        self.assertEqual(target.messages(), [])
+        buffered.handle(events.Event(events.INFO, "three"))
+        self.assertEqual(target.messages(), ["one", "two", "three"])
+        buffered.handle(events.Event(events.ERROR, "urgent"))
+        self.assertEqual(target.messages()[-1], "urgent")
+
+        target = events.MemorySink()
+        threaded = events.ThreadedSink(target)
+        with events.use_sink(threaded):
+            for i in range(50):
+                events.info(f"event {i}")
+        self.assertEqual(target.messages(), [f"event {i}" for i in range(50)])
+        threaded.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,12 +4,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
-import shutil
-from pathlib import Path
 from user_management.family import FamilyManagement
 from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
 
-class TestFamily(unittest.TestCase):
+class TestFamily(IsolatedTestCase):
     """
     A test suite for the FamilyManagement system.
 
@@ -26,36 +25,27 @@ class TestFamily(unittest.TestCase):
     def setUpClass(cls):
         """
         Class-level setup method.
-        Initializes test directories and the ReminderSystem instance.
         Called once before any test methods are executed.
         """
         print("\nSetting up TestFamily class...")
-        cls.base_dir = Path("./test_data")  # Path to test data directory
-        cls.base_dir.mkdir(exist_ok=True)  # Create test data directory if it doesn't exist
-        cls.data_dir = cls.base_dir / "data"  # Subdirectory for test data
-        cls.data_dir.mkdir(exist_ok=True)  # Create data directory
-        cls.reminder_system = ReminderSystem(cls.base_dir)  # Initialize the reminder system
     
     @classmethod
     def tearDownClass(cls):
         """
         Class-level teardown method.
-        Cleans up test directories and files created during testing.
         Called once after all test methods are executed.
         """
         print("\nCleaning up TestFamily class...")
-        try:
-            if cls.base_dir.exists():
-                shutil.rmtree(cls.base_dir)  # Remove the base directory and its contents
-        except Exception as e:
-            print(f"Warning: Could not clean up test directory: {e}")  # Log any cleanup errors
 
     def setUp(self):
         """
         Test-level setup method.
-        Initializes a new FamilyManagement instance and ensures the member list is empty.
+        Initializes a new FamilyManagement instance, with its ReminderSystem, in the
+        test's own directory and ensures the member list is empty.
         Called before every test method.
         """
+        super().setUp()  # Create the test's base directory
+        self.reminder_system = ReminderSystem(self.base_dir)  # Initialize the reminder system
         self.family_manager = FamilyManagement(
             self.base_dir,  # Directory for storing family data
             self.reminder_system  # Associated reminder system
@@ -141,5 +131,25 @@ class TestFamily(unittest.TestCase):
         # Verify non-existent members cannot be deleted
         self.assertFalse(self.family_manager.delete_member("NonExistent"))
 
+    def test_rolled_back_member_leaves_no_files(self):
+        """
+        Test case for adding a member inside a batch that rolls back.
+
+        Verifies:
+        - The member is not added.
+        - The member's inventory files written when it was added are removed.
+        - Files of members that existed before the batch are kept.
+        """
+        self.family_manager.add_member("John")
+        with self.assertRaises(RuntimeError):
+            with self.family_manager.batch():
+                self.family_manager.add_member("Bob")
+                raise RuntimeError("Bad record")
+        self.assertNotIn("Bob", self.family_manager.members)
+        data_dir = self.base_dir / "data"
+        self.assertEqual(sorted(path.name for path in data_dir.glob("Bob_*")), [])
+        self.assertTrue((data_dir / "John_inventory.csv").exists())
+        self.assertEqual(list(FamilyManagement(self.base_dir, self.reminder_system).members), ["John"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,168 @@
+# test_group_commit.py
+# Unit tests for saving changes in the background with group commit.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import unittest
+from benchmarks.stress import run_stress
+from medication_management import events
+from medication_management.group_commit import GroupCommitter
+from medication_management.medication import Medication
+from medication_management.inventory import InventoryManagement
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestGroupCommit(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestGroupCommit class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestGroupCommit class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+
+    def test_committer_saves_after_interval(self):
+        """Test that marked changes are saved together after the interval."""
+        saved = []
+        committer = GroupCommitter(lambda: saved.append(time.monotonic()), interval=0.05, max_ops=1000)
+        for _ in range(10):
+            committer.mark()
+        self.assertEqual(saved, [])
+        deadline = time.monotonic() + 2
+        while not saved and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(committer.pending, 0)
+        committer.close()
+
+    def test_committer_saves_at_max_ops(self):
+        """Test that reaching max_ops triggers a save before the interval."""
+        saved = threading.Event()
+        committer = GroupCommitter(saved.set, interval=60, max_ops=5)
+        for _ in range(5):
+            committer.mark()
+        self.assertTrue(saved.wait(2))
+        committer.close()
+
+    def test_committer_flush_and_close(self):
+        """Test that flush() waits for the save and close() saves what is pending."""
+        saves = []
+        committer = GroupCommitter(lambda: saves.append(1), interval=60, max_ops=1000)
+        committer.flush()  # Nothing pending
+        self.assertEqual(saves, [])
+        committer.mark()
+        committer.flush()
+        self.assertEqual((len(saves), committer.pending), (1, 0))
+        committer.mark()
+        committer.close()
+        self.assertEqual(len(saves), 2)
+        committer.close()  # Closing twice is harmless
+
+    def test_committer_flush_raises_on_failed_save(self):
+        """Test that a failed save makes flush() raise and keeps the changes pending."""
+        outcomes = [False, True]
+        committer = GroupCommitter(lambda: outcomes.pop(0), interval=60, max_ops=1000)
+        committer.mark()
+        with self.assertRaises(RuntimeError):
+            committer.flush()
+        self.assertEqual(committer.pending, 1)
+        committer.flush()  # The retry succeeds
+        self.assertEqual(committer.pending, 0)
+        committer.close()
+
+    def test_inventory_group_commit(self):
+        """Test that stock updates are applied at once and saved on flush()."""
+        with events.silenced():
+            inventory = InventoryManagement("Alice", self.base_dir)
+            med_id = inventory.add_medication(Medication("Aspirin", "100mg", "daily", 1, 10))
+            inventory.enable_group_commit(interval=60, max_ops=1000)
+            for _ in range(50):
+                self.assertTrue(inventory.update_stock(med_id, 1))
+            self.assertEqual(inventory.medications[med_id].stock, 60)
+            self.assertEqual(InventoryManagement("Alice", self.base_dir).medications[med_id].stock, 10)
+
+            inventory.flush()
+            self.assertEqual(InventoryManagement("Alice", self.base_dir).medications[med_id].stock, 60)
+            self.assertEqual(inventory._committer.saves, 1)
+
+            inventory.update_stock(med_id, -5)
+            inventory.disable_group_commit()  # Saves what is pending
+            self.assertEqual(InventoryManagement("Alice", self.base_dir).medications[med_id].stock, 55)
+            inventory.update_stock(med_id, 1)  # Saved immediately again
+            self.assertEqual(InventoryManagement("Alice", self.base_dir).medications[med_id].stock, 56)
+
+    def test_reminder_group_commit(self):
+        """Test that reminder changes are saved on flush()."""
+        with events.silenced():
+            reminders = ReminderSystem(self.base_dir)
+            reminders.enable_group_commit(interval=60)
+            reminders.set_reminder("Alice", 1, "Take with food")
+            self.assertEqual(dict(ReminderSystem(self.base_dir).reminders), {})
+            reminders.flush()
+            self.assertEqual(ReminderSystem(self.base_dir).reminders["Alice"][1], "Take with food")
+            reminders.disable_group_commit()
+
+    def test_failed_batch_keeps_unflushed_changes(self):
+        """Test that rolling back a batch keeps the changes made before it but not saved yet."""
+        with events.silenced():
+            family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+            family.add_member("Alice")
+            inventory = family.members["Alice"]
+            med_id = inventory.add_medication(Medication("Aspirin", "100mg", "daily", 1, 10))
+            family.enable_group_commit(interval=60, max_ops=1000)
+            inventory.update_stock(med_id, 20)
+            family.reminder_system.set_reminder("Alice", med_id, "Take with food")
+            with self.assertRaises(ValueError):
+                inventory.add_medications([Medication("Ibuprofen", "200mg", "daily", 1, 5), {"name": "Broken"}])
+            with self.assertRaises(RuntimeError):
+                with family.batch():
+                    inventory.update_stock(med_id, 5)
+                    raise RuntimeError("boom")
+            self.assertEqual(inventory.medications[med_id].stock, 30)
+            self.assertEqual(family.reminder_system.reminders["Alice"][med_id], "Take with food")
+            family.flush()
+            saved = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+            self.assertEqual(saved.members["Alice"].medications[med_id].stock, 30)
+            self.assertEqual(saved.reminder_system.reminders["Alice"][med_id], "Take with food")
+            self.assertEqual(family.oplog.undo_target()["op"], "update_stock")  # The log agrees with the data
+            family.disable_group_commit()
+
+    def test_family_group_commit(self):
+        """Test that group commit covers new members and deleted members stay deleted."""
+        with events.silenced():
+            family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+            family.enable_group_commit(interval=60)
+            family.add_member("Alice")
+            inventory = family.members["Alice"]
+            med_id = inventory.add_medication(Medication("Aspirin", "100mg", "daily", 1, 2))
+            self.assertIsNotNone(inventory._committer)
+            family.flush()
+
+            saved = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+            self.assertEqual(saved.members["Alice"].medications[med_id].stock, 2)
+            self.assertIn("Alice", saved.reminder_system.reminders)  # Low stock reminder
+
+            inventory.update_stock(med_id, 1)
+            family.delete_member("Alice")
+            self.assertIsNone(inventory._committer)
+            self.assertFalse(inventory.inventory_file.exists())
+            family.disable_group_commit()
+            self.assertFalse(inventory.inventory_file.exists())
+
+    def test_no_lost_updates_under_concurrency(self):
+        """Test that concurrent updates with group commit are all saved."""
+        result = run_stress(self.base_dir, threads=4, updates_per_thread=100, group_commit=0.01)
+        self.assertEqual(result["lost_updates"], {"memory": 0, "disk": 0})
+
+if __name__ == '__main__':
+    unittest.main()
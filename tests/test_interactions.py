@@ -0,0 +1,155 @@
+# test_interactions.py
+# Unit tests for drug-interaction checks and their reminders.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from medication_management import events
+from medication_management.medication import Medication
+from medication_management.interactions import (
+    Interaction, InteractionIndex, alert_message, alert_severity, default_index
+)
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem, KIND_INTERACTION
+from main import run_command
+from tests.isolation import IsolatedTestCase
+
+class TestInteractions(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestInteractions class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestInteractions class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, with events silenced."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def load_family(self):
+        """Load the family data saved in the test directory."""
+        return FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+
+    def interaction_reminders(self, reminders, member):
+        """Return the interaction reminders of a member keyed by medication ID."""
+        return {record.med_id: record for record in reminders.find_reminders(member=member, kind=KIND_INTERACTION)}
+
+    def test_default_index(self):
+        """Test that the shipped table loads and lookups ignore case, spacing and order."""
+        index = default_index()
+        self.assertIs(index, default_index())  # Loaded once
+        self.assertGreater(len(index), 20)
+        self.assertEqual(index.lookup("Warfarin", " ASPIRIN ").severity, "major")
+        self.assertIs(index.lookup("aspirin", "warfarin"), index.lookup("warfarin", "aspirin"))
+        self.assertIsNone(index.lookup("aspirin", "vitamin d"))
+
+    def test_from_csv_rejects_unknown_severity(self):
+        """Test that a table row with an unknown severity is reported with its line."""
+        (self.base_dir / "data").mkdir(exist_ok=True)
+        path = self.base_dir / "data" / "table.csv"
+        path.write_text("drug_a,drug_b,severity,description\na,b,minor,x\nc,d,fatal,y\n", encoding="utf-8")
+        with self.assertRaisesRegex(ValueError, "line 3"):
+            InteractionIndex.from_csv(path)
+
+    def test_check_and_check_medications(self):
+        """Test checking one medication and every pair of an inventory."""
+        index = InteractionIndex([
+            Interaction("a", "b", "minor", "ab"),
+            Interaction("b", "c", "major", "bc"),
+        ])
+        self.assertEqual([med_id for med_id, _ in index.check("B", [(1, "a"), (2, "x"), (3, "c")])], [1, 3])
+        self.assertEqual(index.check("x", [(1, "a")]), [])
+
+        medications = {
+            1: Medication("A", "1mg", "daily", 1, 10),
+            2: Medication("B", "1mg", "daily", 1, 10),
+            3: Medication("C", "1mg", "daily", 1, 10),
+            4: Medication("b", "2mg", "daily", 1, 10),
+        }
+        pairs = [(a, b, interaction.description) for a, b, interaction in index.check_medications(medications)]
+        self.assertEqual(pairs, [(1, 2, "ab"), (1, 4, "ab"), (2, 3, "bc"), (3, 4, "bc")])
+
+        found = [("A", index.lookup("a", "b")), ("C", index.lookup("b", "c"))]
+        self.assertEqual(alert_severity(interaction for _, interaction in found), "critical")
+        self.assertEqual(alert_message("B", found), "Possible interaction of B with A (minor): ab; C (major): bc")
+
+    def test_add_medication_sets_reminder(self):
+        """Test that adding an interacting medication sets a reminder on it."""
+        family = self.load_family()
+        family.add_member("Alice")
+        inventory = family.members["Alice"]
+        aspirin_id = inventory.add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+        self.assertEqual(self.interaction_reminders(family.reminder_system, "Alice"), {})
+
+        warfarin_id = inventory.add_medication(Medication("Warfarin", "5mg", "daily", 1, 30))
+        reminders = self.interaction_reminders(ReminderSystem(self.base_dir), "Alice")
+        self.assertEqual(list(reminders), [warfarin_id])
+        self.assertEqual(reminders[warfarin_id].severity, "critical")
+        self.assertIn("Aspirin", reminders[warfarin_id].render())
+
+        ibuprofen_ids = list(inventory.add_medications([Medication("Ibuprofen", "200mg", "daily", 1, 30)]))
+        reminders = self.interaction_reminders(family.reminder_system, "Alice")
+        self.assertEqual(sorted(reminders), [warfarin_id] + ibuprofen_ids)
+        self.assertIn("Warfarin", reminders[ibuprofen_ids[0]].text)
+        self.assertNotIn(aspirin_id, reminders)
+
+    def test_family_check_clears_stale_reminders(self):
+        """Test that the family check finds every pair and clears reminders that no longer apply."""
+        family = self.load_family()
+        family.add_member("Alice")
+        family.add_member("Bob")
+        alice = family.members["Alice"]
+        aspirin_id = alice.add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+        warfarin_id = alice.add_medication(Medication("Warfarin", "5mg", "daily", 1, 30))
+        family.members["Bob"].add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+
+        results = family.check_interactions()
+        self.assertEqual(list(results), ["Alice"])
+        self.assertEqual([(a, b) for a, b, _ in results["Alice"]], [(aspirin_id, warfarin_id)])
+
+        # A reminder set while checks were off is stale and cleared by the next check
+        family.reminder_system.set_interaction_reminder("Bob", 1, "Aspirin", "stale")
+        self.assertEqual(family.check_interactions(), results)
+        self.assertEqual(self.interaction_reminders(ReminderSystem(self.base_dir), "Bob"), {})
+
+    def test_delete_medication_clears_alert(self):
+        """Test that deleting one medication of a pair clears the alert on the other."""
+        family = self.load_family()
+        family.add_member("Alice")
+        alice = family.members["Alice"]
+        aspirin_id = alice.add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+        warfarin_id = alice.add_medication(Medication("Warfarin", "5mg", "daily", 1, 30))
+        self.assertIn(warfarin_id, self.interaction_reminders(family.reminder_system, "Alice"))
+        alice.delete_medication(aspirin_id)
+        self.assertEqual(self.interaction_reminders(ReminderSystem(self.base_dir), "Alice"), {})
+
+    def test_cli_interactions(self):
+        """Test the interactions batch command."""
+        argv = ["--base-dir", str(self.base_dir), "--quiet", "interactions"]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(run_command(argv), 0)
+        self.assertIn("No drug interactions found.", output.getvalue())
+
+        family = self.load_family()
+        family.add_member("Alice")
+        family.members["Alice"].add_medication(Medication("Sildenafil", "50mg", "daily", 1, 30))
+        family.members["Alice"].add_medication(Medication("Nitroglycerin", "0.4mg", "daily", 1, 30))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(run_command(argv), 0)
+        self.assertIn("Alice: Sildenafil (ID 1) + Nitroglycerin (ID 2) [major]", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,10 +5,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
-import shutil
-from pathlib import Path
+import json
+from unittest import mock
 from medication_management.medication import Medication
 from medication_management.inventory import InventoryManagement
+from tests.isolation import IsolatedTestCase
 
 class MockReminderSystem:
     """Mock reminder system to simulate reminders without an actual implementation."""
@@ -22,35 +23,37 @@ class MockReminderSystem:
         self.reminders[member][med_id] = message
         print(f"Reminder set: {message}")
 
-    def clear_reminder(self, member, med_id):
+    def set_low_stock_reminder(self, member, med_id, med_name, days_left):
+        """Set a low stock reminder for a specific member and medication ID."""
+        self.set_reminder(
+            member, med_id, f"Low stock alert for {med_name} (ID {med_id})! Only {days_left} days left."
+        )
+
+    def clear_reminder(self, member, med_id, kind=None):
         """Clear a reminder for a specific member and medication ID."""
         if member in self.reminders and med_id in self.reminders[member]:
             del self.reminders[member][med_id]
             print(f"Cleared reminder for {member} - Medication ID {med_id}")
 
-class TestInventory(unittest.TestCase):
+    def clear_low_stock_reminder(self, member, med_id):
+        """Clear the low stock reminder for a specific member and medication ID."""
+        self.clear_reminder(member, med_id)
+
+class TestInventory(IsolatedTestCase):
     @classmethod
     def setUpClass(cls):
         """Set up shared resources for all tests in the class."""
         print("\nSetting up TestInventory class...")
-        cls.base_dir = Path("./test_data")
-        cls.base_dir.mkdir(exist_ok=True)
-        cls.data_dir = cls.base_dir / "data"
-        cls.data_dir.mkdir(exist_ok=True)
-        cls.reminder_system = MockReminderSystem()
 
     @classmethod
     def tearDownClass(cls):
         """Clean up shared resources after all tests in the class."""
         print("\nCleaning up TestInventory class...")
-        try:
-            if cls.base_dir.exists():
-                shutil.rmtree(cls.base_dir)
-        except Exception as e:
-            print(f"Warning: Could not clean up test directory: {e}")
 
     def setUp(self):
         """Initialize resources for each test."""
+        super().setUp()
+        self.reminder_system = MockReminderSystem()
         self.inventory = InventoryManagement(
             member_name="TestUser",
             base_dir=self.base_dir,
@@ -117,5 +120,75 @@ class TestInventory(unittest.TestCase):
         # Verify med2 is not in low stock
         self.assertFalse(any(x[0] == med2_id for x in low_stock))
 
+    def test_add_medications_bulk(self):
+        """Test adding a stream of medications in one transaction"""
+        first_id = self.inventory.next_med_id
+        records = (
+            {"name": f"Bulk Med {i}", "dosage": "10mg", "frequency": "daily",
+             "daily_dosage": 1, "stock": i}
+            for i in range(50)
+        )
+        with mock.patch.object(self.inventory, '_save_inventory',
+                               wraps=self.inventory._save_inventory) as save_inventory:
+            ids = self.inventory.add_medications(records)
+        self.assertEqual(save_inventory.call_count, 1)
+        self.assertEqual(list(ids), list(range(first_id, first_id + 50)))
+        self.assertEqual(self.inventory.next_med_id, first_id + 50)
+        self.assertEqual(self.inventory.medications[first_id + 7].stock, 7)
+        # Stock of 0-3 days triggers low stock reminders
+        self.assertIn(first_id + 3, self.reminder_system.reminders["TestUser"])
+        self.assertNotIn(first_id + 4, self.reminder_system.reminders["TestUser"])
+
+    def test_add_medications_rolls_back(self):
+        """Test that an invalid medication cancels the whole bulk add"""
+        before = dict(self.inventory.medications)
+        next_id = self.inventory.next_med_id
+        invalid = Medication(name="Bad Med", dosage="1mg", frequency="daily", daily_dosage=0, stock=5)
+        with self.assertRaises(ValueError):
+            self.inventory.add_medications([self.test_med, invalid])
+        self.assertEqual(set(self.inventory.medications), set(before))
+        self.assertEqual(self.inventory.next_med_id, next_id)
+
+    def test_update_stocks_bulk(self):
+        """Test applying many stock changes in one transaction"""
+        med_a, med_b = self.inventory.add_medications([
+            Medication(name="Med A", dosage="1mg", frequency="daily", daily_dosage=1, stock=10),
+            Medication(name="Med B", dosage="1mg", frequency="daily", daily_dosage=1, stock=10),
+        ])
+        self.assertEqual(self.inventory.update_stocks({med_a: 5, med_b: -8}), 2)
+        self.assertEqual(self.inventory.medications[med_a].stock, 15)
+        self.assertEqual(self.inventory.medications[med_b].stock, 2)
+        self.assertIn(med_b, self.reminder_system.reminders["TestUser"])
+
+        # Pairs from a generator accumulate on the same ID
+        self.assertEqual(self.inventory.update_stocks((med_b, 4) for _ in range(3)), 3)
+        self.assertEqual(self.inventory.medications[med_b].stock, 14)
+        self.assertNotIn(med_b, self.reminder_system.reminders["TestUser"])
+
+        # A failing change cancels the others
+        with self.assertRaises(ValueError):
+            self.inventory.update_stocks([(med_a, 1), (med_b, -100)])
+        self.assertEqual(self.inventory.medications[med_a].stock, 15)
+        with self.assertRaises(ValueError):
+            self.inventory.update_stocks({999999: 1})
+
+    def test_export(self):
+        """Test exporting the inventory as CSV, JSON and JSON lines"""
+        med_id = self.inventory.add_medication(self.test_med)
+        csv_text = self.inventory.export("csv")
+        self.assertTrue(csv_text.startswith("med_id,name,dosage"))
+        self.assertIn(f"{med_id},Test Med,100mg,daily,1,10,False", csv_text)
+
+        records = json.loads(self.inventory.export("json"))
+        self.assertEqual(len(records), len(self.inventory.medications))
+        lines = self.inventory.export("jsonl").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], records)
+
+        export_file = self.base_dir / "export.csv"
+        self.inventory.export("csv", export_file)
+        self.assertEqual(export_file.read_text(), csv_text)
+        with self.assertRaises(ValueError):
+            self.inventory.export("xml")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+# test_locking.py
+# Unit tests for sharing one data directory between several processes.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import unittest
+from medication_management import events
+from medication_management.locking import DataFileLock
+from medication_management.medication import Medication
+from medication_management.inventory import InventoryManagement
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+
+def _restock_worker(base_dir, member, med_id, times):
+    """Restock one medication one unit at a time from a separate process."""
+    with events.silenced():
+        inventory = InventoryManagement(member, base_dir)
+        for _ in range(times):
+            inventory.update_stock(med_id, 1)
+
+
+class TestLocking(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestLocking class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestLocking class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory."""
+        super().setUp()
+        (self.base_dir / "data").mkdir()
+
+    def test_version_counter(self):
+        """Test versions are bumped under the exclusive lock only"""
+        lock = DataFileLock(self.base_dir / "data" / "example.csv")
+        self.assertEqual(lock.version(), 0)
+        with lock.exclusive():
+            with lock.shared():  # Re-entrant
+                self.assertEqual(lock.bump(), 1)
+        self.assertEqual(lock.version(), 1)
+        with lock.shared():
+            with self.assertRaises(RuntimeError):
+                lock.bump()
+
+    def test_concurrent_stock_updates_are_merged(self):
+        """Test two writers' stock changes add up instead of overwriting each other"""
+        first = InventoryManagement("LockUser", self.base_dir)
+        med_id = first.add_medication(Medication("Med", "1mg", "daily", 1, 10))
+        second = InventoryManagement("LockUser", self.base_dir)
+
+        first.update_stock(med_id, 5)
+        second.update_stock(med_id, -3)
+        self.assertEqual(second.medications[med_id].stock, 12)
+        first.update_stock(med_id, 1)
+        self.assertEqual(first.medications[med_id].stock, 13)
+        self.assertEqual(InventoryManagement("LockUser", self.base_dir).medications[med_id].stock, 13)
+
+    def test_concurrent_adds_and_deletes_are_merged(self):
+        """Test medications added or deleted by another writer are kept or removed"""
+        first = InventoryManagement("LockUser", self.base_dir)
+        kept = first.add_medication(Medication("Kept", "1mg", "daily", 1, 10))
+        deleted = first.add_medication(Medication("Deleted", "1mg", "daily", 1, 10))
+        second = InventoryManagement("LockUser", self.base_dir)
+
+        first.add_medication(Medication("First", "1mg", "daily", 1, 10))
+        first.delete_medication(deleted)
+        second.add_medication(Medication("Second", "1mg", "daily", 1, 10))
+        second.update_stock(deleted, 5)  # Deleted by the first writer: dropped
+
+        names = sorted(med.name for med in InventoryManagement("LockUser", self.base_dir).medications.values())
+        self.assertEqual(names, ["First", "Kept", "Second"])
+        self.assertEqual(len(set(second.medications)), 3)
+        self.assertIn(kept, second.medications)
+
+    def test_concurrent_reminders_and_members_are_merged(self):
+        """Test reminder and member changes of two writers are both kept"""
+        first_reminders = ReminderSystem(self.base_dir)
+        second_reminders = ReminderSystem(self.base_dir)
+        first_reminders.set_reminder("John", 1, "First")
+        second_reminders.set_reminder("John", 2, "Second")
+        self.assertEqual(dict(ReminderSystem(self.base_dir).reminders["John"]), {1: "First", 2: "Second"})
+
+        first_family = FamilyManagement(self.base_dir, first_reminders)
+        second_family = FamilyManagement(self.base_dir, second_reminders)
+        first_family.add_member("John")
+        second_family.add_member("Jane")
+        self.assertEqual(list(second_family.members), ["John", "Jane"])
+        second_family.delete_member("John")
+        first_family.add_member("Bob")
+        self.assertEqual(list(FamilyManagement(self.base_dir, first_reminders).members), ["Jane", "Bob"])
+
+    def test_multiple_processes(self):
+        """Test restocks from several processes are not lost"""
+        inventory = InventoryManagement("LockUser", self.base_dir)
+        med_id = inventory.add_medication(Medication("Med", "1mg", "daily", 1, 0))
+        workers = [
+            multiprocessing.Process(target=_restock_worker, args=(self.base_dir, "LockUser", med_id, 20))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(InventoryManagement("LockUser", self.base_dir).medications[med_id].stock, 80)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+# test_lots.py
+# Unit tests for lot tracking and first-expiring-first-out consumption.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from datetime import date
+from medication_management import events
+from medication_management.lots import LotQueue
+from medication_management.medication import Medication
+from medication_management.inventory import InventoryManagement
+from medication_management.snapshot import InventorySnapshot
+from user_management.analytics import FamilyAnalytics
+from user_management.family import FamilyManagement
+from user_management.refill import RefillPlanner
+from user_management.reminder import ReminderSystem, KIND_LOW_STOCK
+from main import run_command
+from tests.isolation import IsolatedTestCase
+
+class TestLots(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestLots class...")
+        cls.today = date(2024, 1, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestLots class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, with events silenced."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def load_family(self):
+        """Load the family data saved in the test directory."""
+        return FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+
+    def test_lot_queue(self):
+        """Test that lots are consumed by expiry, merged by date and serialized."""
+        lots = LotQueue([(5, "2024-03-01"), (10, None), (3, date(2024, 2, 1))])
+        lots.add(2, "2024-03-01")
+        self.assertEqual(lots.total, 20)
+        self.assertEqual(len(lots), 3)
+        self.assertEqual(lots.next_expiry, date(2024, 2, 1))
+        self.assertEqual(lots.consume(4), [(3, date(2024, 2, 1)), (1, date(2024, 3, 1))])
+        self.assertEqual(lots.serialize(), "6@2024-03-01;10")
+        self.assertEqual(LotQueue.parse(lots.serialize()).lots(), lots.lots())
+        with self.assertRaises(ValueError):
+            lots.consume(17)
+        with self.assertRaises(ValueError):
+            lots.add(0)
+        self.assertEqual(LotQueue([(4, None)]).serialize(), "")
+
+    def test_expire_and_usable(self):
+        """Test writing off expired lots and counting only stock used before it expires."""
+        lots = LotQueue([(10, "2024-01-02"), (10, "2024-01-10"), (10, None)])
+        # 4 a day: 8 of the first lot by Jan 2, then the second lot (capacity 40 by Jan 10)
+        self.assertEqual(lots.usable(4, self.today), 28)
+        self.assertEqual(lots.usable(10, self.today), 30)
+        self.assertEqual(lots.expire(date(2024, 1, 2)), 0)  # Usable on its expiration date
+        self.assertEqual(lots.expire(date(2024, 1, 3)), 10)
+        self.assertEqual((lots.total, lots.next_expiry), (20, date(2024, 1, 10)))
+
+    def test_medication_lots(self):
+        """Test stock updates with expiry dates and days left respecting expiring lots."""
+        med = Medication("Aspirin", "100mg", "daily", 2, 10)
+        self.assertEqual(med.calculate_days_left(self.today), 5)
+        self.assertTrue(med.update_stock(10, "2024-01-02"))
+        self.assertEqual(med.stock, 20)
+        # The dated lot is used first but only 4 of it before it expires
+        self.assertEqual(med.calculate_days_left(self.today), 7)
+        self.assertTrue(med.update_stock(-3))
+        self.assertEqual(med.lots.lots(), [(7, date(2024, 1, 2)), (10, None)])
+        self.assertEqual(med.expire_lots(date(2024, 1, 5)), 7)
+        self.assertEqual(med.stock, 10)
+
+        med.stock = 4  # Assigned directly, e.g. by a merge
+        self.assertEqual(med.stock_lots().total, 4)
+        with self.assertRaises(ValueError):
+            med.update_stock(1, "01/02/2024")
+
+    def test_reads_do_not_change_lots(self):
+        """Test that reading days left or the record never rewrites lots that disagree with the stock."""
+        med = Medication("Aspirin", "100mg", "daily", 1, 0)
+        # A restock caught between adding its lot and raising the stock
+        med.lots = LotQueue([(10, "2099-01-01")])
+        self.assertEqual(med.calculate_days_left(self.today), 0)
+        self.assertEqual(med.to_dict()["lots"], "")
+        self.assertEqual(med.lots.serialize(), "10@2099-01-01")
+        med.stock = 10
+        self.assertEqual(med.calculate_days_left(self.today), 10)
+        self.assertEqual(med.to_dict()["lots"], "10@2099-01-01")
+        # A failed update leaves the lots and the stock as they were
+        lots = med.lots
+        with self.assertRaises(ValueError):
+            med.update_stock(1, "not a date")
+        self.assertIs(med.lots, lots)
+        self.assertEqual((med.stock, lots.serialize()), (10, "10@2099-01-01"))
+
+    def test_days_left_agree_across_reports(self):
+        """Test that analytics, the refill plan and the snapshot count only usable stock, as reminders do."""
+        family = self.load_family()
+        family.add_member("Alice")
+        inventory = family.members["Alice"]
+        med_id = inventory.add_medication(Medication("Aspirin", "100mg", "daily", 2, 4))
+        inventory.update_stock(med_id, 20, "2024-01-03")  # Only 6 of them are used by Jan 3
+        medication = inventory.medications[med_id]
+        self.assertEqual(medication.calculate_days_left(self.today), 5)
+
+        analytics = FamilyAnalytics(family)
+        table = analytics.supply_table(self.today)
+        self.assertEqual(table.loc[0, 'days_left'], 5)
+        self.assertEqual((table.loc[0, 'stock'], table.loc[0, 'usable']), (24, 10))
+        self.assertEqual(analytics.group_by("member", self.today).loc["Alice", 'days_of_supply'], 5)
+        self.assertEqual(analytics.burn_down(days=5, today=self.today)['units_left'].tolist(), [10, 8, 6, 4, 2, 0])
+        later = date(2024, 1, 3)  # Another day rebuilds the dated rows
+        self.assertEqual(analytics.supply_table(later).loc[0, 'days_left'], medication.calculate_days_left(later))
+
+        trips = RefillPlanner(family, analytics).plan(horizon=10, safety_days=3, today=self.today)
+        self.assertEqual(trips[0].date, date(2024, 1, 3))  # Day 5 - 3 safety days
+        self.assertEqual(trips[0].refills[0].days_left, 3)
+
+        with InventorySnapshot(inventory.snapshot_file) as snapshot:
+            self.assertEqual(snapshot.check_low_stock(5, today=self.today), [(med_id, "Aspirin", 5)])
+            self.assertEqual(snapshot.check_low_stock(4, today=self.today), [])
+
+    def test_lots_are_saved_and_undone(self):
+        """Test that lots survive a reload from CSV and snapshot, and undo restores them."""
+        family = self.load_family()
+        family.add_member("Alice")
+        inventory = family.members["Alice"]
+        med_id = inventory.add_medication(Medication("Aspirin", "100mg", "daily", 1, 10))
+        self.assertTrue(inventory.update_stock(med_id, 5, "2030-06-30"))
+        inventory.update_stock(med_id, -2)
+
+        loaded = InventoryManagement("Alice", self.base_dir)  # From the snapshot
+        self.assertEqual(loaded.medications[med_id].lots.lots(), [(3, date(2030, 6, 30)), (10, None)])
+        loaded.snapshot_file.unlink()
+        loaded = InventoryManagement("Alice", self.base_dir)  # From the CSV
+        self.assertEqual(loaded.medications[med_id].stock_lots().serialize(), "3@2030-06-30;10")
+
+        family.undo()
+        family.undo()
+        self.assertEqual(family.members["Alice"].medications[med_id].stock_lots().serialize(), "")
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 10)
+
+    def test_concurrent_restocks_keep_their_expiry(self):
+        """Test that merging saves from two processes keeps the lots of both."""
+        first = InventoryManagement("Alice", self.base_dir)
+        med_id = first.add_medication(Medication("Aspirin", "100mg", "daily", 1, 10))
+        second = InventoryManagement("Alice", self.base_dir)
+        first.update_stock(med_id, 5, "2030-01-01")
+        second.update_stock(med_id, 7, "2031-01-01")
+        lots = InventoryManagement("Alice", self.base_dir).medications[med_id].stock_lots()
+        self.assertEqual(lots.lots(), [(5, date(2030, 1, 1)), (7, date(2031, 1, 1)), (10, None)])
+
+    def test_family_write_off_expired(self):
+        """Test the sweep over all members and the expire batch command."""
+        family = self.load_family()
+        for member in ("Alice", "Bob"):
+            family.add_member(member)
+            family.members[member].add_medication(Medication("Aspirin", "100mg", "daily", 1, 10))
+        family.members["Alice"].update_stock(1, 20, "2020-01-01")
+        family.members["Bob"].update_stock(1, 20, "2999-01-01")
+        family.members["Alice"].add_medication(Medication("Vitamin D", "1000IU", "daily", 1, 2))
+        family.members["Alice"].update_stock(2, 5, "2020-06-01")
+
+        self.assertEqual(family.write_off_expired(date(2020, 3, 1)), {"Alice": {1: 20}})
+        self.assertEqual(family.members["Alice"].medications[1].stock, 10)
+        self.assertEqual(family.oplog.undo_target()["op"], "write_off_expired")
+
+        argv = ["--base-dir", str(self.base_dir), "--quiet", "expire"]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(run_command(argv), 0)
+        self.assertIn("Alice: wrote off 5 expired units of medication ID 2.", output.getvalue())
+        saved = self.load_family()
+        self.assertEqual(saved.members["Alice"].medications[2].stock, 2)
+        self.assertEqual(saved.members["Bob"].medications[1].stock, 30)
+        reminders = saved.reminder_system.find_reminders(member="Alice", kind=KIND_LOW_STOCK)
+        self.assertEqual([record.med_id for record in reminders], [2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# test_memory.py
+# Unit tests for the in-memory storage mode.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import unittest
+from datetime import datetime
+from medication_management import events
+from medication_management.inventory import InventoryManagement
+from medication_management.medication import Medication
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem, KIND_LOW_STOCK
+from tests.isolation import IsolatedTestCase
+
+class TestMemory(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestMemory class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestMemory class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, with events silenced."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def memory_family(self, **options):
+        """Create an in-memory family with in-memory reminders."""
+        return FamilyManagement(self.base_dir, ReminderSystem(self.base_dir, in_memory=True), in_memory=True, **options)
+
+    def test_no_files_touched(self):
+        """Test that a full workload in memory creates no file at all."""
+        family = self.memory_family()
+        family.add_member("Alice")
+        alice = family.members["Alice"]
+        med_id = alice.add_medication(Medication("Aspirin", "100mg", "daily", 1, 2))
+        alice.update_stock(med_id, 10, "2030-01-01")
+        family.undo()
+        family.redo()
+        family.get_all_low_stock()
+        family.delete_member("Alice")
+        self.assertFalse((self.base_dir / "data").exists())
+
+    def test_same_semantics(self):
+        """Test that saves, reminders, undo and restore behave as on disk."""
+        family = self.memory_family()
+        family.add_member("Alice")
+        alice = family.members["Alice"]
+        med_id = alice.add_medication(Medication("Aspirin", "100mg", "daily", 1, 2))
+        self.assertEqual(len(family.reminder_system.find_reminders(member="Alice", kind=KIND_LOW_STOCK)), 1)
+
+        alice.update_stock(med_id, 10)
+        before_restock = datetime.now()
+        time.sleep(0.01)
+        alice.update_stock(med_id, 10)
+        self.assertEqual(alice.medications[med_id].stock, 22)
+        family.undo()
+        self.assertEqual(alice.medications[med_id].stock, 12)
+        family.redo()
+        family.restore(before_restock)
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 12)
+
+        # A failed batch is rolled back to the last saved state
+        with self.assertRaises(RuntimeError):
+            with family.batch():
+                family.members["Alice"].update_stock(med_id, 100)
+                family.delete_member("Alice")
+                family.add_member("Bob")
+                raise RuntimeError("abort")
+        self.assertEqual(list(family.members), ["Alice"])
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 12)
+
+    def test_instances_are_independent(self):
+        """Test that in-memory instances on the same base_dir share nothing, so tests can run in parallel."""
+        first = self.memory_family()
+        second = self.memory_family()
+        first.add_member("Alice")
+        first.members["Alice"].add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+        self.assertEqual(second.members, {})
+        inventory = InventoryManagement("Alice", self.base_dir, in_memory=True)
+        self.assertEqual(inventory.medications, {})
+
+    def test_save_to_disk(self):
+        """Test that an in-memory family is written to disk on close and loads from there."""
+        with self.memory_family(save_on_close=True) as family:
+            family.add_member("Alice")
+            family.members["Alice"].add_medication(Medication("Aspirin", "100mg", "daily", 1, 2))
+            self.assertFalse((self.base_dir / "data").exists())
+
+        loaded = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+        self.assertEqual(list(loaded.members), ["Alice"])
+        self.assertEqual(loaded.members["Alice"].medications[1].name, "Aspirin")
+        self.assertEqual(len(loaded.reminder_system.find_reminders(member="Alice")), 1)
+
+if __name__ == '__main__':
+    unittest.main()
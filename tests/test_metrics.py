@@ -0,0 +1,89 @@
+# test_metrics.py
+# Unit tests for the opt-in instrumentation registry.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from medication_management.medication import Medication
+from medication_management.inventory import InventoryManagement
+from medication_management.metrics import MetricsRegistry, registry
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from tests.isolation import IsolatedTestCase
+
+class TestMetrics(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestMetrics class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestMetrics class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory and empty metrics."""
+        super().setUp()
+        registry.reset()
+
+    def tearDown(self):
+        """Make sure instrumentation is off after every test."""
+        registry.disable()
+        registry.reset()
+
+    def test_disabled_by_default(self):
+        """Test nothing is wrapped or recorded while instrumentation is off"""
+        original = InventoryManagement.__dict__['update_stock']
+        self.assertFalse(registry.enabled)
+        inventory = InventoryManagement("MetricsUser", self.base_dir)
+        inventory.add_medication(Medication("Med", "1mg", "daily", 1, 10))
+        self.assertEqual(registry.snapshot(), {})
+
+        registry.enable()
+        self.assertIsNot(InventoryManagement.__dict__['update_stock'], original)
+        registry.disable()
+        self.assertIs(InventoryManagement.__dict__['update_stock'], original)
+
+    def test_records_calls_time_and_bytes(self):
+        """Test call counts, wall time and bytes are recorded per operation"""
+        registry.enable()
+        reminder_system = ReminderSystem(self.base_dir)
+        family = FamilyManagement(self.base_dir, reminder_system)
+        family.add_member("John")
+        inventory = family.members["John"]
+        med_id = inventory.add_medication(Medication("Med", "1mg", "daily", 1, 10))
+        for _ in range(3):
+            inventory.update_stock(med_id, 1)
+        FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+
+        stats = registry.snapshot()
+        self.assertEqual(stats["InventoryManagement.update_stock"]["calls"], 3)
+        self.assertGreater(stats["InventoryManagement.update_stock"]["seconds"], 0)
+        self.assertEqual(stats["InventoryManagement._save_inventory"]["calls"], 5)
+        self.assertGreater(stats["InventoryManagement._save_inventory"]["bytes_written"], 0)
+        self.assertGreater(stats["InventoryManagement._load_inventory"]["bytes_read"], 0)
+        self.assertGreater(stats["FamilyManagement._load_members"]["bytes_read"], 0)
+        self.assertEqual(stats["ReminderSystem._load_reminders"]["calls"], 2)
+        self.assertIn("InventoryManagement.update_stock", registry.summary())
+
+    def test_register_custom_class(self):
+        """Test registering methods on a separate registry"""
+        class Worker:
+            def work(self):
+                return 42
+
+            def _helper(self):
+                return 1
+
+        local = MetricsRegistry()
+        local.register(Worker)
+        local.enable()
+        self.assertEqual(Worker().work(), 42)
+        Worker()._helper()
+        self.assertEqual(list(local.snapshot()), ["Worker.work"])
+        local.disable()
+
+if __name__ == '__main__':
+    unittest.main()
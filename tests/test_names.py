@@ -0,0 +1,157 @@
+# test_names.py
+# Unit tests for medication name normalization, fuzzy lookups and duplicate merging.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from medication_management import events
+from medication_management.medication import Medication
+from medication_management.names import NameIndex, clean_name, normalize_name, similarity
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem, KIND_LOW_STOCK
+from main import run_command
+from tests.isolation import IsolatedTestCase
+
+class TestNames(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestNames class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestNames class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, recording events."""
+        super().setUp()
+        self.sink = events.MemorySink()
+        self.previous_sink = events.set_sink(self.sink)
+        self.family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+        self.family.add_member("Alice")
+        self.alice = self.family.members["Alice"]
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def warnings(self):
+        """Return the messages of the warnings recorded so far."""
+        return self.sink.messages(events.WARNING)
+
+    def test_normalization(self):
+        """Test that case, spacing and punctuation do not make names different."""
+        self.assertEqual(clean_name("  Ibuprofen \t 200 "), "Ibuprofen 200")
+        self.assertEqual(normalize_name("Vitamin-D "), normalize_name("vitamin  d"))
+        self.assertEqual(similarity("Ibuprofen", "ibuprofen "), 1.0)
+        self.assertGreater(similarity("Ibuprofen", "Ibuprofin"), 0.5)
+        self.assertLess(similarity("Metformin", "Metoprolol"), 0.5)
+
+    def test_name_index(self):
+        """Test lookups, removal and grouping in the trigram index."""
+        index = NameIndex([("Ibuprofen", 1), ("ibuprofen", 2), ("Ibuprofin", 3), ("Aspirin", 4)])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.keys(" IBUPROFEN"), {1, 2})
+        matches = index.similar("Ibuprofen")
+        self.assertEqual([(match.name, match.keys) for match in matches], [("ibuprofen", {1, 2}), ("ibuprofin", {3})])
+        self.assertEqual(index.similar("Ibuprofen", limit=1)[0].score, 1.0)
+        self.assertEqual(index.similar("xyz"), [])
+        self.assertEqual(sorted(map(sorted, index.groups())), [[1, 2, 3]])
+
+        index.remove("Ibuprofin", 3)
+        index.remove("Ibuprofin", 3)  # Unknown pairs are ignored
+        self.assertEqual([match.name for match in index.similar("Ibuprofin")], ["ibuprofen"])
+        index.add("Naproxen", 5)  # Reuses the freed ID
+        self.assertEqual(index.keys("naproxen"), {5})
+
+    def test_add_medication_cleans_name_and_warns(self):
+        """Test that a misspelled medication with the same dose is reported when added."""
+        first = self.alice.add_medication(Medication("Ibuprofen", "200mg", "daily", 1, 30))
+        self.alice.add_medication(Medication("Ibuprofen", "400mg", "daily", 1, 30))  # Another dose: not a duplicate
+        self.assertEqual(self.warnings(), [])
+        second = self.alice.add_medication(Medication(" ibuprofin  ", "200 mg", "daily", 1, 30))
+        self.assertEqual(self.alice.medications[second].name, "ibuprofin")
+        self.assertEqual(len(self.warnings()), 1)
+        self.assertIn(f"(ID {first})", self.warnings()[0])
+        self.assertEqual([med_id for med_id, _, _ in self.alice.find_similar("IBUPROFEN")], [1, 2, second])
+
+    def test_add_medications_warns_per_item(self):
+        """Test that a bulk add reports duplicates and dosage conflicts of each added medication."""
+        first = self.alice.add_medication(Medication("Ibuprofen", "200mg", "daily", 1, 30))
+        added = self.alice.add_medications([
+            Medication("Ibuprofin", "200mg", "daily", 1, 30),
+            Medication("Vitamin D", "1000IU", "twice daily", 1, 30),
+            Medication("ibuprofen ", "200mg", "daily", 1, 30),
+        ])
+        warnings = self.warnings()
+        duplicates = [message for message in warnings if "may duplicate" in message]
+        self.assertEqual(len(duplicates), 2)  # One per new medication, against the older ones only
+        self.assertTrue(duplicates[0].startswith(f"Medication 'Ibuprofin' (ID {added[0]}) may duplicate "
+                                                 f"'Ibuprofen' (ID {first});"))
+        self.assertTrue(duplicates[1].startswith(f"Medication 'ibuprofen' (ID {added[2]})"))
+        self.assertIn(f"(ID {first})", duplicates[1])
+        self.assertIn(f"(ID {added[0]})", duplicates[1])
+        conflicts = [message for message in warnings if "may duplicate" not in message]
+        self.assertEqual(len(conflicts), 1)
+        self.assertTrue(conflicts[0].startswith(f"Medication 'Vitamin D' (ID {added[1]}):"))
+
+    def test_merge_duplicates(self):
+        """Test that duplicates are merged into the lowest ID with their stock and reminders."""
+        self.alice.add_medications([
+            Medication("Ibuprofen", "200mg", "daily", 1, 2),
+            Medication("Aspirin", "100mg", "daily", 1, 30),
+            Medication("Ibuprofin", "200mg", "daily", 1, 10),
+        ])
+        self.alice.update_stock(3, 5, "2030-01-01")
+        self.assertEqual(self.alice.find_duplicates(), [[1, 3]])
+
+        self.assertEqual(self.alice.merge_duplicates(), {1: [3]})
+        self.assertEqual(sorted(self.alice.medications), [1, 2])
+        merged = self.alice.medications[1]
+        self.assertEqual((merged.name, merged.stock), ("Ibuprofen", 17))
+        self.assertEqual(merged.lots.serialize(), "5@2030-01-01;12")
+        reminders = self.family.reminder_system.find_reminders(member="Alice", kind=KIND_LOW_STOCK)
+        self.assertEqual(list(reminders), [])  # 17 days left: the low stock reminder of ID 1 is cleared
+        self.assertEqual(self.alice.find_duplicates(), [])
+
+        self.family.undo()
+        self.assertEqual(sorted(self.alice.medications), [1, 2, 3])
+        self.assertEqual(self.alice.medications[1].stock, 2)
+
+    def test_family_index(self):
+        """Test the family-wide index as members and medications change."""
+        self.alice.add_medication(Medication("Ibuprofen", "200mg", "daily", 1, 30))
+        self.family.add_member("Bob")
+        self.family.members["Bob"].add_medication(Medication("Ibuprofin", "200mg", "daily", 1, 30))
+        self.assertEqual([(member, med_id) for member, med_id, _, _ in self.family.find_similar("ibuprofen")],
+                         [("Alice", 1), ("Bob", 1)])
+
+        self.family.add_member("Carol")
+        self.family.members["Carol"].add_medication(Medication("Ibuprofen", "200mg", "daily", 1, 30))
+        self.alice.update_medication(1, name="Naproxen")
+        self.family.delete_member("Bob")
+        self.assertEqual([(member, name) for member, _, name, _ in self.family.find_similar("ibuprofen")],
+                         [("Carol", "Ibuprofen")])
+        self.assertEqual(self.family.find_similar("naproxen")[0][:2], ("Alice", 1))
+
+    def test_cli_dedup(self):
+        """Test the dedup batch command, as a dry run and applied."""
+        self.alice.add_medications([Medication("Ibuprofen", "200mg", "daily", 1, 30),
+                                    Medication("Ibuprofin", "200mg", "daily", 1, 30)])
+        argv = ["--base-dir", str(self.base_dir), "--quiet", "dedup"]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(run_command(argv), 0)
+            self.assertEqual(run_command(argv + ["--apply"]), 0)
+            self.assertEqual(run_command(argv), 0)
+        lines = output.getvalue().splitlines()
+        self.assertIn("Alice: Ibuprofen (ID 1) + Ibuprofin (ID 2)", lines)
+        self.assertIn("Merged 1 duplicate medication(s).", lines)
+        self.assertEqual(lines[-1], "No duplicate medications found.")
+
+if __name__ == '__main__':
+    unittest.main()
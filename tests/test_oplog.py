@@ -0,0 +1,281 @@
+# test_oplog.py
+# Unit tests for the operation log, undo/redo and point-in-time restore.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import time
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from medication_management import events
+from medication_management.medication import Medication
+from medication_management.oplog import OperationLog, change
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from main import run_command
+from tests.isolation import IsolatedTestCase
+
+class TestOperationLog(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestOperationLog class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestOperationLog class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, with events silenced."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def load_family(self):
+        """Load the family data saved in the test directory."""
+        return FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+
+    def add_alice(self, family, stock=10):
+        """Add the member Alice with one medication and return its ID."""
+        family.add_member("Alice")
+        return family.members["Alice"].add_medication(Medication("Aspirin", "100mg", "daily", 1, stock))
+
+    def test_mutations_are_logged(self):
+        """Test that each mutation appends one entry with before and after images."""
+        family = self.load_family()
+        med_id = self.add_alice(family)
+        family.members["Alice"].update_stock(med_id, -3)
+        family.members["Alice"].delete_medication(med_id)
+        entries = list(family.oplog.entries())
+        self.assertEqual([entry["op"] for entry in entries],
+                         ["add_member", "add_medication", "update_stock", "delete_medication"])
+        self.assertEqual([entry["seq"] for entry in entries], [1, 2, 3, 4])
+        stock_change = entries[2]["changes"][0]
+        self.assertEqual((stock_change["before"]["stock"], stock_change["after"]["stock"]), (10, 7))
+        self.assertIsNone(entries[3]["changes"][0]["after"])
+
+    def test_batch_is_one_entry_and_rollback_is_not_logged(self):
+        """Test that a batch is logged as one entry and a failed batch not at all."""
+        family = self.load_family()
+        med_id = self.add_alice(family)
+        with family.batch():
+            family.members["Alice"].update_stock(med_id, 1)
+            family.add_member("Bob")
+        with self.assertRaises(RuntimeError):
+            with family.batch():
+                family.members["Alice"].update_stock(med_id, 1)
+                raise RuntimeError("boom")
+        entries = list(family.oplog.entries())
+        self.assertEqual([entry["op"] for entry in entries], ["add_member", "add_medication", "batch"])
+        self.assertEqual(len(entries[-1]["changes"]), 2)
+
+    def test_undo_and_redo(self):
+        """Test that deletions can be undone and redone, also after a restart."""
+        family = self.load_family()
+        med_id = self.add_alice(family)
+        family.members["Alice"].update_stock(med_id, 5)
+        family.delete_member("Alice")
+        self.assertFalse((self.base_dir / "data" / "Alice_inventory.csv").exists())
+
+        family = self.load_family()  # Undo works across sessions
+        self.assertTrue(family.undo())
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 15)
+        self.assertEqual(self.load_family().members["Alice"].medications[med_id].stock, 15)
+
+        self.assertTrue(family.undo())  # The stock update
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 10)
+        self.assertTrue(family.redo())
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 15)
+
+        self.assertTrue(family.undo())
+        self.assertTrue(family.undo())  # The medication
+        self.assertEqual(self.load_family().members["Alice"].medications, {})
+        self.assertTrue(family.undo())  # The member
+        self.assertFalse(family.undo())
+        self.assertEqual(self.load_family().members, {})
+
+    def test_new_operation_clears_redo(self):
+        """Test that a new change after an undo cannot be followed by a redo."""
+        family = self.load_family()
+        med_id = self.add_alice(family)
+        family.members["Alice"].update_stock(med_id, 5)
+        family.undo()
+        family.members["Alice"].update_stock(med_id, 1)
+        self.assertFalse(family.redo())
+
+    def test_restore_point_in_time(self):
+        """Test that the state at a past time is restored, and the restore can be undone."""
+        family = self.load_family()
+        med_id = self.add_alice(family)
+        family.members["Alice"].update_stock(med_id, 5)
+        time.sleep(0.01)
+        moment = datetime.now()
+        time.sleep(0.01)
+        family.members["Alice"].delete_medication(med_id)
+        family.add_member("Bob")
+
+        self.assertEqual(family.restore(moment), 2)
+        self.assertEqual(list(family.members), ["Alice"])
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 15)
+        saved = self.load_family()
+        self.assertEqual(list(saved.members), ["Alice"])
+        self.assertEqual(saved.members["Alice"].medications[med_id].stock, 15)
+
+        family.undo()  # Undo the restore
+        self.assertEqual(sorted(family.members), ["Alice", "Bob"])
+        self.assertEqual(family.members["Alice"].medications, {})
+
+        with self.assertRaises(ValueError):
+            family.restore(datetime(2000, 1, 1))
+
+    def test_restore_replays_from_the_last_checkpoint(self):
+        """Test that checkpoints are written and restore only reads the log after one."""
+        family = self.load_family()
+        family.oplog.checkpoint_every = 5
+        med_id = self.add_alice(family)
+        for _ in range(10):
+            family.members["Alice"].update_stock(med_id, 1)
+        checkpoints = family.oplog.checkpoints()
+        self.assertEqual([checkpoint["seq"] for checkpoint in checkpoints], [0, 5, 10])
+
+        # Corrupting the history before the last checkpoint does not matter
+        log_path = family.oplog.path
+        tail = log_path.read_bytes()[checkpoints[-1]["offset"]:]
+        log_path.write_bytes(b"x" * checkpoints[-1]["offset"] + tail)
+        state = family.oplog.state_at(datetime.now())
+        self.assertEqual(state["Alice"][med_id]["stock"], 20)
+
+    def test_undo_stacks_start_at_the_last_checkpoint(self):
+        """Test that the undo and redo stacks are saved with checkpoints and only the log after one is read."""
+        family = self.load_family()
+        family.oplog.checkpoint_every = 5
+        med_id = self.add_alice(family)
+        for _ in range(3):
+            family.members["Alice"].update_stock(med_id, 1)
+        family.undo()  # After the checkpoint of entry 5: the third update is on the redo stack
+        family.members["Alice"].update_stock(med_id, 2)  # Clears the redo stack
+        family.undo()
+        checkpoints = family.oplog.checkpoints()
+        self.assertEqual([checkpoint["seq"] for checkpoint in checkpoints], [0, 5])
+
+        # Corrupting the history before the last checkpoint does not matter
+        log_path = family.oplog.path
+        tail = log_path.read_bytes()[checkpoints[-1]["offset"]:]
+        log_path.write_bytes(b"x" * checkpoints[-1]["offset"] + tail)
+        family = self.load_family()
+        self.assertEqual(family.oplog.redo_target()["seq"], 7)
+        self.assertEqual([entry["seq"] for entry in family.oplog._undo], [1, 2, 3, 4])
+        self.assertTrue(family.redo())
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 14)
+        for stock in (12, 11, 10):
+            self.assertTrue(family.undo())
+            self.assertEqual(family.members["Alice"].medications[med_id].stock, stock)
+
+    def test_compaction_keeps_the_newest_checkpoints(self):
+        """Test that old checkpoints and the log before the oldest kept one are dropped."""
+        family = self.load_family()
+        family.oplog.checkpoint_every = 2
+        family.oplog.keep_checkpoints = 2
+        med_id = self.add_alice(family)  # Checkpoints after entries 0 and 2
+        for _ in range(3):
+            family.members["Alice"].update_stock(med_id, 1)  # Checkpoint after entry 4
+        before_update = datetime.now()
+        time.sleep(0.01)
+        family.members["Alice"].update_stock(med_id, 1)  # Checkpoint 6: four of them, compacted to two
+        checkpoints = family.oplog.checkpoints()
+        self.assertEqual([checkpoint["seq"] for checkpoint in checkpoints], [4, 6])
+        self.assertEqual(checkpoints[0]["offset"], 0)
+        self.assertEqual(sorted(path.name for path in family.oplog.checkpoint_dir.glob("0*")),
+                         ["000000000004.json", "000000000004.stacks.json",
+                          "000000000006.json", "000000000006.stacks.json"])
+        self.assertEqual([entry["seq"] for entry in family.oplog.entries()], [5, 6])
+
+        family.members["Alice"].update_stock(med_id, 1)
+        self.assertEqual(family.oplog.state_at(before_update)["Alice"][med_id]["stock"], 13)
+        self.assertEqual(family.oplog.state_at(datetime.now())["Alice"][med_id]["stock"], 15)
+        family = self.load_family()  # The stacks reach back past the dropped entries
+        for stock in (14, 13, 12, 11, 10):
+            self.assertTrue(family.undo())
+            self.assertEqual(family.members["Alice"].medications[med_id].stock, stock)
+        self.assertGreater(family.oplog.compact(1), 0)
+        self.assertEqual(len(family.oplog.checkpoints()), 1)
+        self.assertTrue(family.redo())
+        self.assertEqual(family.members["Alice"].medications[med_id].stock, 11)
+        with self.assertRaises(ValueError):
+            family.oplog.compact(0)
+
+    def test_separate_entries_in_a_transaction(self):
+        """Test that separate() blocks in a transaction are entries of their own."""
+        (self.base_dir / "data").mkdir(exist_ok=True)
+        log = OperationLog(self.base_dir / "data")
+        with log.transaction():
+            log.record("x", [change("A", 1, None, {"med_id": 1})])
+            with log.separate():
+                log.record("y", [change("A", 2, None, {"med_id": 2})])
+                log.record("z", [change("A", 3, None, {"med_id": 3})])
+            with log.separate():
+                log.record("y", [change("A", 4, None, {"med_id": 4})])
+            log.record("x", [change("A", 5, None, {"med_id": 5})])
+        with self.assertRaises(RuntimeError):
+            with log.transaction(), log.separate():
+                log.record("y", [change("A", 6, None, {"med_id": 6})])
+                raise RuntimeError("boom")
+        self.assertEqual([(entry["op"], len(entry["changes"])) for entry in log.entries()],
+                         [("x", 1), ("batch", 2), ("y", 1), ("x", 1)])
+
+    def test_group_commit_buffers_entries(self):
+        """Test that entries wait for the group committer and are numbered after other processes' entries."""
+        family = self.load_family()
+        med_id = self.add_alice(family)
+        family.enable_group_commit(interval=60, max_ops=1000)
+        size = family.oplog.path.stat().st_size
+        for _ in range(5):
+            family.members["Alice"].update_stock(med_id, 1)
+        self.assertEqual(family.oplog.path.stat().st_size, size)  # Nothing written yet
+        self.assertEqual(family.oplog.last_seq(), 7)
+        self.assertEqual(family.oplog.undo_target()["seq"], 7)
+        family.undo()
+
+        other = self.load_family()  # Another process appends meanwhile
+        other.members["Alice"].update_stock(med_id, 100)
+        family.flush()
+        entries = list(family.oplog.entries())
+        self.assertEqual([entry["seq"] for entry in entries], list(range(1, 10)))
+        self.assertEqual([entry["op"] for entry in entries[-3:]], ["update_stock", "update_stock", "undo"])
+        self.assertEqual(entries[-1]["undo_of"], 8)
+        self.assertEqual(family.oplog.redo_target()["seq"], 8)
+        family.disable_group_commit()
+        self.assertEqual(self.load_family().oplog.redo_target()["seq"], 8)
+
+    def test_transaction_and_suspended(self):
+        """Test the transaction and suspension helpers of OperationLog."""
+        (self.base_dir / "data").mkdir(exist_ok=True)
+        log = OperationLog(self.base_dir / "data")
+        with log.suspended():
+            self.assertIsNone(log.record("x", [change("A", 1, None, {"med_id": 1})]))
+        with log.transaction():
+            log.record("x", [change("A", 1, None, {"med_id": 1})])
+            with log.transaction():
+                log.record("y", [change("A", 2, None, {"med_id": 2})])
+        self.assertEqual([(entry["op"], len(entry["changes"])) for entry in log.entries()], [("batch", 2)])
+
+    def test_cli_undo(self):
+        """Test the undo and redo batch commands."""
+        family = self.load_family()
+        self.add_alice(family)
+        argv = ["--base-dir", str(self.base_dir), "--quiet"]
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(run_command(argv + ["undo"]), 0)
+            self.assertEqual(self.load_family().members["Alice"].medications, {})
+            self.assertEqual(run_command(argv + ["redo"]), 0)
+            self.assertEqual(run_command(argv + ["redo"]), 1)
+        self.assertEqual(len(self.load_family().members["Alice"].medications), 1)
+
+if __name__ == '__main__':
+    unittest.main()
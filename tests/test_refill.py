@@ -0,0 +1,101 @@
+# test_refill.py
+# Unit tests for refill planning across the family.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from datetime import date
+from medication_management import events
+from medication_management.medication import Medication
+from user_management.family import FamilyManagement
+from user_management.refill import RefillPlanner
+from user_management.reminder import ReminderSystem, KIND_REFILL
+from main import run_command
+from tests.isolation import IsolatedTestCase
+
+class TestRefill(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestRefill class...")
+        cls.today = date(2024, 1, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestRefill class...")
+
+    def setUp(self):
+        """Create a family of two members with medications running out at different times."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+        self.family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+        self.family.add_member("Alice")
+        self.family.add_member("Bob")
+        self.family.members["Alice"].add_medication(Medication("Aspirin", "100mg", "daily", 1, 10))
+        self.family.members["Alice"].add_medication(Medication("Metformin", "500mg", "twice daily", 2, 30))
+        self.family.members["Bob"].add_medication(Medication("Vitamin D", "1000IU", "daily", 1, 2))
+        self.planner = RefillPlanner(self.family)
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def test_plan(self):
+        """Test the trips chosen and the refills picked up on each."""
+        trips = self.planner.plan(horizon=60, today=self.today)
+        summary = [(trip.date, sorted((refill.member, refill.med_id) for refill in trip.refills)) for trip in trips]
+        self.assertEqual(summary, [
+            (date(2024, 1, 1), [("Alice", 1), ("Bob", 1)]),   # Vitamin D is overdue, Aspirin due on day 7
+            (date(2024, 1, 13), [("Alice", 2)]),
+            (date(2024, 1, 30), [("Bob", 1)]),
+            (date(2024, 2, 7), [("Alice", 1), ("Alice", 2)]),
+            (date(2024, 2, 29), [("Bob", 1)]),
+        ])
+        metformin = trips[1].refills[0]
+        self.assertEqual((metformin.name, metformin.days_left, metformin.quantity), ("Metformin", 3, 60))
+
+    def test_plan_keeps_safety_stock_with_fewest_trips(self):
+        """Test that no medication drops below its safety stock and a wider window saves trips."""
+        for index in range(30):
+            self.family.members["Alice"].add_medication(Medication(f"Drug{index}", "1mg", "daily", 1, 4 + index))
+        narrow = self.planner.plan(horizon=90, window=2, today=self.today)
+        wide = self.planner.plan(horizon=90, window=14, today=self.today)
+        self.assertLess(len(wide), len(narrow))
+        for trips in (narrow, wide):
+            for trip in trips[1:]:  # Bob's Vitamin D starts below its safety stock
+                for refill in trip.refills:
+                    self.assertGreaterEqual(refill.days_left, 3, refill)
+        with self.assertRaises(ValueError):
+            self.planner.plan(refill_days=7, window=7)
+
+    def test_refill_reminders(self):
+        """Test that the first refill of every medication becomes a due reminder."""
+        trips = self.planner.plan(horizon=60, today=self.today)
+        reminders = self.family.reminder_system
+        reminders.sync_refill_reminders(self.planner.next_refills(trips))
+        records = {(record.member, record.med_id): record for record in reminders.find_reminders(kind=KIND_REFILL)}
+        self.assertEqual(records[("Alice", 2)].due_date, date(2024, 1, 13))
+        self.assertEqual(records[("Alice", 2)].render(),
+                         "Refill Metformin (ID 2) on 2024-01-13, with 3 days of stock left.")
+
+        self.family.delete_member("Bob")
+        reminders.sync_refill_reminders(self.planner.next_refills(self.planner.plan(today=self.today)))
+        saved = ReminderSystem(self.base_dir).find_reminders(kind=KIND_REFILL)
+        self.assertEqual(sorted(record.med_id for record in saved if record.member == "Alice"), [1, 2])
+        self.assertEqual([record for record in saved if record.member == "Bob"], [])
+
+    def test_cli_refill_plan(self):
+        """Test the refill-plan batch command."""
+        argv = ["--base-dir", str(self.base_dir), "--quiet", "refill-plan", "--horizon", "10", "--reminders"]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(run_command(argv), 0)
+        self.assertIn("Bob: Vitamin D (ID 1), 30 units, 2 days left", output.getvalue())
+        self.assertEqual(len(ReminderSystem(self.base_dir).find_reminders(kind=KIND_REFILL)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
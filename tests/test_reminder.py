@@ -4,11 +4,13 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
-import shutil
-from pathlib import Path
-from user_management.reminder import ReminderSystem
+from datetime import date, timedelta
+from user_management.reminder import (
+    ReminderSystem, KIND_CUSTOM, KIND_LOW_STOCK, SEVERITY_CRITICAL, SEVERITY_WARNING
+)
+from tests.isolation import IsolatedTestCase
 
-class TestReminder(unittest.TestCase):
+class TestReminder(IsolatedTestCase):
     """
     A test suite for the ReminderSystem module.
 
@@ -23,27 +25,17 @@ class TestReminder(unittest.TestCase):
     def setUpClass(cls):
         """
         Class-level setup method.
-        Initializes the base and data directories for storing reminder data.
         Called once before any test methods are executed.
         """
         print("\nSetting up TestReminder class...")
-        cls.base_dir = Path("./test_data")  # Path to the base directory for testing
-        cls.base_dir.mkdir(exist_ok=True)  # Create the base directory if it doesn't exist
-        cls.data_dir = cls.base_dir / "data"  # Path to the data directory
-        cls.data_dir.mkdir(exist_ok=True)  # Create the data directory
 
     @classmethod
     def tearDownClass(cls):
         """
         Class-level teardown method.
-        Cleans up test directories and files after all test methods are executed.
+        Called once after all test methods are executed.
         """
         print("\nCleaning up TestReminder class...")
-        try:
-            if cls.base_dir.exists():
-                shutil.rmtree(cls.base_dir)  # Remove the test directories
-        except Exception as e:
-            print(f"Warning: Could not clean up test directory: {e}")  # Log any cleanup errors
 
     def setUp(self):
         """
@@ -51,6 +43,7 @@ class TestReminder(unittest.TestCase):
         Initializes a new ReminderSystem instance and adds some sample reminders.
         Called before each test method.
         """
+        super().setUp()  # Create the test's base directory
         self.reminder_system = ReminderSystem(self.base_dir)  # Initialize ReminderSystem
         # Add initial reminders for testing
         self.reminder_system.set_reminder("TestUser", 1, "Test reminder 1")
@@ -158,5 +151,67 @@ class TestReminder(unittest.TestCase):
             "Test reminder 1"
         )  # Verify content of reminder 1
 
+    def test_typed_low_stock_reminder(self):
+        """
+        Test case for typed low stock reminder records.
+
+        Verifies:
+        - Low stock reminders carry kind, severity, days left and due date.
+        - The message is rendered from the record when accessed.
+        - Reminders of different kinds on one medication are kept apart.
+        """
+        record = self.reminder_system.set_low_stock_reminder("TestUser", 1, "Med1", 1)
+        self.assertEqual(record.kind, KIND_LOW_STOCK)
+        self.assertEqual(record.severity, SEVERITY_CRITICAL)
+        self.assertEqual(record.due_date, date.today() + timedelta(days=1))
+        self.assertIn("Low stock alert for Med1 (ID 1)! Only 1 days left.",
+                      self.reminder_system.reminders["TestUser"][1])
+        self.assertIn("Test reminder 1", self.reminder_system.reminders["TestUser"][1])
+
+        # Clearing by kind keeps the custom reminder on the same medication
+        self.reminder_system.clear_low_stock_reminder("TestUser", 1)
+        self.assertEqual(self.reminder_system.reminders["TestUser"][1], "Test reminder 1")
+
+    def test_find_reminders(self):
+        """
+        Test case for filtering reminders by kind, severity and due date.
+
+        Verifies:
+        - Kind and severity filters return only matching records.
+        - The due-date filter returns records due on or before the date, in due order.
+        """
+        self.reminder_system.set_low_stock_reminder("FindUser", 4, "Med4", 3)
+        self.reminder_system.set_low_stock_reminder("FindOther", 5, "Med5", 0)
+        self.reminder_system.set_reminder("FindUser", 6, "Custom reminder")
+        members = ("FindUser", "FindOther")
+
+        low_stock = self.reminder_system.find_reminders(kind=KIND_LOW_STOCK)
+        self.assertEqual(sorted(r.med_id for r in low_stock if r.member in members), [4, 5])
+        custom = self.reminder_system.find_reminders(member="FindUser", kind=KIND_CUSTOM)
+        self.assertEqual([r.med_id for r in custom], [6])
+        warning = self.reminder_system.find_reminders(member="FindUser", severity=SEVERITY_WARNING)
+        self.assertEqual([r.med_id for r in warning], [4])
+
+        due = self.reminder_system.find_reminders(due_before=date.today() + timedelta(days=3))
+        self.assertEqual([r.med_id for r in due if r.member in members], [5, 4])
+        due = self.reminder_system.find_reminders(due_before=date.today())
+        self.assertEqual([r.med_id for r in due if r.member in members], [5])
+
+    def test_typed_persistence(self):
+        """
+        Test case for persisting typed reminder records.
+
+        Verifies:
+        - Kind, severity, days left and due date survive a reload.
+        """
+        self.reminder_system.set_low_stock_reminder("PersistUser", 6, "Med6", 2)
+        new_reminder_system = ReminderSystem(self.base_dir)
+        record = new_reminder_system.find_reminders(member="PersistUser", kind=KIND_LOW_STOCK)[0]
+        self.assertEqual(record.med_id, 6)
+        self.assertEqual(record.med_name, "Med6")
+        self.assertEqual(record.days_left, 2)
+        self.assertEqual(record.severity, SEVERITY_WARNING)
+        self.assertEqual(record.due_date, date.today() + timedelta(days=2))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,116 @@
+# test_report.py
+# Unit tests for streaming report generation.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import json
+import unittest
+from medication_management.medication import Medication
+from medication_management.prescription import PrescriptionMedication
+from medication_management.inventory import InventoryManagement
+from medication_management.report import (
+    BufferedSink, STOCK_COLUMNS, iter_report_lines, write_report
+)
+from tests.isolation import IsolatedTestCase
+
+class CountingSink(io.StringIO):
+    """A string sink that counts how often it is written to."""
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+class TestReport(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestReport class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestReport class...")
+
+    def setUp(self):
+        """Create an inventory with one regular and one prescription medication."""
+        super().setUp()
+        self.inventory = InventoryManagement("ReportUser", self.base_dir)
+        self.inventory.add_medication(Medication(
+            name="Vitamin D", dosage="1000IU", frequency="daily", daily_dosage=1, stock=30
+        ))
+        self.inventory.add_medication(PrescriptionMedication(
+            name="Amoxicillin", dosage="500mg", frequency="3 times/day", daily_dosage=3, stock=9,
+            doctor_name="Dr. Smith", prescription_date="2024-01-01", indication="Infection",
+            warnings="Take with food", expiration_date="2030-01-01"
+        ))
+
+    def tearDown(self):
+        """Clean up resources after each test."""
+        self.inventory = None
+
+    def test_text_stock_report(self):
+        """Test the text stock report keeps the fixed-width layout"""
+        sink = io.StringIO()
+        self.inventory.generate_stock_report(sink=sink)
+        lines = sink.getvalue().splitlines()
+        self.assertEqual(lines[1], "Stock Report for ReportUser:")
+        self.assertEqual(lines[2], f"{'ID':<5} {'Name':<20} {'Stock':<10} {'Days Left':<10}")
+        self.assertEqual(lines[3], "-" * 50)
+        self.assertEqual(lines[4], f"{1:<5} {'Vitamin D':<20} {30:<10} {30:<10}")
+
+    def test_csv_and_json_reports(self):
+        """Test CSV and JSON output of the stock and prescription reports"""
+        sink = io.StringIO()
+        self.inventory.generate_stock_report(sink=sink, fmt="csv")
+        self.assertEqual(sink.getvalue(), "id,name,stock,days_left\n1,Vitamin D,30,30\n2,Amoxicillin,9,3\n")
+
+        sink = io.StringIO()
+        self.inventory.generate_prescription_report(sink=sink, fmt="json")
+        rows = json.loads(sink.getvalue())
+        self.assertEqual(rows, [{
+            "id": 2, "name": "Amoxicillin", "doctor": "Dr. Smith",
+            "date": "2024-01-01", "expiration_date": "2030-01-01"
+        }])
+
+        with self.assertRaises(ValueError):
+            self.inventory.generate_stock_report(sink=io.StringIO(), fmt="xml")
+
+    def test_streaming_is_lazy_and_buffered(self):
+        """Test rows are consumed lazily and written in large chunks"""
+        consumed = []
+
+        def rows():
+            for i in range(10000):
+                consumed.append(i)
+                yield {"id": i, "name": f"Med {i}", "stock": i, "days_left": None}
+
+        lines = iter_report_lines(rows(), STOCK_COLUMNS, fmt="csv")
+        next(lines)
+        next(lines)
+        self.assertEqual(consumed, [0])
+
+        sink = CountingSink()
+        write_report(rows(), STOCK_COLUMNS, sink=sink, fmt="text", buffer_size=4096)
+        self.assertEqual(len(sink.getvalue().splitlines()), 10002)
+        self.assertLess(sink.writes, 200)
+        self.assertIn(f"{9999:<5} {'Med 9999':<20} {9999:<10} {'N/A':<10}", sink.getvalue())
+
+    def test_buffered_sink_flush(self):
+        """Test the buffered sink holds small writes until flushed"""
+        sink = CountingSink()
+        buffered = BufferedSink(sink, buffer_size=100)
+        buffered.write("a" * 10)
+        self.assertEqual(sink.writes, 0)
+        buffered.write("b" * 95)
+        self.assertEqual(sink.writes, 1)
+        buffered.write("c")
+        buffered.flush()
+        self.assertEqual(sink.getvalue(), "a" * 10 + "b" * 95 + "c")
+
+if __name__ == '__main__':
+    unittest.main()
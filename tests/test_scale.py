@@ -0,0 +1,117 @@
+# test_scale.py
+# Unit tests for the synthetic data generator, and scale tests of large families.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import date
+from benchmarks.generators import generate_dataset, generate_memory_family, iter_dataset
+from benchmarks.scale import ScaleLimits, check_limits, run_scale
+from medication_management import events
+from medication_management.lots import LotQueue
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem, KIND_LOW_STOCK
+from tests.isolation import IsolatedTestCase
+
+# Family sizes to run the scale tests at, e.g. FAMILYMEDT_SCALE=1000,10000; unset skips them
+SCALE_SIZES = {int(size) for size in os.environ.get("FAMILYMEDT_SCALE", "").split(",") if size.strip()}
+
+class TestScale(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestScale class...")
+        cls.today = date(2024, 1, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestScale class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, with events silenced."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def test_generated_mix(self):
+        """Test that the generated medications have the intended mix of prescriptions, low stock and lots."""
+        rows = []
+        reminders = []
+        for _, member_rows, member_reminders in iter_dataset(200, 10, 2, seed=3, today=self.today):
+            rows.extend(member_rows)
+            reminders.extend(member_reminders)
+        self.assertEqual((len(rows), len(reminders)), (2000, 400))
+        share = lambda test: sum(1 for row in rows if test(row)) / len(rows)
+        self.assertAlmostEqual(share(lambda row: row['is_prescription']), 0.4, delta=0.05)
+        self.assertAlmostEqual(share(lambda row: row['stock'] // row['daily_dosage'] <= 5), 0.15, delta=0.05)
+        self.assertAlmostEqual(share(lambda row: row['lots']), 0.3, delta=0.05)
+        for row in rows:
+            if row['lots']:
+                self.assertEqual(LotQueue.parse(row['lots']).total, row['stock'])
+        self.assertTrue(any(row['expiration_date'] and row['expiration_date'] < "2024-01-01" for row in rows))
+        # Medications about to run out have their low stock reminder
+        self.assertTrue(all(reminder['days_left'] <= 3 for reminder in reminders if reminder['kind'] == KIND_LOW_STOCK))
+
+    def test_memory_backend_matches_csv(self):
+        """Test that the in-memory family holds what the CSV files hold, and saves the same files."""
+        generate_dataset(self.base_dir / "csv", 20, 5, 2, seed=7, today=self.today)
+        on_disk = FamilyManagement(self.base_dir / "csv", ReminderSystem(self.base_dir / "csv"))
+        in_memory = generate_memory_family(20, 5, 2, seed=7, today=self.today, base_dir=self.base_dir / "memory")
+        self.assertFalse((self.base_dir / "memory").exists())
+
+        def contents(family):
+            inventories = {name: list(inventory.iter_records()) for name, inventory in family.members.items()}
+            return inventories, sorted(map(repr, family.reminder_system.iter_records()))
+
+        self.assertEqual(contents(in_memory), contents(on_disk))
+        self.assertTrue(in_memory.save_to_disk())
+        saved = FamilyManagement(self.base_dir / "memory", ReminderSystem(self.base_dir / "memory"))
+        self.assertEqual(contents(saved), contents(on_disk))
+
+    def test_low_stock_sweep_sets_reminders(self):
+        """Test that the family sweep sets the low stock reminders it finds, in bulk."""
+        family = generate_memory_family(50, 6, 0, seed=2, today=self.today)
+        warnings = family.get_all_low_stock()
+        self.assertTrue(warnings)
+        reminders = family.reminder_system.find_reminders(kind=KIND_LOW_STOCK)
+        self.assertEqual(sorted((r.member, r.med_id) for r in reminders), sorted(w[:2] for w in warnings))
+
+    def test_check_limits(self):
+        """Test that every exceeded bound is reported and an unknown peak is not checked."""
+        result = {"members": 1000, "backend": "csv", "load": 12.0, "sweep": 0.5, "peak_mb": None}
+        self.assertEqual(len(check_limits(result)), 1)
+        self.assertEqual(check_limits(result, ScaleLimits(load=20, sweep=1, peak_mb=1)), [])
+        result.update(sweep=5.0, peak_mb=2000)
+        self.assertEqual([message.split(": ")[1].split()[0] for message in check_limits(result)],
+                         ["load", "sweep", "peak_mb"])
+
+    def check_scale(self, members):
+        """Run the scale test of one size on both backends and check its bounds."""
+        for backend in ("csv", "memory"):
+            with self.subTest(backend=backend):
+                result = run_scale(members, backend=backend)
+                self.assertGreater(result["low_stock"], 0)
+                self.assertEqual(check_limits(result), [])
+
+    @unittest.skipUnless(1000 in SCALE_SIZES, "set FAMILYMEDT_SCALE=1000 to run")
+    def test_scale_1k(self):
+        """Test load time, sweep time and peak memory with 1,000 members."""
+        self.check_scale(1000)
+
+    @unittest.skipUnless(10000 in SCALE_SIZES, "set FAMILYMEDT_SCALE=10000 to run")
+    def test_scale_10k(self):
+        """Test load time, sweep time and peak memory with 10,000 members."""
+        self.check_scale(10000)
+
+    @unittest.skipUnless(100000 in SCALE_SIZES, "set FAMILYMEDT_SCALE=100000 to run")
+    def test_scale_100k(self):
+        """Test load time, sweep time and peak memory with 100,000 members."""
+        self.check_scale(100000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+# test_schedule.py
+# Unit tests for dose schedules and their incremental updates.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from medication_management import events
+from medication_management.medication import Medication
+from medication_management.prescription import PrescriptionMedication
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from user_management.schedule import DoseScheduler, dose_plan
+from main import run_command
+from tests.isolation import IsolatedTestCase
+
+class TestSchedule(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestSchedule class...")
+        cls.day = date(2024, 1, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestSchedule class...")
+
+    def setUp(self):
+        """Create a family of two members with scheduled medications."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+        self.family = FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+        self.family.add_member("Alice")
+        self.family.add_member("Bob")
+        self.alice = self.family.members["Alice"]
+        self.alice.add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+        self.alice.add_medication(Medication("Metformin", "500mg", "twice daily", 2, 60))
+        self.family.members["Bob"].add_medication(Medication("Vitamin D", "1000IU", "every other day", 1, 30))
+        self.scheduler = DoseScheduler(self.family)
+
+    def tearDown(self):
+        """Stop the scheduler and restore the event sink."""
+        self.scheduler.close()
+        events.set_sink(self.previous_sink)
+
+    def at(self, hour, day=None):
+        """Return a time on the test day."""
+        return datetime.combine(day or self.day, datetime.min.time()).replace(hour=hour)
+
+    def test_dose_plan(self):
+        """Test the dose times and units derived from frequency and daily dosage."""
+        self.assertEqual(dose_plan("daily", 1), (1, ((480, 1),)))
+        self.assertEqual(dose_plan("3 times/day", 6), (1, ((480, 2), (840, 2), (1200, 2))))
+        self.assertEqual(dose_plan("twice daily", 1), (1, ((480, 0.5), (1200, 0.5))))
+        self.assertEqual(dose_plan("every 4 hours", 6)[1][0], (0, 1))  # Spread over the whole day
+        self.assertEqual(dose_plan("weekly", 2), (7, ((480, 2),)))
+        self.assertIsNone(dose_plan("as needed", 1))
+        self.assertIsNone(dose_plan("daily", 0))
+
+    def test_stream_is_time_ordered(self):
+        """Test that the family's doses come in time order over several days."""
+        doses = list(self.scheduler.stream(self.day, days=2))
+        self.assertEqual([dose.time for dose in doses], sorted(dose.time for dose in doses))
+        self.assertEqual([(dose.time, dose.member, dose.name, dose.units) for dose in doses[:3]], [
+            (self.at(8), "Alice", "Aspirin", 1),
+            (self.at(8), "Alice", "Metformin", 1),
+            (self.at(8), "Bob", "Vitamin D", 1),
+        ])
+        # Every other day: Vitamin D on one of the two days only
+        self.assertEqual(len([dose for dose in doses if dose.member == "Bob"]), 1)
+        self.assertEqual(len(doses), 7)
+
+    def test_stream_is_lazy(self):
+        """Test that an endless stream can be consumed one dose at a time."""
+        stream = self.scheduler.stream(self.day, days=None)
+        first = [next(stream) for _ in range(1000)]
+        self.assertGreater(first[-1].time.date(), date(2024, 6, 1))
+
+    def test_member_day_and_upcoming(self):
+        """Test the doses of one member and the doses due within some hours."""
+        self.assertEqual([dose.name for dose in self.scheduler.member_day("Alice", self.day)],
+                         ["Aspirin", "Metformin", "Metformin"])
+        self.assertEqual(self.scheduler.member_day("Carol", self.day), [])
+        upcoming = self.scheduler.upcoming(self.at(9), hours=24, members=["Alice"])
+        self.assertEqual([dose.time for dose in upcoming],
+                         [self.at(20), self.at(8, date(2024, 1, 2)), self.at(8, date(2024, 1, 2))])
+
+    def test_incremental_updates(self):
+        """Test that adding, changing and deleting a medication updates the schedule."""
+        self.assertEqual(len(self.scheduler.member_day("Alice", self.day)), 3)
+        med_id = self.alice.add_medication(Medication("Ibuprofen", "200mg", "three times a day", 3, 30))
+        self.assertEqual(len(self.scheduler.member_day("Alice", self.day)), 6)
+
+        self.assertTrue(self.alice.update_medication(med_id, frequency="daily", daily_dosage=1))
+        self.assertEqual(self.alice.medications[med_id].stock, 30)
+        self.assertEqual(len(self.scheduler.member_day("Alice", self.day)), 4)
+
+        self.alice.delete_medication(1)
+        self.assertEqual([dose.name for dose in self.scheduler.member_day("Alice", self.day)],
+                         ["Metformin", "Ibuprofen", "Metformin"])  # By medication ID at the same time
+
+        self.family.undo()  # Restores the deleted Aspirin
+        self.assertEqual(len(self.scheduler.member_day("Alice", self.day)), 4)
+
+        self.family.add_member("Carol")
+        self.family.members["Carol"].add_medication(Medication("Aspirin", "100mg", "daily", 1, 30))
+        self.assertEqual(len(self.scheduler.member_day("Carol", self.day)), 1)
+        self.family.delete_member("Bob")
+        self.assertEqual({dose.member for dose in self.scheduler.stream(self.day, days=2)}, {"Alice", "Carol"})
+
+    def test_update_medication_rejects_stock_and_unknown_fields(self):
+        """Test that update_medication only changes the descriptive fields."""
+        with self.assertRaises(ValueError):
+            self.alice.update_medication(1, stock=5)
+        with self.assertRaises(ValueError):
+            self.alice.update_medication(1, colour="red")
+        with self.assertRaises(ValueError):
+            self.alice.update_medication(1, daily_dosage=0)
+        self.assertFalse(self.alice.update_medication(99, frequency="daily"))
+
+    def test_prescription_active_days(self):
+        """Test that a prescription is scheduled between its prescription and expiration dates."""
+        self.alice.add_medication(PrescriptionMedication(
+            "Amoxicillin", "500mg", "daily", 1, 10, "Dr. Smith", "2024-01-02", "Infection", "", "2024-01-03"))
+        days = [dose.time.date() for dose in self.scheduler.stream(self.day, days=5, members=["Alice"])
+                if dose.name == "Amoxicillin"]
+        self.assertEqual(days, [date(2024, 1, 2), date(2024, 1, 3)])
+
+    def test_cli_schedule(self):
+        """Test the schedule batch command."""
+        argv = ["--base-dir", str(self.base_dir), "--quiet", "schedule", "--start", "2024-01-01", "--member", "Bob"]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(run_command(argv), 0)
+        self.assertIn("Bob: Vitamin D (ID 1), 1 unit(s)", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+# test_server.py
+# Unit tests for the HTTP/JSON service and its write coalescing.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http.client
+import json
+import threading
+import time
+import unittest
+from benchmarks.load_test import run_load_test
+from medication_management import events
+from medication_management.inventory import INVENTORY_COLUMNS, InventoryManagement
+from server import ApiError, make_server
+from tests.isolation import IsolatedTestCase
+
+class TestServer(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestServer class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestServer class...")
+
+    def setUp(self):
+        """Start a server on a free port over an empty data directory."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+        self.server = make_server(self.base_dir, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.service.close()
+        events.set_sink(self.previous_sink)
+
+    def request(self, method, path, body=None, connection=None):
+        """Send a request, with a body encoded as JSON unless it is bytes, and return (status, decoded JSON body)."""
+        own = connection is None
+        connection = connection or http.client.HTTPConnection("127.0.0.1", self.port)
+        data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode("utf-8")
+        connection.request(method, path, body=data)
+        response = connection.getresponse()
+        payload = response.read()
+        if own:
+            connection.close()
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            return response.status, json.loads(payload)
+        return response.status, payload.decode("utf-8")
+
+    def add_alice(self):
+        """Add the member Alice with one medication and return its ID."""
+        self.request("POST", "/members", {"name": "Alice"})
+        status, record = self.request("POST", "/members/Alice/medications", {
+            "name": "Aspirin", "dosage": "100mg", "frequency": "daily", "daily_dosage": 1, "stock": 30
+        })
+        self.assertEqual(status, 201)
+        return record["med_id"]
+
+    def test_member_and_medication_crud(self):
+        """Test that members and medications can be added, read and deleted."""
+        med_id = self.add_alice()
+        self.assertEqual(self.request("GET", "/members"), (200, {"members": ["Alice"]}))
+
+        status, record = self.request("GET", f"/members/Alice/medications/{med_id}")
+        self.assertEqual(status, 200)
+        self.assertEqual(record["name"], "Aspirin")
+        self.assertFalse(record["is_prescription"])
+
+        status, record = self.request("POST", f"/members/Alice/medications/{med_id}/stock", {"quantity": -28})
+        self.assertEqual((status, record["stock"]), (200, 2))
+        status, payload = self.request("GET", "/members/Alice/low-stock")
+        self.assertEqual(payload["low_stock"], [{"med_id": med_id, "name": "Aspirin", "days_left": 2}])
+
+        # Writes are saved before the response is sent
+        saved = InventoryManagement("Alice", self.base_dir)
+        self.assertEqual(saved.medications[med_id].stock, 2)
+
+        self.assertEqual(self.request("DELETE", f"/members/Alice/medications/{med_id}")[0], 200)
+        self.assertEqual(self.request("GET", f"/members/Alice/medications/{med_id}")[0], 404)
+        self.assertEqual(self.request("DELETE", "/members/Alice")[0], 200)
+        self.assertEqual(self.request("GET", "/members"), (200, {"members": []}))
+
+    def test_errors(self):
+        """Test the status codes of invalid requests."""
+        med_id = self.add_alice()
+        self.assertEqual(self.request("GET", "/members/Bob/medications")[0], 404)
+        self.assertEqual(self.request("GET", "/nowhere")[0], 404)
+        self.assertEqual(self.request("DELETE", "/members")[0], 405)
+        self.assertEqual(self.request("POST", "/members", {"name": "Alice"})[0], 409)
+        self.assertEqual(self.request("POST", "/members", {"name": ""})[0], 400)
+        self.assertEqual(self.request("POST", "/members/Alice/medications", {"name": "X"})[0], 400)
+        self.assertEqual(self.request("POST", f"/members/Alice/medications/{med_id}/stock", {"quantity": "a"})[0], 400)
+        self.assertEqual(self.request("POST", f"/members/Alice/medications/{med_id}/stock", {"quantity": -99})[0], 409)
+        self.assertEqual(self.request("GET", "/members/Alice/reports/stock?format=xml")[0], 400)
+        # A body that is not a JSON object is rejected, not read as an empty one
+        for body in (b"{not json", b"[1, 2]"):
+            status, payload = self.request("POST", f"/members/Alice/medications/{med_id}/stock", body)
+            self.assertEqual(status, 400)
+            self.assertIn("JSON", payload["error"])
+
+    def test_medication_record_matches_csv_schema(self):
+        """Test that the API returns medications as records in the inventory CSV schema."""
+        self.request("POST", "/members", {"name": "Alice"})
+        status, record = self.request("POST", "/members/Alice/medications", {
+            "name": "Lisinopril", "dosage": "10mg", "frequency": "daily", "daily_dosage": 1, "stock": 30,
+            "is_prescription": True, "doctor_name": "Dr. Lee", "prescription_date": "2024-01-01",
+            "indication": "Hypertension", "warnings": "None", "expiration_date": "2030-01-01"
+        })
+        self.assertEqual(status, 201)
+        status, fetched = self.request("GET", f"/members/Alice/medications/{record['med_id']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(set(fetched), set(INVENTORY_COLUMNS))
+        self.assertTrue(fetched["is_prescription"])
+
+    def test_reports_and_reminders(self):
+        """Test reports in each format and the reminder endpoints."""
+        med_id = self.add_alice()
+        status, report = self.request("GET", "/members/Alice/reports/stock?format=csv")
+        self.assertEqual(status, 200)
+        self.assertIn("Aspirin", report)
+        status, report = self.request("GET", "/members/Alice/reports/stock")
+        self.assertEqual(report[0]["name"], "Aspirin")
+
+        self.assertEqual(self.request("POST", "/reminders", {
+            "member": "Alice", "med_id": med_id, "message": "Refill", "due_date": "2030-01-01"
+        })[0], 201)
+        status, payload = self.request("GET", "/reminders?member=Alice")
+        self.assertEqual([(r["message"], r["due_date"]) for r in payload["reminders"]], [("Refill", "2030-01-01")])
+        self.assertEqual(self.request("DELETE", f"/reminders/Alice/{med_id}")[0], 200)
+        self.assertEqual(self.request("GET", "/reminders?member=Alice")[1], {"reminders": []})
+
+    def test_keep_alive(self):
+        """Test that one connection serves many requests."""
+        self.add_alice()
+        connection = http.client.HTTPConnection("127.0.0.1", self.port)
+        for _ in range(5):
+            self.assertEqual(self.request("GET", "/members", connection=connection)[0], 200)
+        connection.close()
+
+    def test_writes_behind_a_delete_report_not_found(self):
+        """Test that a write queued behind the deletion of its medication or member is a 404, not a 409."""
+        med_id = self.add_alice()
+        service = self.server.service
+        release = threading.Event()
+        results = {}
+
+        def queue(name, call):
+            def run():
+                try:
+                    results[name] = call()
+                except ApiError as e:
+                    results[name] = (e.status, str(e))
+            waiting = service.coalescer._queue.qsize() + 1
+            thread = threading.Thread(target=run)
+            thread.start()
+            while service.coalescer._queue.qsize() < waiting:
+                time.sleep(0.001)
+            return thread
+
+        def block(family):
+            started.set()
+            release.wait()
+
+        started = threading.Event()
+        threads = [threading.Thread(target=service.coalescer.submit, args=(block,))]
+        threads[0].start()
+        started.wait()  # The writer is busy until released
+        threads.append(queue("delete medication", lambda: service.delete_medication("Alice", med_id)))
+        threads.append(queue("update stock", lambda: service.update_stock("Alice", med_id, {"quantity": 1})))
+        threads.append(queue("delete member", lambda: service.delete_member("Alice")))
+        threads.append(queue("add medication", lambda: service.add_medication("Alice", {
+            "name": "Ibuprofen", "dosage": "200mg", "frequency": "daily", "daily_dosage": 1, "stock": 5})))
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results["delete medication"], {"deleted": med_id})
+        self.assertEqual(results["update stock"], (404, f"Medication ID {med_id} not found."))
+        self.assertEqual(results["delete member"], {"deleted": "Alice"})
+        self.assertEqual(results["add medication"], (404, "Family member 'Alice' not found."))
+
+    def test_concurrent_writes_are_coalesced(self):
+        """Test that concurrent writes are all applied and share flushes."""
+        med_id = self.add_alice()
+        before = self.server.service.stats()
+        threads, updates = 8, 25
+
+        def client():
+            connection = http.client.HTTPConnection("127.0.0.1", self.port)
+            for _ in range(updates):
+                self.request("POST", f"/members/Alice/medications/{med_id}/stock", {"quantity": 1}, connection)
+            connection.close()
+
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        stats = self.server.service.stats()
+        writes = stats["writes"] - before["writes"]
+        flushes = stats["flushes"] - before["flushes"]
+        self.assertEqual(writes, threads * updates)
+        self.assertLess(flushes, writes)
+        saved = InventoryManagement("Alice", self.base_dir)
+        self.assertEqual(saved.medications[med_id].stock, 30 + threads * updates)
+        # Each write stays its own undo step
+        ops = [entry["op"] for entry in self.server.service.family.oplog.entries()]
+        self.assertEqual(ops.count("update_stock"), writes)
+        self.assertNotIn("batch", ops)
+
+    def test_load_test(self):
+        """Test that the load test reports throughput and latency without errors."""
+        self.add_alice()
+        result = run_load_test(f"http://127.0.0.1:{self.port}", clients=2, requests_per_client=20)
+        self.assertEqual(result["requests"], 40)
+        self.assertEqual(result["errors"], 0)
+        self.assertGreater(result["requests_per_second"], 0)
+        self.assertGreaterEqual(result["p99_ms"], result["p50_ms"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# test_snapshot.py
+# Unit tests for the binary inventory snapshot format.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import io
+import time
+import unittest
+from unittest import mock
+from medication_management.medication import Medication
+from medication_management.prescription import PrescriptionMedication
+from medication_management.inventory import InventoryManagement
+from medication_management.snapshot import InventorySnapshot, write_snapshot
+from tests.isolation import IsolatedTestCase
+
+class TestSnapshot(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestSnapshot class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestSnapshot class...")
+
+    def setUp(self):
+        """Create an inventory with one plain and one prescription medication."""
+        super().setUp()
+        self.inventory = InventoryManagement("SnapUser", self.base_dir)
+        self.inventory.add_medication(Medication("Vitamin C", "500mg", "daily", 2, 5))
+        self.inventory.add_medication(PrescriptionMedication(
+            "Antibiotic", "250mg", "twice daily", 2, 40, "Dr. Smith",
+            "2024-01-01", "Infection", "Take with food", "2030-01-01"
+        ))
+
+    def test_round_trip_and_csv_export(self):
+        """Test a snapshot holds the same records and exports the CSV schema"""
+        with InventorySnapshot(self.inventory.snapshot_file) as snapshot:
+            self.assertEqual(len(snapshot), 2)
+            self.assertEqual(list(snapshot.iter_records()), list(self.inventory.iter_records()))
+            self.assertEqual(snapshot.field(1, 'doctor_name'), "Dr. Smith")
+            buffer = io.StringIO()
+            snapshot.to_csv(buffer)
+        self.assertEqual(buffer.getvalue(), self.inventory.export("csv"))
+
+    def test_check_low_stock(self):
+        """Test the snapshot low stock query matches InventoryManagement.check_low_stock"""
+        with InventorySnapshot(self.inventory.snapshot_file) as snapshot:
+            self.assertEqual(snapshot.check_low_stock(), self.inventory.check_low_stock())
+            self.assertEqual(snapshot.check_low_stock(), [(1, "Vitamin C", 2)])
+
+    def test_startup_loads_snapshot_without_parsing_csv(self):
+        """Test an unchanged inventory is loaded from the snapshot"""
+        with mock.patch("medication_management.inventory.pd.read_csv") as read_csv:
+            reloaded = InventoryManagement("SnapUser", self.base_dir)
+        read_csv.assert_not_called()
+        self.assertEqual(list(reloaded.iter_records()), list(self.inventory.iter_records()))
+        self.assertEqual(reloaded.next_med_id, 3)
+        self.assertIsInstance(reloaded.medications[2], PrescriptionMedication)
+
+    def test_stale_or_invalid_snapshot_falls_back_to_csv(self):
+        """Test an edited CSV or a corrupt snapshot is not used"""
+        with open(self.inventory.inventory_file) as stream:
+            header = stream.readline().strip().split(",")
+        with open(self.inventory.inventory_file, "a", newline="") as stream:
+            csv.DictWriter(stream, fieldnames=header).writerow({
+                'med_id': 3, 'name': "Aspirin", 'dosage': "100mg", 'frequency': "daily",
+                'daily_dosage': 1, 'stock': 10, 'is_prescription': False
+            })
+        self.assertIsNone(self.inventory.open_snapshot())
+        self.assertEqual(sorted(InventoryManagement("SnapUser", self.base_dir).medications), [1, 2, 3])
+
+        self.inventory.snapshot_file.write_bytes(b"not a snapshot")
+        with self.assertRaises(ValueError):
+            InventorySnapshot(self.inventory.snapshot_file)
+        self.assertEqual(sorted(InventoryManagement("SnapUser", self.base_dir).medications), [1, 2, 3])
+
+        # Loading the CSV rebuilt the snapshot
+        snapshot = self.inventory.open_snapshot()
+        self.assertEqual(list(snapshot.med_ids), [1, 2, 3])
+        snapshot.close()
+
+    def test_same_size_rewrite_is_detected(self):
+        """Test a CSV rewritten with the same size and modification time is not read from the snapshot"""
+        path = self.inventory.inventory_file
+        mtime = path.stat().st_mtime_ns
+        text = path.read_text()
+        self.assertIn(",5,", text)
+        path.write_text(text.replace(",5,", ",6,", 1))  # Another process sets the stock from 5 to 6
+        os.utime(path, ns=(mtime, mtime))
+        self.assertIsNone(self.inventory.open_snapshot())
+        self.assertEqual(InventoryManagement("SnapUser", self.base_dir).medications[1].stock, 6)
+
+    def test_snapshot_is_restamped_outside_racy_window(self):
+        """Test a snapshot verified by hash is stamped again, so the next start skips hashing"""
+        path = self.inventory.inventory_file
+        past = time.time() - 60
+        os.utime(path, (past, past))
+        InventoryManagement("SnapUser", self.base_dir)  # Hashes the CSV and stamps it again
+        with mock.patch("medication_management.cache._digest") as digest, \
+                mock.patch("medication_management.inventory.pd.read_csv") as read_csv:
+            reloaded = InventoryManagement("SnapUser", self.base_dir)
+        digest.assert_not_called()
+        read_csv.assert_not_called()
+        self.assertEqual(list(reloaded.iter_records()), list(self.inventory.iter_records()))
+
+    def test_empty_snapshot(self):
+        """Test a snapshot without medications"""
+        path = self.base_dir / "data" / "empty.snap"
+        write_snapshot(path, {})
+        with InventorySnapshot(path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertEqual(snapshot.check_low_stock(), [])
+            self.assertFalse(snapshot.is_fresh(self.inventory.inventory_file))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,35 +6,182 @@ import os
 # Add the project's root directory to the Python module search path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import argparse
+import io
+import time
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 # Import all test classes to include in the test suite
 from tests.test_medication import TestMedication
 from tests.test_prescription import TestPrescription
 from tests.test_inventory import TestInventory
 from tests.test_family import TestFamily
 from tests.test_reminder import TestReminder
+from tests.test_cli import TestCli
+from tests.test_report import TestReport
+from tests.test_analytics import TestAnalytics
+from tests.test_benchmarks import TestBenchmarks
+from tests.test_metrics import TestMetrics
+from tests.test_events import TestEvents
+from tests.test_snapshot import TestSnapshot
+from tests.test_cache import TestCache
+from tests.test_locking import TestLocking
+from tests.test_concurrency import TestConcurrency
+from tests.test_server import TestServer
+from tests.test_group_commit import TestGroupCommit
+from tests.test_oplog import TestOperationLog
+from tests.test_interactions import TestInteractions
+from tests.test_units import TestUnits
+from tests.test_lots import TestLots
+from tests.test_refill import TestRefill
+from tests.test_schedule import TestSchedule
+from tests.test_names import TestNames
+from tests.test_memory import TestMemory
+from tests.test_scale import TestScale
+from tests.test_sweep import TestSweep
+
+# All test classes, in the order they run
+TEST_CASES = [
+    TestMedication,
+    TestPrescription,
+    TestInventory,
+    TestFamily,
+    TestReminder,
+    TestCli,
+    TestReport,
+    TestAnalytics,
+    TestBenchmarks,
+    TestMetrics,
+    TestEvents,
+    TestSnapshot,
+    TestCache,
+    TestLocking,
+    TestConcurrency,
+    TestServer,
+    TestGroupCommit,
+    TestOperationLog,
+    TestInteractions,
+    TestUnits,
+    TestLots,
+    TestRefill,
+    TestSchedule,
+    TestNames,
+    TestMemory,
+    TestScale,
+    TestSweep,
+]
 
 def create_test_suite():
     """Create and return a test suite containing all test cases"""
     suite = unittest.TestSuite()
     
     # Add all test cases from each test class
-    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestMedication))
-    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestPrescription))
-    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestInventory))
-    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestFamily))
-    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestReminder))
+    for test_case in TEST_CASES:
+        suite.addTests(unittest.TestLoader().loadTestsFromTestCase(test_case))
     
     return suite
 
+class TimedTextTestResult(unittest.TextTestResult):
+    """A test result that also records how long every test took."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []  # (test id, seconds) in run order
+        self._started = None
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.timings.append((test.id(), time.perf_counter() - self._started))
+
+def run_test(name):
+    """
+    Run one test, in a worker process.
+
+    Args:
+        name (str): The dotted name of the test method.
+
+    Returns:
+        tuple: (output, tests run, failures, errors, skipped, timings), with
+        the counts as integers.
+    """
+    stream = io.StringIO()
+    result = TimedTextTestResult(unittest.runner._WritelnDecorator(stream), True, 2)
+    with redirect_stdout(stream):  # Keep what the test prints with its result
+        unittest.TestLoader().loadTestsFromName(name).run(result)
+    result.printErrors()
+    return (stream.getvalue(), result.testsRun, len(result.failures), len(result.errors),
+            len(result.skipped), result.timings)
+
+def run_parallel(jobs):
+    """
+    Run the tests in a pool of worker processes.
+
+    Every test runs in a base directory of its own (see tests/isolation.py),
+    so any two tests can run side by side; they are handed out one at a
+    time, so a few slow tests do not hold up a whole class. The output of
+    each test is printed in suite order once it is done.
+
+    Args:
+        jobs (int): The number of worker processes.
+
+    Returns:
+        tuple: (successful, timings).
+    """
+    names = [test.id() for test in create_test_suite()]
+    started = time.perf_counter()
+    run = failures = errors = skipped = 0
+    timings = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for output, tests, failed, errored, skips, test_timings in pool.map(run_test, names):
+            sys.stderr.write(output)
+            run += tests
+            failures += failed
+            errors += errored
+            skipped += skips
+            timings.extend(test_timings)
+    print(f"Ran {run} tests in {time.perf_counter() - started:.3f}s with {jobs} processes", file=sys.stderr)
+    summary = f"failures={failures}, errors={errors}, skipped={skipped}"
+    print(f"{'OK' if not failures and not errors else 'FAILED'} ({summary})", file=sys.stderr)
+    return not failures and not errors, timings
+
+def print_timings(timings, count):
+    """Print the slowest tests: none if count is None, all of them if count is 0."""
+    if count is None:
+        return
+    timings = sorted(timings, key=lambda timing: timing[1], reverse=True)
+    print("\nTest durations (slowest first):", file=sys.stderr)
+    for test_id, seconds in (timings[:count] if count else timings):
+        print(f"{seconds:8.3f}s  {test_id}", file=sys.stderr)
+
+def parse_args(argv=None):
+    """Parse the command-line options of the test suite."""
+    parser = argparse.ArgumentParser(description="Run the FamilyMedT test suite.")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="run the tests in this many processes (default: 1)")
+    parser.add_argument("--durations", type=int, default=None, metavar="N",
+                        help="print the N slowest tests, or all of them for 0, as pytest does "
+                             "(default: none)")
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
-    # Create and run the test suite
-    suite = create_test_suite()
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    args = parse_args()
+    if args.jobs > 1:
+        successful, timings = run_parallel(args.jobs)
+    else:
+        # Create and run the test suite
+        suite = create_test_suite()
+        runner = unittest.TextTestRunner(verbosity=2, resultclass=TimedTextTestResult)
+        result = runner.run(suite)
+        successful, timings = result.wasSuccessful(), result.timings
+    print_timings(timings, args.durations)
     
     # Exit with appropriate status code
-    if result.wasSuccessful():
+    if successful:
         exit(0)
     else:
-        exit(1)
\ No newline at end of file
+        exit(1)
@@ -0,0 +1,156 @@
+# test_sweep.py
+# Unit tests for the streaming low stock and expiry sweep over the inventory files.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from benchmarks.generators import generate_dataset
+from main import run_command
+from medication_management import events
+from medication_management.lots import LotQueue
+from medication_management.prescription import PrescriptionMedication
+from medication_management.medication import Medication
+from user_management.family import FamilyManagement
+from user_management.reminder import ReminderSystem
+from user_management.sweep import (
+    SWEEP_LOT_EXPIRY, SWEEP_LOW_STOCK, SWEEP_PRESCRIPTION_EXPIRY, SweepResult, sweep_inventories
+)
+from tests.isolation import IsolatedTestCase
+
+class TestSweep(IsolatedTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestSweep class...")
+        cls.today = date.today()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestSweep class...")
+
+    def setUp(self):
+        """Start every test from an empty data directory, with events silenced."""
+        super().setUp()
+        self.previous_sink = events.set_sink(events.NullSink())
+
+    def tearDown(self):
+        """Restore the event sink."""
+        events.set_sink(self.previous_sink)
+
+    def load_family(self):
+        """Load the family data saved in the test directory."""
+        return FamilyManagement(self.base_dir, ReminderSystem(self.base_dir))
+
+    def add_family(self):
+        """Save two members with one medication meeting each condition."""
+        family = self.load_family()
+        family.add_member("Alice")
+        family.add_member("Bob")
+        yesterday = (self.today - timedelta(days=1)).isoformat()
+        soon = (self.today + timedelta(days=5)).isoformat()
+        alice = family.members["Alice"]
+        alice.add_medication(Medication("Aspirin", "100mg", "daily", 1, 2))
+        alice.add_medication(PrescriptionMedication("Lisinopril", "10mg", "daily", 1, 60, "Dr. Lee",
+                                                    "2024-01-01", "Hypertension", "None", yesterday))
+        bob = family.members["Bob"]
+        bob.add_medication(Medication("Vitamin D", "1000IU", "daily", 1, 90))
+        bob.add_medication(PrescriptionMedication("Metformin", "500mg", "twice daily", 2, 100, "Dr. Chen",
+                                                  "2024-01-01", "Diabetes", "None", soon))
+        # 20 units expired yesterday and 10 expire soon, so 6 + 3 units (9 days) are usable
+        ibuprofen = Medication("Ibuprofen", "200mg", "daily", 1, 33)
+        ibuprofen.lots = LotQueue.parse(f"20@{yesterday};10@{soon};3")
+        bob.add_medication(ibuprofen)
+        family.save_all_data()
+        return family
+
+    def test_conditions(self):
+        """Test that low stock, expired prescriptions and expired lots are reported in file order."""
+        self.add_family()
+        reminders_file = self.base_dir / "data" / "reminders.csv"
+        reminders = reminders_file.read_text()
+        results = list(sweep_inventories(self.base_dir, today=self.today))
+        self.assertEqual(results, [
+            SweepResult("Alice", 1, "Aspirin", SWEEP_LOW_STOCK, 2, None, None),
+            SweepResult("Alice", 2, "Lisinopril", SWEEP_PRESCRIPTION_EXPIRY, None,
+                        (self.today - timedelta(days=1)).isoformat(), None),
+            SweepResult("Bob", 3, "Ibuprofen", SWEEP_LOT_EXPIRY, None,
+                        (self.today - timedelta(days=1)).isoformat(), 20),
+        ])
+        # A longer window adds what expires within it
+        soon = (self.today + timedelta(days=5)).isoformat()
+        results = list(sweep_inventories(self.base_dir, threshold=9, expiry_days=7, today=self.today))
+        self.assertIn(SweepResult("Bob", 3, "Ibuprofen", SWEEP_LOW_STOCK, 9, None, None), results)
+        self.assertIn(SweepResult("Bob", 2, "Metformin", SWEEP_PRESCRIPTION_EXPIRY, None, soon, None), results)
+        self.assertIn(SweepResult("Bob", 3, "Ibuprofen", SWEEP_LOT_EXPIRY, None,
+                                  (self.today - timedelta(days=1)).isoformat(), 30), results)
+        # The sweep only reads: no reminder is set
+        self.assertEqual(reminders_file.read_text(), reminders)
+
+    def test_matches_family_sweep(self):
+        """Test that the streamed low stock findings match get_all_low_stock() on generated data."""
+        generate_dataset(self.base_dir, 40, 8, 0, seed=5, today=self.today)
+        streamed = [(r.member, r.med_id, r.name, r.days_left)
+                    for r in sweep_inventories(self.base_dir, today=self.today) if r.kind == SWEEP_LOW_STOCK]
+        self.assertTrue(streamed)
+        self.assertEqual(streamed, self.load_family().get_all_low_stock())
+
+    def test_chunk_size_does_not_change_results(self):
+        """Test that any chunk size gives the same findings, in the same order."""
+        generate_dataset(self.base_dir, 30, 7, 0, seed=9, today=self.today)
+        expected = list(sweep_inventories(self.base_dir, expiry_days=30, chunk_size=100000, today=self.today))
+        for chunk_size in (1, 3, 7, 50):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(sweep_inventories(self.base_dir, expiry_days=30,
+                                                        chunk_size=chunk_size, today=self.today)), expected)
+        with self.assertRaises(ValueError):
+            list(sweep_inventories(self.base_dir, chunk_size=0))
+
+    def test_memory_bounded_by_chunk_size(self):
+        """Test that peak memory follows the chunk size rather than the number of rows."""
+        generate_dataset(self.base_dir, 400, 10, 0, seed=1, today=self.today)
+
+        def peak(chunk_size):
+            tracemalloc.start()
+            try:
+                for _ in sweep_inventories(self.base_dir, chunk_size=chunk_size, today=self.today):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        self.assertLess(peak(100) * 4, peak(100000))
+
+    def test_invalid_rows_and_missing_files_are_skipped(self):
+        """Test that a bad row is reported and skipped and a member without a file is ignored."""
+        self.add_family()
+        inventory_file = self.base_dir / "data" / "Alice_inventory.csv"
+        with open(inventory_file, "a") as stream:
+            stream.write("x,Broken,1mg,daily,not-a-number,1,False,,,,,,\n")
+        (self.base_dir / "data" / "Bob_inventory.csv").unlink()
+        sink = events.MemorySink()
+        events.set_sink(sink)
+        results = list(sweep_inventories(self.base_dir, today=self.today))
+        self.assertEqual({r.member for r in results}, {"Alice"})
+        self.assertTrue(any("Alice_inventory.csv" in event.message for event in sink.events))
+
+    def test_cli(self):
+        """Test that the sweep command prints one line per finding without loading the family."""
+        self.add_family()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = run_command(["--base-dir", str(self.base_dir), "sweep", "--chunk-size", "2"])
+        self.assertEqual(status, 0)
+        lines = output.getvalue().splitlines()
+        self.assertIn("Alice: Aspirin (ID 1), low stock, 2 day(s) left", lines)
+        self.assertEqual(len(lines), 3)
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(run_command(["--base-dir", str(self.base_dir), "sweep", "--chunk-size", "0"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# test_units.py
+# Unit tests for parsing dosage and frequency strings.
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from medication_management.medication import Medication
+from medication_management.units import Dosage, parse_dosage, parse_frequency
+
+class TestUnits(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared resources for all tests in the class."""
+        print("\nSetting up TestUnits class...")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared resources after all tests in the class."""
+        print("\nCleaning up TestUnits class...")
+
+    def test_parse_dosage(self):
+        """Test that dosages are converted to the normalized unit of their dimension."""
+        self.assertEqual(parse_dosage("500mg"), Dosage(500.0, "mg"))
+        self.assertEqual(parse_dosage(" 0.5 g"), Dosage(500.0, "mg"))
+        self.assertEqual(parse_dosage("250 mcg"), Dosage(0.25, "mg"))
+        self.assertEqual(parse_dosage("1,000 IU"), Dosage(1000.0, "iu"))
+        self.assertEqual(parse_dosage("250mg/5ml"), Dosage(250.0, "mg"))
+        self.assertEqual(parse_dosage("2 Tablets"), Dosage(2.0, "tablet"))
+        for text in ("", "mg", "5", "a lot", "5 spoons"):
+            self.assertIsNone(parse_dosage(text), text)
+
+    def test_parse_frequency(self):
+        """Test that frequencies are converted to doses per day."""
+        cases = {
+            "daily": 1, "Once a day": 1, "twice daily": 2, "2 times/day": 2, "3x a day": 3,
+            "TID": 3, "b.i.d.": 2, "every 8 hours": 3, "q12h": 2, "every other day": 0.5,
+            "every 2 weeks": 1 / 14, "once weekly": 1 / 7, "morning and evening": 2,
+            "1 tablet daily": 1, "at bedtime": 1, "every day": 1, "every week": 1 / 7, "each day": 1,
+            "everyday": 1, "twice every day": 2, "1 tablet every day": 1,
+        }
+        for text, expected in cases.items():
+            self.assertAlmostEqual(parse_frequency(text), expected, msg=text)
+        for text in ("", "as needed", "2 tablets PRN", "sometimes"):
+            self.assertIsNone(parse_frequency(text), text)
+
+    def test_parsing_is_cached(self):
+        """Test that each distinct string is parsed once."""
+        parse_dosage.cache_clear()
+        for _ in range(100):
+            parse_dosage("40mg")
+        info = parse_dosage.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 99))
+
+    def test_medication_fields(self):
+        """Test the parsed fields of a medication and the dosage consistency check."""
+        med = Medication("Test Med", "0.5 g", "twice daily", 4, 20)
+        self.assertEqual(med.dose, Dosage(500.0, "mg"))
+        self.assertEqual(med.doses_per_day, 2)
+        self.assertEqual(med.daily_amount, 2000)
+        self.assertIsNone(med.dosage_conflict())
+
+        med.daily_dosage = 3
+        self.assertIn("twice daily", med.dosage_conflict())
+        self.assertIsNone(Medication("Test Med", "?", "as needed", 1, 5).daily_amount)
+        self.assertIsNone(Medication("Test Med", "5mg", "weekly", 1, 5).dosage_conflict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+# Import necessary modules
+from datetime import date  # For projecting run-out dates
+import numpy as np  # For vectorized supply calculations
+import pandas as pd  # For the columnar snapshot and group-bys
+from medication_management.prescription import PrescriptionMedication
+from medication_management.interactions import normalize_drug_name  # Shared with the interaction checks
+from medication_management.units import parse_dosage, parse_frequency  # For the numeric dosage columns
+
+# Columns of the analytics snapshot
+SNAPSHOT_COLUMNS = [
+    'member', 'med_id', 'name', 'drug', 'dosage', 'frequency', 'daily_dosage',
+    'stock', 'usable', 'is_prescription', 'doctor', 'indication', 'expiration_date',
+    'dose_amount', 'dose_unit', 'doses_per_day', 'daily_amount'
+]
+
+# Keys accepted by FamilyAnalytics.group_by
+GROUP_KEYS = ("drug", "doctor", "indication", "member")
+
+
+class FamilyAnalytics:
+    """
+    Aggregate analytics over the inventories of all family members.
+
+    A columnar snapshot (one pandas DataFrame row per medication) is built
+    from the inventories and cached. Each member's part of the snapshot is
+    rebuilt only when that member's inventory has changed, so repeated
+    queries after a small change do not rebuild the whole family.
+
+    The 'usable' column is the stock that can be used before its lot
+    expires, as Medication.calculate_days_left() counts it, so days left
+    agree with the reminders. It depends on the day for medications with
+    dated lots; their members are rebuilt when another day is asked for.
+
+    Attributes:
+        family_manager (FamilyManagement): The family whose inventories are analysed.
+    """
+
+    def __init__(self, family_manager):
+        """
+        Initialize the FamilyAnalytics class.
+
+        Args:
+            family_manager (FamilyManagement): The family whose inventories are analysed.
+        """
+        self.family_manager = family_manager
+        self._member_frames = {}  # member -> (inventory, revision, day of the usable stock or None, DataFrame)
+        self._snapshot = None  # Cached concatenation of the member frames
+        self.rebuilds = 0  # Number of member frames built, for cache diagnostics
+
+    @staticmethod
+    def _build_member_frame(member, medications, today=None):
+        """
+        Build the columnar snapshot rows of one member's inventory.
+
+        Args:
+            member (str): The name of the family member.
+            medications (dict): The member's medications by ID.
+            today (date, optional): The day the usable stock is counted from. Defaults to today.
+
+        Returns:
+            tuple: (pandas.DataFrame with one row per medication and
+            SNAPSHOT_COLUMNS, whether the usable stock depends on the day).
+        """
+        parsed = ('dose_amount', 'dose_unit', 'doses_per_day', 'daily_amount')
+        columns = {column: [] for column in SNAPSHOT_COLUMNS if column not in parsed}
+        dated = False
+        for med_id, med in medications.items():
+            is_prescription = isinstance(med, PrescriptionMedication)
+            usable = med.stock
+            if isinstance(med.daily_dosage, int) and med.daily_dosage > 0:
+                lots = med.stock_lots()
+                if lots.is_dated():
+                    usable = lots.usable(med.daily_dosage, today)
+                    dated = True
+            columns['member'].append(member)
+            columns['med_id'].append(med_id)
+            columns['name'].append(med.name)
+            columns['drug'].append(normalize_drug_name(med.name))
+            columns['dosage'].append(med.dosage)
+            columns['frequency'].append(med.frequency)
+            columns['daily_dosage'].append(med.daily_dosage)
+            columns['stock'].append(med.stock)
+            columns['usable'].append(usable)
+            columns['is_prescription'].append(is_prescription)
+            columns['doctor'].append(med.doctor_name if is_prescription else None)
+            columns['indication'].append(med.indication if is_prescription else None)
+            columns['expiration_date'].append(med.expiration_date if is_prescription else None)
+
+        frame = pd.DataFrame(columns)
+        frame['daily_dosage'] = pd.to_numeric(frame['daily_dosage'], errors='coerce').astype('float64')
+        frame['stock'] = pd.to_numeric(frame['stock'], errors='coerce').astype('float64')
+        frame['usable'] = pd.to_numeric(frame['usable'], errors='coerce').astype('float64')
+
+        # Parse each distinct dosage and frequency string once, then map the columns
+        doses = {text: parse_dosage(text) for text in frame['dosage'].unique()}
+        frequencies = {text: parse_frequency(text) for text in frame['frequency'].unique()}
+        frame['dose_amount'] = frame['dosage'].map(
+            {text: dose.amount if dose else np.nan for text, dose in doses.items()}).astype('float64')
+        frame['dose_unit'] = frame['dosage'].map({text: dose.unit if dose else None for text, dose in doses.items()})
+        frame['doses_per_day'] = frame['frequency'].map(
+            {text: np.nan if value is None else value for text, value in frequencies.items()}).astype('float64')
+        frame['daily_amount'] = frame['dose_amount'] * frame['daily_dosage']
+        return frame[SNAPSHOT_COLUMNS], dated
+
+    def snapshot(self, today=None):
+        """
+        Return the columnar snapshot of all members' inventories.
+
+        Only the members whose inventory changed since the last call, or
+        whose usable stock was counted from another day, are rebuilt; the
+        combined frame is reused when nothing changed.
+
+        Args:
+            today (date, optional): The day the usable stock is counted from. Defaults to today.
+
+        Returns:
+            pandas.DataFrame: One row per medication with SNAPSHOT_COLUMNS.
+        """
+        today = today or date.today()
+        members = self.family_manager.members
+        changed = False
+
+        # Drop members that were deleted
+        for member in list(self._member_frames):
+            if member not in members:
+                del self._member_frames[member]
+                changed = True
+
+        # Rebuild members that are new or whose inventory changed
+        for member, inventory in members.items():
+            cached = self._member_frames.get(member)
+            revision = getattr(inventory, 'revision', None)
+            if (cached is None or cached[0] is not inventory or cached[1] != revision or revision is None
+                    or cached[2] not in (None, today)):
+                frame, dated = self._build_member_frame(member, inventory.medications, today)
+                self._member_frames[member] = (inventory, revision, today if dated else None, frame)
+                self.rebuilds += 1
+                changed = True
+
+        if changed or self._snapshot is None:
+            frames = [cached[3] for cached in self._member_frames.values() if not cached[3].empty]
+            if frames:
+                self._snapshot = pd.concat(frames, ignore_index=True)
+            else:
+                self._snapshot = self._build_member_frame(None, {})[0]
+        return self._snapshot
+
+    def supply_table(self, today=None):
+        """
+        Return the snapshot with days of supply and projected run-out dates.
+
+        Args:
+            today (date, optional): The projection start date. Defaults to today.
+
+        Returns:
+            pandas.DataFrame: The snapshot plus 'days_left' (whole days of
+            usable stock, NaN when daily_dosage is not positive) and 'runout_date'.
+        """
+        frame = self.snapshot(today).copy()
+        usable = frame['usable'].to_numpy()
+        daily = frame['daily_dosage'].to_numpy()
+        valid = daily > 0
+        days_left = np.full(len(frame), np.nan)
+        np.floor_divide(usable, daily, out=days_left, where=valid)
+        frame['days_left'] = days_left
+        start = pd.Timestamp(today or date.today())
+        frame['runout_date'] = start + pd.to_timedelta(frame['days_left'], unit='D')
+        return frame
+
+    def group_by(self, key, today=None):
+        """
+        Aggregate the family's medications by drug, doctor, indication or member.
+
+        Args:
+            key (str): One of "drug", "doctor", "indication" or "member".
+            today (date, optional): The projection start date. Defaults to today.
+
+        Returns:
+            pandas.DataFrame: Indexed by the key, with the number of
+            medications, the number of members taking them, total stock, total
+            daily dosage, combined days of supply (of the usable stock), the
+            fewest days left and the earliest run-out date.
+
+        Raises:
+            ValueError: If the key is not supported.
+        """
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Unsupported group key: {key}. Use one of {', '.join(GROUP_KEYS)}.")
+        frame = self.supply_table(today)
+        grouped = frame.dropna(subset=[key]).groupby(key, sort=True)
+        result = grouped.agg(
+            medications=('med_id', 'size'),
+            members=('member', 'nunique'),
+            total_stock=('stock', 'sum'),
+            total_usable=('usable', 'sum'),
+            total_daily_dosage=('daily_dosage', 'sum'),
+            min_days_left=('days_left', 'min'),
+            earliest_runout=('runout_date', 'min'),
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['days_of_supply'] = np.floor_divide(
+                result['total_usable'].to_numpy(), result['total_daily_dosage'].to_numpy()
+            )
+        return result.drop(columns='total_usable')
+
+    def daily_amounts(self, key="member"):
+        """
+        Total the amount of medication taken per day, in normalized units.
+
+        Amounts are the parsed dosage times the daily dosage, so a member
+        taking 2 x 500mg and 1 x 0.5 g of the same drug takes 1500 mg a day.
+        Medications whose dosage is not understood are left out.
+
+        Args:
+            key (str, optional): One of "drug", "doctor", "indication" or "member".
+
+        Returns:
+            pandas.DataFrame: Indexed by the key and the dose unit ('mg', 'ml',
+            'iu', ...), with the number of medications and the total daily amount.
+
+        Raises:
+            ValueError: If the key is not supported.
+        """
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Unsupported group key: {key}. Use one of {', '.join(GROUP_KEYS)}.")
+        frame = self.snapshot().dropna(subset=[key, 'dose_unit', 'daily_amount'])
+        return frame.groupby([key, 'dose_unit'], sort=True).agg(
+            medications=('med_id', 'size'),
+            total_daily_amount=('daily_amount', 'sum'),
+        )
+
+    def runout_dates(self, within_days=None, today=None):
+        """
+        List medications by projected run-out date.
+
+        Args:
+            within_days (int, optional): Only include medications running out within this many days.
+            today (date, optional): The projection start date. Defaults to today.
+
+        Returns:
+            pandas.DataFrame: member, med_id, name, days_left and runout_date, earliest first.
+        """
+        frame = self.supply_table(today)
+        if within_days is not None:
+            frame = frame[frame['days_left'] <= within_days]
+        return frame.sort_values(['runout_date', 'member', 'med_id'])[
+            ['member', 'med_id', 'name', 'days_left', 'runout_date']
+        ].reset_index(drop=True)
+
+    def burn_down(self, days=30, today=None):
+        """
+        Project the family's total remaining supply for each of the next days.
+
+        Every medication is consumed at its daily dosage until its usable
+        stock runs out; stock that expires first is not counted. The projection sorts medications by exhaustion time once and uses
+        cumulative sums, so it costs O(n log n + days) rather than n × days.
+
+        Args:
+            days (int, optional): Number of days to project.
+            today (date, optional): The projection start date. Defaults to today.
+
+        Returns:
+            pandas.DataFrame: Indexed by date, with the total units left and the
+            number of medications still in stock on that day.
+        """
+        frame = self.snapshot(today)
+        stock = frame['usable'].to_numpy()
+        daily = frame['daily_dosage'].to_numpy()
+        valid = (daily > 0) & (stock > 0)
+        stock, daily = stock[valid], daily[valid]
+
+        exhaustion = stock / daily  # Fractional day on which each medication runs out
+        order = np.argsort(exhaustion)
+        exhaustion, stock, daily = exhaustion[order], stock[order], daily[order]
+        # Suffix sums: totals over the medications running out after day d
+        stock_suffix = np.concatenate([np.cumsum(stock[::-1])[::-1], [0.0]])
+        daily_suffix = np.concatenate([np.cumsum(daily[::-1])[::-1], [0.0]])
+
+        day = np.arange(days + 1, dtype='float64')
+        first_active = np.searchsorted(exhaustion, day, side='right')
+        units_left = stock_suffix[first_active] - day * daily_suffix[first_active]
+        in_stock = len(exhaustion) - first_active
+
+        index = pd.date_range(pd.Timestamp(today or date.today()), periods=days + 1, freq='D', name='date')
+        return pd.DataFrame({'units_left': units_left, 'medications_in_stock': in_stock}, index=index)
+
@@ -1,7 +1,18 @@
 # Import necessary modules
+import threading  # For guarding the family-wide name index
+import numpy as np  # For the expiry sweep over all members
 import pandas as pd  # For handling CSV files and data manipulation
+from datetime import date  # For the expiry sweep
+from contextlib import ExitStack, contextmanager, nullcontext  # For grouping inventory batches into one transaction
 from pathlib import Path  # For handling file paths
 from medication_management.inventory import InventoryManagement  # For managing inventory of medications
+from medication_management.metrics import registry as metrics  # For opt-in instrumentation
+from medication_management import events  # For levelled status messages
+from medication_management.cache import ParseCache  # For skipping the parse of an unchanged file
+from medication_management.locking import DataFileLock, MemoryLock  # For sharing the member list between processes
+from medication_management.oplog import OperationLog, change, invert  # For undo, redo and point-in-time restore
+from medication_management.lots import UNDATED  # Sort key of stock without an expiration date
+from medication_management.names import DEFAULT_THRESHOLD, NameIndex  # For fuzzy medication name lookups
 
 class FamilyManagement:
     """
@@ -10,71 +21,353 @@ class FamilyManagement:
     as well as checking and managing medication inventory.
     """
 
-    def __init__(self, base_dir, reminder_system):
+    def __init__(self, base_dir, reminder_system, in_memory=False, save_on_close=False):
         """
         Initialize the FamilyManagement class.
         
         Args:
             base_dir (Path): The base directory for storing family data.
             reminder_system (object): An external system for managing reminders and alerts.
+            in_memory (bool, optional): Keep the family, its inventories and its
+                operation log in memory only, starting empty; no file is touched
+                until save_to_disk(). Pair it with ReminderSystem(base_dir, in_memory=True).
+            save_on_close (bool, optional): In in-memory mode, write the data to
+                base_dir with save_to_disk() when close() is called.
         """
         self.base_dir = base_dir  # Base directory for family data
         self.reminder_system = reminder_system  # Reminder system for managing alerts
+        self.in_memory = in_memory  # Whether the data lives in memory only
+        self.save_on_close = save_on_close  # Whether close() writes in-memory data to disk
         self.data_dir = self.base_dir / "data"  # Directory for storing family data files
-        self.data_dir.mkdir(exist_ok=True)  # Create the data directory if it doesn't exist
+        if not in_memory:
+            self.data_dir.mkdir(exist_ok=True)  # Create the data directory if it doesn't exist
         self.members_file = self.data_dir / "members.csv"  # File to store family member data
+        self.parse_cache = ParseCache(self.data_dir / ".cache")  # Parsed member names of unchanged files
         self.members = {}  # Dictionary to store family members and their inventory managers
         self.current_member = None  # The currently selected family member
+        self._batch_stack = None  # Open inventory/reminder batches while a batch() block runs
+        self._dirty = False  # Whether saving the member list was deferred by an open batch
+        self._pending_unlinks = []  # (member, data file) of members deleted inside an open batch
+        self._batch_creates = []  # (member, data file) created for members added inside an open batch
+        # Guards the member list against other processes
+        self._lock = MemoryLock(self.members_file) if in_memory else DataFileLock(self.members_file)
+        self._saved_members = []  # In-memory mode: the member names as last saved, standing in for the file
+        self._memory_inventories = {}  # In-memory mode: name -> inventory, standing in for the inventory files
+        self._version = 0  # Version of the members file the member list is based on
+        self._base = set()  # Member names at that version, for merging
+        self._group_commit = None  # (interval, max_ops) while group commit is enabled
+        self.oplog = OperationLog(self.data_dir, state=self._oplog_state,
+                                  in_memory=in_memory)  # Log of changes for undo and restore
+        self._name_index = None  # Family-wide trigram index of medication names, built on first lookup
+        self._indexed_names = {}  # (member, med_id) -> name it is indexed under
+        self._names_lock = threading.Lock()  # Guards the name index against inventory listeners
         self._load_members()  # Load existing family member data from file
+        self.oplog.ensure_checkpoint()  # So the state from now on can be restored
 
     def _load_members(self):
         """
         Load family members from the CSV file.
         If the file doesn't exist, create an empty file with a 'name' column.
+
+        The file is read under its shared lock, and the version read is
+        remembered so that a later save can detect concurrent writers.
+        """
+        with self._lock.shared():
+            names = self._read_members()
+            self._version = self._lock.version()
+        self._base = set(names)
+        for name in names:
+            # Create an InventoryManagement instance for each member
+            self.members[name] = self._new_inventory(name)
+
+    def _new_inventory(self, name):
+        """
+        Create the inventory of a member, with group commit if it is enabled.
+        """
+        # In memory, a member's inventory object stands in for its files and outlives a rolled back batch
+        inventory = self._memory_inventories.get(name) if self.in_memory else None
+        if inventory is None:
+            inventory = InventoryManagement(name, self.base_dir, self.reminder_system, in_memory=self.in_memory)
+            inventory.oplog = self.oplog
+            inventory.add_listener(self._on_inventory_change)
+            if self.in_memory:
+                self._memory_inventories[name] = inventory
+        if self._group_commit is not None:
+            inventory.enable_group_commit(*self._group_commit)
+        return inventory
+
+    def _read_members(self):
         """
+        Read the member names from the CSV file.
+
+        Returns:
+            list: The member names, empty if the file is missing or unreadable.
+        """
+        if self.in_memory:
+            return list(self._saved_members)
         if not self.members_file.exists():
             # Create an empty CSV file if it doesn't exist
             df = pd.DataFrame(columns=['name'])
             df.to_csv(self.members_file, index=False)
-            return
+            return []
 
         try:
             # Load the members from the CSV file
-            df = pd.read_csv(self.members_file)
-            if not df.empty:
-                for _, row in df.iterrows():
-                    # Create an InventoryManagement instance for each member
-                    self.members[row['name']] = InventoryManagement(
-                        row['name'], self.base_dir, self.reminder_system
-                    )
+            return self.parse_cache.load(self.members_file, self._parse_members, tag="members")
         except Exception as e:
             # Handle errors and recreate an empty file if needed
-            print(f"Error loading members: {str(e)}")
+            events.error(f"Error loading members: {str(e)}", "family")
             df = pd.DataFrame(columns=['name'])
             df.to_csv(self.members_file, index=False)
+            return []
+
+    @staticmethod
+    def _parse_members(path):
+        """
+        Parse the members CSV file.
+
+        Args:
+            path (Path): The members CSV file.
+
+        Returns:
+            list: The member names in the file.
+        """
+        df = pd.read_csv(path)
+        metrics.record_file_read("FamilyManagement._load_members", path)
+        return list(df['name'])
+
+    def _save_members(self):
+        """
+        Save the family members' names to the CSV file.
+
+        The file is written under its exclusive lock. If another process
+        saved it since it was loaded, members added or deleted here are
+        merged into the saved list instead of overwriting it.
+        """
+        with self._lock.exclusive():
+            if self._lock.version() != self._version:
+                self._merge_with_saved()
+            if self.in_memory:
+                self._saved_members = list(self.members)
+            else:
+                self._write_members_file()
+            self._version = self._lock.bump()
+        self._base = set(self.members)
+
+    def _write_members_file(self):
+        """Write the members CSV file."""
+        df = pd.DataFrame({'name': list(self.members.keys())})
+        df.to_csv(self.members_file, index=False)
+        metrics.record_file_write("FamilyManagement._save_members", self.members_file)
+
+    def save_to_disk(self):
+        """
+        Write the member list, every inventory and the reminders to their files.
+
+        In in-memory mode this is the only method that touches the disk: the
+        files are written under base_dir/data as a normal save would write
+        them, and the data stays in memory. The operation log is not
+        written, so undo history does not carry over. Otherwise it is
+        save_all_data().
+
+        Returns:
+            bool: True if everything was written, False otherwise.
+        """
+        if not self.in_memory:
+            return self.save_all_data()
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            with DataFileLock(self.members_file).exclusive() as lock:
+                self._write_members_file()
+                lock.bump()
+        except Exception as e:
+            events.error(f"Error writing members to disk: {str(e)}", "family")
+            return False
+        saved = all([inventory.save_to_disk() for inventory in list(self.members.values())])
+        if hasattr(self.reminder_system, 'save_to_disk'):
+            saved = self.reminder_system.save_to_disk() and saved
+        if saved:
+            events.info(f"Family data written to {self.data_dir}.", "family")
+        return saved
+
+    def close(self):
+        """
+        Finish working with the family.
+
+        Pending group commits are saved, and an in-memory family created
+        with save_on_close is written to disk.
+
+        Returns:
+            bool: False if writing to disk failed, otherwise True.
+        """
+        self.disable_group_commit()
+        if self.in_memory and self.save_on_close:
+            return self.save_to_disk()
+        return True
+
+    def __enter__(self):
+        """Use the family in a with block that calls close() on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the family."""
+        self.close()
+
+    def _merge_with_saved(self):
+        """
+        Merge members added or deleted here into the list saved by another process.
+
+        Members another process added are loaded, and members it deleted are
+        dropped unless they were added here again.
+        """
+        theirs = self._read_members()
+        merged = [name for name in theirs if name in self.members or name not in self._base]
+        merged += [name for name in self.members if name not in self._base and name not in merged]
+        for name, inventory in self.members.items():
+            if name not in merged:
+                inventory.disable_group_commit()
+        self.members = {name: self.members.get(name) or self._new_inventory(name) for name in merged}
+        self._name_index = None  # Rebuilt for the merged members on the next lookup
+        if self.current_member not in self.members:
+            self.current_member = None
+        events.info("Merged member changes saved by another process.", "family")
+
+    @contextmanager
+    def batch(self):
+        """
+        Apply many family, inventory and reminder changes as one transaction.
+
+        Inside the block every save is deferred: each touched inventory, the
+        reminders and the member list are written once when the block exits.
+        If the block raises, all in-memory changes are discarded by reloading
+        the data files and the exception is re-raised.
+
+        Yields:
+            FamilyManagement: This family manager.
+        """
+        if self._batch_stack is not None:
+            # Nested batch: the outermost block commits
+            yield self
+            return
+
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(self.oplog.transaction())  # Exited last, after the inventories saved
+                self._batch_stack = stack
+                # Inventory write locks before the reminder lock: the order
+                # InventoryManagement takes them in when it sets reminders
+                for inventory in self.members.values():
+                    stack.enter_context(inventory.batch())
+                if hasattr(self.reminder_system, 'batch'):
+                    stack.enter_context(self.reminder_system.batch())
+                yield self
+        except BaseException:
+            # Inventories and reminders have rolled back; reload the member list too
+            self._batch_stack = None
+            self._dirty = False
+            self._pending_unlinks = []
+            for inventory in self.members.values():
+                inventory.disable_group_commit()
+            # Members added in the block are not saved; neither are their files
+            for name, path in self._batch_creates:
+                self._remove_data(name, path)
+            self._batch_creates = []
+            self.members = {}
+            self._name_index = None
+            self.current_member = None
+            self._load_members()
+            raise
+        finally:
+            self._batch_stack = None
+
+        # Inventories and reminders were saved by their own batches on exit
+        self._batch_creates = []
+        for name, path in self._pending_unlinks:
+            self._remove_data(name, path)
+        self._pending_unlinks = []
+        if self._dirty:
+            self._dirty = False
+            self._save_members()
+
+    def _item_level(self):
+        """
+        Level for per-item events: DEBUG inside a batch, otherwise INFO.
+        """
+        return events.DEBUG if self._batch_stack is not None else events.INFO
 
     def save_all_data(self):
         """
         Save all family member data to the CSV file and their respective inventory files.
+
+        Inside a batch() block the save is deferred until the block exits.
         
         Returns:
             bool: True if save operation was successful, False otherwise.
         """
+        if self._batch_stack is not None:
+            self._dirty = True
+            return True
+
         try:
             # Save family members' names to the CSV file
-            df = pd.DataFrame({'name': list(self.members.keys())})
-            df.to_csv(self.members_file, index=False)
+            self._save_members()
 
             # Save each member's inventory data
             for member_name, inventory in self.members.items():
                 inventory._save_inventory()
 
-            print("All data saved successfully")
+            events.info("All data saved successfully", "family")
             return True
         except Exception as e:
-            print(f"Error saving data: {str(e)}")
+            events.error(f"Error saving data: {str(e)}", "family")
             return False
 
+    def enable_group_commit(self, interval=0.05, max_ops=100):
+        """
+        Save inventory and reminder changes from background threads.
+
+        Applies to the reminders, the operation log and every inventory,
+        including members added later. The member list is still saved on
+        every change. See InventoryManagement.enable_group_commit.
+
+        Args:
+            interval (float, optional): Seconds an unsaved change may wait.
+            max_ops (int, optional): Number of waiting changes per file that triggers a save at once.
+        """
+        self._group_commit = (interval, max_ops)
+        if hasattr(self.reminder_system, 'enable_group_commit'):
+            self.reminder_system.enable_group_commit(interval, max_ops)
+        self.oplog.enable_group_commit(interval, max_ops)
+        for inventory in list(self.members.values()):
+            inventory.enable_group_commit(interval, max_ops)
+
+    def disable_group_commit(self):
+        """
+        Save the pending changes and return to saving on every change.
+
+        Raises:
+            RuntimeError: If saving the pending changes failed.
+        """
+        self._group_commit = None
+        for inventory in list(self.members.values()):
+            inventory.disable_group_commit()
+        if hasattr(self.reminder_system, 'disable_group_commit'):
+            self.reminder_system.disable_group_commit()
+        self.oplog.disable_group_commit()
+
+    def flush(self):
+        """
+        Wait until every inventory, reminder and operation log change made so far is saved.
+
+        Raises:
+            RuntimeError: If saving the pending changes failed.
+        """
+        for inventory in list(self.members.values()):
+            inventory.flush()
+        if hasattr(self.reminder_system, 'flush'):
+            self.reminder_system.flush()
+        self.oplog.flush()
+
     def add_member(self, name):
         """
         Add a new family member.
@@ -89,13 +382,22 @@ class FamilyManagement:
             raise ValueError("Name cannot be empty")
 
         if name in self.members:
-            print(f"Member {name} already exists.")
+            events.warning(f"Member {name} already exists.", "family")
             return False
 
+        if self._batch_stack is not None and not self.in_memory:
+            # The inventory writes its empty files at once; remember the new ones for a rollback
+            paths = (self.data_dir / f"{name}_inventory.csv", self.data_dir / f"{name}_inventory.snap")
+            self._batch_creates.extend((name, path) for path in paths if not path.exists())
+
         # Create a new InventoryManagement instance for the member
-        self.members[name] = InventoryManagement(name, self.base_dir, self.reminder_system)
+        self.members[name] = self._new_inventory(name)
+        self._on_inventory_change(self.members[name], None)
+        self.oplog.record("add_member", [change(name, None, None, {"records": []})])
+        if self._batch_stack is not None:
+            self._batch_stack.enter_context(self.members[name].batch())
         self.save_all_data()  # Save updated data
-        print(f"Family member '{name}' added successfully.")
+        events.emit(self._item_level(), f"Family member '{name}' added successfully.", "family")
         return True
 
     def switch_member(self, name):
@@ -110,7 +412,7 @@ class FamilyManagement:
         """
         if name in self.members:
             self.current_member = name  # Set the current member
-            print(f"Switched to family member: {name}")
+            events.info(f"Switched to family member: {name}", "family")
 
             # Check for low stock medications for the new member
             inventory_manager = self.get_current_member_inventory()
@@ -121,7 +423,7 @@ class FamilyManagement:
                     self.reminder_system.check_alerts(name, low_stock_warnings)
             return True
         
-        print(f"Family member '{name}' not found.")
+        events.warning(f"Family member '{name}' not found.", "family")
         return False
 
     def list_members(self):
@@ -151,18 +453,25 @@ class FamilyManagement:
             bool: True if the member was deleted successfully, False otherwise.
         """
         if name not in self.members:
-            print(f"Family member '{name}' not found.")
+            events.warning(f"Family member '{name}' not found.", "family")
             return False
 
-        # Delete the member's inventory files if they exist
+        # Delete the member's inventory files if they exist (deferred while a batch is open)
         inventory = self.members[name]
-        if hasattr(inventory, 'inventory_file') and inventory.inventory_file.exists():
-            inventory.inventory_file.unlink()
-        if hasattr(inventory, 'history_file') and inventory.history_file.exists():
-            inventory.history_file.unlink()
+        inventory.disable_group_commit()  # So the flusher does not write the files again
+        self.oplog.record("delete_member", [change(name, None, {"records": list(inventory.iter_records())}, None)])
+        for attr in ('inventory_file', 'history_file', 'snapshot_file'):
+            path = getattr(inventory, attr, None)
+            if path is None:
+                continue
+            if self._batch_stack is not None:
+                self._pending_unlinks.append((name, path))
+            else:
+                self._remove_data(name, path)
 
         # Remove the member from the dictionary
         del self.members[name]
+        self._on_inventory_change(inventory, None)
         if self.current_member == name:
             self.current_member = None  # Clear the current member if it was the one deleted
 
@@ -170,9 +479,287 @@ class FamilyManagement:
         self.reminder_system.clear_all_reminders(name)
 
         self.save_all_data()  # Save updated data
-        print(f"Family member '{name}' and associated data deleted successfully.")
+        events.emit(self._item_level(), f"Family member '{name}' and associated data deleted successfully.", "family")
         return True
 
+    def _remove_data(self, name, path):
+        """Remove a data file of a deleted member, or in memory the inventory standing in for it."""
+        if self.in_memory:
+            self._memory_inventories.pop(name, None)
+        elif path.exists():
+            path.unlink()
+
+    def write_off_expired(self, today=None):
+        """
+        Write off the expired lots of every member in one sweep.
+
+        The earliest expiration date of every medication in the family is
+        gathered into one array and compared with today at once, so only the
+        medications that have an expired lot are visited. The write-offs are
+        saved as one batch.
+
+        Args:
+            today (date, optional): The current date. Defaults to today.
+
+        Returns:
+            dict: {member: {med_id: quantity written off}} for members with expired lots.
+        """
+        today = today or date.today()
+        owners = [(member, med_id) for member, inventory in self.members.items() for med_id in inventory.medications]
+        next_expiry = np.fromiter(
+            (self._next_expiry_ordinal(self.members[member].medications.get(med_id)) for member, med_id in owners),
+            dtype=np.int64, count=len(owners)
+        )
+        expired = {}
+        for index in np.flatnonzero(next_expiry < today.toordinal()):
+            member, med_id = owners[index]
+            expired.setdefault(member, []).append(med_id)
+        if not expired:
+            return {}
+
+        results = {}
+        with self.batch():
+            for member, med_ids in expired.items():
+                written_off = self.members[member].write_off_expired(today, med_ids)
+                if written_off:
+                    results[member] = written_off
+        return results
+
+    @staticmethod
+    def _next_expiry_ordinal(medication):
+        """Return the ordinal of a medication's earliest lot expiry (UNDATED if none)."""
+        if medication is None:
+            return UNDATED
+        expiry = medication.stock_lots().next_expiry
+        return UNDATED if expiry is None else expiry.toordinal()
+
+    def check_interactions(self):
+        """
+        Check the medications of every member for drug interactions, in one pass.
+
+        Every member's interaction reminders are brought up to date and the
+        reminders are saved once.
+
+        Returns:
+            dict: {member: [(med_id_a, med_id_b, Interaction), ...]} for members with interactions.
+        """
+        members = {name: inventory for name, inventory in self.members.items() if inventory.interactions is not None}
+        if not members:
+            return {}
+        # All inventories share the default index unless one was replaced
+        by_index = {}
+        for name, inventory in members.items():
+            by_index.setdefault(id(inventory.interactions), (inventory.interactions, {}))[1][name] = inventory
+        results = {}
+        for index, group in by_index.values():
+            results.update(index.check_family(group))
+
+        batch = self.reminder_system.batch() if hasattr(self.reminder_system, 'batch') else nullcontext()
+        with batch:
+            for name, inventory in members.items():
+                inventory._sync_interaction_reminders(results.get(name, []))
+        count = sum(len(pairs) for pairs in results.values())
+        events.info(f"Found {count} drug interaction(s) for {len(results)} member(s).", "family")
+        return results
+
+    def _on_inventory_change(self, inventory, med_ids):
+        """
+        Inventory listener: bring the changed medications up to date in the name index.
+
+        Called with med_ids None when a member's medications may all have
+        changed, or the member was added or deleted.
+        """
+        with self._names_lock:
+            index = self._name_index
+            if index is None:
+                return
+            member = inventory.member_name
+            current = self.members.get(member)
+            if med_ids is None:
+                med_ids = [med_id for key_member, med_id in self._indexed_names if key_member == member]
+                if current is inventory:
+                    med_ids += list(inventory.medications)
+            for med_id in med_ids:
+                name = self._indexed_names.pop((member, med_id), None)
+                if name is not None:
+                    index.remove(name, (member, med_id))
+                medication = inventory.medications.get(med_id) if current is inventory else None
+                if medication is not None:
+                    index.add(medication.name, (member, med_id))
+                    self._indexed_names[(member, med_id)] = medication.name
+
+    def find_similar(self, name, threshold=DEFAULT_THRESHOLD, limit=None):
+        """
+        Find the medications of any member whose names are similar to a name.
+
+        One trigram index covers the whole family; it is built on the first
+        lookup and kept up to date as medications are added, changed or deleted.
+
+        Args:
+            name (str): The name to look up.
+            threshold (float, optional): The minimum similarity, from 0 to 1.
+            limit (int, optional): The maximum number of names matched.
+
+        Returns:
+            list: (member, med_id, name, score) tuples, most similar first.
+        """
+        with self._names_lock:
+            if self._name_index is None:
+                self._indexed_names = {
+                    (member, med_id): medication.name
+                    for member, inventory in list(self.members.items())
+                    for med_id, medication in inventory.medications.items()
+                }
+                self._name_index = NameIndex((name, key) for key, name in self._indexed_names.items())
+            matches = self._name_index.similar(name, threshold, limit)
+            found = [(member, med_id, self._indexed_names[(member, med_id)], match.score)
+                     for match in matches for member, med_id in sorted(match.keys)]
+        return found
+
+    def find_duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """
+        Find the medications each member probably entered more than once.
+
+        Args:
+            threshold (float, optional): The minimum similarity of two names, from 0 to 1.
+
+        Returns:
+            dict: {member: [[med_id, ...], ...]} for members with duplicates,
+            as returned by InventoryManagement.find_duplicates.
+        """
+        results = {}
+        for member, inventory in list(self.members.items()):
+            groups = inventory.find_duplicates(threshold)
+            if groups:
+                results[member] = groups
+        return results
+
+    def merge_duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """
+        Merge every member's duplicate medications, as one transaction.
+
+        Args:
+            threshold (float, optional): The minimum similarity of two names, from 0 to 1.
+
+        Returns:
+            dict: {member: {kept med_id: [merged med_ids]}} for members with duplicates.
+        """
+        duplicates = self.find_duplicates(threshold)
+        results = {}
+        if not duplicates:
+            return results
+        with self.batch():
+            for member, groups in duplicates.items():
+                results[member] = self.members[member].merge_duplicates(groups)
+        count = sum(len(others) for merged in results.values() for others in merged.values())
+        events.info(f"Merged {count} duplicate medication(s) for {len(results)} member(s).", "family")
+        return results
+
+    def _oplog_state(self):
+        """Return the current state of all inventories, for operation log checkpoints."""
+        return {
+            name: {record['med_id']: record for record in inventory.iter_records()}
+            for name, inventory in list(self.members.items())
+        }
+
+    def _apply_changes(self, changes):
+        """
+        Apply the after images of operation log changes to the family, in one batch.
+
+        The changes themselves are not recorded again; the caller records
+        the undo, redo or restore entry.
+        """
+        with self.oplog.suspended(), self.batch():
+            for item in changes:
+                member, med_id, after = item['member'], item['med_id'], item['after']
+                if med_id is None:
+                    if after is None:
+                        if member in self.members:
+                            self.delete_member(member)
+                        continue
+                    if member not in self.members:
+                        self.add_member(member)
+                    self.members[member]._replace_medications(after['records'])
+                elif member in self.members:
+                    self.members[member]._put_medication(med_id, after)
+
+    def undo(self):
+        """
+        Undo the last recorded operation.
+
+        Operations are undone newest first, including those of earlier
+        sessions; a batch is undone as a whole. A deleted member is added
+        again with the medications it had. Reminders are not restored.
+
+        Returns:
+            bool: True if an operation was undone, False if there was nothing to undo.
+        """
+        entry = self.oplog.undo_target()
+        if entry is None:
+            events.warning("Nothing to undo.", "family")
+            return False
+        changes = invert(entry['changes'])
+        self._apply_changes(changes)
+        self.oplog.record("undo", changes, undo_of=entry['seq'])
+        events.info(f"Undid {entry['op']} (operation {entry['seq']}).", "family")
+        return True
+
+    def redo(self):
+        """
+        Apply the last undone operation again.
+
+        Returns:
+            bool: True if an operation was redone, False if there was nothing to redo.
+        """
+        entry = self.oplog.redo_target()
+        if entry is None:
+            events.warning("Nothing to redo.", "family")
+            return False
+        self._apply_changes(entry['changes'])
+        self.oplog.record("redo", entry['changes'], redo_of=entry['seq'])
+        events.info(f"Redid {entry['op']} (operation {entry['seq']}).", "family")
+        return True
+
+    def restore(self, when):
+        """
+        Restore all members and inventories to their state at a point in time.
+
+        The state is rebuilt from the last checkpoint before `when` plus the
+        operations recorded after it. The restore is itself recorded, so it
+        can be undone. Reminders are not restored.
+
+        Args:
+            when (datetime or str): The point in time, as a datetime or ISO 8601 string.
+
+        Returns:
+            int: The number of members and medications changed.
+
+        Raises:
+            ValueError: If the operation log does not reach back to `when`.
+        """
+        target = self.oplog.state_at(when)
+        current = self._oplog_state()
+        changes = []
+        for member, records in current.items():
+            if member not in target:
+                changes.append(change(member, None, {"records": list(records.values())}, None))
+        for member, records in target.items():
+            if member not in current:
+                changes.append(change(member, None, None, {"records": list(records.values())}))
+                continue
+            for med_id, record in records.items():
+                if current[member].get(med_id) != record:
+                    changes.append(change(member, med_id, current[member].get(med_id), record))
+            for med_id, record in current[member].items():
+                if med_id not in records:
+                    changes.append(change(member, med_id, record, None))
+
+        if changes:
+            self._apply_changes(changes)
+            self.oplog.record("restore", changes, restored_to=str(when))
+        events.info(f"Restored the state as of {when} ({len(changes)} changes).", "family")
+        return len(changes)
+
     def get_current_member_inventory(self):
         """
         Get the inventory manager for the currently selected family member.
@@ -181,7 +768,7 @@ class FamilyManagement:
             InventoryManagement: The inventory manager for the current member, or None if no member is selected.
         """
         if not self.current_member:
-            print("No family member selected.")
+            events.warning("No family member selected.", "family")
             return None
         return self.members[self.current_member]
 
@@ -192,9 +779,21 @@ class FamilyManagement:
         Returns:
             list: A list of tuples containing member name, medication ID, medication name, and days left.
         """
-        low_stock_warnings = []
-        for member_name, inventory in self.members.items():
-            low_stock_meds = inventory.check_low_stock()
-            for med_id, med_name, days_left in low_stock_meds:
-                low_stock_warnings.append((member_name, med_id, med_name, days_left))
+        if not hasattr(self.reminder_system, 'set_low_stock_reminders'):
+            low_stock_warnings = []
+            for member_name, inventory in self.members.items():
+                low_stock_meds = inventory.check_low_stock()
+                for med_id, med_name, days_left in low_stock_meds:
+                    low_stock_warnings.append((member_name, med_id, med_name, days_left))
+            return low_stock_warnings
+
+        # Collect first and set the reminders in one go, saved once
+        low_stock_warnings = [(member_name, med_id, med_name, days_left)
+                              for member_name, inventory in self.members.items()
+                              for med_id, med_name, days_left in inventory.check_low_stock(remind=False)]
+        self.reminder_system.set_low_stock_reminders(low_stock_warnings)
         return low_stock_warnings
+
+
+# Instrument the public methods and the load/save helpers (active only when enabled)
+metrics.register(FamilyManagement)
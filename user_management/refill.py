@@ -0,0 +1,125 @@
+# refill.py
+# Refill planning: few pharmacy trips that keep every medication above its safety stock.
+from collections import namedtuple
+from datetime import date, timedelta
+import numpy as np  # For the vectorized depletion projection
+from user_management.analytics import FamilyAnalytics
+
+# One medication to pick up on a trip
+Refill = namedtuple("Refill", ["member", "med_id", "name", "days_left", "quantity"])
+
+# One pharmacy trip: its date and the refills picked up
+RefillTrip = namedtuple("RefillTrip", ["date", "refills"])
+
+
+class RefillPlanner:
+    """
+    Plan pharmacy trips for the whole family.
+
+    Every medication is projected to deplete at its daily dosage, from the
+    stock it can use before its lots expire. Its stock must never drop below `safety_days` of supply, so each refill has a
+    deadline; it may be picked up up to `window` days before it. A refill
+    adds `refill_days` of supply, so a medication's later deadlines follow
+    every `refill_days` days, and all deadlines over the horizon are known
+    up front.
+
+    Choosing the fewest trips is then the interval stabbing problem, which
+    a greedy pass over the deadlines in order solves optimally: a trip is
+    made on the earliest open deadline and picks up every refill whose
+    window has opened by then. The deadlines are computed with numpy and
+    each trip is one binary search, so planning costs O(n log n) for n
+    refills, independent of the horizon length.
+
+    Attributes:
+        family_manager (FamilyManagement): The family to plan for.
+        analytics (FamilyAnalytics): Source of the cached columnar snapshot.
+    """
+
+    def __init__(self, family_manager, analytics=None):
+        """
+        Initialize a RefillPlanner.
+
+        Args:
+            family_manager (FamilyManagement): The family to plan for.
+            analytics (FamilyAnalytics, optional): Analytics whose cached snapshot is reused.
+        """
+        self.family_manager = family_manager
+        self.analytics = analytics or FamilyAnalytics(family_manager)
+
+    def plan(self, horizon=60, safety_days=3, refill_days=30, window=7, today=None):
+        """
+        Plan the pharmacy trips over a horizon.
+
+        Args:
+            horizon (int, optional): Days to plan ahead.
+            safety_days (int, optional): Days of supply every medication keeps at least.
+            refill_days (int, optional): Days of supply one refill adds.
+            window (int, optional): Days before its deadline a refill may be picked up.
+            today (date, optional): The first day of the plan. Defaults to today.
+
+        Returns:
+            list: RefillTrip tuples in date order. Medications below their
+            safety stock already are refilled on the first trip, today.
+
+        Raises:
+            ValueError: If refill_days is not greater than window, so one
+                refill could not last until the next window opens.
+        """
+        if refill_days <= window:
+            raise ValueError("refill_days must be greater than window.")
+        today = today or date.today()
+        frame = self.analytics.snapshot(today)
+        daily = frame['daily_dosage'].to_numpy()
+        stock = frame['usable'].to_numpy()
+        valid = np.flatnonzero((daily > 0) & ~np.isnan(stock))
+        if not len(valid):
+            return []
+
+        # Day by which each medication must be refilled to keep its safety stock
+        days_left = np.floor_divide(stock[valid], daily[valid])
+        first = days_left - safety_days
+        # Number of refills due within the horizon, one every refill_days days
+        counts = np.where(first <= horizon, (horizon - first) // refill_days + 1, 0).astype(np.int64)
+        rows = np.repeat(np.arange(len(valid)), counts)
+        nth = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        # Overdue refills are due today; one far below its safety stock may need several
+        deadlines = np.maximum(first[rows] + nth * refill_days, 0)
+
+        order = np.lexsort((rows, deadlines))
+        deadlines, rows, nth = deadlines[order], rows[order], nth[order]
+
+        members = frame['member'].to_numpy()
+        med_ids = frame['med_id'].to_numpy()
+        names = frame['name'].to_numpy()
+        trips = []
+        start = 0
+        while start < len(deadlines):
+            day = int(deadlines[start])
+            end = int(np.searchsorted(deadlines, day + window, side='right'))
+            refills = []
+            for position in range(start, end):
+                row = valid[rows[position]]
+                # Supply left on the trip day: the initial days plus earlier refills, minus the days passed
+                left = int(days_left[rows[position]] + nth[position] * refill_days - day)
+                refills.append(Refill(members[row], int(med_ids[row]), names[row], left,
+                                      int(refill_days * daily[row])))
+            trips.append(RefillTrip(today + timedelta(days=day), refills))
+            start = end
+        return trips
+
+    def next_refills(self, trips):
+        """
+        Return the first planned refill of every medication.
+
+        Args:
+            trips (list): RefillTrip tuples as returned by plan().
+
+        Returns:
+            dict: {(member, med_id): (trip date, Refill)}, in the form
+            ReminderSystem.sync_refill_reminders takes.
+        """
+        first = {}
+        for trip in trips:
+            for refill in trip.refills:
+                first.setdefault((refill.member, refill.med_id), (trip.date, refill))
+        return first
@@ -1,6 +1,150 @@
 # Import necessary modules
+import sys  # For interning repeated member and kind strings
+import threading  # For serializing changes made from several threads
+from contextlib import contextmanager  # For batched saves
+from bisect import bisect_right, insort  # For the sorted due-date index
+from collections.abc import Mapping  # For the read-only reminder views
+from datetime import date, datetime, timedelta  # For due dates and creation times
 import pandas as pd  # For handling CSV files and data manipulation
 from pathlib import Path  # For handling file paths
+from medication_management.metrics import registry as metrics  # For opt-in instrumentation
+from medication_management import events  # For levelled status messages
+from medication_management.cache import ParseCache  # For skipping the parse of an unchanged file
+from medication_management.locking import DataFileLock, MemoryLock  # For sharing the reminders file between processes
+from medication_management.group_commit import GroupCommitter  # For saving changes in the background
+
+# Reminder kinds
+KIND_CUSTOM = "custom"  # Free-text reminder set by the user
+KIND_LOW_STOCK = "low_stock"  # Generated when a medication is about to run out
+KIND_INTERACTION = "interaction"  # Generated when a member's medications interact
+KIND_REFILL = "refill"  # Planned pharmacy pick-up of a medication
+
+# Reminder severities
+SEVERITY_INFO = "info"
+SEVERITY_WARNING = "warning"
+SEVERITY_CRITICAL = "critical"
+
+# Columns of the reminders CSV file
+REMINDER_COLUMNS = [
+    'member', 'med_id', 'kind', 'severity', 'med_name', 'days_left',
+    'due_date', 'created_at', 'message'
+]
+
+
+class Reminder:
+    """
+    A single typed reminder record.
+
+    Only the structured fields are stored; the human-readable message is
+    rendered from a per-kind template when the reminder is displayed.
+
+    Attributes:
+        kind (str): The reminder kind (e.g. "low_stock", "custom").
+        member (str): The name of the family member.
+        med_id (int): The ID of the medication.
+        severity (str): One of "info", "warning" or "critical".
+        med_name (str): The name of the medication, if known.
+        days_left (int): Days of stock left when the reminder was set, if known.
+        due_date (date): The date the reminder becomes due, if any.
+        created_at (datetime): When the reminder was created.
+        text (str): The free-text message of a custom reminder.
+    """
+    __slots__ = (
+        'kind', 'member', 'med_id', 'severity', 'med_name', 'days_left',
+        'due_date', 'created_at', 'text'
+    )
+
+    # Message templates, rendered lazily by render()
+    TEMPLATES = {
+        KIND_LOW_STOCK: "Low stock alert for {med_name} (ID {med_id})! Only {days_left} days left.",
+        KIND_REFILL: "Refill {med_name} (ID {med_id}) on {due_date}, with {days_left} days of stock left.",
+    }
+
+    def __init__(self, kind, member, med_id, severity=SEVERITY_INFO, med_name=None,
+                 days_left=None, due_date=None, created_at=None, text=None):
+        """
+        Initialize a Reminder record.
+
+        Args:
+            kind (str): The reminder kind.
+            member (str): The name of the family member.
+            med_id (int): The ID of the medication.
+            severity (str, optional): The reminder severity.
+            med_name (str, optional): The name of the medication.
+            days_left (int, optional): Days of stock left.
+            due_date (date, optional): The date the reminder becomes due.
+            created_at (datetime, optional): Creation time, defaults to now.
+            text (str, optional): The message of a custom reminder.
+        """
+        self.kind = sys.intern(kind)
+        self.member = sys.intern(member)
+        self.med_id = med_id
+        self.severity = sys.intern(severity)
+        self.med_name = med_name
+        self.days_left = days_left
+        self.due_date = due_date
+        self.created_at = created_at or datetime.now()
+        self.text = text
+
+    def render(self):
+        """
+        Render the human-readable reminder message.
+
+        Returns:
+            str: The reminder message.
+        """
+        if self.text is not None or self.kind not in self.TEMPLATES:
+            return self.text or ""
+        return self.TEMPLATES[self.kind].format(
+            med_name=self.med_name, med_id=self.med_id, days_left=self.days_left, due_date=self.due_date
+        )
+
+    def __repr__(self):
+        """
+        Return a string representation of the Reminder object.
+
+        Returns: A string representing the reminder.
+        """
+        return f"Reminder(kind={self.kind}, member={self.member}, med_id={self.med_id}, severity={self.severity}, due_date={self.due_date})"
+
+
+class _MemberRemindersView(Mapping):
+    """Read-only view mapping medication IDs to rendered messages for one member."""
+
+    def __init__(self, member_records):
+        self._records = member_records
+
+    def __getitem__(self, med_id):
+        # Render lazily; several kinds on the same medication are joined
+        return " | ".join(rec.render() for rec in self._records[med_id].values())
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+
+class _RemindersView(Mapping):
+    """Read-only view with the legacy ``{member: {med_id: message}}`` shape."""
+
+    def __init__(self, records):
+        self._records = records
+
+    def __getitem__(self, member):
+        return _MemberRemindersView(self._records[member])
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+
+def _fingerprint(record):
+    """Return the stored fields of a reminder, used to detect local changes."""
+    return tuple(getattr(record, field) for field in Reminder.__slots__)
+
 
 class ReminderSystem:
     """
@@ -8,75 +152,418 @@ class ReminderSystem:
     Provides functionality to set, clear, and list reminders, as well as save and load them from a CSV file.
     """
 
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, in_memory=False):
         """
         Initialize the ReminderSystem class.
 
         Args:
             base_dir (str or Path): Base directory where reminder data is stored.
+            in_memory (bool, optional): Keep the reminders in memory only. They
+                start empty, saves keep a copy of the records instead of writing
+                the file, and no file is touched until save_to_disk().
         """
         self.base_dir = Path(base_dir)  # Ensure base_dir is a Path object
+        self.in_memory = in_memory  # Whether the reminders live in memory only
         self.data_dir = self.base_dir / "data"  # Directory for storing reminder data
-        self.data_dir.mkdir(exist_ok=True)  # Create the directory if it doesn't exist
+        if not in_memory:
+            self.data_dir.mkdir(exist_ok=True)  # Create the directory if it doesn't exist
         self.reminders_file = self.data_dir / "reminders.csv"  # File for storing reminders
+        self.parse_cache = ParseCache(self.data_dir / ".cache")  # Parsed reminders of unchanged files
 
-        # Structure to hold reminders, organized by member name
-        # Example structure: { "member_name": {med_id: message, ...}, ... }
-        self.reminders = {}
+        # Reminder records, organized by member name, medication ID and kind
+        # Example structure: { "member_name": {med_id: {kind: Reminder, ...}, ...}, ... }
+        self._records = {}
+        self._by_kind = {}  # Index: kind -> set of (member, med_id)
+        self._by_due = {}  # Index: due date -> set of (member, med_id, kind)
+        self._due_dates = []  # Sorted list of the due dates present in _by_due
+        self._batch_depth = 0  # Nesting depth of open batch() blocks
+        self._dirty = False  # Whether a save was deferred by an open batch
+        # Guards the file against other processes
+        self._lock = MemoryLock(self.reminders_file) if in_memory else DataFileLock(self.reminders_file)
+        self._saved_records = []  # In-memory mode: the records as last saved, standing in for the file
+        self._mutex = threading.RLock()  # Serializes changes; readers use the copy-on-write records without it
+        self._version = 0  # Version of the reminders file the in-memory records are based on
+        self._base = {}  # Fingerprints of the records at that version, for merging
+        self._committer = None  # Background saver while group commit is enabled
         self._load_reminders()  # Load existing reminders from file
 
+    @property
+    def reminders(self):
+        """
+        Read-only view of the active reminders as ``{member: {med_id: message}}``.
+
+        Messages are rendered only when an entry is accessed. The view is a
+        snapshot: changes replace the underlying dictionaries instead of
+        modifying them, so it can be read from any thread without locking.
+        """
+        return _RemindersView(self._records)
+
+    def _index_add(self, record):
+        """Add a record to the kind and due-date indexes."""
+        self._by_kind.setdefault(record.kind, set()).add((record.member, record.med_id))
+        if record.due_date is not None:
+            if record.due_date not in self._by_due:
+                self._by_due[record.due_date] = set()
+                insort(self._due_dates, record.due_date)
+            self._by_due[record.due_date].add((record.member, record.med_id, record.kind))
+
+    def _index_remove(self, record):
+        """Remove a record from the kind and due-date indexes."""
+        keys = self._by_kind.get(record.kind)
+        if keys is not None:
+            keys.discard((record.member, record.med_id))
+            if not keys:
+                del self._by_kind[record.kind]
+        if record.due_date is not None and record.due_date in self._by_due:
+            keys = self._by_due[record.due_date]
+            keys.discard((record.member, record.med_id, record.kind))
+            if not keys:
+                del self._by_due[record.due_date]
+                self._due_dates.pop(bisect_right(self._due_dates, record.due_date) - 1)
+
+    def _publish(self, member, med_id, kinds):
+        """
+        Replace the records of one medication of a member (removing them if
+        kinds is empty). The changed dictionaries are copied rather than
+        modified, so readers iterating over the records without the lock
+        always see a consistent snapshot.
+        """
+        member_records = dict(self._records.get(member, {}))
+        if kinds:
+            member_records[med_id] = kinds
+        else:
+            member_records.pop(med_id, None)
+        self._records = {**self._records, member: member_records}
+
+    def _discard(self, member, med_id, kind):
+        """Remove a record if it exists, keeping the indexes in sync."""
+        kinds = self._records.get(member, {}).get(med_id)
+        if kinds and kind in kinds:
+            kinds = dict(kinds)
+            self._index_remove(kinds.pop(kind))
+            self._publish(member, med_id, kinds)
+
+    def _replace_all(self, records):
+        """Replace every record and rebuild the indexes."""
+        self._by_kind = {}
+        self._by_due = {}
+        self._due_dates = []
+        nested = {}
+        for record in records:
+            kinds = nested.setdefault(record.member, {}).setdefault(record.med_id, {})
+            previous = kinds.get(record.kind)
+            if previous is not None:
+                self._index_remove(previous)
+            kinds[record.kind] = record
+            self._index_add(record)
+        self._records = nested
+
+    def _fingerprints(self):
+        """Return the fingerprint of every record, keyed by (member, med_id, kind)."""
+        return {(record.member, record.med_id, record.kind): _fingerprint(record) for record in self.iter_records()}
+
+    def _store(self, record):
+        """Insert or replace a record, keeping the indexes in sync."""
+        kinds = dict(self._records.get(record.member, {}).get(record.med_id, {}))
+        previous = kinds.get(record.kind)
+        if previous is not None:
+            self._index_remove(previous)
+        kinds[record.kind] = record
+        self._publish(record.member, record.med_id, kinds)
+        self._index_add(record)
+
+    def _store_many(self, records):
+        """
+        Insert or replace many records, copying each changed dictionary once.
+
+        _store() copies the dictionary of all members on every call; here it
+        is copied once and the new dictionaries are published together.
+        """
+        published = dict(self._records)
+        copied = set()  # Members whose dictionary is already a private copy
+        for record in records:
+            if record.member not in copied:
+                published[record.member] = dict(published.get(record.member, {}))
+                copied.add(record.member)
+            member_records = published[record.member]
+            kinds = dict(member_records.get(record.med_id, {}))
+            previous = kinds.get(record.kind)
+            if previous is not None:
+                self._index_remove(previous)
+            kinds[record.kind] = record
+            member_records[record.med_id] = kinds
+            self._index_add(record)
+        self._records = published
+
     def _load_reminders(self):
         """
-        Load reminders from the CSV file into the `self.reminders` dictionary.
+        Load reminders from the CSV file into the reminder records.
         If the file doesn't exist, create a new empty file.
+
+        The file is read under its shared lock, and the version read is
+        remembered so that a later save can detect concurrent writers.
         """
+        with self._lock.shared():
+            self._read_reminders()
+            self._version = self._lock.version()
+        self._base = self._fingerprints()
+
+    def _read_reminders(self):
+        """Read the reminders file, replacing the reminder records and indexes."""
+        if self.in_memory:
+            self._replace_all(self._saved_records)
+            return
         if not self.reminders_file.exists():
             # Create a new empty CSV file with required columns
-            df = pd.DataFrame(columns=['member', 'med_id', 'message'])
+            df = pd.DataFrame(columns=REMINDER_COLUMNS)
             df.to_csv(self.reminders_file, index=False)
+            self._replace_all([])
             return
 
         try:
-            # Read reminders from the CSV file
-            df = pd.read_csv(self.reminders_file)
-            if not df.empty:
-                # Populate the reminders dictionary
-                for _, row in df.iterrows():
-                    member = row['member']
-                    med_id = int(row['med_id'])  # Ensure medication ID is stored as an integer
-                    message = row['message']
-                    if member not in self.reminders:
-                        self.reminders[member] = {}
-                    self.reminders[member][med_id] = message
+            # Read reminders from the CSV file; files written before typed
+            # reminders only have member, med_id and message columns
+            records = self.parse_cache.load(self.reminders_file, self._parse_reminders, tag="reminders")
+            self._replace_all(records)
         except Exception as e:
             # Handle errors during loading
-            print(f"Error loading reminders: {str(e)}")
-            df = pd.DataFrame(columns=['member', 'med_id', 'message'])
+            events.error(f"Error loading reminders: {str(e)}", "reminders")
+            df = pd.DataFrame(columns=REMINDER_COLUMNS)
             df.to_csv(self.reminders_file, index=False)
+            self._replace_all([])
+
+    def _parse_reminders(self, path):
+        """
+        Parse the reminders CSV file.
+
+        Args:
+            path (Path): The reminders CSV file.
+
+        Returns:
+            list: The Reminder records in the file.
+        """
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        metrics.record_file_read("ReminderSystem._load_reminders", path)
+        return [self._record_from_row(row) for row in df.to_dict('records')]
+
+    @staticmethod
+    def _record_from_row(row):
+        """
+        Build a Reminder from a CSV row of strings.
+
+        Args:
+            row (dict): A row of the reminders CSV file.
+
+        Returns:
+            Reminder: The parsed reminder record.
+        """
+        kind = row.get('kind') or KIND_CUSTOM
+        days_left = row.get('days_left')
+        due_date = row.get('due_date')
+        created_at = row.get('created_at')
+        return Reminder(
+            kind=kind,
+            member=row['member'],
+            med_id=int(row['med_id']),  # Ensure medication ID is stored as an integer
+            severity=row.get('severity') or SEVERITY_INFO,
+            med_name=row.get('med_name') or None,
+            days_left=int(float(days_left)) if days_left else None,
+            due_date=date.fromisoformat(due_date) if due_date else None,
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+            text=row.get('message') if kind not in Reminder.TEMPLATES else None
+        )
 
     def _save_reminders(self):
         """
         Save the current reminders to the CSV file for persistence.
+
+        The file is written under its exclusive lock. If another process
+        saved it since it was loaded, the local changes are merged into the
+        saved reminders first instead of overwriting them.
+
+        Returns:
+            bool: False if saving failed, otherwise True.
         """
         try:
-            # Convert reminders dictionary into a list of rows for saving
-            data = []
-            for member, member_reminders in self.reminders.items():
-                for med_id, message in member_reminders.items():
-                    data.append({
-                        'member': member,
-                        'med_id': med_id,
-                        'message': message
-                    })
-
-            # Save the data into the reminders CSV file
-            df = pd.DataFrame(data)
-            df.to_csv(self.reminders_file, index=False)
-            print("Reminders saved successfully")
+            with self._mutex, self._lock.exclusive():
+                if self._lock.version() != self._version:
+                    self._merge_with_saved()
+                if self.in_memory:
+                    self._saved_records = list(self.iter_records())  # Records are replaced, never changed in place
+                else:
+                    self._write_file()
+                self._version = self._lock.bump()
+                self._base = self._fingerprints()
+            events.info("Reminders saved successfully", "reminders")
+            return True
         except Exception as e:
-            print(f"Error saving reminders: {str(e)}")
+            events.error(f"Error saving reminders: {str(e)}", "reminders")
+            return False
+
+    def _write_file(self):
+        """Write the reminders CSV file."""
+        # Convert reminder records into a list of rows for saving
+        data = []
+        for record in self.iter_records():
+            data.append({
+                'member': record.member,
+                'med_id': record.med_id,
+                'kind': record.kind,
+                'severity': record.severity,
+                'med_name': record.med_name,
+                'days_left': record.days_left,
+                'due_date': record.due_date.isoformat() if record.due_date else None,
+                'created_at': record.created_at.isoformat(),
+                'message': record.text
+            })
 
-    def set_reminder(self, member, med_id, message):
+        # Save the data into the reminders CSV file
+        df = pd.DataFrame(data, columns=REMINDER_COLUMNS)
+        df.to_csv(self.reminders_file, index=False)
+        metrics.record_file_write("ReminderSystem._save_reminders", self.reminders_file)
+
+    def save_to_disk(self):
+        """
+        Write the reminders file, also in in-memory mode.
+
+        In in-memory mode this is the only method that touches the disk: it
+        writes the CSV file under base_dir/data, creating the directory if
+        needed, and bumps the file's version so other processes reload it.
+        The reminders stay in memory. Otherwise it is a normal save.
+
+        Returns:
+            bool: False if saving failed, otherwise True.
+        """
+        if not self.in_memory:
+            return self._save_reminders()
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            with self._mutex, DataFileLock(self.reminders_file).exclusive() as lock:
+                self._write_file()
+                lock.bump()
+            events.info(f"Reminders written to {self.reminders_file}.", "reminders")
+            return True
+        except Exception as e:
+            events.error(f"Error writing reminders to disk: {str(e)}", "reminders")
+            return False
+
+    def _merge_with_saved(self):
+        """
+        Merge the local changes into the reminders saved by another process.
+
+        Reminders added or changed here since the last load or save replace
+        the saved ones with the same member, medication and kind; reminders
+        cleared here are cleared there; everything else is kept as saved.
+        """
+        base = self._base
+        ours = {(record.member, record.med_id, record.kind): record for record in self.iter_records()}
+        self._read_reminders()
+        for key, record in ours.items():
+            if base.get(key) != _fingerprint(record):
+                self._store(record)
+        for key in base:
+            if key not in ours:
+                self._discard(*key)
+        events.info("Merged reminder changes saved by another process.", "reminders")
+
+    def _persist(self):
+        """
+        Save the reminders, or defer the save while a batch is open or
+        group commit is enabled.
+        """
+        with self._mutex:
+            if self._batch_depth:
+                self._dirty = True
+                return
+            if self._committer is not None:
+                self._committer.mark()
+                return
+            self._save_reminders()
+
+    def enable_group_commit(self, interval=0.05, max_ops=100):
+        """
+        Save changes from a background thread instead of on every change.
+
+        See InventoryManagement.enable_group_commit.
+
+        Args:
+            interval (float, optional): Seconds an unsaved change may wait.
+            max_ops (int, optional): Number of waiting changes that triggers a save at once.
+        """
+        with self._mutex:
+            if self._committer is None:
+                self._committer = GroupCommitter(self._save_reminders, interval, max_ops,
+                                                 name="group-commit-reminders")
+
+    def disable_group_commit(self):
+        """
+        Save the pending changes and return to saving on every change.
+
+        Raises:
+            RuntimeError: If saving the pending changes failed.
+        """
+        with self._mutex:
+            committer, self._committer = self._committer, None
+        if committer is not None:
+            committer.close()
+
+    def flush(self):
+        """
+        Wait until every reminder change made so far is saved.
+
+        Must not be called inside a batch() block of the same thread.
+
+        Raises:
+            RuntimeError: If saving the pending changes failed.
+        """
+        committer = self._committer
+        if committer is not None:
+            committer.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several reminder changes into one transaction that is saved once.
+
+        If the block raises, the in-memory changes are discarded by reloading
+        the reminders file and the exception is re-raised. Other threads
+        cannot change the reminders while a batch is open. With group
+        commit, changes made before the batch are saved when it starts, so
+        a rollback does not discard them.
+
+        Yields:
+            ReminderSystem: This reminder system.
+        """
+        with self._mutex:
+            committer = self._committer
+            if not self._batch_depth and committer is not None and committer.pending:
+                self._save_reminders()
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._dirty = False
+                    self._reload()
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._dirty = False
+                self._save_reminders()
+
+    def _item_level(self):
+        """
+        Level for per-item events: DEBUG inside a batch, otherwise INFO.
+        """
+        return events.DEBUG if self._batch_depth else events.INFO
+
+    def _reload(self):
+        """Discard the in-memory reminders and load the reminders file again."""
+        with self._mutex:
+            self._load_reminders()
+
+    def set_reminder(self, member, med_id, message, severity=SEVERITY_INFO, due_date=None):
         """
         Set a reminder for a specific medication for a family member.
 
@@ -84,24 +571,183 @@ class ReminderSystem:
             member (str): The name of the family member.
             med_id (int): The ID of the medication.
             message (str): The reminder message.
+            severity (str, optional): The reminder severity.
+            due_date (date, optional): The date the reminder becomes due.
         """
-        if member not in self.reminders:
-            self.reminders[member] = {}
-        self.reminders[member][med_id] = message
-        self._save_reminders()
+        with self._mutex:
+            self._store(Reminder(
+                KIND_CUSTOM, member, med_id, severity=severity, due_date=due_date, text=message
+            ))
+            self._persist()
 
-    def clear_reminder(self, member, med_id):
+    def set_low_stock_reminder(self, member, med_id, med_name, days_left):
+        """
+        Set a low stock reminder for a medication of a family member.
+
+        The reminder is due on the day the medication is projected to run out.
+
+        Args:
+            member (str): The name of the family member.
+            med_id (int): The ID of the medication.
+            med_name (str): The name of the medication.
+            days_left (int): The number of days left before running out of stock.
+
+        Returns:
+            Reminder: The stored reminder record.
+        """
+        record = self._low_stock_record(member, med_id, med_name, days_left)
+        with self._mutex:
+            self._store(record)
+            self._persist()
+        return record
+
+    def set_low_stock_reminders(self, warnings):
+        """
+        Set the low stock reminders of many medications at once.
+
+        The same as calling set_low_stock_reminder() for every warning, but
+        the records are published and saved once, so a sweep over the whole
+        family takes time linear in its size rather than quadratic.
+
+        Args:
+            warnings (iterable): (member, med_id, med_name, days_left) tuples,
+                as returned by FamilyManagement.get_all_low_stock().
+
+        Returns:
+            list: The stored reminder records.
+        """
+        records = [self._low_stock_record(*warning) for warning in warnings]
+        if records:
+            with self._mutex:
+                self._store_many(records)
+                self._persist()
+        return records
+
+    @staticmethod
+    def _low_stock_record(member, med_id, med_name, days_left):
+        """Return the low stock reminder of a medication, due on the day it runs out."""
+        return Reminder(
+            KIND_LOW_STOCK, member, med_id,
+            severity=SEVERITY_CRITICAL if days_left <= 1 else SEVERITY_WARNING,
+            med_name=med_name,
+            days_left=days_left,
+            due_date=date.today() + timedelta(days=max(days_left, 0))
+        )
+
+    def clear_reminder(self, member, med_id, kind=None):
         """
         Clear a specific reminder for a family member.
 
         Args:
             member (str): The name of the family member.
             med_id (int): The ID of the medication whose reminder should be cleared.
+            kind (str, optional): Only clear reminders of this kind. Clears all kinds if omitted.
         """
-        if member in self.reminders and med_id in self.reminders[member]:
-            del self.reminders[member][med_id]
-            self._save_reminders()
-            print(f"Cleared reminder for {member} - Medication ID {med_id}.")
+        with self._mutex:
+            kinds = self._records.get(member, {}).get(med_id)
+            if not kinds or (kind is not None and kind not in kinds):
+                return
+            kinds = dict(kinds)
+            for record_kind in ([kind] if kind is not None else list(kinds)):
+                self._index_remove(kinds.pop(record_kind))
+            self._publish(member, med_id, kinds)
+            self._persist()
+        events.emit(self._item_level(), f"Cleared reminder for {member} - Medication ID {med_id}.", "reminders")
+
+    def set_interaction_reminder(self, member, med_id, med_name, message, severity=SEVERITY_WARNING):
+        """
+        Set a drug-interaction reminder for a medication of a family member.
+
+        Args:
+            member (str): The name of the family member.
+            med_id (int): The ID of the medication.
+            med_name (str): The name of the medication.
+            message (str): The interactions found, as text.
+            severity (str, optional): The reminder severity.
+
+        Returns:
+            Reminder: The stored reminder record.
+        """
+        record = Reminder(KIND_INTERACTION, member, med_id, severity=severity, med_name=med_name, text=message)
+        with self._mutex:
+            self._store(record)
+            self._persist()
+        return record
+
+    def clear_interaction_reminder(self, member, med_id):
+        """
+        Clear the drug-interaction reminder for a medication of a family member.
+
+        Args:
+            member (str): The name of the family member.
+            med_id (int): The ID of the medication.
+        """
+        self.clear_reminder(member, med_id, kind=KIND_INTERACTION)
+
+    def sync_interaction_reminders(self, member, alerts):
+        """
+        Make a member's drug-interaction reminders match a complete check.
+
+        Reminders of medications without interactions are cleared, and the
+        reminders are saved once, only if something changed.
+
+        Args:
+            member (str): The name of the family member.
+            alerts (dict): {med_id: (med_name, message, severity)} for every
+                medication of the member that has interactions.
+        """
+        with self._mutex:
+            changed = False
+            for med_id, kinds in list(self._records.get(member, {}).items()):
+                if KIND_INTERACTION in kinds and med_id not in alerts:
+                    self._discard(member, med_id, KIND_INTERACTION)
+                    changed = True
+            for med_id, (med_name, message, severity) in alerts.items():
+                current = self._records.get(member, {}).get(med_id, {}).get(KIND_INTERACTION)
+                if current is not None and (current.text, current.severity) == (message, severity):
+                    continue
+                self._store(Reminder(KIND_INTERACTION, member, med_id, severity=severity,
+                                     med_name=med_name, text=message))
+                changed = True
+            if changed:
+                self._persist()
+
+    def sync_refill_reminders(self, refills):
+        """
+        Replace the refill reminders with those of a new refill plan.
+
+        Refill reminders of medications that are not in the plan are
+        cleared, and the reminders are saved once, only if something changed.
+
+        Args:
+            refills (dict): {(member, med_id): (date, refill)} where refill has
+                name and days_left, as returned by RefillPlanner.next_refills.
+        """
+        with self._mutex:
+            changed = False
+            for member, med_id in list(self._by_kind.get(KIND_REFILL, ())):
+                if (member, med_id) not in refills:
+                    self._discard(member, med_id, KIND_REFILL)
+                    changed = True
+            for (member, med_id), (due_date, refill) in refills.items():
+                current = self._records.get(member, {}).get(med_id, {}).get(KIND_REFILL)
+                if current is not None and (current.due_date, current.days_left) == (due_date, refill.days_left):
+                    continue
+                self._store(Reminder(KIND_REFILL, member, med_id, severity=SEVERITY_INFO, med_name=refill.name,
+                                     days_left=refill.days_left, due_date=due_date))
+                changed = True
+            if changed:
+                self._persist()
+
+    def clear_low_stock_reminder(self, member, med_id):
+        """
+        Clear the low stock reminder for a medication of a family member.
+
+        Args:
+            member (str): The name of the family member.
+            med_id (int): The ID of the medication.
+        """
+        self.clear_reminder(member, med_id, kind=KIND_LOW_STOCK)
 
     def check_alerts(self, member, low_stock_warnings):
         """
@@ -116,9 +762,62 @@ class ReminderSystem:
         """
         if low_stock_warnings:
             for med_id, med_name, days_left in low_stock_warnings:
-                message = f"Low stock alert for {med_name} (ID {med_id})! Only {days_left} days left."
-                self.set_reminder(member, med_id, message)
-                print(message)  # Print the alert for immediate feedback
+                record = self.set_low_stock_reminder(member, med_id, med_name, days_left)
+                events.warning(record.render(), "reminders")  # Report the alert for immediate feedback
+
+    def iter_records(self, member=None):
+        """
+        Iterate over reminder records.
+
+        Args:
+            member (str, optional): Only yield records of this family member.
+
+        Yields:
+            Reminder: The matching reminder records.
+        """
+        records = self._records  # A consistent snapshot; changes replace the dictionaries
+        members = [member] if member is not None else list(records)
+        for name in members:
+            for kinds in records.get(name, {}).values():
+                yield from kinds.values()
+
+    def find_reminders(self, member=None, kind=None, severity=None, due_before=None):
+        """
+        Find reminder records matching all of the given filters.
+
+        The kind and due-date filters are answered from indexes, so only the
+        matching records are visited.
+
+        Args:
+            member (str, optional): The name of the family member.
+            kind (str, optional): The reminder kind.
+            severity (str, optional): The reminder severity.
+            due_before (date, optional): Only include reminders due on or before this date.
+
+        Returns:
+            list: The matching Reminder records, ordered by due date when filtering on it.
+        """
+        if due_before is not None:
+            candidates = []
+            with self._mutex:  # The indexes are updated in place
+                for due in self._due_dates[:bisect_right(self._due_dates, due_before)]:
+                    for rec_member, med_id, rec_kind in sorted(self._by_due[due], key=str):
+                        candidates.append(self._records[rec_member][med_id][rec_kind])
+        elif kind is not None:
+            with self._mutex:
+                candidates = [
+                    self._records[rec_member][med_id][kind]
+                    for rec_member, med_id in self._by_kind.get(kind, ())
+                ]
+        else:
+            candidates = self.iter_records(member)
+
+        return [
+            record for record in candidates
+            if (member is None or record.member == member)
+            and (kind is None or record.kind == kind)
+            and (severity is None or record.severity == severity)
+        ]
 
     def list_reminders(self, member):
         """
@@ -127,7 +826,7 @@ class ReminderSystem:
         Args:
             member (str): The name of the family member.
         """
-        if member not in self.reminders or not self.reminders[member]:
+        if member not in self._records or not self._records[member]:
             print(f"\nNo active reminders for {member}.")
             return
 
@@ -139,7 +838,7 @@ class ReminderSystem:
         """
         List all active reminders for all family members.
         """
-        if not any(reminders for reminders in self.reminders.values()):
+        if not any(reminders for reminders in self._records.values()):
             print("\nNo active reminders.")
             return
 
@@ -157,7 +856,15 @@ class ReminderSystem:
         Args:
             member (str): The name of the family member.
         """
-        if member in self.reminders:
-            self.reminders[member] = {}
-            self._save_reminders()
-            print(f"All reminders cleared for {member}.")
+        with self._mutex:
+            if member not in self._records:
+                return
+            for record in list(self.iter_records(member)):
+                self._index_remove(record)
+            self._records = {**self._records, member: {}}
+            self._persist()
+        events.emit(self._item_level(), f"All reminders cleared for {member}.", "reminders")
+
+
+# Instrument the public methods and the load/save helpers (active only when enabled)
+metrics.register(ReminderSystem)
@@ -0,0 +1,257 @@
+# schedule.py
+# Dose schedules: when each medication is taken, as a time-ordered stream over the family.
+import threading
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import count
+from medication_management.prescription import PrescriptionMedication
+from medication_management.units import parse_frequency
+
+# One dose to take: when, by whom, of which medication and how many units
+Dose = namedtuple("Dose", ["time", "member", "med_id", "name", "units"])
+
+# Dose times for up to four doses a day, in minutes after midnight
+DOSE_TIMES = {
+    1: (8 * 60,),
+    2: (8 * 60, 20 * 60),
+    3: (8 * 60, 14 * 60, 20 * 60),
+    4: (8 * 60, 12 * 60, 16 * 60, 20 * 60),
+}
+
+# Time of the first dose of the day, in minutes after midnight
+FIRST_DOSE = 8 * 60
+
+# Day ordinals bounding a medication that is always active
+ALWAYS = (0, date.max.toordinal())
+
+
+@lru_cache(maxsize=4096)
+def dose_plan(frequency, daily_dosage):
+    """
+    Return when a medication is taken, from its frequency and daily dosage.
+
+    Up to four doses a day are taken at the times in DOSE_TIMES; more are
+    spread evenly over the day from FIRST_DOSE. The daily dosage is split
+    evenly over the doses of a day. A medication taken less than daily, e.g.
+    "every other day" or "weekly", takes its daily dosage at FIRST_DOSE on
+    every dosing day. Results are cached per distinct pair, since the same
+    few values repeat across many medications.
+
+    Args:
+        frequency (str): The frequency string.
+        daily_dosage (int): Units per day.
+
+    Returns:
+        tuple: (period, ((minute, units), ...)): the doses are taken every
+        `period` days, at the given minutes after midnight. None if the
+        frequency is not understood, the medication is taken as needed or
+        the daily dosage is not a positive integer.
+    """
+    per_day = parse_frequency(frequency)
+    if per_day is None or not isinstance(daily_dosage, int) or daily_dosage <= 0:
+        return None
+    if per_day < 1:
+        return max(1, round(1 / per_day)), ((FIRST_DOSE, daily_dosage),)
+    doses = max(1, round(per_day))
+    minutes = DOSE_TIMES.get(doses) or tuple(sorted((FIRST_DOSE + i * 1440 // doses) % 1440 for i in range(doses)))
+    units = daily_dosage // doses if daily_dosage % doses == 0 else daily_dosage / doses
+    return 1, tuple((minute, units) for minute in minutes)
+
+
+def _active_days(medication):
+    """
+    Return the first and last day ordinals a medication is taken on.
+
+    A prescription is taken from its prescription date to its expiration
+    date; other medications, and prescriptions with unreadable dates, always.
+    """
+    if not isinstance(medication, PrescriptionMedication):
+        return ALWAYS
+    try:
+        first = datetime.strptime(medication.prescription_date, "%Y-%m-%d").toordinal()
+        last = datetime.strptime(medication.expiration_date, "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError):
+        return ALWAYS
+    return first, last
+
+
+class DoseScheduler:
+    """
+    Dose timetables of the whole family, generated lazily.
+
+    Every schedulable medication is turned into its doses of one day once:
+    (minute, member, medication, units) entries plus the days they apply
+    to. The entries are kept in buckets by minute of the day, so the
+    family's day in time order is a walk over the buckets, and any number of
+    days is generated one dose at a time without materializing them.
+
+    The scheduler listens to the member inventories. When a medication is
+    added, changed or deleted, only that medication's entries are replaced;
+    members added or removed are picked up on the next query. A running
+    stream sees changes from its next day on.
+
+    Attributes:
+        family_manager (FamilyManagement): The family to schedule.
+    """
+
+    def __init__(self, family_manager):
+        """
+        Initialize a DoseScheduler.
+
+        Args:
+            family_manager (FamilyManagement): The family to schedule.
+        """
+        self.family_manager = family_manager
+        self._lock = threading.Lock()  # Guards the indexes against inventory listeners on other threads
+        self._inventories = {}  # member -> InventoryManagement listened to
+        self._by_member = {}  # member -> {med_id: dose entries of one day}
+        self._buckets = {}  # minute -> {(member, med_id): dose entry}
+        self._timeline = None  # All dose entries of one day in time order, None when stale
+
+    def close(self):
+        """Stop listening to the member inventories."""
+        with self._lock:
+            for inventory in self._inventories.values():
+                inventory.remove_listener(self._on_change)
+            self._inventories = {}
+            self._by_member = {}
+            self._buckets = {}
+            self._timeline = None
+
+    def _sync_members(self):
+        """Start listening to new members' inventories and drop removed members."""
+        members = self.family_manager.members
+        with self._lock:
+            for member, inventory in list(self._inventories.items()):
+                if members.get(member) is not inventory:
+                    inventory.remove_listener(self._on_change)
+                    del self._inventories[member]
+                    self._update(member, {}, None)
+            for member, inventory in list(members.items()):
+                if member not in self._inventories:
+                    self._inventories[member] = inventory
+                    inventory.add_listener(self._on_change)
+                    self._update(member, inventory.medications, None)
+
+    def _on_change(self, inventory, med_ids):
+        """Inventory listener: replace the entries of the changed medications."""
+        with self._lock:
+            if self._inventories.get(inventory.member_name) is inventory:
+                self._update(inventory.member_name, inventory.medications, med_ids)
+
+    def _update(self, member, medications, med_ids):
+        """
+        Replace the dose entries of some of a member's medications.
+
+        Args:
+            member (str): The member.
+            medications (dict): The member's medications keyed by ID.
+            med_ids (iterable): The IDs to update, or None for all.
+        """
+        current = self._by_member.setdefault(member, {})
+        if med_ids is None:
+            med_ids = list(current.keys() | medications.keys())
+        for med_id in med_ids:
+            for entry in current.pop(med_id, ()):
+                bucket = self._buckets[entry[0]]
+                del bucket[(member, med_id)]
+                if not bucket:
+                    del self._buckets[entry[0]]
+            medication = medications.get(med_id)
+            entries = self._entries(member, med_id, medication) if medication is not None else ()
+            if entries:
+                current[med_id] = entries
+                for entry in entries:
+                    self._buckets.setdefault(entry[0], {})[(member, med_id)] = entry
+        if not current:
+            del self._by_member[member]
+        self._timeline = None
+
+    @staticmethod
+    def _entries(member, med_id, medication):
+        """Return the dose entries of one day of a medication, or () if it is not scheduled."""
+        plan = dose_plan(medication.frequency, medication.daily_dosage)
+        if plan is None:
+            return ()
+        period, doses = plan
+        first, last = _active_days(medication)
+        return tuple((minute, timedelta(minutes=minute), member, med_id, medication.name, units, period, first, last)
+                     for minute, units in doses)
+
+    def _day_entries(self, members):
+        """Return the dose entries of one day in time order, of all members or the given ones."""
+        with self._lock:
+            if members is not None:
+                entries = [entry for member in members
+                           for med_entries in self._by_member.get(member, {}).values() for entry in med_entries]
+                entries.sort(key=lambda entry: (entry[0], entry[2], entry[3]))
+                return entries
+            if self._timeline is None:
+                self._timeline = tuple(bucket[key] for minute, bucket in sorted(self._buckets.items())
+                                       for key in sorted(bucket))
+            return self._timeline
+
+    def stream(self, start=None, days=1, members=None):
+        """
+        Generate the doses of a number of days in time order.
+
+        Doses at the same time are ordered by member and medication ID.
+
+        Args:
+            start (date, optional): The first day. Defaults to today.
+            days (int, optional): The number of days, or None for no end.
+            members (iterable, optional): Only these members. Defaults to the whole family.
+
+        Yields:
+            Dose: The doses.
+        """
+        self._sync_members()
+        start = start or date.today()
+        members = None if members is None else set(members)
+        for offset in (count() if days is None else range(days)):
+            day = start + timedelta(days=offset)
+            ordinal = day.toordinal()
+            midnight = datetime.combine(day, time())
+            for _, delta, member, med_id, name, units, period, first, last in self._day_entries(members):
+                if ordinal < first or ordinal > last:
+                    continue
+                if period > 1 and (ordinal - first) % period:
+                    continue
+                yield Dose(midnight + delta, member, med_id, name, units)
+
+    def member_day(self, member, day=None):
+        """
+        Return the doses of one member on one day.
+
+        Args:
+            member (str): The member.
+            day (date, optional): The day. Defaults to today.
+
+        Returns:
+            list: Dose tuples in time order.
+        """
+        return list(self.stream(day, 1, [member]))
+
+    def upcoming(self, now=None, hours=24, members=None):
+        """
+        Return the doses due within some hours.
+
+        Args:
+            now (datetime, optional): The current time. Defaults to now.
+            hours (float, optional): How far to look ahead.
+            members (iterable, optional): Only these members. Defaults to the whole family.
+
+        Returns:
+            list: Dose tuples in time order, due at or after now and before now + hours.
+        """
+        now = now or datetime.now()
+        end = now + timedelta(hours=hours)
+        days = (end.date() - now.date()).days + 1
+        doses = []
+        for dose in self.stream(now.date(), days, members):
+            if dose.time >= end:
+                break
+            if dose.time >= now:
+                doses.append(dose)
+        return doses
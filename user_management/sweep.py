@@ -0,0 +1,174 @@
+# sweep.py
+# Streaming sweeps over the members' inventory files, one chunk of rows at a time.
+import csv
+from collections import namedtuple
+from datetime import date, timedelta
+from pathlib import Path
+import numpy as np  # For evaluating the conditions over a whole chunk
+from medication_management import events
+from medication_management.inventory import medication_from_record
+from medication_management.locking import DataFileLock
+
+# Conditions a sweep reports
+SWEEP_LOW_STOCK = "low_stock"  # Days of stock left at or below the threshold
+SWEEP_PRESCRIPTION_EXPIRY = "prescription_expiry"  # Prescription expired or expiring soon
+SWEEP_LOT_EXPIRY = "lot_expiry"  # Stock in a lot that expired or expires soon
+
+# One finding: the medication, the condition and its details. days_left is
+# set for low stock, expiry for both expiry conditions and quantity for lots.
+SweepResult = namedtuple("SweepResult", ["member", "med_id", "name", "kind", "days_left", "expiry", "quantity"])
+
+# Rows evaluated together by default
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def _read_members(data_dir):
+    """Yield the member names in members.csv; the file is closed and unlocked first."""
+    members_file = data_dir / "members.csv"
+    if not members_file.exists():
+        return
+    with DataFileLock(members_file).shared(), open(members_file, newline="") as stream:
+        names = [row['name'] for row in csv.DictReader(stream)]
+    yield from names
+
+
+class _Chunk:
+    """The columns of up to chunk_size inventory rows, evaluated together."""
+
+    def __init__(self):
+        self.members = []
+        self.med_ids = []
+        self.names = []
+        self.stock = []
+        self.daily_dosage = []
+        self.expiration = []  # Expiration dates of prescriptions, "" otherwise
+        self.rows = {}  # Position -> row, for rows with lots only
+
+    def __len__(self):
+        return len(self.med_ids)
+
+    def add(self, member, row):
+        """Add one CSV row, raising ValueError if a required field is invalid."""
+        med_id = int(float(row['med_id']))
+        stock = int(float(row['stock']))
+        daily_dosage = int(float(row['daily_dosage']))
+        prescription = str(row.get('is_prescription', '')).strip().lower() in ("true", "1", "yes")
+        if row.get('lots'):
+            self.rows[len(self.med_ids)] = row
+        self.members.append(member)
+        self.med_ids.append(med_id)
+        self.names.append(row['name'])
+        self.stock.append(stock)
+        self.daily_dosage.append(daily_dosage)
+        self.expiration.append((row.get('expiration_date') or "") if prescription else "")
+
+    def evaluate(self, threshold, today, horizon):
+        """
+        Return the findings of the chunk, in row order.
+
+        Days left are stock // daily dosage for the whole chunk at once;
+        rows with dated lots are recomputed from their lots, as
+        Medication.calculate_days_left() does. Rows without a positive
+        daily dosage are not checked for low stock.
+        """
+        count = len(self)
+        stock = np.array(self.stock, dtype=np.int64)
+        daily_dosage = np.array(self.daily_dosage, dtype=np.int64)
+        valid = daily_dosage > 0
+        days_left = np.zeros(count, dtype=np.int64)
+        np.floor_divide(stock, daily_dosage, out=days_left, where=valid)
+        expiration = np.array(self.expiration, dtype="U10")
+        prescription_expiry = (expiration != "") & (expiration < horizon.isoformat())
+
+        lot_expiry = {}  # Position -> (earliest expiry in the window, quantity expiring in it)
+        for position, row in self.rows.items():
+            try:
+                medication = medication_from_record(row)
+            except (KeyError, ValueError) as e:
+                events.error(f"Error reading lots of {self.members[position]}'s medication "
+                             f"{self.med_ids[position]}: {str(e)}", "sweep")
+                continue
+            lots = medication.stock_lots()
+            if valid[position] and lots.is_dated():
+                days_left[position] = medication.calculate_days_left(today)
+            expiring = [(expiry, quantity) for quantity, expiry in lots.lots()
+                        if expiry is not None and expiry < horizon]
+            if expiring:
+                lot_expiry[position] = (expiring[0][0].isoformat(), sum(quantity for _, quantity in expiring))
+
+        low_stock = valid & (days_left <= threshold)
+        flagged = low_stock | prescription_expiry
+        if lot_expiry:
+            flagged[list(lot_expiry)] = True
+        results = []
+        for position in np.flatnonzero(flagged).tolist():
+            member, med_id, name = self.members[position], self.med_ids[position], self.names[position]
+            if low_stock[position]:
+                results.append(SweepResult(member, med_id, name, SWEEP_LOW_STOCK, int(days_left[position]), None, None))
+            if prescription_expiry[position]:
+                results.append(SweepResult(member, med_id, name, SWEEP_PRESCRIPTION_EXPIRY, None,
+                                           self.expiration[position], None))
+            if position in lot_expiry:
+                expiry, quantity = lot_expiry[position]
+                results.append(SweepResult(member, med_id, name, SWEEP_LOT_EXPIRY, None, expiry, quantity))
+        return results
+
+
+def sweep_inventories(base_dir, threshold=3, expiry_days=0, chunk_size=DEFAULT_CHUNK_SIZE, members=None, today=None):
+    """
+    Check every member's inventory file for low stock and expiry, streaming.
+
+    Unlike FamilyManagement.get_all_low_stock(), no inventory is loaded:
+    each member's CSV file is read row by row, rows are collected into
+    chunks of chunk_size rows across members, and each chunk is evaluated
+    with numpy and dropped before the next is read. Memory use is bounded by
+    the chunk size, not the size of the family, so a nightly sweep fits on
+    a small machine. Each file is read under its shared lock, which is
+    released before its findings are yielded. The sweep only reads: no
+    reminder is set.
+
+    Args:
+        base_dir (str or Path): The base directory of the data.
+        threshold (int, optional): Days of stock left at or below which a
+            medication is reported, as in check_low_stock().
+        expiry_days (int, optional): Also report prescriptions and lots
+            expiring within this many days; 0 reports only those already
+            expired (a lot can still be used on its expiration date).
+        chunk_size (int, optional): Rows evaluated together.
+        members (iterable, optional): Only these members, in this order.
+            Defaults to every member in members.csv.
+        today (date, optional): The current date. Defaults to today.
+
+    Yields:
+        SweepResult: The findings, by member in order and by row in each
+        file; a medication meeting several conditions yields one per condition.
+
+    Raises:
+        ValueError: If chunk_size is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive.")
+    data_dir = Path(base_dir) / "data"
+    today = today or date.today()
+    horizon = today + timedelta(days=expiry_days)
+    chunk = _Chunk()
+    results = []
+    for member in (_read_members(data_dir) if members is None else members):
+        inventory_file = data_dir / f"{member}_inventory.csv"
+        if not inventory_file.exists():
+            continue
+        with DataFileLock(inventory_file).shared(), open(inventory_file, newline="") as stream:
+            for line_number, row in enumerate(csv.DictReader(stream), start=2):
+                try:
+                    chunk.add(member, row)
+                except (KeyError, TypeError, ValueError) as e:
+                    events.error(f"Skipping line {line_number} of {inventory_file.name}: {str(e)}", "sweep")
+                    continue
+                if len(chunk) >= chunk_size:
+                    results.extend(chunk.evaluate(threshold, today, horizon))
+                    chunk = _Chunk()
+        # Findings are yielded outside the lock, so a paused consumer never blocks writers
+        yield from results
+        results = []
+    if len(chunk):
+        yield from chunk.evaluate(threshold, today, horizon)